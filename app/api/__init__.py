@@ -11,6 +11,8 @@ from .eliminacion_evento import router as eliminacion_evento_router
 from .notificacion import router as notificacion_router
 from .suscripcion import router as suscripcion_router
 from .pagos import router as pagos_router
+from .salud import router as salud_router
+from .tareas import router as tareas_router
 
 
 routers = [ 
@@ -26,6 +28,8 @@ routers = [
            reportes_router,
            notificacion_router,
            suscripcion_router,
-           pagos_router
+           pagos_router,
+           salud_router,
+           tareas_router
            ]
 
@@ -11,7 +11,7 @@ from app.models.registro_models import Evento
 
 # Schemas
 from app.schemas.evento_solicitud_schema import (
-    SolicitudPublicacionResponse, 
+    SolicitudPublicacionResumen,
     RevisionSolicitud, 
     SolicitudesPaginadas,
     SolicitudEliminacionResponse
@@ -74,7 +74,7 @@ def listar_todas(
 
 @router.get(
     "/solicitudes/pendientes", 
-    response_model=list[SolicitudPublicacionResponse], 
+    response_model=list[SolicitudPublicacionResumen], 
     summary="Ver Altas Pendientes"
 )
 def ver_pendientes_alta(db: Session = Depends(get_db), admin: Usuario = Depends(require_admin)):
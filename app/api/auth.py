@@ -1,4 +1,6 @@
 # app/api/auth.py
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -18,8 +20,8 @@ router = APIRouter(prefix="/auth", tags=["Autenticación"])
     summary="Registro de usuario",
     description="Endpoint para registrar un nuevo usuario en el sistema"
 )
-def register(usuario_data: UsuarioCreate, db: Session = Depends(get_db)):
-    new_usuario = AuthService.register_usuario(db, usuario_data)
+async def register(usuario_data: UsuarioCreate, db: Session = Depends(get_db)):
+    new_usuario = await AuthService.register_usuario(db, usuario_data)
     return new_usuario
 
 
@@ -33,7 +35,7 @@ def register(usuario_data: UsuarioCreate, db: Session = Depends(get_db)):
 # ANTES devolvíamos: { "access_token": "...", "token_type": "bearer" }
 # AHORA devolvemos: { "access_token": "...", "token_type": "bearer", "user": {...} }
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """
     Endpoint de login que autentica al usuario y devuelve:
     1. Token de acceso (JWT)
@@ -47,14 +49,15 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     )
     
     # 1. Autenticar y obtener el token (esto ya existía)
-    token_data = AuthService.authenticate_usuario(db, login_data)
+    token_data = await AuthService.authenticate_usuario(db, login_data)
     
     # ========================================
     # ✅ NUEVO: Obtener información del usuario
     # ========================================
     # Usamos el token recién generado para obtener los datos completos del usuario
     # Esto incluye: id_usuario, nombre_y_apellido, email, id_rol, telefono, etc.
-    usuario = AuthService.get_current_usuario_from_token(db, token_data["access_token"])
+    # (en un thread: el endpoint es async y esto consulta la base)
+    usuario = await asyncio.to_thread(AuthService.get_current_usuario_from_token, db, token_data["access_token"])
     
     # ========================================
     # ✅ NUEVO: Devolver token + datos del usuario
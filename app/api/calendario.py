@@ -2,10 +2,8 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db 
-from app.db.crud import calendario_crud as crud
 from app.schemas import calendario_schema as schemas
 from app.services import calendario_services as service     
-from app.models.inscripcion_models import ReservaEvento 
 
 router = APIRouter(tags=["Calendario"])
 calendario_srv = service.CalendarioService()
@@ -19,66 +17,7 @@ def obtener_calendario_mensual(
     """
     Endpoint para el calendario mensual.
     Devuelve eventos con detalles completos y lógica de cupos corregida.
+    🚀 Una sola consulta por mes (eventos + reservas) y resultado cacheado
+    hasta que cambie algún evento o reserva.
     """
-    
-    # 1. Llamamos al servicio (Lógica de fechas)
-    fecha_inicio, fecha_fin = calendario_srv.obtener_rango_fechas(month, year)
-    
-    if not fecha_inicio:
-        return [] 
-
-    # 2. Llamamos al CRUD (Base de datos)
-    resultados_db = crud.get_eventos_calendario(db, fecha_inicio, fecha_fin)
-    
-    # 3. Mapeo manual
-    lista_eventos = []
-    
-    for row in resultados_db:
-        
-        id_evento_actual = row[0]
-        cupo_db = row[10] # Valor crudo de la base de datos (puede ser None, 0 o un número)
-        
-        # Contamos cuántos inscriptos hay
-        ocupados = db.query(ReservaEvento).filter(ReservaEvento.id_evento == id_evento_actual).count()
-        
-        # --- LÓGICA CORREGIDA AQUÍ ---
-        if cupo_db and cupo_db > 0:
-            # CASO A: Tiene límite (ej: 50). Calculamos la resta.
-            cupo_maximo_actual = cupo_db
-            disponibles = cupo_db - ocupados
-        else:
-            # CASO B: Es 0 o None (Ilimitado).
-            # No restamos. Enviamos None para que el front sepa que es libre.
-            cupo_maximo_actual = 0
-            disponibles = None 
-        # -----------------------------
-
-        evento_dict = {
-            # --- Datos Básicos ---
-            "id_evento": row[0],       
-            "nombre_evento": row[1],
-            "fecha_evento": row[2],
-            "ubicacion": row[3],
-
-            # --- Tipo ---
-            "id_tipo": row[4] if row[4] is not None else 0,
-            "nombre_tipo": row[5] if row[5] is not None else "General",
-
-            # --- Dificultad ---
-            "id_dificultad": row[6] if row[6] is not None else 0,
-            "nombre_dificultad": row[7] if row[7] is not None else "General",
-
-            # --- Detalles Extra ---
-            "descripcion": row[8] if row[8] is not None else "",
-            "costo_participacion": row[9] if row[9] is not None else 0.0,
-            
-            "cupo_maximo": cupo_maximo_actual,
-            "cupos_disponibles": disponibles, # Ahora mandamos None si es ilimitado
-
-            # --- Coordenadas ---
-            "lat": row[11] if row[11] is not None else None,
-            "lng": row[12] if row[12] is not None else None
-        }
-        lista_eventos.append(evento_dict)
-    
-    return lista_eventos
\ No newline at end of file
+    return calendario_srv.obtener_calendario_mensual(db, month, year)
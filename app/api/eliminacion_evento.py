@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -83,6 +83,7 @@ def obtener_bajas_pendientes(
 @router.patch("/admin/aprobar-baja/{id_evento}")
 def aprobar_baja(
     id_evento: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(get_current_user)
 ):
@@ -95,13 +96,15 @@ def aprobar_baja(
     return EliminacionService.aprobar_baja(
         db=db,
         id_evento=id_evento,
-        id_admin=usuario_actual.id_usuario
+        id_admin=usuario_actual.id_usuario,
+        background_tasks=background_tasks
     )
 
 
 @router.patch("/admin/rechazar-baja/{id_evento}")
 def rechazar_baja(
     id_evento: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     usuario_actual: Usuario = Depends(get_current_user)
 ):
@@ -111,7 +114,7 @@ def rechazar_baja(
     if usuario_actual.id_rol not in [1, 2]:
         raise HTTPException(status_code=403, detail="Requiere permisos de administrador")
     
-    return EliminacionService.rechazar_baja(db=db, id_evento=id_evento)
+    return EliminacionService.rechazar_baja(db=db, id_evento=id_evento, background_tasks=background_tasks)
 
 
 # ============================================================================
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.broker import broker
+from app.core.cache import etag_coincide
 from app.api.auth import get_current_user
 from app.models.auth_models import Usuario
-from app.core.security import security
-from app.db.database import get_db
+from app.core.security import STREAM_TOKEN_SEGUNDOS, create_stream_token, decode_stream_token
+from app.db.database import SessionLocal, get_db
 from app.schemas.notificacion_schema import NotificacionResponse
 from app.services.notificacion_service import NotificacionService
+from app.services.auth_services import AuthService
 
 
 router = APIRouter(
@@ -14,13 +20,123 @@ router = APIRouter(
     tags=["Notificaciones"]
 )
 
-# 📌 Ver todas las notificaciones del usuario logueado
+# El navegador revalida siempre con If-None-Match (y nadie más guarda la respuesta)
+CACHE_CONTROL_NOTIFICACIONES = "private, no-cache"
+
+# Canal en vivo (SSE)
+PING_SEGUNDOS = 20                 # mantiene viva la conexión a través de proxies
+REINTENTO_MS = 5000                # cuánto espera el EventSource para reconectar
+MAX_CONEXIONES_STREAM = int(os.getenv("PUSH_MAX_CONEXIONES", "10000"))
+
+
+def _sin_cambios(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Setea ETag en la respuesta; si el cliente ya tiene esa versión devuelve un 304."""
+    cabeceras = {"ETag": etag, "Cache-Control": CACHE_CONTROL_NOTIFICACIONES}
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return None
+
+
+# 📌 Ver las notificaciones del usuario logueado
+#    - sin parámetros: todas (como siempre)
+#    - con limite / cursor: paginado por keyset; X-Next-Cursor trae el cursor de la siguiente página
+#    - ETag / If-None-Match: si no hubo cambios responde 304 sin leer las notificaciones
 @router.get("/", response_model=List[NotificacionResponse])
 def listar_mis_notificaciones(
+    request: Request,
+    response: Response,
+    limite: Optional[int] = Query(None, ge=1, le=100, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    etag = NotificacionService.etag(db, current_user.id_usuario, limite, cursor)
+    no_modificado = _sin_cambios(request, response, etag)
+    if no_modificado:
+        return no_modificado
+
+    if limite is None and cursor is None:
+        return NotificacionService.listar_notificaciones_usuario(db, current_user.id_usuario)
+
+    pagina, siguiente = NotificacionService.listar_pagina(db, current_user.id_usuario, limite or 20, cursor)
+    if siguiente:
+        response.headers["X-Next-Cursor"] = siguiente
+    return pagina
+
+# 📌 Canal en vivo (Server-Sent Events): avisa "notificaciones" y "pagos" del usuario
+#    apenas se confirman, en lugar de que el navbar consulte cada 30 segundos.
+#    EventSource no permite headers: el front pide antes un token de stream
+#    (POST /stream/token, dura STREAM_TOKEN_SEGUNDOS) y lo pasa como ?token=.
+#    El token de login nunca va en la URL.
+@router.post("/stream/token")
+def token_stream(current_user: Usuario = Depends(get_current_user)):
+    return {"token": create_stream_token(current_user.id_usuario), "expira_en": STREAM_TOKEN_SEGUNDOS}
+
+
+def _usuario_del_stream(request: Request, token: Optional[str] = Query(None)) -> int:
+    """
+    Sin Depends(get_db): el cierre de las dependencias con yield corre después de
+    la respuesta, y un stream abierto retendría una conexión del pool todo el rato.
+    """
+    if token:
+        id_usuario = decode_stream_token(token)
+        if id_usuario is None:
+            raise HTTPException(status_code=401, detail="Token de stream inválido o vencido")
+        return id_usuario
+
+    # Clientes que sí pueden mandar headers: token de login en Authorization
+    esquema, _, token = request.headers.get("authorization", "").partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Falta el token")
+    db = SessionLocal()
+    try:
+        return AuthService.get_current_usuario_from_token(db, token).id_usuario
+    finally:
+        db.close()
+
+
+async def _eventos_sse(id_usuario: int):
+    suscripcion = broker.suscribir(id_usuario)
+    try:
+        yield f"retry: {REINTENTO_MS}\n\nevent: conectado\ndata: {{}}\n\n"
+        while True:
+            evento = await suscripcion.siguiente(timeout=PING_SEGUNDOS)
+            if evento is None:
+                yield ": ping\n\n"
+                continue
+            datos = json.dumps(evento["datos"], ensure_ascii=False)
+            yield f"event: {evento['tipo']}\ndata: {datos}\n\n"
+    finally:
+        # Al cortarse la conexión Starlette cancela el generador
+        broker.desuscribir(suscripcion)
+
+
+@router.get("/stream")
+async def stream_notificaciones(id_usuario: int = Depends(_usuario_del_stream)):
+    if broker.conexiones() >= MAX_CONEXIONES_STREAM:
+        raise HTTPException(status_code=503, detail="Demasiadas conexiones; usar el polling")
+    return StreamingResponse(
+        _eventos_sse(id_usuario),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# 📌 Cantidad de no leídas (badge del navbar): un COUNT sobre el índice parcial
+@router.get("/unread-count")
+def contar_no_leidas(
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return {"no_leidas": NotificacionService.contar_no_leidas(db, current_user.id_usuario)}
+
+# 📌 Marcar todas como leídas (un solo UPDATE)
+@router.put("/leer-todas")
+def marcar_todas_leidas(
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    return NotificacionService.listar_notificaciones_usuario(db, current_user.id_usuario)
+    return {"actualizadas": NotificacionService.marcar_todas_leidas(db, current_user.id_usuario)}
 
 # 📌 Marcar una notificación como leída (solo si es tuya)
 @router.put("/{id_notificacion}", response_model=NotificacionResponse)
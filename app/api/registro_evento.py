@@ -3,7 +3,7 @@
 
 import os
 
-from fastapi import APIRouter, Depends, Header, status, HTTPException, File, Form, UploadFile, Request, Query
+from fastapi import APIRouter, Depends, Header, status, HTTPException, File, Form, UploadFile, Request, Query, Response
 from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
@@ -13,10 +13,13 @@ from pydantic import ValidationError
 
 from app.db.database import get_db
 from app.db.crud import registro_crud
+from app.core import paginacion
+from app.core.cache import etag_coincide
 from app.core.security import security
 from app.services.auth_services import AuthService
-from app.schemas.registro_schema import EventoCancelacionRequest, EventoCreate, EventoResponse, EventoBorradorCreate
+from app.schemas.registro_schema import EventoCancelacionRequest, EventoCreate, EventoResponse, EventoBorradorCreate, RutaEventoResponse
 from app.services.registro_services import EventoService
+from app.services import mapa_services, planificador_services
 # ✅ NUEVO: Importar para redirección
 from app.services.evento_solicitud_service import EventoSolicitudService
 from app.schemas.evento_solicitud_schema import SolicitudPublicacionCreate
@@ -24,6 +27,8 @@ from app.models.registro_models import Evento  # ← FALTABA ESTE IMPORT
 
 router = APIRouter(prefix="/eventos", tags=["Eventos"])
 
+RADIO_MAXIMO_KM = 500   # /eventos/cercanos: más que eso deja de ser "cerca" y el cubrimiento pierde precisión
+
 def get_current_user(
     db: Session = Depends(get_db),
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -271,22 +276,26 @@ def resumen_mis_eventos(
     summary="Listar solo los eventos creados por el usuario actual"
 )
 def read_mis_eventos(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    """Lista los eventos del usuario logueado"""
+    """Lista los eventos del usuario logueado (más nuevos primero, paginado por cursor)"""
     
     # 🚀 Llamamos DIRECTO a la función optimizada del CRUD que me pasaste antes
     from app.db.crud import registro_crud 
     
-    eventos = registro_crud.get_eventos_por_usuario(
+    eventos, siguiente = registro_crud.get_eventos_por_usuario(
         db=db,
         id_usuario=current_user.id_usuario,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
+    paginacion.headers_pagina(response, siguiente)
     
     return eventos
 
@@ -305,6 +314,9 @@ def buscar_eventos_con_filtros(
     id_dificultad: Optional[int] = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+    total: Optional[str] = Query(None, pattern=paginacion.PATRON_TOTAL,
+                                 description="exacto | aproximado | no (por defecto: exacto en la primera página)"),
     db: Session = Depends(get_db)
 ):
     if limit > 100:
@@ -317,7 +329,7 @@ def buscar_eventos_con_filtros(
         db=db, busqueda=busqueda, fecha_desde=fecha_desde,
         fecha_hasta=fecha_hasta, fecha_exacta=fecha_exacta,
         ubicacion=ubicacion, id_tipo=id_tipo, id_dificultad=id_dificultad,
-        skip=skip, limit=limit
+        skip=skip, limit=limit, cursor=cursor, modo_total=total
     )
     
     eventos_lista = []
@@ -338,6 +350,8 @@ def buscar_eventos_con_filtros(
     
     return {
         "total": resultado["total"],
+        "total_aproximado": resultado["total_aproximado"],
+        "siguiente_cursor": resultado["siguiente_cursor"],
         "eventos": eventos_lista,
         "skip": resultado["skip"],
         "limit": resultado["limit"],
@@ -345,6 +359,66 @@ def buscar_eventos_con_filtros(
         "mensaje": resultado["mensaje"]
     }
 
+@router.get(
+    "/cercanos",
+    summary="Eventos cerca de un punto",
+    description="Eventos publicados y futuros a menos de radio_km de (lat, lng), del más cercano al más lejano. "
+                "Paginado por cursor: siguiente_cursor (también en X-Next-Cursor) va en ?cursor="
+)
+def buscar_eventos_cercanos(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radio_km: float = Query(25, gt=0, le=RADIO_MAXIMO_KM),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="siguiente_cursor de la página anterior"),
+    db: Session = Depends(get_db)
+):
+    resultados, siguiente = registro_crud.get_eventos_cercanos(
+        db=db, lat=lat, lng=lng, radio_km=radio_km, limit=limit, cursor=cursor
+    )
+    paginacion.headers_pagina(response, siguiente)
+
+    eventos_lista = []
+    for evento, distancia in resultados:
+        eventos_lista.append({
+            "id_evento": evento.id_evento,
+            "nombre_evento": evento.nombre_evento,
+            "ubicacion": evento.ubicacion,
+            "fecha_evento": evento.fecha_evento,
+            "costo_participacion": float(evento.costo_participacion) if evento.costo_participacion else 0.0,
+            "id_tipo": evento.id_tipo,
+            "tipo": evento.tipo_evento.nombre if evento.tipo_evento else None,
+            "id_dificultad": evento.id_dificultad,
+            "dificultad": evento.nivel_dificultad.nombre if evento.nivel_dificultad else None,
+            "lat": float(evento.lat),
+            "lng": float(evento.lng),
+            "distancia_km": float(evento.distancia_km) if evento.distancia_km is not None else None,
+            "distancia_al_evento_km": distancia
+        })
+
+    return {
+        "centro": {"lat": lat, "lng": lng},
+        "radio_km": radio_km,
+        "siguiente_cursor": siguiente,
+        "eventos": eventos_lista
+    }
+
+@router.get(
+    "/mapa",
+    summary="Eventos del mapa agrupados por zona",
+    description="Clusters y eventos sueltos del bbox visible ('oeste,sur,este,norte', como toBBoxString() de Leaflet) "
+                "para el zoom del mapa. Los clusters traen cantidad y zoom_expansion (zoom en el que se separan)."
+)
+def read_mapa_eventos(
+    response: Response,
+    bbox: str = Query(..., description="oeste,sur,este,norte"),
+    zoom: int = Query(..., ge=0, le=22),
+    db: Session = Depends(get_db)
+):
+    response.headers["Cache-Control"] = "public, max-age=60"
+    return mapa_services.obtener_mapa(db, bbox, zoom)
+
 @router.get("/catalogos/filtros", summary="Obtener catálogos para filtros")
 def obtener_catalogos_para_filtros(db: Session = Depends(get_db)):
     return registro_crud.obtener_catalogos_filtros(db)
@@ -355,21 +429,28 @@ def obtener_catalogos_para_filtros(db: Session = Depends(get_db)):
     summary="Listar todos los eventos públicos"
 )
 def read_eventos(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=500), 
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    total: str = Query(paginacion.TOTAL_NINGUNO, pattern=paginacion.PATRON_TOTAL,
+                       description="exacto | aproximado | no; se devuelve en X-Total-Count"),
     db: Session = Depends(get_db)
 ):
     from app.models.auth_models import Usuario
     # ✅ JOIN con Usuario para incluir nombre_usuario (necesario para panel admin)
-    resultados = (
+    query = (
         db.query(Evento, Usuario.nombre_y_apellido)
         .join(Usuario, Evento.id_usuario == Usuario.id_usuario)
         .filter(Evento.id_estado == 3)
-        .order_by(Evento.id_evento.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    cantidad, aproximado = paginacion.contar(db, db.query(Evento).filter(Evento.id_estado == 3), total)
+    # Más nuevos primero, keyset sobre la PK (sin OFFSET para las páginas siguientes)
+    resultados, siguiente = paginacion.paginar(
+        query, (Evento.id_evento,), limit, cursor,
+        clave=lambda fila: (fila[0].id_evento,), descendente=True, saltar=skip
+    )
+    paginacion.headers_pagina(response, siguiente, cantidad, aproximado)
     eventos = []
     for evento, nombre in resultados:
         evento.email_usuario = nombre  # reutilizamos el campo, ahora trae nombre
@@ -384,6 +465,28 @@ def read_eventos(
 def read_one_evento(evento_id: int, db: Session = Depends(get_db)):
     return EventoService.obtener_evento_por_id(db, evento_id)
 
+@router.get(
+    "/{evento_id}/ruta",
+    response_model=RutaEventoResponse,
+    response_model_exclude_none=True,
+    summary="Ruta del evento para el mapa",
+    description="Encoded polyline (o [[lat, lng], ...] con formato=coordenadas) simplificada para el zoom de Leaflet. Sin zoom: la ruta completa."
+)
+def read_ruta_evento(
+    evento_id: int,
+    request: Request,
+    response: Response,
+    zoom: Optional[int] = Query(None, ge=0, le=22),
+    formato: str = Query("polyline", pattern="^(polyline|coordenadas)$"),
+    db: Session = Depends(get_db)
+):
+    ruta, etag = EventoService.obtener_ruta(db, evento_id, zoom, formato)
+    cabeceras = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+    return ruta
+
 @router.post(
     "/{evento_id}/multimedia",
     summary="Agregar imágenes o enlaces multimedia a un evento",
@@ -462,6 +565,30 @@ def agregar_multimedia_evento(
 # ✅ NUEVO: CRON JOB PARA REVISIÓN DE EVENTOS POR BAJA OCUPACIÓN
 # ============================================================================
 
+def _validar_cron_secret(cron_secret: Optional[str]) -> None:
+    SECRETO_ESPERADO = os.getenv("SECRETO_ESPERADO")
+    
+    # Validamos que el secreto exista en el entorno y que coincida con el header
+    if not SECRETO_ESPERADO or cron_secret != SECRETO_ESPERADO:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, 
+            detail="No autorizado. Falta o es incorrecto el Header 'cron-secret'."
+        )
+
+def _correr_tarea_cron(nombre: str, mensaje: str) -> dict:
+    """
+    Corre una tarea del planificador (app/services/planificador_services.py) dentro del request.
+    Queda en el historial de corridas y respeta su lease: si ya está corriendo, se omite.
+    """
+    try:
+        corrida = planificador_services.ejecutar_tarea(nombre, planificador_services.DISPARO_CRON)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+    if corrida.get("omitida"):
+        return {"status": "omitida", "mensaje": corrida["motivo"], "detalles": None}
+    return {"status": "ok", "mensaje": mensaje, "detalles": corrida["resultado"]}
+
 @router.get(
     "/cron/revisar-eventos",
     summary="CRON: Cancelar eventos por baja ocupación",
@@ -469,27 +596,55 @@ def agregar_multimedia_evento(
 )
 def ejecutar_revision_diaria(
     cron_secret: str = Header(None, alias="cron-secret"), # Usamos alias para asegurar que agarra el header exacto
+    simular: bool = Query(False, description="Devuelve el plan (advertencias y cancelaciones) y los tiempos por fase sin escribir nada"),
     db: Session = Depends(get_db)
 ):
     """
-    Este endpoint está pensado para ser llamado por cron-job.org todos los días.
-    Requiere un Header 'cron-secret' válido.
+    Ya corre sola todos los días desde el planificador interno (tarea 'baja_ocupacion');
+    queda por compatibilidad con cron-job.org. Requiere un Header 'cron-secret' válido.
     """
-    SECRETO_ESPERADO = os.getenv("SECRETO_ESPERADO")
-    
-    # Validamos que el secreto exista en el entorno y que coincida con el header
-    if not SECRETO_ESPERADO or cron_secret != SECRETO_ESPERADO:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail="No autorizado. Falta o es incorrecto el Header 'cron-secret'."
-        )
-
-    try:
-        resultado = EventoService.cancelar_eventos_por_baja_ocupacion(db)
+    _validar_cron_secret(cron_secret)
+    if simular:
         return {
-            "status": "ok", 
-            "mensaje": "Revisión completada con éxito",
-            "detalles": resultado
+            "status": "ok",
+            "mensaje": "Simulación: no se modificó nada",
+            "detalles": EventoService.cancelar_eventos_por_baja_ocupacion(db, simular=True)
         }
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+    return _correr_tarea_cron("baja_ocupacion", "Revisión completada con éxito")
+
+
+# ============================================================================
+# ✅ NUEVO: CRON JOB DE RECONCILIACIÓN DE CUPOS
+# ============================================================================
+
+@router.get(
+    "/cron/reconciliar-ocupacion",
+    summary="CRON: Reconciliar contadores de ocupación",
+    description="Recalcula la tabla ocupacion_evento contando reserva_evento y corrige diferencias."
+)
+def ejecutar_reconciliacion_ocupacion(
+    cron_secret: str = Header(None, alias="cron-secret"),
+):
+    """Corre cada noche desde el planificador (tarea 'reconciliar_ocupacion'). Requiere el Header 'cron-secret'."""
+    _validar_cron_secret(cron_secret)
+    return _correr_tarea_cron("reconciliar_ocupacion", "Reconciliación de ocupación completada")
+
+
+# ============================================================================
+# ✅ NUEVO: CRON DE TRANSICIONES DE ESTADO
+# ============================================================================
+
+@router.get(
+    "/cron/transiciones",
+    summary="CRON: Finalizar eventos vencidos y expirar reservas",
+    description="Corre ya las tareas de transición de estado (el planificador las corre solas cada pocos minutos)."
+)
+def ejecutar_transiciones_estado(
+    cron_secret: str = Header(None, alias="cron-secret"),
+):
+    """Para cuando el planificador está desactivado (PLANIFICADOR=0). Requiere el Header 'cron-secret'."""
+    _validar_cron_secret(cron_secret)
+    return {
+        "finalizar_eventos": _correr_tarea_cron("finalizar_eventos", "Eventos vencidos finalizados"),
+        "expirar_reservas": _correr_tarea_cron("expirar_reservas", "Reservas vencidas expiradas"),
+    }
@@ -0,0 +1,98 @@
+# app/api/salud.py
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import hashing
+from app.db.database import get_db
+from app.services import planificador_services
+from app.services.auth_services import AuthService
+
+router = APIRouter(prefix="/salud", tags=["Salud"])
+
+# Bearer opcional: /salud/detalle acepta el token de un admin o el header cron-secret
+bearer_opcional = HTTPBearer(auto_error=False)
+
+# Lo que /salud (pública) muestra de cada tarea: estado y fechas, sin errores ni resultados
+CAMPOS_PUBLICOS_TAREA = ("nombre", "en_curso", "ultima_ejecucion", "ultimo_exito", "ultimo_estado", "atrasada")
+
+
+# ============================================================================
+# SEGURIDAD
+# ============================================================================
+
+def require_admin_o_cron(
+    cron_secret: Optional[str] = Header(None, alias="cron-secret"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_opcional),
+    db: Session = Depends(get_db)
+) -> None:
+    secreto = os.getenv("SECRETO_ESPERADO")
+    if secreto and cron_secret and hmac.compare_digest(cron_secret, secreto):
+        return
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No autorizado. Falta el token de administrador o el header 'cron-secret'."
+        )
+    usuario = AuthService.get_current_usuario_from_token(db, credentials.credentials)
+    if usuario.id_rol not in [1, 2]:
+        raise HTTPException(status_code=403, detail="Acceso restringido a Administradores")
+
+
+def _chequear_base(db: Session) -> Optional[str]:
+    """None si la base responde; si no, el error (solo para /salud/detalle y el log)."""
+    try:
+        db.execute(text("SELECT 1"))
+        return None
+    except Exception as e:
+        print(f"❌ [SALUD] La base no responde: {e}")
+        return str(e)
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@router.get(
+    "",
+    summary="Estado del backend",
+    description="Pública: si la base responde y si alguna tarea programada está atrasada, con las fechas de su última corrida. "
+                "Errores, resultados y la cola de bcrypt en /salud/detalle."
+)
+def read_salud(response: Response, db: Session = Depends(get_db)):
+    if _chequear_base(db) is not None:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "error", "base_de_datos": "error", "tareas": None}
+
+    planificador = planificador_services.estado(db)
+    return {
+        "status": "degradado" if any(t["atrasada"] for t in planificador["tareas"]) else "ok",
+        "base_de_datos": "ok",
+        "tareas": [{campo: tarea[campo] for campo in CAMPOS_PUBLICOS_TAREA} for tarea in planificador["tareas"]]
+    }
+
+
+@router.get(
+    "/detalle",
+    summary="Estado del backend (detalle)",
+    description="Admin o cron (header cron-secret): error de la base, último resultado/error de cada tarea y la cola del pool de bcrypt.",
+    dependencies=[Depends(require_admin_o_cron)]
+)
+def read_salud_detalle(response: Response, db: Session = Depends(get_db)):
+    error_base = _chequear_base(db)
+    if error_base is not None:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "error", "base_de_datos": error_base, "planificador": None, "hashing": hashing.estadisticas()}
+
+    planificador = planificador_services.estado(db)
+    return {
+        "status": "degradado" if any(t["atrasada"] for t in planificador["tareas"]) else "ok",
+        "base_de_datos": "ok",
+        "planificador": planificador,
+        "hashing": hashing.estadisticas()
+    }
@@ -0,0 +1,120 @@
+# app/api/tareas.py
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.db.database import get_db
+from app.db.crud import tarea_crud
+from app.core.security import security
+from app.services.auth_services import AuthService
+from app.services import planificador_services
+from app.services.registro_services import EventoService
+from app.models.auth_models import Usuario
+
+router = APIRouter(prefix="/admin/tareas", tags=["Tareas Programadas"])
+
+
+# ============================================================================
+# SEGURIDAD
+# ============================================================================
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Usuario:
+    return AuthService.get_current_usuario_from_token(db, credentials.credentials)
+
+
+def require_admin(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+    if current_user.id_rol not in [1, 2]:
+        raise HTTPException(status_code=403, detail="Acceso restringido a Administradores")
+    return current_user
+
+
+def _validar_tarea(nombre: str) -> None:
+    if nombre not in planificador_services.TAREAS:
+        raise HTTPException(status_code=404, detail=f"No existe la tarea '{nombre}'")
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+@router.get(
+    "",
+    summary="Tareas programadas",
+    description="Programación, próxima y última corrida de cada tarea, con métricas de duración de las últimas 50 corridas."
+)
+def listar_tareas(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    return planificador_services.estado(db, con_metricas=True)
+
+
+@router.get(
+    "/historial",
+    summary="Historial de corridas",
+    description="Últimas corridas (más nuevas primero), de todas las tareas o de una."
+)
+def historial_tareas(
+    nombre: Optional[str] = Query(None, description="Filtrar por tarea"),
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    if nombre:
+        _validar_tarea(nombre)
+    return [
+        {
+            "id_ejecucion": e.id_ejecucion,
+            "nombre": e.nombre,
+            "disparo": e.disparo,
+            "duenio": e.duenio,
+            "inicio": e.inicio,
+            "fin": e.fin,
+            "duracion_ms": e.duracion_ms,
+            "estado": e.estado,
+            "resultado": e.resultado,
+            "error": e.error,
+        }
+        for e in tarea_crud.get_historial(db, nombre, limite)
+    ]
+
+
+@router.get(
+    "/baja_ocupacion/plan",
+    summary="Simular la revisión por baja ocupación",
+    description="Qué eventos se advertirían y cuáles se cancelarían hoy, con los tiempos de cada fase. No escribe nada."
+)
+def plan_baja_ocupacion(
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    return EventoService.cancelar_eventos_por_baja_ocupacion(db, simular=True)
+
+
+@router.post(
+    "/{nombre}/ejecutar",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Correr una tarea ahora",
+    description="La corrida sigue en segundo plano después de responder (no la corta el límite HTTP). El resultado queda en el historial."
+)
+def ejecutar_tarea(
+    nombre: str,
+    background_tasks: BackgroundTasks,
+    current_user: Usuario = Depends(require_admin)
+):
+    _validar_tarea(nombre)
+    background_tasks.add_task(_correr_en_segundo_plano, nombre)
+    return {"mensaje": f"Tarea '{nombre}' lanzada", "historial": f"/api/v1/admin/tareas/historial?nombre={nombre}"}
+
+
+def _correr_en_segundo_plano(nombre: str) -> None:
+    try:
+        corrida = planificador_services.ejecutar_tarea(nombre, planificador_services.DISPARO_MANUAL)
+        if corrida.get("omitida"):
+            print(f"⏭️ [TAREAS] '{nombre}' omitida: {corrida['motivo']}")
+    except Exception as e:
+        print(f"❌ [TAREAS] La corrida manual de '{nombre}' falló: {e}")
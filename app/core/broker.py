@@ -0,0 +1,135 @@
+# app/core/broker.py
+"""
+Pub/sub en memoria del proceso para empujar novedades a los navegadores (SSE).
+
+- Cada conexión de /notificaciones/stream se suscribe con el id del usuario y
+  recibe sus eventos por una asyncio.Queue del event loop del servidor.
+- Publicar es seguro desde cualquier thread (los endpoints sync y los listeners
+  de sesión corren en el threadpool): se agenda la entrega en el loop con
+  call_soon_threadsafe, UNA sola vez por lote de eventos.
+- Los eventos son avisos ("tenés notificaciones nuevas", "cambiaron tus pagos"):
+  el cliente vuelve a pedir los datos (con ETag). Si una cola se llena, se
+  vacía y se manda un único "resync" en lugar de ir acumulando.
+
+OJO: es por proceso. Con varios workers de uvicorn cada uno avisa a las
+conexiones que atiende; lo que se confirme en otro proceso llega por el
+polling de respaldo del frontend.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+MAX_PENDIENTES_POR_CONEXION = 50
+EVENTO_RESYNC = "resync"
+
+
+class Suscripcion:
+    """Una conexión abierta. Se crea desde el event loop (endpoint async)."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, id_usuario: int, loop: asyncio.AbstractEventLoop, max_pendientes: int):
+        self.id = next(self._ids)
+        self.id_usuario = id_usuario
+        self.loop = loop
+        self.cola: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max_pendientes)
+        self.desbordes = 0
+
+    def _entregar(self, evento: dict) -> None:
+        # Corre en el loop: no hace falta lock
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordes += 1
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait({"tipo": EVENTO_RESYNC, "datos": {}, "ts": evento["ts"]})
+
+    async def siguiente(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Próximo evento, o None si pasó el timeout (para mandar el ping)."""
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BrokerEventos:
+    def __init__(self, max_pendientes: int = MAX_PENDIENTES_POR_CONEXION):
+        self.max_pendientes = max_pendientes
+        self._suscriptores: Dict[int, Set[Suscripcion]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.publicados = 0
+        self.entregados = 0
+
+    def suscribir(self, id_usuario: int) -> Suscripcion:
+        suscripcion = Suscripcion(id_usuario, asyncio.get_running_loop(), self.max_pendientes)
+        with self._lock:
+            self._suscriptores[id_usuario].add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            conexiones = self._suscriptores.get(suscripcion.id_usuario)
+            if conexiones is not None:
+                conexiones.discard(suscripcion)
+                if not conexiones:
+                    del self._suscriptores[suscripcion.id_usuario]
+
+    def publicar(self, id_usuario: int, tipo: str, datos: Optional[dict] = None) -> int:
+        return self.publicar_muchos([(id_usuario, tipo, datos)])
+
+    def publicar_muchos(self, eventos: Iterable[Tuple[int, str, Optional[dict]]]) -> int:
+        """
+        Publica (id_usuario, tipo, datos) en lote. Los usuarios sin conexiones
+        abiertas se saltean sin costo. Devuelve a cuántas conexiones se entregó.
+        """
+        ahora = time.time()
+        por_loop: Dict[asyncio.AbstractEventLoop, List[Tuple[Suscripcion, dict]]] = defaultdict(list)
+        publicados = 0
+        with self._lock:
+            for id_usuario, tipo, datos in eventos:
+                publicados += 1
+                conexiones = self._suscriptores.get(id_usuario)
+                if not conexiones:
+                    continue
+                evento = {"tipo": tipo, "datos": datos or {}, "ts": ahora}
+                for suscripcion in conexiones:
+                    por_loop[suscripcion.loop].append((suscripcion, evento))
+            self.publicados += publicados
+
+        entregados = 0
+        for loop, entregas in por_loop.items():
+            try:
+                loop.call_soon_threadsafe(_entregar_lote, entregas)
+                entregados += len(entregas)
+            except RuntimeError:
+                # Loop cerrado (apagado del servidor): se descarta
+                pass
+        with self._lock:
+            self.entregados += entregados
+        return entregados
+
+    def conexiones(self) -> int:
+        with self._lock:
+            return sum(len(c) for c in self._suscriptores.values())
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "usuarios": len(self._suscriptores),
+                "conexiones": sum(len(c) for c in self._suscriptores.values()),
+                "publicados": self.publicados,
+                "entregados": self.entregados,
+            }
+
+
+def _entregar_lote(entregas: List[Tuple[Suscripcion, dict]]) -> None:
+    for suscripcion, evento in entregas:
+        suscripcion._entregar(evento)
+
+
+# Instancia global del proceso
+broker = BrokerEventos()
@@ -0,0 +1,131 @@
+# app/core/cache.py
+"""
+Caché en memoria del proceso.
+
+- CacheLRU: diccionario LRU con TTL opcional, seguro entre threads
+  (los endpoints sync de FastAPI corren en un threadpool).
+- versiones: contador por tabla que se incrementa al confirmar cambios
+  (ver app/db/versionado.py). Las claves de caché incluyen la versión de las
+  tablas de las que dependen, así un cambio invalida sin tener que buscar claves.
+- etag_coincide: compara el If-None-Match del cliente con el ETag actual (304).
+
+IMPORTANTE: leer la versión ANTES de consultar la base. Si se lee después,
+un commit intermedio podría dejar datos viejos guardados con la versión nueva.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_SIN_VALOR = object()
+
+
+class CacheLRU:
+    """LRU con TTL opcional (en segundos). ttl_segundos=None -> no vence por tiempo."""
+
+    def __init__(self, max_items: int = 256, ttl_segundos: Optional[float] = None):
+        self.max_items = max_items
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._datos.get(clave, _SIN_VALOR)
+            if item is _SIN_VALOR:
+                self.misses += 1
+                return default
+
+            valor, vence = item
+            if vence is not None and vence < time.monotonic():
+                del self._datos[clave]
+                self.misses += 1
+                return default
+
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def set(self, clave: Hashable, valor: Any, ttl_segundos: Optional[float] = None) -> None:
+        ttl = ttl_segundos if ttl_segundos is not None else self.ttl_segundos
+        vence = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._datos[clave] = (valor, vence)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Devuelve el valor cacheado o lo calcula y lo guarda (sin lock durante el cálculo)."""
+        valor = self.get(clave, _SIN_VALOR)
+        if valor is _SIN_VALOR:
+            valor = calcular()
+            self.set(clave, valor)
+        return valor
+
+    def invalidar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def invalidar_si(self, condicion: Callable[[Hashable], bool]) -> int:
+        """Borra las claves que cumplan la condición. Devuelve cuántas borró."""
+        with self._lock:
+            claves = [c for c in self._datos if condicion(c)]
+            for c in claves:
+                del self._datos[c]
+            return len(claves)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        return {
+            "items": len(self._datos),
+            "max_items": self.max_items,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class RegistroVersiones:
+    """Versión (entero creciente) por nombre de tabla."""
+
+    def __init__(self):
+        self._versiones: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, *nombres: str) -> tuple:
+        with self._lock:
+            return tuple(self._versiones.get(n, 0) for n in nombres)
+
+    def incrementar(self, *nombres: str) -> None:
+        with self._lock:
+            for n in nombres:
+                self._versiones[n] = self._versiones.get(n, 0) + 1
+
+
+# Instancia única del proceso
+versiones = RegistroVersiones()
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True si el If-None-Match incluye el ETag actual (o es "*"). El header es una
+    lista separada por comas; la comparación es débil (W/"x" coincide con "x").
+    """
+    if not if_none_match:
+        return False
+    actual = etag[2:] if etag.startswith("W/") else etag
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor == "*":
+            return True
+        if (valor[2:] if valor.startswith("W/") else valor) == actual:
+            return True
+    return False
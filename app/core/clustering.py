@@ -0,0 +1,182 @@
+# app/core/clustering.py
+"""
+Clustering jerárquico de puntos para el mapa (estilo supercluster).
+
+Se arma UNA vez un índice con todos los puntos y, para cada zoom de
+ZOOM_MAXIMO a ZOOM_MINIMO, se agrupan los puntos/clusters del zoom siguiente
+que quedan a menos de RADIO_PX píxeles en pantalla. Cada cluster guarda el
+centro pesado por cantidad y el zoom en que se abre en más de uno
+(zoom_expansion: al hacer click en el cluster, el mapa salta a ese zoom).
+
+Las coordenadas se trabajan en Web Mercator normalizado ([0, 1] x [0, 1], como
+las teselas de Leaflet/OSM), así el radio en píxeles es el mismo en todo el mapa.
+Cada cluster cae en exactamente una tesela de su zoom: pedir una tesela es
+buscar en un diccionario, y no se repiten clusters entre teselas vecinas.
+"""
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RADIO_PX = 60            # dos marcadores a menos de esto en pantalla se agrupan
+EXTENSION_PX = 256       # px de una tesela
+ZOOM_MINIMO = 0
+ZOOM_MAXIMO = 16         # desde ZOOM_MAXIMO + 1 se ven los puntos sueltos
+LATITUD_MAXIMA = 85.05112878   # límite de Web Mercator
+
+
+# ============================================================================
+# PROYECCIÓN
+# ============================================================================
+def lng_a_x(lng: float) -> float:
+    return lng / 360.0 + 0.5
+
+
+def lat_a_y(lat: float) -> float:
+    seno = math.sin(math.radians(max(-LATITUD_MAXIMA, min(LATITUD_MAXIMA, lat))))
+    y = 0.5 - 0.25 * math.log((1 + seno) / (1 - seno)) / math.pi
+    return min(max(y, 0.0), 1.0)
+
+
+def x_a_lng(x: float) -> float:
+    return (x - 0.5) * 360.0
+
+
+def y_a_lat(y: float) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+def teselas_para_bbox(oeste: float, sur: float, este: float, norte: float, zoom: int) -> List[Tuple[int, int]]:
+    """(x, y) de las teselas que cubren el bbox. Si oeste > este el bbox cruza el antimeridiano."""
+    n = 2 ** zoom
+    y_desde = min(int(lat_a_y(norte) * n), n - 1)
+    y_hasta = min(int(lat_a_y(sur) * n), n - 1)
+
+    def columna(lng: float) -> int:
+        return min(int(lng_a_x(max(-180.0, min(180.0, lng))) * n), n - 1)
+
+    if oeste <= este:
+        columnas = list(range(columna(oeste), columna(este) + 1))
+    else:
+        columnas = list(range(columna(oeste), n)) + list(range(0, columna(este) + 1))
+    return [(x, y) for x in columnas for y in range(y_desde, y_hasta + 1)]
+
+
+# ============================================================================
+# ÍNDICE
+# ============================================================================
+class _Nivel:
+    """Clusters de un zoom (listas paralelas) y qué clusters caen en cada tesela."""
+
+    def __init__(self):
+        self.xs: List[float] = []
+        self.ys: List[float] = []
+        self.cantidades: List[int] = []
+        self.puntos: List[Optional[int]] = []          # índice del punto original si cantidad == 1
+        self.expansion: List[Optional[int]] = []
+        self.teselas: Dict[Tuple[int, int], List[int]] = {}
+
+    def agregar(self, x: float, y: float, cantidad: int, punto: Optional[int], expansion: Optional[int]) -> None:
+        self.xs.append(x)
+        self.ys.append(y)
+        self.cantidades.append(cantidad)
+        self.puntos.append(punto)
+        self.expansion.append(expansion)
+
+    def indexar_teselas(self, zoom: int) -> None:
+        n = 2 ** zoom
+        teselas = defaultdict(list)
+        for i, (x, y) in enumerate(zip(self.xs, self.ys)):
+            teselas[(min(int(x * n), n - 1), min(int(y * n), n - 1))].append(i)
+        self.teselas = dict(teselas)
+
+
+class IndiceClusters:
+    """
+    puntos: (lat, lng, datos) — datos es lo que se devuelve para un punto suelto
+    (id, nombre, etc.). El orden de los puntos define el agrupamiento: pasarlos
+    siempre en el mismo orden (por id) para que el mapa no "salte" entre versiones.
+    """
+
+    def __init__(self, puntos: Iterable[Tuple[float, float, dict]], radio_px: int = RADIO_PX,
+                 zoom_minimo: int = ZOOM_MINIMO, zoom_maximo: int = ZOOM_MAXIMO):
+        self.zoom_minimo = zoom_minimo
+        self.zoom_maximo = zoom_maximo
+        self.datos: List[dict] = []
+
+        hojas = _Nivel()
+        for lat, lng, datos in puntos:
+            hojas.agregar(lng_a_x(lng), lat_a_y(lat), 1, len(self.datos), None)
+            self.datos.append(datos)
+        hojas.indexar_teselas(zoom_maximo + 1)
+
+        self.niveles: Dict[int, _Nivel] = {zoom_maximo + 1: hojas}
+        for zoom in range(zoom_maximo, zoom_minimo - 1, -1):
+            self.niveles[zoom] = self._agrupar(self.niveles[zoom + 1], zoom, radio_px / (EXTENSION_PX * 2 ** zoom))
+            self.niveles[zoom].indexar_teselas(zoom)
+
+    @staticmethod
+    def _agrupar(anterior: _Nivel, zoom: int, radio: float) -> _Nivel:
+        """Agrupa los clusters del zoom siguiente (greedy, en el orden del índice)."""
+        # Grilla de celdas de lado 'radio': los vecinos están en las 9 celdas alrededor
+        grilla = defaultdict(list)
+        for i, (x, y) in enumerate(zip(anterior.xs, anterior.ys)):
+            grilla[(int(x / radio), int(y / radio))].append(i)
+
+        radio2 = radio * radio
+        visitado = [False] * len(anterior.xs)
+        nivel = _Nivel()
+        for i in range(len(anterior.xs)):
+            if visitado[i]:
+                continue
+            visitado[i] = True
+            x, y = anterior.xs[i], anterior.ys[i]
+            celda_x, celda_y = int(x / radio), int(y / radio)
+
+            hijos = [i]
+            for cx in (celda_x - 1, celda_x, celda_x + 1):
+                for cy in (celda_y - 1, celda_y, celda_y + 1):
+                    for j in grilla.get((cx, cy), ()):
+                        if not visitado[j] and (anterior.xs[j] - x) ** 2 + (anterior.ys[j] - y) ** 2 <= radio2:
+                            visitado[j] = True
+                            hijos.append(j)
+
+            if len(hijos) == 1:
+                # Nada cerca: pasa igual a este zoom (y se abre donde se abría)
+                nivel.agregar(x, y, anterior.cantidades[i], anterior.puntos[i], anterior.expansion[i])
+                continue
+
+            total = sum(anterior.cantidades[j] for j in hijos)
+            nivel.agregar(
+                sum(anterior.xs[j] * anterior.cantidades[j] for j in hijos) / total,
+                sum(anterior.ys[j] * anterior.cantidades[j] for j in hijos) / total,
+                total, None, zoom + 1,
+            )
+        return nivel
+
+    def tesela(self, zoom: int, x: int, y: int) -> List[dict]:
+        """Clusters y puntos sueltos de la tesela (zoom, x, y)."""
+        nivel = self.niveles[max(self.zoom_minimo, min(zoom, self.zoom_maximo + 1))]
+        if zoom > self.zoom_maximo + 1:
+            # Zoom más cerca que las hojas: buscar en la tesela que la contiene y filtrar
+            escala = 2 ** (zoom - self.zoom_maximo - 1)
+            n = 2 ** zoom
+            candidatos = nivel.teselas.get((x // escala, y // escala), ())
+            indices = [i for i in candidatos if int(nivel.xs[i] * n) == x and int(nivel.ys[i] * n) == y]
+        else:
+            indices = nivel.teselas.get((x, y), ())
+
+        salida = []
+        for i in indices:
+            lat, lng = round(y_a_lat(nivel.ys[i]), 6), round(x_a_lng(nivel.xs[i]), 6)
+            if nivel.cantidades[i] == 1:
+                salida.append({"tipo": "evento", "lat": lat, "lng": lng, **self.datos[nivel.puntos[i]]})
+            else:
+                salida.append({
+                    "tipo": "cluster", "lat": lat, "lng": lng,
+                    "cantidad": nivel.cantidades[i],
+                    "zoom_expansion": nivel.expansion[i],
+                })
+        return salida
+
+    def __len__(self) -> int:
+        return len(self.datos)
@@ -0,0 +1,96 @@
+# app/core/geohash.py
+"""
+Geohash: índice espacial con un btree común.
+
+Un geohash es un string (base32) que identifica una celda de la grilla; cada
+carácter más la subdivide en 32. Celdas cercanas comparten prefijo, así que
+"los eventos dentro de esta celda" es un LIKE 'prefijo%' que resuelve el índice
+(varchar_pattern_ops en Postgres), sin PostGIS y igual en SQLite.
+
+  precisión | celda aprox. (ecuador)
+      4     |  39 km x 19.5 km
+      5     | 4.9 km x 4.9 km
+      6     | 1.2 km x 0.6 km
+      9     |  4.8 m x 4.8 m    <- la que se guarda en evento.geohash
+
+Para buscar en un radio: celdas_para_radio() cubre el cuadrado que contiene
+el círculo con pocas celdas del tamaño adecuado; la distancia exacta se
+calcula después sobre esos candidatos.
+"""
+import math
+from typing import List, Tuple
+
+from app.core.geometria import RADIO_TIERRA_KM
+
+ALFABETO = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION_EVENTO = 9
+MAX_CELDAS = 16          # celdas del cubrimiento: más = candidatos más justos pero más OR en la consulta
+# Con el mismo radio que la haversine de distancias_km: si fuera mayor, el
+# cuadrado quedaría corto y se perderían puntos justo en el borde del radio
+KM_POR_GRADO_LAT = math.radians(RADIO_TIERRA_KM)
+
+
+def codificar(lat: float, lng: float, precision: int = PRECISION_EVENTO) -> str:
+    lat_min, lat_max, lng_min, lng_max = -90.0, 90.0, -180.0, 180.0
+    salida, bits, valor, es_lng = [], 0, 0, True
+    while len(salida) < precision:
+        # Los bits se alternan: longitud, latitud, longitud, ...
+        if es_lng:
+            medio = (lng_min + lng_max) / 2
+            if lng >= medio:
+                valor, lng_min = (valor << 1) | 1, medio
+            else:
+                valor, lng_max = valor << 1, medio
+        else:
+            medio = (lat_min + lat_max) / 2
+            if lat >= medio:
+                valor, lat_min = (valor << 1) | 1, medio
+            else:
+                valor, lat_max = valor << 1, medio
+        es_lng = not es_lng
+        bits += 1
+        if bits == 5:
+            salida.append(ALFABETO[valor])
+            bits, valor = 0, 0
+    return "".join(salida)
+
+
+def tamanio_celda(precision: int) -> Tuple[float, float]:
+    """(alto, ancho) de una celda en grados."""
+    bits_lng = math.ceil(5 * precision / 2)
+    bits_lat = 5 * precision // 2
+    return 180.0 / 2 ** bits_lat, 360.0 / 2 ** bits_lng
+
+
+def celdas_para_radio(lat: float, lng: float, radio_km: float) -> List[str]:
+    """
+    Prefijos de geohash que cubren el círculo (lat, lng, radio_km): la precisión
+    más fina que lo cubre con MAX_CELDAS celdas o menos.
+    """
+    delta_lat = radio_km / KM_POR_GRADO_LAT
+    sur, norte = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+    # Un grado de longitud mide menos cuanto más lejos del ecuador: el ancho se
+    # calcula en el borde del cuadrado más cercano al polo, no en el centro
+    cos_borde = math.cos(math.radians(max(abs(sur), abs(norte))))
+    if sur <= -90.0 or norte >= 90.0 or radio_km >= 180.0 * KM_POR_GRADO_LAT * cos_borde:
+        # El círculo toca un polo (o da la vuelta): todas las longitudes
+        oeste, este = -180.0, 180.0
+    else:
+        delta_lng = radio_km / (KM_POR_GRADO_LAT * cos_borde)
+        oeste, este = lng - delta_lng, lng + delta_lng
+
+    for precision in range(PRECISION_EVENTO, 0, -1):
+        alto, ancho = tamanio_celda(precision)
+        filas = range(math.floor(sur / alto), math.floor(norte / alto) + 1)
+        columnas = range(math.floor(oeste / ancho), math.floor(este / ancho) + 1)
+        if len(filas) * len(columnas) <= MAX_CELDAS or precision == 1:
+            break
+
+    celdas = set()
+    for fila in filas:
+        centro_lat = min((fila + 0.5) * alto, 90.0)
+        for columna in columnas:
+            # Normaliza la longitud por si el cuadrado cruza el antimeridiano
+            centro_lng = ((columna + 0.5) * ancho + 180.0) % 360.0 - 180.0
+            celdas.add(codificar(centro_lat, centro_lng, precision))
+    return sorted(celdas)
@@ -0,0 +1,233 @@
+# app/core/geometria.py
+"""
+Geometría de rutas: normalización, simplificación y codificación compacta.
+
+- normalizar_ruta: acepta lo que manda el frontend ([{lat, lng}, ...] de
+  leaflet-routing-machine), pares [lat, lng] o el JSON como texto.
+- douglas_peucker: saca los puntos que no cambian la forma más que 'tolerancia'
+  (en grados). Iterativo, sin recursión: una ruta de gravel de 10k+ puntos no
+  revienta el stack.
+- codificar_polyline / decodificar_polyline: formato "encoded polyline" de
+  Google (precisión 1e-5, ~1 m): ~4-6 bytes por punto contra ~40 del JSON.
+- metricas_ruta: distancia (haversine), bounding box, centroide y densidad de
+  puntos, calculadas en el servidor al guardar la ruta.
+- distancias_km: distancia desde un punto a muchos (búsqueda de eventos cercanos).
+
+Las cuentas por punto van con NumPy (operaciones sobre el array entero, sin
+loops de Python): una ruta de 100k puntos se procesa en milisegundos.
+Benchmark: python -m scripts.bench_metricas_ruta
+"""
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Punto = Tuple[float, float]     # (lat, lng)
+
+PRECISION_POLYLINE = 5
+TAMANO_TESELA = 256             # px de una tesela de Leaflet / OSM
+RADIO_TIERRA_KM = 6371.0088     # radio medio (IUGG)
+
+
+# ============================================================================
+# NORMALIZACIÓN
+# ============================================================================
+def normalizar_ruta(valor: Any) -> List[Punto]:
+    """Lista de (lat, lng) válidos; lo que no se entiende se descarta."""
+    if isinstance(valor, str):
+        try:
+            valor = json.loads(valor)
+        except ValueError:
+            return []
+    if not isinstance(valor, (list, tuple)):
+        return []
+
+    puntos: List[Punto] = []
+    for item in valor:
+        try:
+            if isinstance(item, dict):
+                lat, lng = float(item["lat"]), float(item.get("lng", item.get("lon")))
+            else:
+                lat, lng = float(item[0]), float(item[1])
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            puntos.append((lat, lng))
+    return puntos
+
+
+def como_array(puntos: Sequence[Punto]) -> np.ndarray:
+    """Lista de (lat, lng) -> array (n, 2) de float64 (si ya es array, sin copiar)."""
+    if isinstance(puntos, np.ndarray):
+        return puntos
+    # fromiter sobre los valores sueltos es ~2x más rápido que np.asarray con tuplas
+    return np.fromiter(
+        (valor for punto in puntos for valor in punto), dtype=np.float64, count=2 * len(puntos)
+    ).reshape(-1, 2)
+
+
+# ============================================================================
+# SIMPLIFICACIÓN
+# ============================================================================
+def tolerancia_para_zoom(zoom: int, pixeles: float = 0.5) -> float:
+    """Grados que ocupan 'pixeles' px en ese zoom: menos que eso no se ve en pantalla."""
+    return pixeles * 360.0 / (TAMANO_TESELA * 2 ** zoom)
+
+
+def douglas_peucker(puntos: Sequence[Punto], tolerancia: float) -> np.ndarray:
+    """
+    Array (k, 2) con los puntos que quedan. En vez de recorrer los tramos de a uno
+    (una vuelta de Python por tramo: miles en una ruta larga), cada ronda procesa
+    todos los tramos abiertos juntos; el resultado es el mismo que el recursivo.
+    """
+    coordenadas = como_array(puntos)
+    n = len(coordenadas)
+    if n < 3 or tolerancia <= 0:
+        return coordenadas
+
+    # Proyección plana simple: a la latitud de la ruta un grado de longitud mide cos(lat)
+    escala = np.cos(np.radians(coordenadas[:, 0].mean()))
+    xs = coordenadas[:, 1] * escala
+    ys = coordenadas[:, 0]
+    tolerancia2 = tolerancia * tolerancia
+
+    conservar = np.zeros(n, dtype=bool)
+    conservar[0] = conservar[-1] = True
+    cerrado = np.zeros(n, dtype=bool)       # tramo que arranca en i ya no se parte más
+    while True:
+        extremos = np.flatnonzero(conservar)
+        inicios, fines = extremos[:-1], extremos[1:]
+        abiertos = (fines - inicios > 1) & ~cerrado[inicios]
+        if not abiertos.any():
+            break
+        inicios, fines = inicios[abiertos], fines[abiertos]
+
+        # Puntos interiores de todos los tramos abiertos, en un solo array
+        largos = fines - inicios - 1
+        desde = np.cumsum(largos) - largos
+        tramo = np.repeat(np.arange(len(inicios)), largos)
+        indices = np.arange(largos.sum()) - desde[tramo] + inicios[tramo] + 1
+
+        x1, y1 = xs[inicios][tramo], ys[inicios][tramo]
+        dx, dy = xs[fines][tramo] - x1, ys[fines][tramo] - y1
+        px, py = xs[indices] - x1, ys[indices] - y1
+        largo2 = dx * dx + dy * dy
+        # Distancia al segmento (no a la recta): las rutas ida y vuelta se superponen
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.where(largo2 > 0, np.clip((px * dx + py * dy) / largo2, 0.0, 1.0), 0.0)
+        ex, ey = px - t * dx, py - t * dy
+        distancias2 = ex * ex + ey * ey
+
+        # Punto más lejano de cada tramo (el primero si hay empate, como np.argmax)
+        maximas = np.maximum.reduceat(distancias2, desde)
+        candidatos = np.flatnonzero(distancias2 == maximas[tramo])
+        primero = np.flatnonzero(np.diff(tramo[candidatos], prepend=-1))
+        mas_lejano = indices[candidatos[primero]]
+
+        partir = maximas > tolerancia2
+        conservar[mas_lejano[partir]] = True
+        cerrado[inicios[~partir]] = True
+
+    return coordenadas[conservar]
+
+
+# ============================================================================
+# MÉTRICAS
+# ============================================================================
+def _haversine(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Distancias en km entre pares de puntos (en radianes, arrays o escalares)."""
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * RADIO_TIERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def distancias_km(lat: float, lng: float, lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """Distancia (km) desde (lat, lng) a cada uno de los puntos (lats[i], lngs[i])."""
+    return _haversine(
+        np.radians(lat), np.radians(lng),
+        np.radians(np.asarray(lats, dtype=np.float64)), np.radians(np.asarray(lngs, dtype=np.float64)),
+    )
+
+
+def metricas_ruta(puntos: Sequence[Punto]) -> Optional[dict]:
+    """
+    Distancia (km, haversine), bounding box, centroide y densidad (puntos/km).
+    El centroide es el promedio de los puntos medios de cada tramo pesado por su
+    largo: si el GPS grabó mucho en una parada, esos puntos no lo corren.
+    None si hay menos de 2 puntos.
+    """
+    if len(puntos) < 2:
+        return None
+
+    coordenadas = como_array(puntos)
+    lat, lng = np.radians(coordenadas[:, 0]), np.radians(coordenadas[:, 1])
+
+    # Haversine de todos los tramos juntos
+    tramos = _haversine(lat[:-1], lng[:-1], lat[1:], lng[1:])
+    distancia = float(tramos.sum())
+
+    # Centroide en 3D (no se rompe con rutas que cruzan el antimeridiano)
+    cos_lat = np.cos(lat)
+    xyz = np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+    if distancia > 0:
+        x, y, z = (((xyz[:-1] + xyz[1:]) / 2) * tramos[:, None]).sum(axis=0)
+    else:
+        x, y, z = xyz.sum(axis=0)
+
+    minimos, maximos = coordenadas.min(axis=0), coordenadas.max(axis=0)
+    return {
+        "distancia_km": round(distancia, 3),
+        "lat_min": round(float(minimos[0]), 6),
+        "lat_max": round(float(maximos[0]), 6),
+        "lng_min": round(float(minimos[1]), 6),
+        "lng_max": round(float(maximos[1]), 6),
+        "centroide_lat": round(float(np.degrees(np.arctan2(z, np.hypot(x, y)))), 6),
+        "centroide_lng": round(float(np.degrees(np.arctan2(y, x))), 6),
+        "densidad_puntos_km": round(len(puntos) / distancia, 2) if distancia > 0 else None,
+    }
+
+
+# ============================================================================
+# ENCODED POLYLINE
+# ============================================================================
+def _codificar_numero(valor: int, salida: List[str]) -> None:
+    valor = ~(valor << 1) if valor < 0 else valor << 1
+    while valor >= 0x20:
+        salida.append(chr((0x20 | (valor & 0x1f)) + 63))
+        valor >>= 5
+    salida.append(chr(valor + 63))
+
+
+def codificar_polyline(puntos: Sequence[Punto], precision: int = PRECISION_POLYLINE) -> str:
+    coordenadas = como_array(puntos)
+    if not len(coordenadas):
+        return ""
+    # Redondeo y diferencias con el punto anterior en bloque; el varint sí es de a uno
+    enteros = np.round(coordenadas * 10 ** precision).astype(np.int64)
+    deltas = np.diff(enteros, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    salida: List[str] = []
+    for valor in deltas.ravel().tolist():
+        _codificar_numero(valor, salida)
+    return "".join(salida)
+
+
+def decodificar_polyline(texto: str, precision: int = PRECISION_POLYLINE) -> List[Punto]:
+    factor = 10 ** precision
+    puntos: List[Punto] = []
+    indice = lat = lng = 0
+    while indice < len(texto):
+        deltas = []
+        for _ in range(2):
+            resultado = desplazamiento = 0
+            while True:
+                byte = ord(texto[indice]) - 63
+                indice += 1
+                resultado |= (byte & 0x1f) << desplazamiento
+                desplazamiento += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(resultado >> 1) if resultado & 1 else resultado >> 1)
+        lat += deltas[0]
+        lng += deltas[1]
+        puntos.append((lat / factor, lng / factor))
+    return puntos
@@ -0,0 +1,201 @@
+# app/core/hashing.py
+"""
+Hash y verificación de contraseñas (bcrypt) en un pool de procesos propio.
+
+bcrypt es CPU pura (~250 ms por operación con 12 rondas). Corriendo en el
+threadpool de FastAPI, una ráfaga de logins (abre la inscripción a un evento)
+ocupa todos los threads y compite por CPU con el resto de los endpoints.
+Acá las operaciones van a un ProcessPoolExecutor de tamaño fijo:
+
+- HASHING_PROCESOS: procesos del pool (por defecto 2, nunca más que las CPUs).
+  0 = sin pool, en un thread como antes (tests / desarrollo en Windows).
+- HASHING_MAX_PENDIENTES: operaciones en cola + en curso. Pasado ese número se
+  responde 503 con Retry-After en lugar de encolar sin límite (la cola crece
+  más rápido de lo que se vacía y todos terminan en timeout).
+- BCRYPT_ROUNDS (app/core/security.py): costo de los hashes nuevos. Si cambia,
+  verificar() devuelve el hash recalculado para guardarlo (rehash al loguearse).
+
+Los procesos arrancan con "spawn": no heredan conexiones a la base ni los
+threads del proceso web. Si un proceso del pool muere (OOM, kill) el pool queda
+roto: se descarta, se arma otro y se reintenta una vez.
+Métricas de cola y latencia en estadisticas() (/salud/detalle).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.security import pwd_context
+
+PROCESOS = min(int(os.getenv("HASHING_PROCESOS", "2")), os.cpu_count() or 1)
+MAX_PENDIENTES = int(os.getenv("HASHING_MAX_PENDIENTES", "64"))
+MUESTRAS_LATENCIA = 500
+
+_lock = threading.Lock()
+_pool: Optional[ProcessPoolExecutor] = None
+_pendientes = 0
+_metricas = {"pico_pendientes": 0, "completadas": 0, "rechazadas": 0, "pools_rotos": 0}
+_latencias_ms: deque = deque(maxlen=MUESTRAS_LATENCIA)       # desde que se pide hasta que vuelve
+_ejecucion_ms: deque = deque(maxlen=MUESTRAS_LATENCIA)       # solo el bcrypt, dentro del proceso
+
+
+# ============================================================================
+# FUNCIONES QUE CORREN EN LOS PROCESOS DEL POOL
+# ============================================================================
+def _hashear_en_proceso(plano: str) -> Tuple[str, float]:
+    inicio = time.perf_counter()
+    return pwd_context.hash(plano), (time.perf_counter() - inicio) * 1000
+
+
+def _verificar_en_proceso(plano: str, hash_guardado: str) -> Tuple[Tuple[bool, Optional[str]], float]:
+    inicio = time.perf_counter()
+    try:
+        # verify_and_update: si el hash quedó con otro costo devuelve el nuevo
+        resultado = pwd_context.verify_and_update(plano, hash_guardado)
+    except ValueError:
+        resultado = (False, None)     # hash guardado corrupto o de otro esquema
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+# ============================================================================
+# POOL Y MÉTRICAS
+# ============================================================================
+def _obtener_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PROCESOS, mp_context=multiprocessing.get_context("spawn"))
+            print(f"🔐 [HASHING] Pool de {PROCESOS} procesos para bcrypt (máx. {MAX_PENDIENTES} pendientes)")
+        return _pool
+
+
+def _descartar_pool(roto: ProcessPoolExecutor) -> None:
+    global _pool
+    with _lock:
+        if _pool is roto:
+            _pool = None
+            _metricas["pools_rotos"] += 1
+    roto.shutdown(wait=False, cancel_futures=True)
+    print("⚠️ [HASHING] Un proceso del pool murió: se arma un pool nuevo")
+
+
+def _reservar() -> None:
+    global _pendientes
+    with _lock:
+        if _pendientes >= MAX_PENDIENTES:
+            _metricas["rechazadas"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Demasiados inicios de sesión al mismo tiempo, intentá de nuevo en unos segundos",
+                headers={"Retry-After": "2"},
+            )
+        _pendientes += 1
+        _metricas["pico_pendientes"] = max(_metricas["pico_pendientes"], _pendientes)
+
+
+def _liberar(inicio: float, ejecucion_ms: Optional[float]) -> None:
+    global _pendientes
+    with _lock:
+        _pendientes -= 1
+        _latencias_ms.append((time.perf_counter() - inicio) * 1000)
+        if ejecucion_ms is not None:
+            _metricas["completadas"] += 1
+            _ejecucion_ms.append(ejecucion_ms)
+
+
+async def _ejecutar(funcion: Callable, *args) -> Any:
+    _reservar()
+    inicio, ejecucion_ms = time.perf_counter(), None
+    try:
+        if PROCESOS <= 0:
+            resultado, ejecucion_ms = await asyncio.to_thread(funcion, *args)
+            return resultado
+        loop = asyncio.get_running_loop()
+        for intento in range(2):
+            pool = _obtener_pool()
+            try:
+                resultado, ejecucion_ms = await loop.run_in_executor(pool, funcion, *args)
+                return resultado
+            except BrokenProcessPool:
+                _descartar_pool(pool)
+                if intento:
+                    raise
+    finally:
+        _liberar(inicio, ejecucion_ms)
+
+
+def _ejecutar_sync(funcion: Callable, *args) -> Any:
+    """Para endpoints sync (corren en el threadpool): bloquea el thread, pero el CPU lo pone el pool."""
+    _reservar()
+    inicio, ejecucion_ms = time.perf_counter(), None
+    try:
+        if PROCESOS <= 0:
+            resultado, ejecucion_ms = funcion(*args)
+            return resultado
+        for intento in range(2):
+            pool = _obtener_pool()
+            try:
+                resultado, ejecucion_ms = pool.submit(funcion, *args).result()
+                return resultado
+            except BrokenProcessPool:
+                _descartar_pool(pool)
+                if intento:
+                    raise
+    finally:
+        _liberar(inicio, ejecucion_ms)
+
+
+def _percentil(valores: list, p: float) -> Optional[float]:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))], 1)
+
+
+def estadisticas() -> dict:
+    with _lock:
+        latencias, ejecuciones = list(_latencias_ms), list(_ejecucion_ms)
+        return {
+            "procesos": PROCESOS,
+            "max_pendientes": MAX_PENDIENTES,
+            "pendientes": _pendientes,
+            **_metricas,
+            "latencia_p50_ms": _percentil(latencias, 0.5),
+            "latencia_p95_ms": _percentil(latencias, 0.95),
+            "bcrypt_p50_ms": _percentil(ejecuciones, 0.5),
+        }
+
+
+def detener() -> None:
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ============================================================================
+# API
+# ============================================================================
+async def hashear(plano: str) -> str:
+    return await _ejecutar(_hashear_en_proceso, plano)
+
+
+async def verificar(plano: str, hash_guardado: str) -> Tuple[bool, Optional[str]]:
+    """(es_correcta, hash_nuevo). hash_nuevo != None si hay que guardarlo (cambió el costo)."""
+    return await _ejecutar(_verificar_en_proceso, plano, hash_guardado)
+
+
+def hashear_sync(plano: str) -> str:
+    return _ejecutar_sync(_hashear_en_proceso, plano)
+
+
+def verificar_sync(plano: str, hash_guardado: str) -> Tuple[bool, Optional[str]]:
+    return _ejecutar_sync(_verificar_en_proceso, plano, hash_guardado)
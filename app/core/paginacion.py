@@ -0,0 +1,183 @@
+# app/core/paginacion.py
+"""
+Paginación por cursor (keyset) para los listados.
+
+En lugar de OFFSET (que recorre y descarta todas las filas anteriores, así que
+cada página es más lenta que la anterior) se pide "lo que viene después de la
+última fila vista", ordenando por columnas únicas en conjunto, por ejemplo
+(fecha_evento, id_evento). Con un índice sobre esas columnas cada página cuesta
+lo mismo, sea la 1 o la 500.
+
+El cursor es opaco para el frontend: JSON en base64 url-safe con los valores
+de orden de la última fila (fechas en ISO). Se devuelve en el header
+X-Next-Cursor (o en el cuerpo) y se manda tal cual en ?cursor=.
+
+Totales: contarlos cuesta un COUNT(*) por página. contar() permite pedir el
+exacto, uno aproximado (estimación del planner de Postgres, gratis) o ninguno.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+HEADER_CURSOR = "X-Next-Cursor"
+HEADER_TOTAL = "X-Total-Count"
+HEADER_TOTAL_APROXIMADO = "X-Total-Aproximado"
+
+TOTAL_EXACTO = "exacto"
+TOTAL_APROXIMADO = "aproximado"
+TOTAL_NINGUNO = "no"
+PATRON_TOTAL = f"^({TOTAL_EXACTO}|{TOTAL_APROXIMADO}|{TOTAL_NINGUNO})$"
+
+
+# ============================================================================
+# CURSOR
+# ============================================================================
+def _a_json(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    if isinstance(valor, Decimal):
+        return {"n": str(valor)}
+    return valor
+
+
+def _de_json(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        if "n" in valor:
+            return Decimal(valor["n"])
+    return valor
+
+
+def codificar_cursor(*valores: Any) -> str:
+    crudo = json.dumps([_a_json(v) for v in valores], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, cantidad: int) -> Tuple[Any, ...]:
+    """Valores del cursor; 400 si está mal formado o no tiene 'cantidad' valores."""
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valores = json.loads(crudo)
+        if not isinstance(valores, list) or len(valores) != cantidad:
+            raise ValueError(cursor)
+        return tuple(_de_json(v) for v in valores)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def decodificar_posicion(cursor: str) -> int:
+    """
+    Cursor de posición: para listados ordenados por un valor calculado (relevancia
+    de la búsqueda) donde no hay keyset posible; guarda cuántas filas ya se mostraron.
+    Se arma con codificar_cursor(posicion).
+    """
+    (posicion,) = decodificar_cursor(cursor, 1)
+    if not isinstance(posicion, int) or isinstance(posicion, bool) or posicion < 0:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return posicion
+
+
+def decodificar_distancia(cursor: str) -> Tuple[float, int]:
+    """
+    Cursor de distancia: para listados ordenados por una distancia calculada en
+    Python (eventos cercanos); guarda (distancia, id) de la última fila mostrada.
+    Se arma con codificar_cursor(distancia, id).
+    """
+    distancia, id_fila = decodificar_cursor(cursor, 2)
+    if (not isinstance(distancia, (int, float)) or isinstance(distancia, bool)
+            or not isinstance(id_fila, int) or isinstance(id_fila, bool)):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return float(distancia), id_fila
+
+
+# ============================================================================
+# KEYSET
+# ============================================================================
+def paginar(
+    query: Query,
+    orden: Sequence,
+    limite: int,
+    cursor: Optional[str],
+    clave: Callable[[Any], Tuple[Any, ...]],
+    descendente: bool = False,
+    saltar: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Devuelve (filas de la página, cursor de la siguiente o None).
+
+    - orden: columnas de orden, todas en la misma dirección y únicas en conjunto
+      (terminar siempre con la PK).
+    - clave(fila) -> valores de esas columnas para la fila (para armar el cursor).
+    - saltar: OFFSET de compatibilidad para clientes que todavía mandan skip
+      (solo se aplica sin cursor).
+    Pide limite + 1 filas para saber si hay más sin contar.
+    """
+    if cursor:
+        despues_de = decodificar_cursor(cursor, len(orden))
+        fila_orden = tuple_(*orden)
+        query = query.filter(fila_orden < despues_de if descendente else fila_orden > despues_de)
+
+    columnas = [c.desc() if descendente else c.asc() for c in orden]
+    query = query.order_by(*columnas)
+    if saltar and not cursor:
+        query = query.offset(saltar)
+    filas = query.limit(limite + 1).all()
+
+    if len(filas) > limite:
+        filas = filas[:limite]
+        return filas, codificar_cursor(*clave(filas[-1]))
+    return filas, None
+
+
+# ============================================================================
+# TOTALES
+# ============================================================================
+class _Explicar(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <select> conservando los parámetros bind."""
+    inherit_cache = False
+
+    def __init__(self, consulta):
+        self.consulta = consulta
+
+
+@compiles(_Explicar, "postgresql")
+def _compilar_explicar(elemento, compilador, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compilador.process(elemento.consulta, **kw)
+
+
+def contar(db: Session, query: Query, modo: str = TOTAL_EXACTO) -> Tuple[Optional[int], bool]:
+    """
+    (total, es_aproximado). 'query' sin ORDER BY ni eager loads.
+    El aproximado sale del EXPLAIN de Postgres; en otros motores se cuenta exacto.
+    """
+    if modo == TOTAL_NINGUNO:
+        return None, False
+    if modo == TOTAL_APROXIMADO and db.get_bind().dialect.name == "postgresql":
+        plan = db.execute(_Explicar(query.order_by(None).statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    return query.order_by(None).count(), False
+
+
+def headers_pagina(response, siguiente: Optional[str], total: Optional[int] = None, aproximado: bool = False) -> None:
+    """Completa X-Next-Cursor / X-Total-Count en la respuesta de un listado."""
+    if siguiente:
+        response.headers[HEADER_CURSOR] = siguiente
+    if total is not None:
+        response.headers[HEADER_TOTAL] = str(total)
+        if aproximado:
+            response.headers[HEADER_TOTAL_APROXIMADO] = "1"
@@ -14,7 +14,17 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Token del canal en vivo (SSE): EventSource no manda headers y va en la URL,
+# que queda en los logs de accesos y proxies. Dura segundos y solo sirve para
+# abrir /notificaciones/stream (no es un token de login).
+STREAM_TOKEN_SEGUNDOS = int(os.getenv("STREAM_TOKEN_SEGUNDOS", 60))
+USO_STREAM = "stream"
+
+# Costo de bcrypt para los hashes nuevos. Los guardados con otro costo se
+# rehashean solos al loguearse (app/core/hashing.py -> verificar).
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -36,3 +46,21 @@ def decode_access_token(token: str):
         return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         return None
+
+def create_stream_token(id_usuario: int) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(seconds=STREAM_TOKEN_SEGUNDOS)
+    # sub no es un email: aunque llegue a get_current_usuario_from_token no encuentra usuario
+    return jwt.encode(
+        {"sub": f"{USO_STREAM}:{id_usuario}", "uso": USO_STREAM, "exp": expire},
+        SECRET_KEY, algorithm=ALGORITHM
+    )
+
+def decode_stream_token(token: str) -> Optional[int]:
+    """id_usuario del token de stream; None si venció, es inválido o es otro tipo de token."""
+    payload = decode_access_token(token)
+    if payload is None or payload.get("uso") != USO_STREAM:
+        return None
+    prefijo, _, id_usuario = str(payload.get("sub", "")).partition(":")
+    if prefijo != USO_STREAM or not id_usuario.isdigit():
+        return None
+    return int(id_usuario)
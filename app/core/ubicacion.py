@@ -0,0 +1,60 @@
+# app/core/ubicacion.py
+"""
+Normalización de ubicaciones de eventos.
+
+Las ubicaciones llegan como texto libre del autocompletado del mapa
+("Calle 123, Municipio de X, Provincia de Y, Argentina", etc).
+De acá salen provincia y localidad, que se guardan en la tabla evento
+al crear / editar / aprobar (ver Evento en registro_models) para que los
+reportes agrupen con GROUP BY en lugar de parsear texto en cada request.
+Se recortan al largo de esas columnas: ubicacion admite 300 caracteres y un
+solo segmento puede ocuparlos casi todos.
+"""
+from typing import Optional, Tuple
+
+SIN_PROVINCIA = "Sin Provincia"
+SIN_LOCALIDAD = "Sin Localidad"
+LARGO_PROVINCIA = 100     # evento.provincia VARCHAR(100)
+LARGO_LOCALIDAD = 150     # evento.localidad VARCHAR(150)
+
+
+def extraer_provincia(ubicacion_completa: Optional[str]) -> str:
+    if not ubicacion_completa:
+        return SIN_PROVINCIA
+    partes = [p.strip() for p in ubicacion_completa.split(',')]
+    for parte in partes:
+        if "Provincia de" in parte:
+            return parte.replace("Provincia de", "").strip().title()
+        if "Province of" in parte:
+            return parte.replace("Province of", "").strip().title()
+    if len(partes) >= 3:
+        candidata = partes[-3].strip()
+        if not candidata.isdigit() and candidata.lower() != "argentina":
+            return candidata.title()
+    if len(partes) >= 2:
+        return partes[-2].strip().title()
+    return SIN_PROVINCIA
+
+
+def extraer_localidad(ubicacion_completa: Optional[str]) -> str:
+    if not ubicacion_completa:
+        return SIN_LOCALIDAD
+    partes = [p.strip() for p in ubicacion_completa.split(',')]
+    for parte in partes:
+        if "Municipio de" in parte:
+            return parte.replace("Municipio de", "").strip().title()
+    for parte in partes:
+        if "Departamento" in parte:
+            return parte.strip().title()
+    if len(partes) >= 3:
+        return partes[-3].strip().title()
+    return partes[0].strip().title()
+
+
+def normalizar_ubicacion(ubicacion_completa: Optional[str]) -> Tuple[str, str]:
+    """(provincia, localidad) tal como se guardan en evento y se muestran en los reportes."""
+    # title() puede alargar el texto ("ß" -> "Ss"): se recorta después
+    return (
+        extraer_provincia(ubicacion_completa).strip().title()[:LARGO_PROVINCIA].rstrip(),
+        extraer_localidad(ubicacion_completa).strip().title()[:LARGO_LOCALIDAD].rstrip(),
+    )
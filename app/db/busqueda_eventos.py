@@ -0,0 +1,202 @@
+# app/db/busqueda_eventos.py
+"""
+Búsqueda de texto de eventos (/eventos/buscar).
+
+Postgres (ver "Búsqueda de texto" en scripts/db/02_postgres.sql):
+  - Evento.busqueda_tsv: tsvector generado (config es_unaccent = spanish + unaccent)
+    con pesos nombre (A) > ubicación (B) > descripción (C), índice GIN.
+  - pg_trgm sobre f_unaccent(lower(nombre_evento / ubicacion)) para errores de
+    tipeo y palabras a medias ("marat", "cordoba", "maraton").
+  - Orden por relevancia: ts_rank_cd + word_similarity, después por fecha.
+
+Otros motores (SQLite de las pruebas): índice invertido en memoria con la misma
+normalización (minúsculas, sin acentos) y trigramas para lo aproximado. Se arma
+una vez y se rehace solo cuando cambia la tabla evento (app.core.cache.versiones).
+"""
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.cache import versiones
+from app.models.registro_models import Evento
+
+CONFIG_TS = "es_unaccent"
+TABLAS_BUSQUEDA = ("evento",)
+
+# Pesos del índice en memoria (mismo orden que los setweight del tsvector)
+PESO_NOMBRE = 1.0
+PESO_UBICACION = 0.4
+PESO_DESCRIPCION = 0.2
+UMBRAL_TRIGRAMAS = 0.45      # similitud mínima para contar una palabra parecida
+
+_PALABRA = re.compile(r"\w+", re.UNICODE)
+
+
+def _es_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas y sin acentos (equivalente a f_unaccent(lower(...)))."""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _escapar_like(texto: str) -> str:
+    return texto.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+# ============================================================================
+# FILTROS
+# ============================================================================
+def filtrar_ubicacion(db: Session, query: Query, ubicacion: str) -> Query:
+    """Subcadena en la ubicación, sin importar mayúsculas ni acentos."""
+    if not _es_postgres(db):
+        return query.filter(Evento.ubicacion.ilike(f"%{ubicacion}%"))
+    # LIKE sobre la misma expresión del índice trigram idx_evento_ubicacion_trgm
+    patron = f"%{_escapar_like(normalizar(ubicacion))}%"
+    return query.filter(func.f_unaccent(func.lower(Evento.ubicacion)).like(patron, escape="!"))
+
+
+def buscar(db: Session, query: Query, termino: str, skip: int, limit: int,
+           contar: bool = True) -> Tuple[Optional[int], List[Evento]]:
+    """
+    Aplica la búsqueda de texto sobre 'query' (ya filtrada por estado, fechas, etc.)
+    y devuelve (total, página ordenada por relevancia). Con contar=False el total
+    es None en Postgres (se ahorra el COUNT en las páginas siguientes).
+    """
+    if _es_postgres(db):
+        return _buscar_postgres(query, termino, skip, limit, contar)
+    return _buscar_en_memoria(db, query, termino, skip, limit)
+
+
+def _buscar_postgres(query: Query, termino: str, skip: int, limit: int,
+                     contar: bool) -> Tuple[Optional[int], List[Evento]]:
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{CONFIG_TS}'::regconfig"), termino)
+    tsv = literal_column("evento.busqueda_tsv")
+    termino_norm = func.f_unaccent(func.lower(termino))
+    nombre_norm = func.f_unaccent(func.lower(Evento.nombre_evento))
+    ubicacion_norm = func.f_unaccent(func.lower(Evento.ubicacion))
+
+    query = query.filter(or_(
+        tsv.op("@@")(tsquery),
+        termino_norm.op("<%")(nombre_norm),        # word_similarity (índice trigram)
+        termino_norm.op("<%")(ubicacion_norm),
+    ))
+    total = query.count() if contar else None
+
+    relevancia = func.ts_rank_cd(tsv, tsquery) * 2 + func.word_similarity(termino_norm, nombre_norm)
+    eventos = (
+        query.order_by(relevancia.desc(), Evento.fecha_evento.asc(), Evento.id_evento.asc())
+        .offset(skip).limit(limit).all()
+    )
+    return total, eventos
+
+
+def _buscar_en_memoria(db: Session, query: Query, termino: str, skip: int, limit: int) -> Tuple[int, List[Evento]]:
+    puntajes = _indice_en_memoria(db).buscar(termino)
+    if not puntajes:
+        return 0, []
+    candidatos = query.filter(Evento.id_evento.in_(list(puntajes))).all()
+    candidatos.sort(key=lambda e: (-puntajes[e.id_evento], e.fecha_evento, e.id_evento))
+    return len(candidatos), candidatos[skip:skip + limit]
+
+
+# ============================================================================
+# ÍNDICE EN MEMORIA (motores sin tsvector / pg_trgm)
+# ============================================================================
+def _trigramas(palabra: str) -> Set[str]:
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def _raiz(palabra: str) -> str:
+    """Stemming mínimo en español: plurales ("carreras" -> "carrera", "ciclistas" -> "ciclista")."""
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] not in "aeiou":
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s"):
+        return palabra[:-1]
+    return palabra
+
+
+class IndiceBusquedaMemoria:
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)   # raíz -> {id_evento: peso}
+        self._trigramas: Dict[str, Set[str]] = {}                          # raíz -> trigramas
+        self._por_trigrama: Dict[str, Set[str]] = defaultdict(set)         # trigrama -> raíces
+
+    def agregar(self, id_evento: int, campos: Iterable[Tuple[Optional[str], float]]) -> None:
+        for texto, peso in campos:
+            for palabra in _PALABRA.findall(normalizar(texto)):
+                raiz = _raiz(palabra)
+                actual = self._postings[raiz].get(id_evento, 0.0)
+                self._postings[raiz][id_evento] = max(actual, peso)
+                if raiz not in self._trigramas:
+                    trigramas = _trigramas(raiz)
+                    self._trigramas[raiz] = trigramas
+                    for t in trigramas:
+                        self._por_trigrama[t].add(raiz)
+
+    def _parecidas(self, raiz: str) -> List[Tuple[str, float]]:
+        """Raíces indexadas que coinciden exacto, por prefijo o por trigramas."""
+        if raiz in self._postings:
+            return [(raiz, 1.0)]
+        trigramas = _trigramas(raiz)
+        candidatas = set()
+        for t in trigramas:
+            candidatas |= self._por_trigrama.get(t, set())
+        resultado = []
+        for candidata in candidatas:
+            if candidata.startswith(raiz):
+                resultado.append((candidata, 0.9))
+                continue
+            comunes = len(trigramas & self._trigramas[candidata])
+            similitud = comunes / len(trigramas | self._trigramas[candidata])
+            if similitud >= UMBRAL_TRIGRAMAS:
+                resultado.append((candidata, similitud))
+        return resultado
+
+    def buscar(self, termino: str) -> Dict[int, float]:
+        """{id_evento: puntaje}. Todas las palabras del término tienen que aparecer (AND)."""
+        puntajes: Optional[Dict[int, float]] = None
+        for palabra in _PALABRA.findall(normalizar(termino)):
+            de_la_palabra: Dict[int, float] = {}
+            for raiz, similitud in self._parecidas(_raiz(palabra)):
+                for id_evento, peso in self._postings[raiz].items():
+                    de_la_palabra[id_evento] = max(de_la_palabra.get(id_evento, 0.0), peso * similitud)
+            if puntajes is None:
+                puntajes = de_la_palabra
+            else:
+                puntajes = {i: puntajes[i] + p for i, p in de_la_palabra.items() if i in puntajes}
+            if not puntajes:
+                return {}
+        return puntajes or {}
+
+
+_lock_indice = threading.Lock()
+_indice: Tuple[Optional[tuple], Optional[IndiceBusquedaMemoria]] = (None, None)
+
+
+def _indice_en_memoria(db: Session) -> IndiceBusquedaMemoria:
+    global _indice
+    version = versiones.get(*TABLAS_BUSQUEDA)   # antes de leer la base
+    with _lock_indice:
+        version_actual, indice = _indice
+        if indice is not None and version_actual == version:
+            return indice
+
+        indice = IndiceBusquedaMemoria()
+        filas = db.query(Evento.id_evento, Evento.nombre_evento, Evento.ubicacion, Evento.descripcion)
+        for id_evento, nombre, ubicacion, descripcion in filas:
+            indice.agregar(id_evento, (
+                (nombre, PESO_NOMBRE), (ubicacion, PESO_UBICACION), (descripcion, PESO_DESCRIPCION)
+            ))
+        _indice = (version, indice)
+        return indice
@@ -1,6 +1,5 @@
 from sqlalchemy.orm import Session
 from app.models.auth_models import Usuario
-from app.core.security import get_password_hash
 from typing import Optional
 
 class UsuarioCRUD:
@@ -9,12 +8,12 @@ class UsuarioCRUD:
         return db.query(Usuario).filter(Usuario.email == email).first()
 
     @staticmethod
-    def create_usuario(db: Session, nombre_y_apellido: str, email: str, contrasenia: str) -> Usuario:
-        hashed_password = get_password_hash(contrasenia)
+    def create_usuario(db: Session, nombre_y_apellido: str, email: str, contrasenia_hash: str) -> Usuario:
+        # El hash lo calcula el service en el pool de bcrypt (app/core/hashing.py)
         db_usuario = Usuario(
             nombre_y_apellido=nombre_y_apellido,
             email=email,
-            contrasenia=hashed_password,
+            contrasenia=contrasenia_hash,
             id_rol= 4 # Rol por defecto: Cliente
         )
         db.add(db_usuario)
@@ -22,6 +21,14 @@ class UsuarioCRUD:
         db.refresh(db_usuario)
         return db_usuario
 
+    @staticmethod
+    def actualizar_contrasenia(db: Session, id_usuario: int, contrasenia_hash: str) -> None:
+        """Reemplaza el hash guardado (rehash al loguearse cuando cambia BCRYPT_ROUNDS). Hace commit."""
+        db.query(Usuario).filter(Usuario.id_usuario == id_usuario).update(
+            {"contrasenia": contrasenia_hash}, synchronize_session=False
+        )
+        db.commit()
+
     @staticmethod
     def get_usuario_by_id(db: Session, id_usuario: int) -> Optional[Usuario]:
         return db.query(Usuario).filter(Usuario.id_usuario == id_usuario).first()
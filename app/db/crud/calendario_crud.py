@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from app.models.registro_models import Evento, TipoEvento, NivelDificultad 
+from app.models.ocupacion_models import OcupacionEvento
 from datetime import date
 
 # Definimos la constante "PRO" para no usar números mágicos
@@ -9,6 +11,8 @@ def get_eventos_calendario(db: Session, fecha_inicio: date, fecha_fin: date):
     """
     Busca eventos publicados dentro del rango de fechas.
     Trae TODA la info: IDs, nombres, descripción, costos y coordenadas.
+    🚀 Incluye las reservas activas de cada evento (contadores de ocupacion_evento)
+    en la MISMA consulta, así el calendario no hace un COUNT por evento.
     """
     
     return db.query(
@@ -33,11 +37,15 @@ def get_eventos_calendario(db: Session, fecha_inicio: date, fecha_fin: date):
 
         # --- 11 y 12: Coordenadas ---
         Evento.lat,                  # row[11]
-        Evento.lng                   # row[12]
+        Evento.lng,                  # row[12]
+
+        # --- 13: Reservas activas (Pendientes + Confirmadas) ---
+        func.coalesce(OcupacionEvento.pendientes + OcupacionEvento.confirmadas, 0).label("ocupados")  # row[13]
         
     )\
     .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)\
     .join(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)\
+    .outerjoin(OcupacionEvento, OcupacionEvento.id_evento == Evento.id_evento)\
     .filter(
         Evento.fecha_evento >= fecha_inicio,
         Evento.fecha_evento <= fecha_fin,
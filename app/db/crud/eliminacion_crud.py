@@ -9,6 +9,7 @@ from sqlalchemy import desc
 from app.models.eliminacion_models import EliminacionEvento
 from app.models.registro_models import Evento
 from app.models.auth_models import Usuario
+from app.db.crud import ocupacion_crud
 from datetime import datetime
 from typing import List
 
@@ -74,6 +75,9 @@ def cancelar_evento(db: Session, id_evento: int) -> Evento:
         }, synchronize_session=False)
         
         db.flush()
+
+        # 3. El UPDATE masivo no pasa por los contadores: recalculamos este evento
+        ocupacion_crud.recalcular_ocupacion(db, id_evento)
     return evento
 
 def depurar_evento(db: Session, id_evento: int) -> Evento:
@@ -1,8 +1,14 @@
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models.inscripcion_models import ReservaEvento
 from app.models.auth_models import Usuario 
 from app.models.notificacion_models import Notificacion # Importamos el modelo para el Sprint 4
+from app.db.crud import ocupacion_crud
+from app.db import push
+from app.db.unidad_trabajo import confirmar
 
 # =============================================================================
 #  MÉTODOS SPRINT 3 (CUPOS Y RESERVAS) - HU 8.1 a 8.9
@@ -42,6 +48,9 @@ def create_reserva(db: Session, id_evento: int, id_usuario: int, id_estado: int)
     )
     db.add(nueva_reserva)
 
+    # Contadores de ocupación (nueva reserva -> suma en su estado)
+    ocupacion_crud.registrar_cambio_estado(db, id_evento, None, id_estado)
+
     # --- SPRINT 4: Generar Notificación ---
     # id_estado 1 = Pago (Pendiente), id_estado 2 = Gratis (Confirmado)
     texto_notif = "¡Reserva exitosa! Tienes 72 hs para confirmar tu pago." if id_estado == 1 else "¡Inscripción exitosa! Ya tienes tu lugar asegurado."
@@ -53,10 +62,9 @@ def create_reserva(db: Session, id_evento: int, id_usuario: int, id_estado: int)
     db.add(nueva_notif)
     # --------------------------------------
 
-    db.commit()
-    
     # IMPORTANTE: El refresh trae de vuelta la fecha_expiracion calculada por la BD (Computed)
-    db.refresh(nueva_reserva) 
+    # (dentro de una unidad de trabajo es flush + refresh y el commit lo hace el service)
+    confirmar(db, nueva_reserva)
     return nueva_reserva
 
 def get_usuario_by_id(db: Session, id_usuario: int):
@@ -77,7 +85,10 @@ def confirmar_reserva_pago(db: Session, reserva: ReservaEvento):
     """
     Cambia el estado de una reserva a 2 (Inscripto/Pagado).
     """
-    reserva.id_estado_reserva = 2
+    # Primero el estado nuevo: si el evento no tiene fila de ocupación se
+    # recalcula contando las reservas, y tiene que contar esta ya confirmada
+    anterior, reserva.id_estado_reserva = reserva.id_estado_reserva, 2
+    ocupacion_crud.registrar_cambio_estado(db, reserva.id_evento, anterior, 2)
 
     # --- SPRINT 4: Notificar confirmación de pago ---
     notif_pago = Notificacion(
@@ -89,4 +100,51 @@ def confirmar_reserva_pago(db: Session, reserva: ReservaEvento):
 
     db.commit()
     db.refresh(reserva)
-    return reserva
\ No newline at end of file
+    return reserva
+
+def cambiar_estado_reserva(db: Session, reserva: ReservaEvento, id_estado_nuevo: int) -> ReservaEvento:
+    """
+    Cambia el estado de una reserva manteniendo los contadores de ocupación.
+    No hace commit: lo decide el Service.
+    """
+    anterior, reserva.id_estado_reserva = reserva.id_estado_reserva, id_estado_nuevo
+    ocupacion_crud.registrar_cambio_estado(db, reserva.id_evento, anterior, id_estado_nuevo)
+    return reserva
+
+# =============================================================================
+#  TRANSICIÓN DE ESTADO: Pendiente -> Expirada (motor de transiciones)
+# =============================================================================
+ID_ESTADO_RESERVA_PENDIENTE = 1
+ID_ESTADO_RESERVA_EXPIRADA = 4
+TAMANO_LOTE_EXPIRACION = 1000
+
+def expirar_reservas_vencidas(db: Session, ahora: Optional[datetime] = None) -> dict:
+    """
+    Pasa a EXPIRADA (4) las reservas pendientes de pago cuya fecha_expiracion ya pasó,
+    con UPDATEs masivos de a TAMANO_LOTE_EXPIRACION, y recalcula la ocupación de los
+    eventos afectados (liberan cupo). Avisa en vivo a los usuarios (badge de pagos).
+    NO hace commit.
+    """
+    ahora = ahora or datetime.now()
+    vencidas = db.query(ReservaEvento.id_reserva, ReservaEvento.id_evento, ReservaEvento.id_usuario).filter(
+        ReservaEvento.id_estado_reserva == ID_ESTADO_RESERVA_PENDIENTE,
+        ReservaEvento.fecha_expiracion < ahora
+    ).all()
+    if not vencidas:
+        return {"reservas_expiradas": 0, "eventos_afectados": 0}
+
+    expiradas = 0
+    for inicio in range(0, len(vencidas), TAMANO_LOTE_EXPIRACION):
+        ids = [fila.id_reserva for fila in vencidas[inicio:inicio + TAMANO_LOTE_EXPIRACION]]
+        # Repetimos el filtro de estado: si se pagó entre el SELECT y el UPDATE, no se toca
+        expiradas += db.query(ReservaEvento).filter(
+            ReservaEvento.id_reserva.in_(ids),
+            ReservaEvento.id_estado_reserva == ID_ESTADO_RESERVA_PENDIENTE
+        ).update({"id_estado_reserva": ID_ESTADO_RESERVA_EXPIRADA}, synchronize_session=False)
+
+    eventos = {fila.id_evento for fila in vencidas}
+    for id_evento in eventos:
+        ocupacion_crud.recalcular_ocupacion(db, id_evento)
+
+    push.anotar(db, {fila.id_usuario for fila in vencidas}, push.EVENTO_PAGOS)
+    return {"reservas_expiradas": expiradas, "eventos_afectados": len(eventos)}
@@ -1,6 +1,13 @@
+from sqlalchemy import func, insert, update
 from sqlalchemy.orm import Session
 from app.models.notificacion_models import Notificacion
-from typing import List, Optional
+from app.db.unidad_trabajo import en_unidad_de_trabajo
+from app.db import push
+from app.core import paginacion
+from typing import Iterable, List, Optional, Tuple
+
+# Filas por INSERT multi-fila (4 parámetros por fila: lejos del límite de Postgres)
+TAMANO_LOTE_NOTIFICACIONES = 1000
 
 class NotificacionCRUD:
     @staticmethod
@@ -11,9 +18,30 @@ class NotificacionCRUD:
             mensaje=mensaje
         )
         db.add(nueva_notificacion)
-        db.commit()
-        db.refresh(nueva_notificacion)
+        push.anotar(db, [id_usuario], push.EVENTO_NOTIFICACIONES, {"mensaje": mensaje})
+        # Dentro de una unidad de trabajo se inserta en el mismo flush que el resto de la operación
+        if not en_unidad_de_trabajo(db):
+            db.commit()
+            db.refresh(nueva_notificacion)
         return nueva_notificacion
+
+    @staticmethod
+    def create_notificaciones_masivas(db: Session, ids_usuario: Iterable[int], mensaje: str,
+                                      id_estado_solicitud: Optional[int] = None) -> int:
+        """
+        Misma notificación para N usuarios con INSERT multi-fila (de a lotes),
+        sin armar objetos ORM ni refresh por fila. NO hace commit: se confirma
+        junto con el cambio que la origina (cancelación, edición, cron).
+        Los ids vacíos o repetidos se descartan. Devuelve cuántas se insertaron.
+        """
+        filas = [
+            {"id_usuario": id_usuario, "id_estado_solicitud": id_estado_solicitud, "mensaje": mensaje, "leida": False}
+            for id_usuario in dict.fromkeys(i for i in ids_usuario if i is not None)
+        ]
+        for inicio in range(0, len(filas), TAMANO_LOTE_NOTIFICACIONES):
+            db.execute(insert(Notificacion).values(filas[inicio:inicio + TAMANO_LOTE_NOTIFICACIONES]))
+        push.anotar(db, (f["id_usuario"] for f in filas), push.EVENTO_NOTIFICACIONES, {"mensaje": mensaje})
+        return len(filas)
     
     @staticmethod
     def get_notificaciones_by_usuario(db: Session, id_usuario: int) -> List[Notificacion]:
@@ -21,11 +49,59 @@ class NotificacionCRUD:
             Notificacion.id_usuario == id_usuario
         ).order_by(Notificacion.fecha_creacion.desc()).all()
 
+    @staticmethod
+    def get_pagina_notificaciones(db: Session, id_usuario: int, limite: int,
+                                  cursor: Optional[str] = None) -> Tuple[List[Notificacion], Optional[str]]:
+        """
+        Paginación por keyset sobre (fecha_creacion, id_notificacion), de la más nueva
+        a la más vieja (usa idx_notificacion_usuario_fecha). Devuelve (filas, siguiente_cursor).
+        """
+        query = db.query(Notificacion).filter(Notificacion.id_usuario == id_usuario)
+        return paginacion.paginar(
+            query, (Notificacion.fecha_creacion, Notificacion.id_notificacion), limite, cursor,
+            clave=lambda n: (n.fecha_creacion, n.id_notificacion), descendente=True
+        )
+
+    @staticmethod
+    def contar_no_leidas(db: Session, id_usuario: int) -> int:
+        # "leida = false" tal cual el predicado del índice parcial idx_notificacion_no_leidas
+        return db.query(func.count(Notificacion.id_notificacion)).filter(
+            Notificacion.id_usuario == id_usuario,
+            Notificacion.leida == False  # noqa: E712
+        ).scalar() or 0
+
+    @staticmethod
+    def get_firma_notificaciones(db: Session, id_usuario: int) -> Tuple[int, int, int]:
+        """
+        (total, no leídas, id máximo) del usuario: cambia si llega una notificación,
+        se marca alguna como leída o se borra. Base del ETag del feed.
+        """
+        total, no_leidas, id_maximo = db.query(
+            func.count(Notificacion.id_notificacion),
+            func.count(Notificacion.id_notificacion).filter(Notificacion.leida == False),  # noqa: E712
+            func.max(Notificacion.id_notificacion)
+        ).filter(Notificacion.id_usuario == id_usuario).one()
+        return total, no_leidas or 0, id_maximo or 0
+
+    @staticmethod
+    def marcar_todas_leidas(db: Session, id_usuario: int) -> int:
+        """UPDATE masivo de las no leídas del usuario. Devuelve cuántas marcó."""
+        resultado = db.execute(
+            update(Notificacion)
+            .where(Notificacion.id_usuario == id_usuario, Notificacion.leida == False)  # noqa: E712
+            .values(leida=True)
+        )
+        # Las otras pestañas del usuario actualizan el badge
+        push.anotar(db, [id_usuario], push.EVENTO_NOTIFICACIONES, {"leidas": True})
+        db.commit()
+        return resultado.rowcount
+
     @staticmethod
     def update_notificacion_leida(db: Session, id_notificacion: int, leida: bool = True) -> Optional[Notificacion]:
         notificacion = db.query(Notificacion).filter(Notificacion.id_notificacion == id_notificacion).first()
         if notificacion:
             notificacion.leida = leida
+            push.anotar(db, [notificacion.id_usuario], push.EVENTO_NOTIFICACIONES, {"leidas": leida})
             db.commit()
             db.refresh(notificacion)
         return notificacion
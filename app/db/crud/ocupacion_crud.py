@@ -0,0 +1,175 @@
+"""
+CRUD de Ocupación de Eventos
+
+Archivo: app/db/crud/ocupacion_crud.py
+Mantiene la tabla ocupacion_evento (contadores de reservas por estado)
+para que los listados no tengan que contar reservas evento por evento.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from typing import Dict, Iterable, Optional
+from app.models.ocupacion_models import OcupacionEvento
+from app.models.inscripcion_models import ReservaEvento
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+# Estado de reserva -> columna del contador
+COLUMNA_POR_ESTADO = {
+    1: "pendientes",
+    2: "confirmadas",
+    3: "canceladas",
+    4: "expiradas",
+}
+
+# ============================================================================
+# ACTUALIZACIÓN INCREMENTAL
+# ============================================================================
+def registrar_cambio_estado(
+    db: Session,
+    id_evento: int,
+    estado_anterior: Optional[int],
+    estado_nuevo: Optional[int]
+) -> None:
+    """
+    Mueve una reserva de un contador a otro.
+    - estado_anterior=None -> reserva nueva
+    - estado_nuevo=None    -> reserva eliminada
+    El UPDATE es atómico (col = col + 1), no hace falta leer la fila antes.
+    Si el evento todavía no tiene fila, se recalcula desde reserva_evento:
+    llamarla DESPUÉS de asignar el estado nuevo a la reserva.
+    """
+    if estado_anterior == estado_nuevo:
+        return
+
+    valores = {}
+    if estado_anterior in COLUMNA_POR_ESTADO:
+        columna = COLUMNA_POR_ESTADO[estado_anterior]
+        valores[columna] = getattr(OcupacionEvento, columna) - 1
+    if estado_nuevo in COLUMNA_POR_ESTADO:
+        columna = COLUMNA_POR_ESTADO[estado_nuevo]
+        valores[columna] = getattr(OcupacionEvento, columna) + 1
+
+    if not valores:
+        return
+
+    filas = db.query(OcupacionEvento).filter(
+        OcupacionEvento.id_evento == id_evento
+    ).update(valores, synchronize_session=False)
+
+    if filas == 0:
+        recalcular_ocupacion(db, id_evento)
+
+
+def recalcular_ocupacion(db: Session, id_evento: int) -> OcupacionEvento:
+    """
+    Recalcula los contadores de UN evento contando sus reservas (un solo GROUP BY).
+    Se usa en cambios masivos (cancelación de evento) y cuando falta la fila.
+    """
+    # La sesión tiene autoflush=False: empujamos los cambios pendientes para contarlos
+    db.flush()
+
+    conteos = dict(
+        db.query(ReservaEvento.id_estado_reserva, func.count(ReservaEvento.id_reserva))
+        .filter(ReservaEvento.id_evento == id_evento)
+        .group_by(ReservaEvento.id_estado_reserva)
+        .all()
+    )
+    valores = {columna: conteos.get(estado, 0) for estado, columna in COLUMNA_POR_ESTADO.items()}
+
+    ocupacion = db.get(OcupacionEvento, id_evento)
+    if ocupacion:
+        for columna, valor in valores.items():
+            setattr(ocupacion, columna, valor)
+        db.flush()
+        return ocupacion
+
+    # Primera reserva del evento: creamos la fila dentro de un SAVEPOINT
+    # por si otra request concurrente la creó primero.
+    ocupacion = OcupacionEvento(id_evento=id_evento, **valores)
+    try:
+        with db.begin_nested():
+            db.add(ocupacion)
+    except IntegrityError:
+        db.query(OcupacionEvento).filter(
+            OcupacionEvento.id_evento == id_evento
+        ).update(valores, synchronize_session=False)
+        ocupacion = db.get(OcupacionEvento, id_evento)
+    return ocupacion
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+def get_ocupacion(db: Session, id_evento: int) -> Optional[OcupacionEvento]:
+    return db.get(OcupacionEvento, id_evento)
+
+
+def get_ocupaciones(db: Session, ids_eventos: Iterable[int]) -> Dict[int, OcupacionEvento]:
+    """
+    Trae los contadores de varios eventos en UNA sola consulta.
+    Los eventos sin reservas no tienen fila y quedan fuera del diccionario.
+    """
+    ids = list(set(ids_eventos))
+    if not ids:
+        return {}
+
+    filas = db.query(OcupacionEvento).filter(OcupacionEvento.id_evento.in_(ids)).all()
+    return {fila.id_evento: fila for fila in filas}
+
+
+def calcular_cupos_disponibles(cupo_maximo: Optional[int], ocupacion: Optional[OcupacionEvento]) -> int:
+    """Cupo máximo menos reservas activas (Pendientes + Confirmadas)."""
+    total = cupo_maximo if cupo_maximo else 0
+    ocupados = ocupacion.ocupados if ocupacion else 0
+    return total - ocupados
+
+# ============================================================================
+# RECONCILIACIÓN (CRON)
+# ============================================================================
+def reconciliar_ocupaciones(db: Session) -> dict:
+    """
+    Compara los contadores con un conteo real de reserva_evento y corrige diferencias.
+    Red de seguridad por si algún camino cambió reservas sin pasar por este CRUD
+    (scripts manuales, updates desde DBeaver, etc).
+    """
+    reales: Dict[int, Dict[str, int]] = {}
+    filas = (
+        db.query(
+            ReservaEvento.id_evento,
+            ReservaEvento.id_estado_reserva,
+            func.count(ReservaEvento.id_reserva)
+        )
+        .group_by(ReservaEvento.id_evento, ReservaEvento.id_estado_reserva)
+        .all()
+    )
+    for id_evento, estado, cantidad in filas:
+        columna = COLUMNA_POR_ESTADO.get(estado)
+        if columna:
+            reales.setdefault(id_evento, dict.fromkeys(COLUMNA_POR_ESTADO.values(), 0))[columna] = cantidad
+
+    guardadas = {o.id_evento: o for o in db.query(OcupacionEvento).all()}
+
+    corregidos = 0
+    for id_evento, valores in reales.items():
+        ocupacion = guardadas.pop(id_evento, None)
+        if ocupacion is None:
+            db.add(OcupacionEvento(id_evento=id_evento, **valores))
+            corregidos += 1
+        elif any(getattr(ocupacion, col) != val for col, val in valores.items()):
+            for columna, valor in valores.items():
+                setattr(ocupacion, columna, valor)
+            corregidos += 1
+
+    # Filas de eventos que ya no tienen reservas -> todo en cero
+    for ocupacion in guardadas.values():
+        if ocupacion.pendientes or ocupacion.confirmadas or ocupacion.canceladas or ocupacion.expiradas:
+            for columna in COLUMNA_POR_ESTADO.values():
+                setattr(ocupacion, columna, 0)
+            corregidos += 1
+
+    db.commit()
+    return {
+        "eventos_revisados": len(reales) + len(guardadas),
+        "corregidos": corregidos
+    }
@@ -0,0 +1,109 @@
+"""
+CRUD de la Bandeja de Salida de Correos (outbox)
+
+Archivo: app/db/crud/outbox_crud.py
+Los servicios encolan acá (sin commit: el correo se confirma junto con el cambio
+que lo origina) y el worker de app/services/outbox_services.py los envía.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.email import MARCADOR_EMAIL, CorreoRenderizado
+from app.models.outbox_models import CorreoSaliente
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+ESTADO_PENDIENTE = "PENDIENTE"
+ESTADO_ENVIADO = "ENVIADO"
+ESTADO_ERROR = "ERROR"
+
+MAX_INTENTOS = 5
+# Clave en session.info para despertar al worker cuando se confirma la transacción
+CLAVE_HAY_CORREOS = "outbox_hay_correos"
+
+# ============================================================================
+# ENCOLAR
+# ============================================================================
+def encolar_correo(db: Session, correo: CorreoRenderizado, emails: Iterable[str]) -> Optional[CorreoSaliente]:
+    """
+    Guarda un correo para N destinatarios. NO hace commit.
+    Si el HTML usa MARCADOR_EMAIL (ej: link de baja), se reemplaza por el email de cada uno.
+    Los emails vacíos o repetidos se descartan.
+    """
+    vistos = set()
+    destinatarios = []
+    for email in emails:
+        if email and email not in vistos:
+            vistos.add(email)
+            destinatarios.append({"email": email, "sustituciones": {MARCADOR_EMAIL: email}})
+
+    if not destinatarios:
+        return None
+
+    saliente = CorreoSaliente(
+        asunto=correo.asunto,
+        html=correo.html,
+        destinatarios=destinatarios,
+        enviados=0,
+        estado=ESTADO_PENDIENTE,
+        intentos=0
+    )
+    db.add(saliente)
+    db.info[CLAVE_HAY_CORREOS] = True
+    return saliente
+
+# ============================================================================
+# WORKER
+# ============================================================================
+def reclamar_pendientes(db: Session, limite: int, segundos_lease: int) -> List[CorreoSaliente]:
+    """
+    Toma hasta `limite` correos pendientes y los "alquila" por segundos_lease.
+    SKIP LOCKED: si hay varios workers (varios procesos de uvicorn) no se pisan.
+    Si un worker muere a mitad de camino, al vencer el lease otro lo retoma desde `enviados`.
+    """
+    ahora = datetime.now()
+    correos = (
+        db.query(CorreoSaliente)
+        .filter(
+            CorreoSaliente.estado == ESTADO_PENDIENTE,
+            or_(CorreoSaliente.bloqueado_hasta.is_(None), CorreoSaliente.bloqueado_hasta < ahora)
+        )
+        .order_by(CorreoSaliente.id_correo)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for correo in correos:
+        correo.bloqueado_hasta = ahora + timedelta(seconds=segundos_lease)
+    db.commit()
+    return correos
+
+
+def registrar_lote_enviado(db: Session, correo: CorreoSaliente, cantidad: int, segundos_lease: int) -> None:
+    """Avanza el puntero de enviados y confirma (así un reintento no duplica mails)."""
+    correo.enviados = (correo.enviados or 0) + cantidad
+    if correo.enviados >= len(correo.destinatarios):
+        correo.estado = ESTADO_ENVIADO
+        correo.fecha_envio = datetime.now()
+        correo.bloqueado_hasta = None
+    else:
+        # Renovamos el lease para que otro worker no lo tome mientras seguimos
+        correo.bloqueado_hasta = datetime.now() + timedelta(seconds=segundos_lease)
+    db.commit()
+
+
+def registrar_error(db: Session, correo: CorreoSaliente, error: Exception) -> None:
+    """Backoff exponencial (1, 2, 4, 8... minutos). Después de MAX_INTENTOS queda en ERROR."""
+    correo.intentos = (correo.intentos or 0) + 1
+    correo.ultimo_error = str(error)[:1000]
+    if correo.intentos >= MAX_INTENTOS:
+        correo.estado = ESTADO_ERROR
+        correo.bloqueado_hasta = None
+    else:
+        correo.bloqueado_hasta = datetime.now() + timedelta(minutes=2 ** (correo.intentos - 1))
+    db.commit()
+
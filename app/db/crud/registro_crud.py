@@ -1,12 +1,18 @@
 from typing import Optional
 
+import numpy as np
+
 from sqlalchemy.orm import Session
 from app.models.registro_models import Evento, EventoMultimedia, TipoEvento, NivelDificultad
+from app.models.ruta_models import RutaEvento
 from app.models.auth_models import Usuario
 from app.schemas.registro_schema import EventoCreate
 from datetime import date
-from sqlalchemy import or_, desc, asc
+from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
+from app.db import busqueda_eventos
+from app.core import geohash, paginacion
+from app.core.geometria import distancias_km
 
 # ============================================================================
 # CONSTANTES DE ESTADO
@@ -20,24 +26,20 @@ ID_ROL_ADMINISTRADOR = 1
 ID_ROL_SUPERVISOR = 2
 
 # ============================================================================
-# FUNCIÓN AUXILIAR: Actualizar eventos pasados automáticamente (¡OPTIMIZADA!)
+# TRANSICIÓN DE ESTADO: Publicado -> Finalizado
 # ============================================================================
-def actualizar_eventos_finalizados(db: Session):
+def finalizar_eventos_vencidos(db: Session, hoy: Optional[date] = None) -> int:
     """
     Cambia el estado de eventos publicados cuya fecha ya pasó a FINALIZADO (4).
-    🚀 Optimizada: Usa "Bulk Update" directo en la base de datos sin usar bucles for.
+    🚀 Un solo "Bulk Update" en la base, sin bucles for. NO hace commit.
+    La corre el motor de transiciones (app/services/transiciones_services.py):
+    los listados ya no escriben, filtran fecha_evento >= hoy.
     """
-    hoy = date.today()
-    
-    # Hacemos la actualización masiva de un solo golpe
-    filas_actualizadas = db.query(Evento).filter(
+    hoy = hoy or date.today()
+    return db.query(Evento).filter(
         Evento.id_estado == ID_ESTADO_PUBLICADO,
         Evento.fecha_evento < hoy
     ).update({"id_estado": ID_ESTADO_FINALIZADO}, synchronize_session=False)
-    
-    if filas_actualizadas > 0:
-        db.commit()
-        print(f"✅ [AUTO-UPDATE] {filas_actualizadas} eventos pasados a FINALIZADO")
 
 # ============================================================================
 # CREATE (Crear)
@@ -68,14 +70,15 @@ def create_evento(db: Session, evento: EventoCreate, user_id: int, id_estado_fin
 # ============================================================================
 # READ (Leer)
 # ============================================================================
-def get_eventos(db: Session, skip: int = 0, limit: int = 100):
+def get_eventos(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
     """
     Devuelve solo eventos PUBLICADOS y FUTUROS (fecha_evento >= hoy).
+    Paginado por cursor sobre (fecha_evento, id_evento): devuelve (eventos, siguiente_cursor).
+    skip se mantiene por compatibilidad (solo tiene sentido sin cursor).
     """
-    actualizar_eventos_finalizados(db)
     hoy = date.today()
     
-    resultados = (
+    query = (
         db.query(Evento, Usuario.email, TipoEvento, NivelDificultad)
         .join(Usuario, Evento.id_usuario == Usuario.id_usuario)
         .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
@@ -83,10 +86,10 @@ def get_eventos(db: Session, skip: int = 0, limit: int = 100):
         .options(joinedload(Evento.multimedia))
         .filter(Evento.id_estado == ID_ESTADO_PUBLICADO)
         .filter(Evento.fecha_evento >= hoy)
-        .order_by(asc(Evento.fecha_evento))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    )
+    resultados, siguiente = paginacion.paginar(
+        query, (Evento.fecha_evento, Evento.id_evento), limit, cursor,
+        clave=lambda fila: (fila[0].fecha_evento, fila[0].id_evento), saltar=skip
     )
     
     eventos = []
@@ -96,23 +99,96 @@ def get_eventos(db: Session, skip: int = 0, limit: int = 100):
         evento.nivel_dificultad = dificultad
         eventos.append(evento)
     
-    return eventos
+    return eventos, siguiente
 
-def get_eventos_por_usuario(db: Session, id_usuario: int, skip: int = 0, limit: int = 100):
+def get_eventos_cercanos(db: Session, lat: float, lng: float, radio_km: float, limit: int = 20,
+                         cursor: Optional[str] = None):
+    """
+    Eventos PUBLICADOS y FUTUROS a menos de radio_km de (lat, lng), del más cercano al más lejano.
+    1. Candidatos por índice: las celdas de geohash que cubren el círculo (LIKE 'prefijo%'),
+       trayendo solo id, lat y lng.
+    2. Distancia exacta (haversine) sobre los candidatos, de una vez con NumPy.
+    3. Se cargan completos únicamente los eventos de la página.
+    Cursor sobre (distancia, id_evento). Devuelve ([(evento, distancia_km)], siguiente_cursor).
     """
-    Devuelve TODOS los eventos de un usuario.
+    celdas = geohash.celdas_para_radio(lat, lng, radio_km)
+    candidatos = (
+        db.query(Evento.id_evento, Evento.lat, Evento.lng)
+        .filter(Evento.id_estado == ID_ESTADO_PUBLICADO)
+        .filter(Evento.fecha_evento >= date.today())
+        .filter(or_(*[Evento.geohash.like(f"{celda}%") for celda in celdas]))
+        .all()
+    )
+    if not candidatos:
+        return [], None
+
+    ids = np.array([c.id_evento for c in candidatos])
+    distancias = distancias_km(lat, lng, [float(c.lat) for c in candidatos], [float(c.lng) for c in candidatos])
+    # Las celdas cubren el cuadrado: afuera quedan las esquinas
+    dentro = distancias <= radio_km
+    ids, distancias = ids[dentro], distancias[dentro]
+    orden = np.lexsort((ids, distancias))
+    ids, distancias = ids[orden], distancias[orden]
+
+    if cursor:
+        distancia_previa, id_previo = paginacion.decodificar_distancia(cursor)
+        despues = (distancias > distancia_previa) | ((distancias == distancia_previa) & (ids > id_previo))
+        ids, distancias = ids[despues], distancias[despues]
+
+    siguiente = None
+    if len(ids) > limit:
+        ids, distancias = ids[:limit], distancias[:limit]
+        siguiente = paginacion.codificar_cursor(float(distancias[-1]), int(ids[-1]))
+    if not len(ids):
+        return [], siguiente
+
+    filas = (
+        db.query(Evento, TipoEvento, NivelDificultad)
+        .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
+        .join(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)
+        .filter(Evento.id_evento.in_(ids.tolist()))
+        .all()
+    )
+    por_id = {}
+    for evento, tipo, dificultad in filas:
+        evento.tipo_evento = tipo
+        evento.nivel_dificultad = dificultad
+        por_id[evento.id_evento] = evento
+
+    return [(por_id[i], round(float(d), 2)) for i, d in zip(ids.tolist(), distancias) if i in por_id], siguiente
+
+def get_puntos_mapa(db: Session):
+    """
+    Eventos PUBLICADOS y FUTUROS con coordenadas, solo lo que necesita un marcador
+    del mapa (para el índice de clusters de app/services/mapa_services.py). Ordenados por id.
+    """
+    return (
+        db.query(Evento.id_evento, Evento.nombre_evento, Evento.fecha_evento, Evento.id_tipo, Evento.lat, Evento.lng)
+        .filter(Evento.id_estado == ID_ESTADO_PUBLICADO)
+        .filter(Evento.fecha_evento >= date.today())
+        .filter(Evento.lat.isnot(None), Evento.lng.isnot(None))
+        .order_by(Evento.id_evento)
+        .all()
+    )
+
+def get_eventos_por_usuario(db: Session, id_usuario: int, skip: int = 0, limit: int = 100,
+                            cursor: Optional[str] = None):
+    """
+    Devuelve TODOS los eventos de un usuario (más nuevos primero).
     🚀 Optimizada con todos los JOINs necesarios.
+    Paginado por cursor sobre (fecha_evento, id_evento): devuelve (eventos, siguiente_cursor).
     """
-    resultados = (
+    query = (
         db.query(Evento, TipoEvento, NivelDificultad)
         .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
         .join(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)
         .options(joinedload(Evento.multimedia))
         .filter(Evento.id_usuario == id_usuario)
-        .order_by(desc(Evento.fecha_evento))
-        .offset(skip)
-        .limit(limit)
-        .all()
+    )
+    resultados, siguiente = paginacion.paginar(
+        query, (Evento.fecha_evento, Evento.id_evento), limit, cursor,
+        clave=lambda fila: (fila[0].fecha_evento, fila[0].id_evento),
+        descendente=True, saltar=skip
     )
     
     eventos_finales = []
@@ -121,7 +197,7 @@ def get_eventos_por_usuario(db: Session, id_usuario: int, skip: int = 0, limit:
         evento.nivel_dificultad = dificultad
         eventos_finales.append(evento)
         
-    return eventos_finales
+    return eventos_finales, siguiente
 
 def get_evento_by_id(db: Session, evento_id: int):
     return db.query(Evento).filter(Evento.id_evento == evento_id).first()
@@ -135,6 +211,17 @@ def get_evento_por_nombre_y_fecha(db: Session, nombre: str, fecha: date):
 # ============================================================================
 # UPDATE (Actualizar)
 # ============================================================================
+def get_ruta_evento(db: Session, evento_id: int) -> Optional[RutaEvento]:
+    """
+    Ruta compacta del evento. Si el evento es anterior a ruta_evento (todavía no
+    migrado con scripts/backfill_rutas.py) se arma en memoria desde el JSON, sin guardar.
+    """
+    ruta = db.get(RutaEvento, evento_id)
+    if ruta is not None:
+        return ruta
+    coordenadas = db.query(Evento.ruta_coordenadas).filter(Evento.id_evento == evento_id).scalar()
+    return RutaEvento.desde_coordenadas(coordenadas) if coordenadas else None
+
 def update_evento(db: Session, evento_id: int, evento_data: EventoCreate):
     db_evento = db.query(Evento).filter(Evento.id_evento == evento_id).first()
     if db_evento:
@@ -182,13 +269,20 @@ def filtrar_eventos_avanzado(
     id_tipo: Optional[int] = None,
     id_dificultad: Optional[int] = None,
     skip: int = 0,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    modo_total: Optional[str] = None
 ):
     """
-    🚀 Optimizada: Se delegó toda la búsqueda a la base de datos (ilike)
-    en lugar de descargar todos los registros a la memoria de Python.
+    🚀 Optimizada: todos los filtros van a la base de datos. La búsqueda de texto
+    usa tsvector + pg_trgm con índices (ver app/db/busqueda_eventos.py) en lugar
+    de ilike('%...%'), que obligaba a recorrer la tabla entera.
+
+    Paginado por cursor (app/core/paginacion.py): sin texto, keyset sobre
+    (fecha_evento, id_evento); con texto el orden es por relevancia y el cursor
+    guarda la posición. El total se cuenta en la primera página (o según
+    modo_total: exacto / aproximado / no); con cursor no se vuelve a contar.
     """
-    actualizar_eventos_finalizados(db)
     hoy = date.today()
     
     query = db.query(Evento).filter(
@@ -209,9 +303,9 @@ def filtrar_eventos_avanzado(
             query = query.filter(Evento.fecha_evento <= fecha_hasta)
             filtros_aplicados['fecha_hasta'] = str(fecha_hasta)
     
-    # Búsqueda en SQL directa usando ilike (insensible a mayúsculas/minúsculas)
+    # Subcadena sin mayúsculas ni acentos (en Postgres usa el índice trigram)
     if ubicacion:
-        query = query.filter(Evento.ubicacion.ilike(f"%{ubicacion}%"))
+        query = busqueda_eventos.filtrar_ubicacion(db, query, ubicacion)
         filtros_aplicados['ubicacion'] = ubicacion
     
     if id_tipo:
@@ -224,23 +318,40 @@ def filtrar_eventos_avanzado(
         dificultad = db.query(NivelDificultad).filter(NivelDificultad.id_dificultad == id_dificultad).first()
         filtros_aplicados['dificultad'] = dificultad.nombre if dificultad else f"ID {id_dificultad}"
     
-    if busqueda:
-        query = query.filter(Evento.nombre_evento.ilike(f"%{busqueda}%"))
+    if modo_total is None:
+        modo_total = paginacion.TOTAL_NINGUNO if cursor else paginacion.TOTAL_EXACTO
+    aproximado = False
+
+    if busqueda and busqueda.strip():
+        # Texto completo + trigramas, ordenado por relevancia (app/db/busqueda_eventos.py)
         filtros_aplicados['busqueda'] = busqueda
+        desde = paginacion.decodificar_posicion(cursor) if cursor else skip
+        total, eventos = busqueda_eventos.buscar(
+            db, query, busqueda.strip(), desde, limit + 1,
+            contar=modo_total != paginacion.TOTAL_NINGUNO
+        )
+        siguiente = paginacion.codificar_cursor(desde + limit) if len(eventos) > limit else None
+        eventos = eventos[:limit]
+    else:
+        total, aproximado = paginacion.contar(db, query, modo_total)
+        eventos, siguiente = paginacion.paginar(
+            query, (Evento.fecha_evento, Evento.id_evento), limit, cursor,
+            clave=lambda e: (e.fecha_evento, e.id_evento), saltar=skip
+        )
     
-    total = query.count()
-    query = query.order_by(asc(Evento.fecha_evento))
-    eventos = query.offset(skip).limit(limit).all()
-    
-    if total == 0:
+    if total is None:
+        mensaje = f"Mostrando {len(eventos)} eventos más."
+    elif total == 0:
         mensaje = "No se encontraron eventos con los filtros seleccionados." if filtros_aplicados else "No hay eventos publicados en este momento."
     elif total == 1:
         mensaje = "Se encontró 1 evento."
     else:
-        mensaje = f"Se encontraron {total} eventos."
+        mensaje = f"Se encontraron {'aprox. ' if aproximado else ''}{total} eventos."
     
     return {
         "total": total,
+        "total_aproximado": aproximado,
+        "siguiente_cursor": siguiente,
         "eventos": eventos,
         "filtros_aplicados": filtros_aplicados,
         "mensaje": mensaje,
@@ -4,6 +4,7 @@ Archivo: app/db/crud/solicitud_edicion_crud.py
 """
 from sqlalchemy.orm import Session
 from app.models.solicitud_edicion_models import SolicitudEdicionEvento
+from app.db.unidad_trabajo import confirmar
 from datetime import datetime
 import json
 
@@ -30,8 +31,7 @@ def crear_solicitud_edicion(
         aprobada=None  # NULL = Pendiente
     )
     db.add(solicitud)
-    db.commit()
-    db.refresh(solicitud)
+    confirmar(db, solicitud)
     return solicitud
 
 
@@ -66,8 +66,7 @@ def aprobar_solicitud(
     solicitud.aprobada = True
     solicitud.fecha_resolucion = datetime.now()
     solicitud.id_admin_resolutor = id_admin
-    db.commit()
-    db.refresh(solicitud)
+    confirmar(db)
     return solicitud
 
 
@@ -0,0 +1,149 @@
+"""
+CRUD de Leases de Tareas Programadas
+
+Archivo: app/db/crud/tarea_crud.py
+Lock distribuido simple sobre la tabla tarea_lease: tomar el lease es un UPDATE
+condicional (atómico en la base), así que entre varios procesos solo uno lo gana.
+"""
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.tarea_models import EjecucionTarea, LeaseTarea
+
+ESTADO_OK = "OK"
+ESTADO_ERROR = "ERROR"
+ESTADO_EN_CURSO = "EN_CURSO"
+
+
+def identidad_proceso() -> str:
+    """host:pid, para saber quién tiene tomada cada tarea."""
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+# ============================================================================
+# LEASE
+# ============================================================================
+def tomar_lease(db: Session, nombre: str, duenio: str, segundos: int) -> bool:
+    """
+    Intenta tomar la tarea 'nombre' por 'segundos'. Devuelve True si la ganó.
+    Se puede tomar si está libre, si venció el lease anterior o si ya era nuestra.
+    Hace commit (el lease tiene que verse desde los otros procesos enseguida).
+    """
+    ahora = datetime.now()
+    valores = {"duenio": duenio, "vence": ahora + timedelta(seconds=segundos), "ultima_ejecucion": ahora}
+
+    filas = db.query(LeaseTarea).filter(
+        LeaseTarea.nombre == nombre,
+        or_(LeaseTarea.vence.is_(None), LeaseTarea.vence < ahora, LeaseTarea.duenio == duenio)
+    ).update(valores, synchronize_session=False)
+
+    if filas == 0:
+        if db.get(LeaseTarea, nombre) is not None:
+            db.rollback()
+            return False
+        # Primera vez que corre la tarea: creamos la fila (si otro proceso la
+        # creó al mismo tiempo, el INSERT choca con la PK y perdimos)
+        try:
+            with db.begin_nested():
+                db.add(LeaseTarea(nombre=nombre, **valores))
+        except IntegrityError:
+            db.rollback()
+            return False
+
+    db.commit()
+    return True
+
+
+def liberar_lease(db: Session, nombre: str, duenio: str, resultado: Optional[dict] = None,
+                  error: Optional[str] = None) -> None:
+    """Suelta el lease y deja registrada la corrida (resultado o error). Hace commit."""
+    ahora = datetime.now()
+    valores = {
+        "vence": None,
+        "ultima_finalizacion": ahora,
+        "ultimo_estado": ESTADO_ERROR if error else ESTADO_OK,
+        "ultimo_resultado": resultado,
+        "ultimo_error": error[:1000] if error else None,
+    }
+    if not error:
+        valores["ultimo_exito"] = ahora
+
+    db.query(LeaseTarea).filter(
+        LeaseTarea.nombre == nombre,
+        LeaseTarea.duenio == duenio
+    ).update(valores, synchronize_session=False)
+    db.commit()
+
+# ============================================================================
+# HISTORIAL
+# ============================================================================
+def crear_ejecucion(db: Session, nombre: str, disparo: str, duenio: str) -> EjecucionTarea:
+    """Registra el inicio de una corrida (EN_CURSO). Hace commit."""
+    ejecucion = EjecucionTarea(nombre=nombre, disparo=disparo, duenio=duenio,
+                               inicio=datetime.now(), estado=ESTADO_EN_CURSO)
+    db.add(ejecucion)
+    db.commit()
+    return ejecucion
+
+
+def finalizar_ejecucion(db: Session, id_ejecucion: int, duracion_ms: float,
+                        resultado: Optional[dict] = None, error: Optional[str] = None) -> None:
+    """Cierra la corrida con su duración y resultado (o error). Hace commit."""
+    db.query(EjecucionTarea).filter(EjecucionTarea.id_ejecucion == id_ejecucion).update({
+        "fin": datetime.now(),
+        "duracion_ms": duracion_ms,
+        "estado": ESTADO_ERROR if error else ESTADO_OK,
+        "resultado": resultado,
+        "error": error[:1000] if error else None,
+    }, synchronize_session=False)
+    db.commit()
+
+# ============================================================================
+# CONSULTAS
+# ============================================================================
+def get_leases(db: Session) -> List[LeaseTarea]:
+    return db.query(LeaseTarea).order_by(LeaseTarea.nombre).all()
+
+
+def get_historial(db: Session, nombre: Optional[str] = None, limite: int = 50) -> List[EjecucionTarea]:
+    """Últimas corridas (más nuevas primero), de una tarea o de todas."""
+    query = db.query(EjecucionTarea)
+    if nombre:
+        query = query.filter(EjecucionTarea.nombre == nombre)
+    return query.order_by(EjecucionTarea.id_ejecucion.desc()).limit(limite).all()
+
+
+def get_metricas(db: Session, nombre: str, ultimas: int = 50) -> dict:
+    """Duración (promedio, p95, máximo) y errores de las últimas 'ultimas' corridas terminadas."""
+    filas = (
+        db.query(EjecucionTarea.duracion_ms, EjecucionTarea.estado)
+        .filter(EjecucionTarea.nombre == nombre, EjecucionTarea.estado != ESTADO_EN_CURSO)
+        .order_by(EjecucionTarea.id_ejecucion.desc())
+        .limit(ultimas)
+        .all()
+    )
+    duraciones = sorted(d for d, _ in filas if d is not None)
+    if not duraciones:
+        return {"corridas": 0, "errores": 0, "duracion_promedio_ms": None,
+                "duracion_p95_ms": None, "duracion_max_ms": None}
+    return {
+        "corridas": len(filas),
+        "errores": sum(1 for _, estado in filas if estado == ESTADO_ERROR),
+        "duracion_promedio_ms": round(sum(duraciones) / len(duraciones), 1),
+        "duracion_p95_ms": duraciones[min(len(duraciones) - 1, int(len(duraciones) * 0.95))],
+        "duracion_max_ms": duraciones[-1],
+    }
+
+
+def purgar_historial(db: Session, dias: int) -> int:
+    """Borra las corridas de más de 'dias' días (el historial crece con cada tarea cada minuto). Hace commit."""
+    borradas = db.query(EjecucionTarea).filter(
+        EjecucionTarea.inicio < datetime.now() - timedelta(days=dias)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return borradas
@@ -4,6 +4,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from app.db import push, unidad_trabajo, versionado
 
 load_dotenv()
 
@@ -15,6 +16,13 @@ engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Versiona las tablas en cada commit para invalidar cachés (app/core/cache.py)
+versionado.instalar(SessionLocal)
+# Commits por request (header X-DB-Commits)
+unidad_trabajo.instalar(SessionLocal)
+# Avisos en vivo (SSE) de notificaciones y pagos, después del commit
+push.instalar(SessionLocal)
+
 def get_db():
     db = SessionLocal()
     try:
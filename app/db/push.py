@@ -0,0 +1,61 @@
+# app/db/push.py
+"""
+Avisos en vivo (app/core/broker.py) que se publican recién cuando la
+transacción se confirma: si hay rollback, nadie se entera de algo que no pasó.
+
+- NotificacionCRUD anota a los destinatarios con anotar(db, ...) al insertar.
+- Las reservas nuevas o modificadas se anotan solas en el flush (badge de
+  pagos pendientes del usuario).
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.broker import broker
+
+_CLAVE_AVISOS = "avisos_push"
+
+EVENTO_NOTIFICACIONES = "notificaciones"
+EVENTO_PAGOS = "pagos"
+
+# Tablas cuyo cambio avisa al dueño de la fila (tabla -> tipo de evento)
+_TABLAS_CON_AVISO = {"reserva_evento": EVENTO_PAGOS}
+
+
+def anotar(db: Session, ids_usuario: Iterable[int], tipo: str, datos: Optional[dict] = None) -> None:
+    """Deja el aviso pendiente hasta el commit."""
+    pendientes = db.info.setdefault(_CLAVE_AVISOS, {})
+    for id_usuario in ids_usuario:
+        if id_usuario is not None:
+            # Un aviso por (usuario, tipo) y transacción: el último gana
+            pendientes[(id_usuario, tipo)] = datos
+
+
+def _despues_del_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty):
+        tipo = _TABLAS_CON_AVISO.get(getattr(obj, "__tablename__", None))
+        if tipo:
+            anotar(session, [obj.id_usuario], tipo)
+
+
+def _despues_del_commit(session: Session) -> None:
+    # Igual que en versionado: el RELEASE de un SAVEPOINT no es el commit real
+    if session.in_nested_transaction():
+        return
+    pendientes = session.info.pop(_CLAVE_AVISOS, None)
+    if pendientes:
+        broker.publicar_muchos(
+            (id_usuario, tipo, datos) for (id_usuario, tipo), datos in pendientes.items()
+        )
+
+
+def _despues_del_rollback(session: Session) -> None:
+    session.info.pop(_CLAVE_AVISOS, None)
+
+
+def instalar(session_factory) -> None:
+    """Registra los listeners sobre la fábrica de sesiones (SessionLocal)."""
+    event.listen(session_factory, "after_flush", _despues_del_flush)
+    event.listen(session_factory, "after_commit", _despues_del_commit)
+    event.listen(session_factory, "after_rollback", _despues_del_rollback)
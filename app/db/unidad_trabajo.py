@@ -0,0 +1,90 @@
+# app/db/unidad_trabajo.py
+"""
+Unidad de trabajo: una operación de negocio = una transacción = un commit.
+
+Los CRUD confirman con confirmar(db): fuera de una unidad de trabajo hace
+commit (como siempre); dentro, solo flush y el commit lo hace la unidad al
+salir del bloque (rollback si hubo una excepción). Así un endpoint que crea
+una reserva + notificación + correo en la bandeja de salida hace UN commit.
+
+    with unidad_de_trabajo(db):
+        inscripcion_crud.create_reserva(...)
+        NotificacionCRUD.create_notificacion(...)   # se inserta en el mismo flush
+
+Además cuenta los commits de cada request (header X-DB-Commits, ver app/main.py)
+para detectar regresiones.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_CLAVE_UNIDAD = "unidad_de_trabajo"
+
+# Contador mutable por request: el listener corre en el thread del endpoint
+# (copia del contexto), pero la lista es la misma que ve el middleware.
+_commits_del_request: ContextVar[Optional[List[int]]] = ContextVar("commits_del_request", default=None)
+
+
+def en_unidad_de_trabajo(db: Session) -> bool:
+    return db.info.get(_CLAVE_UNIDAD, 0) > 0
+
+
+def confirmar(db: Session, *refrescar) -> None:
+    """Commit si la operación es suelta; flush si está dentro de una unidad de trabajo."""
+    if en_unidad_de_trabajo(db):
+        db.flush()
+    else:
+        db.commit()
+    for objeto in refrescar:
+        db.refresh(objeto)
+
+
+@contextmanager
+def unidad_de_trabajo(db: Session):
+    """
+    Agrupa todo lo del bloque en una transacción. Anidable: solo la unidad
+    de más afuera hace commit / rollback.
+    """
+    externa = not en_unidad_de_trabajo(db)
+    db.info[_CLAVE_UNIDAD] = db.info.get(_CLAVE_UNIDAD, 0) + 1
+    try:
+        yield db
+        if externa:
+            db.commit()
+    except Exception:
+        if externa:
+            db.rollback()
+        raise
+    finally:
+        db.info[_CLAVE_UNIDAD] -= 1
+
+
+# ============================================================================
+# CONTEO DE COMMITS POR REQUEST
+# ============================================================================
+@contextmanager
+def contar_commits():
+    """Usado por el middleware: devuelve una lista [commits] que se completa durante el request."""
+    contador = [0]
+    token = _commits_del_request.set(contador)
+    try:
+        yield contador
+    finally:
+        _commits_del_request.reset(token)
+
+
+def _despues_del_commit(session: Session) -> None:
+    # El RELEASE de un SAVEPOINT (begin_nested) también dispara after_commit: no cuenta
+    if session.in_nested_transaction():
+        return
+    contador = _commits_del_request.get()
+    if contador is not None:
+        contador[0] += 1
+
+
+def instalar(session_factory) -> None:
+    """Registra el contador de commits sobre la fábrica de sesiones (SessionLocal)."""
+    event.listen(session_factory, "after_commit", _despues_del_commit)
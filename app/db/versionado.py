@@ -0,0 +1,55 @@
+# app/db/versionado.py
+"""
+Listeners de sesión que incrementan app.core.cache.versiones al hacer commit.
+
+Se anotan las tablas tocadas en cada flush (altas, cambios, bajas) y en los
+UPDATE/DELETE masivos (query.update / query.delete). Recién cuando la
+transacción se confirma se incrementan sus versiones; si hay rollback se descartan.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import versiones
+
+_CLAVE_TABLAS = "tablas_modificadas"
+
+
+def _anotar(session: Session, tabla: str) -> None:
+    session.info.setdefault(_CLAVE_TABLAS, set()).add(tabla)
+
+
+def _despues_del_flush(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tabla = getattr(obj, "__tablename__", None)
+        if tabla:
+            _anotar(session, tabla)
+
+
+def _al_ejecutar(orm_execute_state) -> None:
+    # UPDATE / DELETE masivos no pasan por el flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        tabla = getattr(orm_execute_state.statement, "table", None)
+        nombre = getattr(tabla, "name", None)
+        if nombre:
+            _anotar(orm_execute_state.session, nombre)
+
+
+def _despues_del_commit(session: Session) -> None:
+    # after_commit también se dispara al liberar un SAVEPOINT: esperar al commit real
+    if session.in_nested_transaction():
+        return
+    tablas = session.info.pop(_CLAVE_TABLAS, None)
+    if tablas:
+        versiones.incrementar(*tablas)
+
+
+def _despues_del_rollback(session: Session) -> None:
+    session.info.pop(_CLAVE_TABLAS, None)
+
+
+def instalar(session_factory) -> None:
+    """Registra los listeners sobre la fábrica de sesiones (SessionLocal)."""
+    event.listen(session_factory, "after_flush", _despues_del_flush)
+    event.listen(session_factory, "do_orm_execute", _al_ejecutar)
+    event.listen(session_factory, "after_commit", _despues_del_commit)
+    event.listen(session_factory, "after_rollback", _despues_del_rollback)
@@ -1,7 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles 
 from app.api import routers
+from app.services.outbox_services import iniciar_worker, detener_worker
+from app.services.planificador_services import iniciar_planificador, detener_planificador
+from app.db.unidad_trabajo import contar_commits
+from app.core import hashing
 import os
 
 app = FastAPI(
@@ -33,14 +37,53 @@ app.add_middleware(
     allow_credentials=True,      # Esto obliga a que la lista sea específica
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Aproximado", "ETag"],  # paginación y caché de listados
 )
 
 
+# 🔎 Commits a la base por request: cada operación de negocio debería hacer uno solo
+# (ver app/db/unidad_trabajo.py). Sirve para detectar regresiones desde el navegador o los tests.
+@app.middleware("http")
+async def header_commits_por_request(request: Request, call_next):
+    with contar_commits() as commits:
+        response = await call_next(request)
+    response.headers["X-DB-Commits"] = str(commits[0])
+    return response
+
+
 # Incluir todos los routers
 for r in routers:
     app.include_router(r, prefix="/api/v1")
 
 
+# 📬 Worker que envía los correos de la bandeja de salida (correo_saliente)
+@app.on_event("startup")
+def iniciar_tareas_de_fondo():
+    iniciar_worker()
+
+
+@app.on_event("shutdown")
+def detener_tareas_de_fondo():
+    detener_worker()
+
+
+# 🗓️ Planificador de tareas (baja ocupación, transiciones de estado, reconciliación)
+@app.on_event("startup")
+async def iniciar_tareas_programadas():
+    await iniciar_planificador()
+
+
+@app.on_event("shutdown")
+async def detener_tareas_programadas():
+    await detener_planificador()
+
+
+# 🔐 Pool de procesos de bcrypt (se crea con el primer login / registro)
+@app.on_event("shutdown")
+def detener_pool_hashing():
+    hashing.detener()
+
+
 @app.get("/", tags=["General"], summary="Página principal de la API")
 def read_root():
     return {
@@ -1,8 +1,10 @@
 from sqlalchemy import Column, Integer, String, Date, Text, DECIMAL, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from app.models.auth_models import Usuario
 from app.models.registro_models import TipoEvento, NivelDificultad, EstadoEvento
 from app.models.base import Base
+from app.models.ruta_models import distancia_decimal
+from app.core.geometria import metricas_ruta, normalizar_ruta
 
 # Modelos de catálogos 
 # Catalogo de estados de solicitud de publicación de eventos: 1-Pendiente, 2-Aprobada, 3-Rechazada
@@ -29,8 +31,10 @@ class SolicitudPublicacion(Base):
     lat = Column(DECIMAL(9, 6), nullable=True)
     lng = Column(DECIMAL(9, 6), nullable=True)
     # ✅ NUEVO: Campos para guardar el ruteo y la distancia
+    # Si viene ruta, la distancia se mide sobre la ruta (ver _medir_ruta), no se confía en el cliente
     distancia_km = Column(DECIMAL(6, 2), nullable=True)
-    ruta_coordenadas = Column(JSON, nullable=True)
+    # Deferred: solo se carga al abrir una solicitud (o al aprobarla), no en los listados
+    ruta_coordenadas = deferred(Column(JSON, nullable=True))
     
 
     # Foreign Keys
@@ -52,3 +56,20 @@ class SolicitudPublicacion(Base):
    
     
   
+
+    @validates("ruta_coordenadas")
+    def _medir_ruta(self, key, ruta_coordenadas):
+        # La ruta completa recién se compacta al aprobar (pasa a Evento); acá solo la distancia
+        tenia_ruta = getattr(self, "_distancia_ruta", None) is not None or bool(self.ruta_coordenadas)
+        metricas = metricas_ruta(normalizar_ruta(ruta_coordenadas))
+        self._distancia_ruta = metricas["distancia_km"] if metricas else None
+        if self._distancia_ruta is not None:
+            self.distancia_km = self._distancia_ruta
+        elif tenia_ruta:
+            self.distancia_km = None      # se sacó la ruta: esa distancia ya no vale
+        return ruta_coordenadas
+
+    @validates("distancia_km")
+    def _distancia_de_la_ruta(self, key, distancia_km):
+        calculada = getattr(self, "_distancia_ruta", None)
+        return distancia_decimal(calculada) if calculada is not None else distancia_km
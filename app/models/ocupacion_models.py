@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from app.models.base import Base
+
+
+# --- CONTADORES DE OCUPACIÓN POR EVENTO ---
+# Una fila por evento con la cantidad de reservas en cada estado.
+# Se mantiene desde inscripcion_crud / eliminacion_crud al cambiar el estado de una reserva,
+# así los listados leen los cupos sin hacer un COUNT(*) por evento.
+class OcupacionEvento(Base):
+    __tablename__ = "ocupacion_evento"
+
+    id_evento = Column(Integer, ForeignKey("evento.id_evento"), primary_key=True)
+    pendientes = Column(Integer, nullable=False, default=0)    # Estado reserva 1
+    confirmadas = Column(Integer, nullable=False, default=0)   # Estado reserva 2
+    canceladas = Column(Integer, nullable=False, default=0)    # Estado reserva 3
+    expiradas = Column(Integer, nullable=False, default=0)     # Estado reserva 4
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def ocupados(self) -> int:
+        """Reservas que ocupan cupo: Pendientes (1) + Confirmadas (2)."""
+        return (self.pendientes or 0) + (self.confirmadas or 0)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+
+# --- BANDEJA DE SALIDA DE CORREOS (OUTBOX) ---
+# Los servicios guardan acá los mails en la MISMA transacción que el cambio que los origina
+# y el worker de app/services/outbox_services.py los envía en segundo plano.
+# Un registro = un asunto + un HTML para N destinatarios (se mandan de a 1000 por llamada a SendGrid).
+class CorreoSaliente(Base):
+    __tablename__ = "correo_saliente"
+
+    id_correo = Column(Integer, primary_key=True, autoincrement=True)
+    asunto = Column(String(255), nullable=False)
+    html = Column(Text, nullable=False)
+    # [{"email": "...", "sustituciones": {"-email-": "..."}}, ...]
+    destinatarios = Column(JSON, nullable=False)
+    enviados = Column(Integer, nullable=False, default=0)           # Cuántos destinatarios ya salieron (reintentos retoman desde acá)
+    estado = Column(String(20), nullable=False, default="PENDIENTE") # PENDIENTE | ENVIADO | ERROR
+    intentos = Column(Integer, nullable=False, default=0)
+    ultimo_error = Column(Text, nullable=True)
+    bloqueado_hasta = Column(DateTime, nullable=True)               # Lease del worker que lo tomó (o backoff tras un error)
+    fecha_creacion = Column(DateTime, server_default=func.now())
+    fecha_envio = Column(DateTime, nullable=True)
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, DateTime, ForeignKey, func, JSON
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, DateTime, ForeignKey, func, JSON, Index
 from app.models.inscripcion_models import ReservaEvento
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from app.models.base import Base
+from app.core.ubicacion import LARGO_LOCALIDAD, LARGO_PROVINCIA, normalizar_ubicacion
+from app.core import geohash
+from app.models.ruta_models import RutaEvento, distancia_decimal
 
 
 # --- MODELOS AUXILIARES ---
@@ -42,8 +45,22 @@ class Evento(Base):
     fecha_creacion = Column(DateTime(timezone=True), server_default=func.now())
     lat = Column(DECIMAL(9, 6), nullable=True)
     lng = Column(DECIMAL(9, 6), nullable=True)
+    # Si hay ruta, la calcula el servidor (ver _distancia_de_la_ruta); si no, la que mandó el cliente
     distancia_km = Column(DECIMAL(6,2), nullable=True)
-    ruta_coordenadas = Column(JSON, nullable=True)
+    # JSON tal cual lo manda el frontend. Deferred: los listados no lo cargan; la ruta
+    # se sirve compacta desde ruta_evento (GET /eventos/{id}/ruta?zoom=).
+    ruta_coordenadas = deferred(Column(JSON, nullable=True))
+    # Derivadas de "ubicacion" (app/core/ubicacion.py). Se completan solas al asignar la ubicación.
+    provincia = Column(String(LARGO_PROVINCIA), nullable=True)
+    localidad = Column(String(LARGO_LOCALIDAD), nullable=True)
+    # Derivado de lat/lng (app/core/geohash.py) para GET /eventos/cercanos. Se completa solo.
+    geohash = Column(String(12), nullable=True)
+
+    __table_args__ = (
+        Index("idx_evento_provincia_localidad", "provincia", "localidad"),
+        # varchar_pattern_ops: el btree resuelve los LIKE 'prefijo%' de la búsqueda por celdas
+        Index("idx_evento_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
 
     # Relaciones para facilitar consultas con joinedload
     tipo_evento = relationship("TipoEvento")          
@@ -52,6 +69,40 @@ class Evento(Base):
     reservas = relationship("ReservaEvento", back_populates="evento") 
     estado_evento = relationship("EstadoEvento")
     usuario = relationship("Usuario")
+    ruta = relationship("RutaEvento", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+
+    @validates("ubicacion")
+    def _normalizar_ubicacion(self, key, ubicacion):
+        # Alta, edición y aprobación de solicitudes pasan por acá (constructor o setattr)
+        self.provincia, self.localidad = normalizar_ubicacion(ubicacion)
+        return ubicacion
+
+    @validates("lat", "lng")
+    def _indexar_posicion(self, key, valor):
+        lat = valor if key == "lat" else self.lat
+        lng = valor if key == "lng" else self.lng
+        self.geohash = geohash.codificar(float(lat), float(lng)) if lat is not None and lng is not None else None
+        return valor
+
+    @validates("ruta_coordenadas")
+    def _compactar_ruta(self, key, ruta_coordenadas):
+        # Mismo camino: cada vez que cambia la ruta se rearma la versión compacta/simplificada
+        tenia_ruta = self.ruta is not None
+        self.ruta = RutaEvento.desde_coordenadas(ruta_coordenadas)
+        if self.ruta is not None:
+            self.distancia_km = self.ruta.distancia_km
+        elif tenia_ruta:
+            # Se sacó la ruta: la distancia era la medida sobre ella (las demás métricas
+            # se van con la fila de ruta_evento)
+            self.distancia_km = None
+        return ruta_coordenadas
+
+    @validates("distancia_km")
+    def _distancia_de_la_ruta(self, key, distancia_km):
+        # Con ruta cargada manda la distancia medida sobre la ruta, no la del cliente
+        if self.ruta is not None and self.ruta.distancia_km is not None:
+            return distancia_decimal(self.ruta.distancia_km)
+        return distancia_km
 
 class EventoMultimedia(Base):
     __tablename__ = "evento_multimedia"
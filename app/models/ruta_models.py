@@ -0,0 +1,85 @@
+import hashlib
+import os
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import Column, Integer, Float, Text, String, DateTime, ForeignKey, JSON, func
+from app.models.base import Base
+from app.core.geometria import (
+    codificar_polyline, como_array, douglas_peucker, metricas_ruta, normalizar_ruta, tolerancia_para_zoom
+)
+
+# Zooms de Leaflet para los que se guarda una versión simplificada (más allá del último, la ruta completa)
+NIVELES_ZOOM = sorted(int(z) for z in os.getenv("RUTA_NIVELES_ZOOM", "8,11,14").split(","))
+
+CAMPOS_METRICAS = (
+    "distancia_km", "lat_min", "lat_max", "lng_min", "lng_max",
+    "centroide_lat", "centroide_lng", "densidad_puntos_km",
+)
+DISTANCIA_MAXIMA_KM = Decimal("9999.99")   # tope de evento.distancia_km (DECIMAL(6,2))
+
+
+def distancia_decimal(distancia_km: float) -> Decimal:
+    """Distancia calculada -> valor para la columna distancia_km de evento / solicitud."""
+    return min(Decimal(str(round(distancia_km, 2))), DISTANCIA_MAXIMA_KM)
+
+
+# --- RUTA DE UN EVENTO (geometría compacta) ---
+# Se arma sola cuando se asigna Evento.ruta_coordenadas (ver el @validates en registro_models):
+# la ruta completa en "encoded polyline" y una versión simplificada con Douglas-Peucker
+# por cada zoom de NIVELES_ZOOM. GET /eventos/{id}/ruta?zoom= sirve desde acá y los
+# listados de eventos ya no cargan el JSON de coordenadas.
+# También guarda las métricas calculadas en el servidor (distancia, bbox, centroide):
+# las búsquedas espaciales las usan sin volver a parsear la ruta.
+class RutaEvento(Base):
+    __tablename__ = "ruta_evento"
+
+    id_evento = Column(Integer, ForeignKey("evento.id_evento", ondelete="CASCADE"), primary_key=True)
+    puntos = Column(Integer, nullable=False)                  # puntos de la ruta completa
+    polyline = Column(Text, nullable=False)                   # ruta completa, precisión 1e-5
+    niveles = Column(JSON, nullable=False)                    # {"8": polyline, "11": ...}
+    puntos_por_nivel = Column(JSON, nullable=False)           # {"8": 42, "11": 310, ...}
+    huella = Column(String(40), nullable=False)               # sha1 de la polyline (ETag)
+    distancia_km = Column(Float, nullable=True)               # haversine sobre la ruta completa
+    lat_min = Column(Float, nullable=True)                    # bounding box
+    lat_max = Column(Float, nullable=True)
+    lng_min = Column(Float, nullable=True)
+    lng_max = Column(Float, nullable=True)
+    centroide_lat = Column(Float, nullable=True)
+    centroide_lng = Column(Float, nullable=True)
+    densidad_puntos_km = Column(Float, nullable=True)         # puntos por km (calidad del trazado)
+    fecha_actualizacion = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @classmethod
+    def desde_coordenadas(cls, ruta: Any) -> Optional["RutaEvento"]:
+        """Arma la fila a partir del JSON del frontend; None si no hay al menos 2 puntos válidos."""
+        puntos = normalizar_ruta(ruta)
+        if len(puntos) < 2:
+            return None
+        puntos = como_array(puntos)     # una sola conversión para métricas, niveles y polyline
+        completa = codificar_polyline(puntos)
+        niveles, puntos_por_nivel = {}, {}
+        for zoom in NIVELES_ZOOM:
+            simplificada = douglas_peucker(puntos, tolerancia_para_zoom(zoom))
+            niveles[str(zoom)] = codificar_polyline(simplificada)
+            puntos_por_nivel[str(zoom)] = len(simplificada)
+        return cls(
+            puntos=len(puntos),
+            polyline=completa,
+            niveles=niveles,
+            puntos_por_nivel=puntos_por_nivel,
+            huella=hashlib.sha1(completa.encode()).hexdigest(),
+            **metricas_ruta(puntos),
+        )
+
+    @property
+    def metricas(self) -> dict:
+        return {campo: getattr(self, campo) for campo in CAMPOS_METRICAS}
+
+    def para_zoom(self, zoom: Optional[int]) -> tuple:
+        """(polyline, puntos, nivel) para el zoom pedido: el primer nivel >= zoom, o la completa."""
+        if zoom is not None:
+            for nivel in NIVELES_ZOOM:
+                if zoom <= nivel:
+                    return self.niveles[str(nivel)], self.puntos_por_nivel[str(nivel)], nivel
+        return self.polyline, self.puntos, None
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, JSON
+from app.models.base import Base
+
+
+# --- LEASE DE TAREAS PROGRAMADAS ---
+# Una fila por tarea de fondo (ej: "expirar_reservas"). El proceso que la corre
+# "alquila" la fila hasta 'vence': con varios workers de uvicorn (o varias réplicas)
+# solo uno ejecuta la tarea a la vez, y si se muere a mitad de camino otro la
+# retoma cuando vence el lease. Guarda además la última corrida para /salud.
+class LeaseTarea(Base):
+    __tablename__ = "tarea_lease"
+
+    nombre = Column(String(100), primary_key=True)
+    duenio = Column(String(100), nullable=True)               # host:pid del proceso que la tiene tomada
+    vence = Column(DateTime, nullable=True)                   # None = libre
+    ultima_ejecucion = Column(DateTime, nullable=True)        # inicio de la última corrida
+    ultima_finalizacion = Column(DateTime, nullable=True)
+    ultimo_exito = Column(DateTime, nullable=True)            # fin de la última corrida sin error
+    ultimo_estado = Column(String(20), nullable=True)         # OK | ERROR
+    ultimo_resultado = Column(JSON, nullable=True)            # contadores de la corrida
+    ultimo_error = Column(Text, nullable=True)
+
+
+# --- HISTORIAL DE EJECUCIONES ---
+# Una fila por corrida de una tarea del planificador (app/services/planificador_services.py),
+# sea programada, manual (admin) o por el cron HTTP viejo.
+class EjecucionTarea(Base):
+    __tablename__ = "ejecucion_tarea"
+
+    id_ejecucion = Column(Integer, primary_key=True, autoincrement=True)
+    nombre = Column(String(100), nullable=False)
+    disparo = Column(String(20), nullable=False)              # PROGRAMADA | MANUAL | CRON
+    duenio = Column(String(100), nullable=True)
+    inicio = Column(DateTime, nullable=False)
+    fin = Column(DateTime, nullable=True)
+    duracion_ms = Column(Float, nullable=True)
+    estado = Column(String(20), nullable=False)               # EN_CURSO | OK | ERROR
+    resultado = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
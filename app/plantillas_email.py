@@ -0,0 +1,351 @@
+# app/plantillas_email.py
+"""
+Plantillas HTML de los correos, compiladas una sola vez al importar el módulo.
+
+Cada plantilla usa la sintaxis de string.Template ($variable / ${variable}).
+Al registrarla se arma la página completa (cabecera, banner, pie), se reemplazan
+las constantes (BACKEND_URL, etc) y el texto queda partido en tramos fijos +
+nombres de variables. Renderizar es solo intercalar los valores de cada
+destinatario: no se vuelve a armar ni a parsear el HTML en cada envío.
+
+Uso:
+    asunto, html = PLANTILLAS.renderizar("cancelacion_evento", nombre_evento="...", motivo="...")
+"""
+import html as html_lib
+import os
+from string import Template
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+API_URL = os.getenv("BACKEND_URL")
+
+
+class PlantillaCompilada:
+    """Texto partido en literales y variables: renderizar = ''.join de los tramos."""
+
+    def __init__(self, texto: str, constantes: Dict[str, str] = None):
+        constantes = constantes or {}
+        self.literales: List[str] = []
+        self.campos: List[str] = []
+
+        actual = []
+        posicion = 0
+        for match in Template.pattern.finditer(texto):
+            actual.append(texto[posicion:match.start()])
+            posicion = match.end()
+            nombre = match.group("named") or match.group("braced")
+            if match.group("escaped") is not None:
+                actual.append("$")
+            elif nombre in constantes:
+                # Las constantes quedan fijas en el texto compilado
+                actual.append(str(constantes[nombre]))
+            elif nombre:
+                self.literales.append("".join(actual))
+                self.campos.append(nombre)
+                actual = []
+            else:
+                raise ValueError(f"Marcador inválido en plantilla en la posición {match.start()}")
+        actual.append(texto[posicion:])
+        self.literales.append("".join(actual))
+
+    def renderizar(self, valores: Dict[str, object], escapar: bool = True) -> str:
+        partes = [self.literales[0]]
+        for campo, literal in zip(self.campos, self.literales[1:]):
+            try:
+                valor = str(valores[campo])
+            except KeyError:
+                raise KeyError(f"Falta la variable '{campo}' para renderizar la plantilla")
+            partes.append(html_lib.escape(valor, quote=True) if escapar else valor)
+            partes.append(literal)
+        return "".join(partes)
+
+
+class RegistroPlantillas:
+    """Asunto + cuerpo compilados por nombre de plantilla."""
+
+    def __init__(self, constantes: Dict[str, str] = None):
+        self.constantes = constantes or {}
+        self._plantillas: Dict[str, Tuple[PlantillaCompilada, PlantillaCompilada]] = {}
+
+    def registrar(self, nombre: str, asunto: str, cuerpo: str) -> None:
+        if nombre in self._plantillas:
+            raise ValueError(f"Plantilla '{nombre}' ya registrada")
+        self._plantillas[nombre] = (
+            PlantillaCompilada(asunto, self.constantes),
+            PlantillaCompilada(cuerpo, self.constantes),
+        )
+
+    def renderizar(self, nombre: str, **valores) -> Tuple[str, str]:
+        """(asunto, html). El asunto no se escapa (no es HTML); el cuerpo sí."""
+        asunto, cuerpo = self._plantillas[nombre]
+        return asunto.renderizar(valores, escapar=False), cuerpo.renderizar(valores)
+
+    def campos(self, nombre: str) -> List[str]:
+        asunto, cuerpo = self._plantillas[nombre]
+        return sorted(set(asunto.campos) | set(cuerpo.campos))
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self._plantillas
+
+    @property
+    def nombres(self) -> List[str]:
+        return list(self._plantillas)
+
+
+# ============================================================================
+# PIEZAS COMUNES (se usan solo al registrar, no al renderizar)
+# ============================================================================
+CABECERA_HTML = """
+<div style="text-align: center; padding: 25px; background-color: #1e1e1e; border-bottom: 2px solid #333;">
+    <h1 style="color: #ff6b35; font-family: Arial, sans-serif; font-size: 28px; margin: 0; text-transform: uppercase; letter-spacing: 3px; font-weight: bold;">
+        WAKE UP <span style="color: #ffffff;">BIKES</span>
+    </h1>
+    <p style="color: #888888; font-family: Arial, sans-serif; font-size: 11px; margin: 5px 0 0 0; letter-spacing: 4px; text-transform: uppercase;">
+        Community & Rides
+    </p>
+</div>
+"""
+
+PIE_HTML = """
+                <div style="background-color: #181818; padding: 20px; text-align: center; color: #666; font-size: 12px; border-top: 1px solid #333;">
+                    <p>© 2026 Wake Up Bikes </p>
+                    EXTRA
+                </div>"""
+
+
+def _pagina(color_banner: str, color_titulo: str, titulo: str, cuerpo: str,
+            centrado: bool = False, pie: bool = True, extra_pie: str = "") -> str:
+    """Arma la página completa con el diseño de todos los correos."""
+    estilo_cuerpo = "padding: 30px; text-align: center;" if centrado else "padding: 30px;"
+    pie_html = PIE_HTML.replace("EXTRA", extra_pie) if pie else ""
+    return f"""
+    <html>
+        <body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #121212; color: #ffffff;">
+            <div style="max-width: 600px; margin: 20px auto; background-color: #1e1e1e; border: 1px solid #333; border-radius: 12px; overflow: hidden;">
+                {CABECERA_HTML}
+                <div style="background-color: {color_banner}; padding: 20px; text-align: center;">
+                    <h1 style="margin: 0; color: {color_titulo};">{titulo}</h1>
+                </div>
+                <div style="{estilo_cuerpo}">
+                    {cuerpo}
+                </div>{pie_html}
+            </div>
+        </body>
+    </html>
+    """
+
+
+def _recuadro(color: str, texto: str) -> str:
+    return f"""<div style="background-color: #2a2a2a; border-left: 4px solid {color}; padding: 15px; margin: 20px 0;">
+                        <p style="margin: 0; color: #ffffff;">{texto}</p>
+                    </div>"""
+
+
+def _boton(color: str, url: str, texto: str) -> str:
+    return f"""<div style="text-align: center; margin-top: 30px;">
+                        <a href="{url}" style="background-color: {color}; color: #121212; padding: 12px 25px; text-decoration: none; border-radius: 6px; font-weight: bold; display: inline-block;">{texto}</a>
+                    </div>"""
+
+
+SALUDO_USUARIO = '<p style="font-size: 18px;">Hola <strong>$nombre_usuario</strong>,</p>'
+SALUDO_CICLISTA = '<p style="font-size: 18px;">Hola ciclista,</p>'
+
+
+def _parrafo(texto: str) -> str:
+    return f'<p style="line-height: 1.6; color: #dddddd;">{texto}</p>'
+
+
+def _nota(texto: str, centrado: bool = False) -> str:
+    alineacion = " text-align: center;" if centrado else ""
+    return f'<p style="color: #cccccc; font-size: 14px;{alineacion}">{texto}</p>'
+
+
+# ============================================================================
+# REGISTRO
+# ============================================================================
+PLANTILLAS = RegistroPlantillas(constantes={"api_url": API_URL})
+
+# --- Inscripciones ---
+_PIE_SUSCRIPCION = """<p>
+                        <a href="$api_url/suscripcion/alta?email=$email_destino" style="color: COLOR; text-decoration: none;">Suscribirme a novedades</a>
+                        |
+                        <a href="$api_url/suscripcion/baja?email=$email_destino" style="color: #666; text-decoration: none;">Darme de baja</a>
+                    </p>"""
+
+_DETALLE_RESERVA = """<p style="color: #cccccc;">Detalles de tu salida:</p>
+                    <div style="background-color: #2a2a2a; border-left: 4px solid COLOR; padding: 15px; margin: 20px 0;">
+                        <p style="margin: 5px 0;"><strong>Evento:</strong> $evento</p>
+                        <p style="margin: 5px 0;"><strong>Fecha:</strong> $fecha</p>
+                    </div>"""
+
+PLANTILLAS.registrar(
+    "reserva_pago",
+    "🚲 Reserva Recibida: $evento",
+    _pagina("#ff6b35", "#121212", "¡Reserva Recibida!", SALUDO_USUARIO + """
+                    <div style="background-color: #3d2b1f; border: 2px dashed #ff6b35; border-radius: 8px; padding: 20px; text-align: center; margin: 20px 0;">
+                        <h2 style="color: #ff6b35; margin: 0 0 10px 0;">⚠️ ACCIÓN REQUERIDA</h2>
+                        <p style="font-size: 16px; margin: 0; line-height: 1.5;">
+                            Para asegurar tu lugar, recordá que tenés un plazo de <br>
+                            <span style="font-size: 26px; font-weight: bold; color: #ffffff;">72 HORAS</span><br>
+                            para realizar el pago. De lo contrario, la reserva expirará automáticamente.
+                        </p>
+                    </div>
+                    """ + _DETALLE_RESERVA.replace("COLOR", "#ff6b35"),
+            extra_pie=_PIE_SUSCRIPCION.replace("COLOR", "#ff6b35"))
+)
+
+PLANTILLAS.registrar(
+    "reserva_gratis",
+    "🚲 Inscripción Exitosa: $evento",
+    _pagina("#28a745", "#121212", "¡Inscripción Exitosa!", SALUDO_USUARIO + """
+                    <div style="background-color: #1e2b1e; border: 2px solid #28a745; border-radius: 8px; padding: 20px; text-align: center; margin: 20px 0;">
+                        <h2 style="color: #28a745; margin: 0 0 10px 0;">✅ LUGAR ASEGURADO</h2>
+                        <p style="font-size: 16px; margin: 0; line-height: 1.5;">
+                            ¡Buenas noticias! Al ser un evento gratuito, <br>
+                            <strong>tu lugar ya está confirmado</strong>.<br>
+                            No necesitás realizar ningún pago ni acción adicional.
+                        </p>
+                    </div>
+                    """ + _DETALLE_RESERVA.replace("COLOR", "#28a745"),
+            extra_pie=_PIE_SUSCRIPCION.replace("COLOR", "#28a745"))
+)
+
+PLANTILLAS.registrar(
+    "cancelacion_reserva",
+    "❌ Cancelación de Reserva: $evento",
+    _pagina("#e63946", "#ffffff", "Reserva Cancelada", SALUDO_USUARIO
+            + _parrafo('Te confirmamos que tu reserva para el evento <strong style="color: #ffffff;">$evento</strong> ha sido cancelada exitosamente.')
+            + _recuadro("#e63946", "Tu lugar ha sido liberado para otros participantes.")
+            + _nota("Si no realizaste esta acción o fue un error, podés volver a inscribirte desde nuestro calendario de eventos siempre que haya cupos disponibles."))
+)
+
+PLANTILLAS.registrar(
+    "recordatorio_pago",
+    "⏰ ¡Últimas 24hs! Asegurá tu lugar en $nombre_evento",
+    _pagina("#f4a261", "#121212", "Recordatorio de Pago",
+            '<p style="font-size: 18px;">¡Hola! Falta muy poco...</p>'
+            + _parrafo("Te recordamos que tu reserva para <strong>$nombre_evento</strong> vence en menos de 24 horas. "
+                       "Para que no pierdas tu cupo, por favor realizá el pago y cargá el comprobante en la plataforma.")
+            + _boton("#f4a261", "$api_url/mis-reservas", "Subir Comprobante"),
+            pie=False)
+)
+
+PLANTILLAS.registrar(
+    "pago_confirmado",
+    "✅ Pago Confirmado: $evento",
+    _pagina("#4CAF50", "#ffffff", "¡Pago Acreditado!",
+            '<p style="font-size: 18px;">¡Todo listo, $nombre_usuario!</p>'
+            + _parrafo("Confirmamos que recibimos el pago para el evento <strong>$evento</strong> del día <strong>$fecha</strong>."
+                       "<br><br>Ya tenés tu lugar asegurado. ¡Nos vemos en la ruta!"),
+            centrado=True)
+)
+
+# --- Eventos (masivos: van por la bandeja de salida) ---
+PLANTILLAS.registrar(
+    "nuevo_evento",
+    "🚲 ¡Nueva Salida Publicada: $nombre_evento!",
+    _pagina("#ff6b35", "#121212", "¡Nueva Ruta Disponible!", """<p style="font-size: 18px;">¡Hola ciclista! Hay una nueva aventura esperándote.</p>
+                    <div style="background-color: #2a2a2a; border-radius: 8px; padding: 25px; margin: 20px 0; border: 1px solid #444;">
+                        <h2 style="color: #ff6b35; margin: 0;">$nombre_evento</h2>
+                        <p style="font-size: 16px; color: #ffffff;">📅 Fecha: $fecha_evento</p>
+                        <br>
+                        <a href="$api_url/calendario?fecha=$fecha_url&evento_id=$id_evento" style="background-color: #ff6b35; color: #121212; padding: 12px 25px; text-decoration: none; border-radius: 6px; font-weight: bold; display: inline-block;">Ver detalles e Inscribirme</a>
+                    </div>
+                    """ + _nota("Recordá que los cupos son limitados. ¡No te quedes afuera!"),
+            centrado=True,
+            extra_pie='<p><a href="$api_url/suscripcion/baja?email=$email_destino" style="color: #666; text-decoration: none;">Dejar de recibir estas novedades</a></p>')
+)
+
+PLANTILLAS.registrar(
+    "modificacion_evento",
+    "📝 Cambio en tu evento: $nombre_evento",
+    _pagina("#ff6b35", "#121212", "Actualización de Evento", SALUDO_CICLISTA
+            + _parrafo("Te informamos que se han realizado cambios en los detalles del evento <strong>$nombre_evento</strong> en el que estás inscripto.")
+            + _recuadro("#ff6b35", "Por favor, revisá la nueva información (horarios, ubicación o costos) para estar al tanto.")
+            + _boton("#ff6b35", "$api_url/calendario?fecha=$fecha_url&evento_id=$id_evento", "Ver Cambios en el Calendario"))
+)
+
+PLANTILLAS.registrar(
+    "cancelacion_evento",
+    "❌ EVENTO CANCELADO: $nombre_evento",
+    _pagina("#e63946", "#ffffff", "Evento Cancelado", SALUDO_CICLISTA
+            + _parrafo("Lamentamos informarte que el evento <strong>$nombre_evento</strong> ha sido cancelado.")
+            + _recuadro("#e63946", "<strong>Motivo:</strong> $motivo")
+            + _nota("Si habías realizado un pago, por favor ponete en contacto con el organizador para gestionar la devolución o el crédito para otra salida."))
+)
+
+PLANTILLAS.registrar(
+    "advertencia_organizador",
+    "⚠️ Atención: Riesgo de cancelación para $nombre_evento",
+    _pagina("#ffcc00", "#121212", "Aviso de Baja Ocupación", '<p style="font-size: 18px;">Hola,</p>'
+            + _parrafo("Te contactamos desde el sistema porque notamos que tu evento <strong>$nombre_evento</strong> "
+                       "actualmente cuenta con un <strong>$porcentaje%</strong> de inscripciones confirmadas.")
+            + """
+                    <div style="background-color: #3d3300; border: 2px dashed #ffcc00; border-radius: 8px; padding: 20px; text-align: center; margin: 20px 0;">
+                        <h2 style="color: #ffcc00; margin: 0 0 10px 0;">⚠️ IMPORTANTE</h2>
+                        <p style="font-size: 16px; margin: 0; line-height: 1.5; color: #ffffff;">
+                            Si el evento no alcanza el mínimo del 40% de ocupación,<br>
+                            se cancelará automáticamente en <br>
+                            <span style="font-size: 26px; font-weight: bold; color: #ffcc00;">$dias_restantes DÍA(S)</span>
+                        </p>
+                    </div>
+                    """
+            + _nota("¡Te animamos a que invites a más personas y compartas tu evento en redes sociales "
+                    "para que siga en pie y sea un éxito!", centrado=True))
+)
+
+# --- Solicitudes de edición / publicación / baja (al organizador) ---
+PLANTILLAS.registrar(
+    "rechazo_edicion",
+    "❌ Solicitud de Edición Rechazada: $nombre_evento",
+    _pagina("#e63946", "#ffffff", "Edición No Aprobada", SALUDO_USUARIO
+            + _parrafo("Te informamos que la solicitud de edición para el evento <strong>$nombre_evento</strong> ha sido revisada y <strong>rechazada</strong> por la administración.")
+            + _recuadro("#e63946", "El evento permanecerá publicado con la información original.")
+            + _nota("Si tenés dudas sobre el motivo del rechazo, por favor contactate con el área de supervisión."))
+)
+
+PLANTILLAS.registrar(
+    "aprobacion_edicion",
+    "✅ Cambios Aprobados: $nombre_evento",
+    _pagina("#4CAF50", "#ffffff", "¡Edición Aprobada!", SALUDO_USUARIO
+            + _parrafo("¡Buenas noticias! Tu solicitud de edición para el evento <strong>$nombre_evento</strong> ha sido aprobada.")
+            + _recuadro("#4CAF50", "Los cambios ya se encuentran visibles en el calendario de eventos."))
+)
+
+PLANTILLAS.registrar(
+    "aprobacion_publicacion",
+    "🚀 ¡Evento Publicado!: $nombre_evento",
+    _pagina("#ff6b35", "#121212", "¡Tu Evento está en línea!", SALUDO_USUARIO
+            + _parrafo("¡Excelentes noticias! La revisión de tu evento <strong>$nombre_evento</strong> ha finalizado con éxito.")
+            + """
+                    <div style="background-color: #2a2a2a; border-radius: 8px; padding: 25px; margin: 20px 0; border: 1px solid #444;">
+                        <p style="font-size: 16px; color: #ffffff; margin: 0;">
+                           ✅ <strong>Estado: Aprobado y Publicado</strong>
+                        </p>
+                        <p style="color: #cccccc; font-size: 14px; margin-top: 10px;">
+                            Ya podés encontrarlo en el calendario y empezar a recibir inscripciones.
+                        </p>
+                    </div>""",
+            centrado=True)
+)
+
+PLANTILLAS.registrar(
+    "baja_aprobada",
+    "✅ Solicitud de Baja Aprobada: $nombre_evento",
+    _pagina("#4CAF50", "#ffffff", "Baja Confirmada", SALUDO_USUARIO
+            + _parrafo("Te informamos que tu solicitud para dar de baja el evento <strong>$nombre_evento</strong> ha sido <strong>aprobada</strong> por la administración.")
+            + _recuadro("#4CAF50", "El evento ha sido cancelado y ya no se encuentra visible en el calendario público.")
+            + _nota("Los participantes inscriptos han sido notificados automáticamente de la cancelación."))
+)
+
+PLANTILLAS.registrar(
+    "baja_rechazada",
+    "❌ Solicitud de Baja Rechazada: $nombre_evento",
+    _pagina("#e63946", "#ffffff", "Solicitud de Baja Rechazada", SALUDO_USUARIO
+            + _parrafo("Tu solicitud para cancelar el evento <strong>$nombre_evento</strong> ha sido revisada y <strong>rechazada</strong> por el administrador.")
+            + _recuadro("#e63946", "El evento continuará publicado y disponible para inscripciones.")
+            + _nota("Si considerás que esto es un error o tenés motivos urgentes para la baja, por favor contactate directamente con soporte técnico."))
+)
@@ -79,7 +79,8 @@ class UsuarioBasico(BaseModel):
 
 
 # --- Respuesta Principal ---
-class SolicitudPublicacionResponse(BaseModel):
+class SolicitudPublicacionResumen(BaseModel):
+    """Para los listados: sin ruta_coordenadas (columna deferred, no se carga)."""
     id_solicitud: int
     nombre_evento: str
     fecha_evento: date
@@ -97,7 +98,6 @@ class SolicitudPublicacionResponse(BaseModel):
     lat: Optional[Decimal] = None
     lng: Optional[Decimal] = None
     distancia_km: Optional[Decimal] = None
-    ruta_coordenadas: Optional[list] = None
 
     
     @field_serializer('fecha_evento')
@@ -110,6 +110,11 @@ class SolicitudPublicacionResponse(BaseModel):
         from_attributes = True
 
 
+class SolicitudPublicacionResponse(SolicitudPublicacionResumen):
+    """Detalle de una solicitud: incluye la ruta."""
+    ruta_coordenadas: Optional[list] = None
+
+
 # ============== Revisión admin ==============
 class RevisionSolicitud(BaseModel):
     id_estado_solicitud: int = Field(..., ge=1, le=4)
@@ -125,7 +130,7 @@ class RevisionSolicitud(BaseModel):
 
 class SolicitudesPaginadas(BaseModel):
     total: int
-    solicitudes: list[SolicitudPublicacionResponse]
+    solicitudes: list[SolicitudPublicacionResumen]
     pagina: int
     por_pagina: int
 
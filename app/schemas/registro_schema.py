@@ -21,10 +21,10 @@ class EventoBase(BaseModel):
     lng: Optional[Decimal] = None
     cupo_maximo: Optional[int] = Field(default=0, ge=0, description="Cupo máximo de participantes")
     distancia_km: Optional[Decimal] = Field(None, description="Distancia total de la ruta en kilómetros")
-    ruta_coordenadas: Optional[list[dict[str, Any]]] = Field(None, description="Array de coordenadas [ {lat, lng}, ... ]")
 
 class EventoCreate(EventoBase):
     """Schema para crear eventos con validaciones"""
+    ruta_coordenadas: Optional[list[dict[str, Any]]] = Field(None, description="Array de coordenadas [ {lat, lng}, ... ]")
     
     @field_validator('fecha_evento')
     @classmethod
@@ -58,7 +58,10 @@ class EventoBorradorCreate(BaseModel):
 
 
 class EventoResponse(EventoBase):
-    """Schema para respuestas con IDs"""
+    """
+    Schema para respuestas con IDs.
+    Sin ruta_coordenadas: la ruta se pide aparte (GET /eventos/{id}/ruta?zoom=).
+    """
     id_evento: int
     id_usuario: int
     id_estado: int
@@ -116,4 +119,29 @@ class ReservaResponseSchema(BaseModel):
     
     # --- (NUEVO) HU 4.1: Input para cancelar evento ---
 class EventoCancelacionRequest(BaseModel):
-    motivo: str = Field(..., min_length=5, description="Motivo por el cual se cancela el evento")
\ No newline at end of file
+    motivo: str = Field(..., min_length=5, description="Motivo por el cual se cancela el evento")
+
+# ============================================================================
+# SCHEMA DE RUTA (GET /eventos/{id}/ruta)
+# ============================================================================
+
+class MetricasRutaResponse(BaseModel):
+    """Calculadas en el servidor al guardar la ruta."""
+    distancia_km: Optional[float] = None
+    lat_min: Optional[float] = None
+    lat_max: Optional[float] = None
+    lng_min: Optional[float] = None
+    lng_max: Optional[float] = None
+    centroide_lat: Optional[float] = None
+    centroide_lng: Optional[float] = None
+    densidad_puntos_km: Optional[float] = Field(None, description="Puntos por km de la ruta completa")
+
+class RutaEventoResponse(BaseModel):
+    id_evento: int
+    zoom: Optional[int] = Field(None, description="Nivel de simplificación usado (None = ruta completa)")
+    puntos: int = Field(..., description="Puntos de esta versión")
+    puntos_originales: int
+    formato: str = Field(..., description="'polyline' (encoded polyline de Google, precisión 5) o 'coordenadas'")
+    polyline: Optional[str] = None
+    coordenadas: Optional[list[list[float]]] = Field(None, description="[[lat, lng], ...] si formato=coordenadas")
+    metricas: Optional[MetricasRutaResponse] = None
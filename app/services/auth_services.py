@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session
+import asyncio
+import os
+import time
+from sqlalchemy.orm import Session, make_transient_to_detached
 from fastapi import HTTPException, status
 from datetime import timedelta
 
@@ -6,25 +9,51 @@ from datetime import timedelta
 from app.models.auth_models import Usuario, Contacto
 
 from app.db.crud.auth_crud import UsuarioCRUD
-from app.core.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, decode_access_token
+from app.core import hashing
+from app.core.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, decode_access_token
 from app.schemas.auth_schema import UsuarioCreate, LoginRequest
 from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.core.cache import CacheLRU, versiones
+
+# ============================================================================
+# CACHÉ DE IDENTIDAD (token -> payload, email -> usuario + contacto)
+# ============================================================================
+# Cada request autenticado decodificaba el JWT y hacía 2 consultas (usuario y contacto).
+# - Tokens: hasta que vencen (nunca más que CACHE_IDENTIDAD_TTL).
+# - Usuarios: snapshot de columnas (dict serializable) con la versión de las tablas
+#   usuario/contacto leída ANTES de consultar; cualquier commit sobre ellas en este
+#   proceso lo deja viejo. Entre procesos (varios workers) el TTL acota la demora.
+TABLAS_IDENTIDAD = ("usuario", "contacto")
+TTL_IDENTIDAD = float(os.getenv("CACHE_IDENTIDAD_TTL", "60"))
+CAMPOS_CONTACTO = ("telefono", "direccion", "enlace_redes")
+
+_cache_tokens = CacheLRU(max_items=4096, ttl_segundos=TTL_IDENTIDAD)
+_cache_usuarios = CacheLRU(max_items=2048, ttl_segundos=TTL_IDENTIDAD)
+
 
 class AuthService:
+    # bcrypt (hash y verificación) corre en el pool de procesos de app/core/hashing.py:
+    # register y login son async y solo mandan a threads las consultas a la base,
+    # así una ráfaga de logins no ocupa el threadpool del resto de los endpoints.
     @staticmethod
-    def register_usuario(db: Session, usuario_data: UsuarioCreate):
-        existing_email = UsuarioCRUD.get_usuario_by_email(db, usuario_data.email)
+    async def register_usuario(db: Session, usuario_data: UsuarioCreate):
+        existing_email = await asyncio.to_thread(UsuarioCRUD.get_usuario_by_email, db, usuario_data.email)
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="El email ya está registrado"
             )
-        
+
+        contrasenia_hash = await hashing.hashear(usuario_data.contrasenia)
+        return await asyncio.to_thread(AuthService._crear_usuario, db, usuario_data, contrasenia_hash)
+
+    @staticmethod
+    def _crear_usuario(db: Session, usuario_data: UsuarioCreate, contrasenia_hash: str):
         new_usuario = UsuarioCRUD.create_usuario(
             db=db,
             nombre_y_apellido=usuario_data.nombre_y_apellido,
             email=usuario_data.email,
-            contrasenia=usuario_data.contrasenia
+            contrasenia_hash=contrasenia_hash
         )
         
         # regla de negocio: al crear usuario, crear notificación de bienvenida
@@ -38,15 +67,25 @@ class AuthService:
         return new_usuario
     
     @staticmethod
-    def authenticate_usuario(db: Session, login_data: LoginRequest):
-        usuario = UsuarioCRUD.get_usuario_by_email(db, login_data.email)
+    async def authenticate_usuario(db: Session, login_data: LoginRequest):
+        usuario = await asyncio.to_thread(UsuarioCRUD.get_usuario_by_email, db, login_data.email)
+
+        correcta, hash_nuevo = False, None
+        if usuario and usuario.contrasenia:
+            correcta, hash_nuevo = await hashing.verificar(login_data.contrasenia, usuario.contrasenia)
         
-        if not usuario or not verify_password(login_data.contrasenia, usuario.contrasenia):
+        if not correcta:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email o contraseña incorrectos",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+
+        # El hash se guardó con otro costo (cambió BCRYPT_ROUNDS): se reemplaza ahora
+        # que tenemos la contraseña en claro, sin pedirle nada al usuario
+        if hash_nuevo:
+            await asyncio.to_thread(UsuarioCRUD.actualizar_contrasenia, db, usuario.id_usuario, hash_nuevo)
+            AuthService.invalidar_identidad(usuario.email)
         
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -64,30 +103,90 @@ class AuthService:
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-        payload = decode_access_token(token)
-        if payload is None:
-            raise credentials_exception
-        
-        email: str = payload.get("sub")
+        email = AuthService._email_del_token(token)
         if email is None:
             raise credentials_exception
         
-        usuario = UsuarioCRUD.get_usuario_by_email(db, email)
-        if usuario is None:
+        usuario = AuthService._usuario_desde_cache(db, email)
+        if usuario is not None:
+            return usuario
+
+        version = versiones.get(*TABLAS_IDENTIDAD)  # ANTES de consultar
+        fila = db.query(Usuario, Contacto).outerjoin(
+            Contacto, Contacto.id_usuario == Usuario.id_usuario
+        ).filter(Usuario.email == email).first()
+        if fila is None:
             raise credentials_exception
         
-        # Cargar datos de contacto
-        contacto = db.query(Contacto).filter(Contacto.id_usuario == usuario.id_usuario).first()
+        # Cargar datos de contacto (vienen en la misma consulta)
+        usuario, contacto = fila
         if contacto:
             usuario.telefono = contacto.telefono
             usuario.direccion = contacto.direccion
             usuario.enlace_redes = contacto.enlace_redes
-        
+
+        _cache_usuarios.set(email, (version, AuthService._snapshot(usuario, contacto)))
+        return usuario
+
+    @staticmethod
+    def invalidar_identidad(*emails: str) -> None:
+        """Descarta el usuario cacheado (cambio de datos, contraseña o baja de cuenta)."""
+        for email in emails:
+            if email:
+                _cache_usuarios.invalidar(email)
+
+    # --- Helpers de la caché de identidad ---
+    @staticmethod
+    def _email_del_token(token: str):
+        payload = _cache_tokens.get(token)
+        if payload is None:
+            payload = decode_access_token(token)
+            # Los tokens con "uso" (p. ej. el del stream) no sirven como login
+            if payload is None or payload.get("sub") is None or payload.get("uso") is not None:
+                return None
+            # Nunca más allá del vencimiento del token
+            restante = payload.get("exp", 0) - time.time()
+            if restante > 0:
+                _cache_tokens.set(token, payload, ttl_segundos=min(restante, TTL_IDENTIDAD))
+        elif payload.get("exp", 0) <= time.time():
+            _cache_tokens.invalidar(token)
+            return None
+        return payload.get("sub")
+
+    @staticmethod
+    def _snapshot(usuario: Usuario, contacto) -> dict:
+        return {
+            "usuario": {col.key: getattr(usuario, col.key) for col in Usuario.__table__.columns},
+            "contacto": {campo: getattr(contacto, campo) for campo in CAMPOS_CONTACTO} if contacto else None,
+        }
+
+    @staticmethod
+    def _usuario_desde_cache(db: Session, email: str):
+        """
+        Rearma el Usuario desde el snapshot sin ir a la base.
+        make_transient_to_detached + merge(load=False) lo deja asociado a la sesión
+        del request como si se hubiera consultado (db.add/refresh y relaciones funcionan).
+        """
+        item = _cache_usuarios.get(email)
+        if item is None:
+            return None
+        version, snapshot = item
+        if version != versiones.get(*TABLAS_IDENTIDAD):
+            _cache_usuarios.invalidar(email)
+            return None
+
+        usuario = Usuario(**snapshot["usuario"])
+        make_transient_to_detached(usuario)
+        usuario = db.merge(usuario, load=False)
+        if snapshot["contacto"]:
+            for campo, valor in snapshot["contacto"].items():
+                setattr(usuario, campo, valor)
         return usuario
 
     @staticmethod
     def update_usuario(db: Session, current_user, usuario_update):
         update_data = usuario_update.dict(exclude_unset=True)
+        email_anterior = current_user.email
         campos_usuario = ["nombre_y_apellido", "email"]
         campos_contacto = ["telefono", "direccion", "enlace_redes"]
 
@@ -119,6 +218,7 @@ class AuthService:
 
         db.add(current_user)
         db.commit()
+        AuthService.invalidar_identidad(email_anterior, current_user.email)
         db.refresh(current_user)
 
         contacto_actualizado = db.query(Contacto).filter(Contacto.id_usuario == current_user.id_usuario).first()
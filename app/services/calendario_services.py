@@ -1,5 +1,18 @@
 from datetime import date
 import calendar
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheLRU, versiones
+from app.db.crud import calendario_crud
+
+# Tablas de las que depende el calendario: si cambian, la versión cambia y la clave vieja deja de usarse
+TABLAS_CALENDARIO = ("evento", "ocupacion_evento", "reserva_evento")
+
+# Un mes por clave; con 64 entradas sobran para todos los meses que se navegan.
+# El TTL acota lo desactualizado que puede quedar un worker cuando el cambio
+# se hizo en OTRO proceso (las versiones son por proceso).
+_cache_calendario = CacheLRU(max_items=64, ttl_segundos=60)
+
 
 class CalendarioService:
     
@@ -32,4 +45,70 @@ class CalendarioService:
 
         # CASO 3: Es un mes futuro
         # (Ej: Piden Febrero y hoy es Enero) -> Retornamos mes completo (1 al 28/29).
-        return fecha_inicio_nominal, fecha_fin
\ No newline at end of file
+        return fecha_inicio_nominal, fecha_fin
+
+    def obtener_calendario_mensual(self, db: Session, month: int, year: int) -> list:
+        """
+        Eventos del mes con sus cupos, en UNA consulta y cacheado por (año, mes).
+        La clave incluye el rango (el mes actual arranca "hoy") y la versión de
+        las tablas de eventos/reservas, que sube con cada publicación, edición,
+        cancelación o cambio de reserva.
+        """
+        fecha_inicio, fecha_fin = self.obtener_rango_fechas(month, year)
+        if not fecha_inicio:
+            return []
+
+        # La versión se lee ANTES de consultar (ver app/core/cache.py)
+        clave = (year, month, fecha_inicio, versiones.get(*TABLAS_CALENDARIO))
+        return _cache_calendario.obtener_o_calcular(
+            clave,
+            lambda: self._armar_calendario(db, fecha_inicio, fecha_fin)
+        )
+
+    def _armar_calendario(self, db: Session, fecha_inicio: date, fecha_fin: date) -> list:
+        resultados_db = calendario_crud.get_eventos_calendario(db, fecha_inicio, fecha_fin)
+
+        # Mapeo manual
+        lista_eventos = []
+        for row in resultados_db:
+            cupo_db = row[10] # Valor crudo de la base de datos (puede ser None, 0 o un número)
+            ocupados = row[13] or 0
+
+            if cupo_db and cupo_db > 0:
+                # CASO A: Tiene límite (ej: 50). Calculamos la resta.
+                cupo_maximo_actual = cupo_db
+                disponibles = cupo_db - ocupados
+            else:
+                # CASO B: Es 0 o None (Ilimitado).
+                # No restamos. Enviamos None para que el front sepa que es libre.
+                cupo_maximo_actual = 0
+                disponibles = None
+
+            lista_eventos.append({
+                # --- Datos Básicos ---
+                "id_evento": row[0],
+                "nombre_evento": row[1],
+                "fecha_evento": row[2],
+                "ubicacion": row[3],
+
+                # --- Tipo ---
+                "id_tipo": row[4] if row[4] is not None else 0,
+                "nombre_tipo": row[5] if row[5] is not None else "General",
+
+                # --- Dificultad ---
+                "id_dificultad": row[6] if row[6] is not None else 0,
+                "nombre_dificultad": row[7] if row[7] is not None else "General",
+
+                # --- Detalles Extra ---
+                "descripcion": row[8] if row[8] is not None else "",
+                "costo_participacion": row[9] if row[9] is not None else 0.0,
+
+                "cupo_maximo": cupo_maximo_actual,
+                "cupos_disponibles": disponibles, # None si es ilimitado
+
+                # --- Coordenadas ---
+                "lat": row[11],
+                "lng": row[12]
+            })
+
+        return lista_eventos
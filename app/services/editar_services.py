@@ -1,6 +1,5 @@
 import json
 from datetime import datetime
-from sqlalchemy import text
 from sqlalchemy.orm import Session, joinedload
 from fastapi import BackgroundTasks, HTTPException, status 
 
@@ -16,20 +15,23 @@ from app.models.inscripcion_models import ReservaEvento
 from app.schemas.editar_schema import EventoEditar
 
 # --- CRUDS ---
-from app.db.crud import solicitud_edicion_crud
+from app.db.crud import solicitud_edicion_crud, outbox_crud
 from app.db.crud.editar_crud import obtener_evento_por_id, guardar_cambios_auditoria
 from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.db.unidad_trabajo import unidad_de_trabajo
 
 # --- EMAILS ---
 from app.email import (
-    enviar_correo_modificacion_evento,
+    MARCADOR_EMAIL,
+    armar_correo_modificacion_evento,
     enviar_correo_rechazo_edicion, 
     enviar_correo_aprobacion_edicion
 )
 
 # --- WHATSAPP ---
 from app.whatsapp import (
-    enviar_whatsapp_modificacion_evento,
+    enviar_whatsapp_masivo,
+    texto_modificacion_evento,
     enviar_whatsapp_rechazo_edicion, 
     enviar_whatsapp_aprobacion_edicion
 )
@@ -38,6 +40,17 @@ from app.whatsapp import (
 ID_ESTADO_PUBLICADO = 3
 
 
+def _telefonos_de(db: Session, ids_usuario: list) -> list:
+    """Teléfonos (tabla contacto) de varios usuarios en una sola consulta."""
+    if not ids_usuario:
+        return []
+    filas = db.query(Contacto.telefono).filter(
+        Contacto.id_usuario.in_(set(ids_usuario)),
+        Contacto.telefono.isnot(None)
+    ).all()
+    return [str(f.telefono) for f in filas]
+
+
 class EditarEventoService:
     
     # ========================================================================
@@ -118,78 +131,69 @@ class EditarEventoService:
                 detail="No se detectaron cambios"
             )
         
-        # 1. Crear solicitud
-        solicitud = solicitud_edicion_crud.crear_solicitud_edicion(
-            db=db,
-            id_evento=evento.id_evento,
-            id_usuario=id_usuario,
-            cambios_propuestos=cambios
-        )
-        
-        # 2. Auto-aprobar la solicitud inmediatamente
-        solicitud_edicion_crud.aprobar_solicitud(
-            db=db,
-            solicitud=solicitud,
-            id_admin=id_usuario
-        )
+        # Solicitud + aprobación + cambios + historial + correo en la bandeja de salida:
+        # todo en una transacción con un solo commit (ver app/db/unidad_trabajo.py)
+        with unidad_de_trabajo(db):
+            # 1. Crear solicitud
+            solicitud = solicitud_edicion_crud.crear_solicitud_edicion(
+                db=db,
+                id_evento=evento.id_evento,
+                id_usuario=id_usuario,
+                cambios_propuestos=cambios
+            )
         
-        # 3. Aplicar cambios al evento
-        for campo, valores in cambios.items():
-            setattr(evento, campo, valores["valor_real"])  # valor_real sigue siendo el objeto Python original aquí, antes de serializar
+            # 2. Auto-aprobar la solicitud inmediatamente
+            solicitud_edicion_crud.aprobar_solicitud(
+                db=db,
+                solicitud=solicitud,
+                id_admin=id_usuario
+            )
         
-        # 4. Registrar en historial
-        historial = HistorialEdicionEvento(
-            id_evento=evento.id_evento,
-            id_usuario=id_usuario,
-            fecha_edicion=datetime.now()
-        )
-        db.add(historial)
-        db.flush()
+            # 3. Aplicar cambios al evento
+            for campo, valores in cambios.items():
+                setattr(evento, campo, valores["valor_real"])  # valor_real sigue siendo el objeto Python original aquí, antes de serializar
         
-        # 5. Registrar detalles de cada cambio
-        for campo, valores in cambios.items():
-            detalle = DetalleCambioEvento(
-                id_historial_edicion=historial.id_historial_edicion,
-                campo_modificado=campo,
-                valor_anterior=str(valor_actual) if (valor_actual := getattr(evento, campo, None)) is not None else "", # Mantenemos coherencia con anterior
-                valor_nuevo=str(valores["nuevo"])
+            # 4. Registrar en historial
+            historial = HistorialEdicionEvento(
+                id_evento=evento.id_evento,
+                id_usuario=id_usuario,
+                fecha_edicion=datetime.now()
             )
-            db.add(detalle)
+            db.add(historial)
+            db.flush()
         
-        db.commit()
-        db.refresh(evento)
-        
-        inscriptos = db.query(ReservaEvento).filter(
-            ReservaEvento.id_evento == evento.id_evento,
-            ReservaEvento.id_estado_reserva.in_([1, 2])
-        ).all()
+            # 5. Registrar detalles de cada cambio
+            for campo, valores in cambios.items():
+                detalle = DetalleCambioEvento(
+                    id_historial_edicion=historial.id_historial_edicion,
+                    campo_modificado=campo,
+                    valor_anterior=str(valor_actual) if (valor_actual := getattr(evento, campo, None)) is not None else "", # Mantenemos coherencia con anterior
+                    valor_nuevo=str(valores["nuevo"])
+                )
+                db.add(detalle)
 
-        for reser in inscriptos:
-            if reser.usuario and reser.usuario.email:
-                # 1. Mail
-                try:
-                    enviar_correo_modificacion_evento(
-                        email_destino=reser.usuario.email,
-                        nombre_evento=evento.nombre_evento,
-                        id_evento=evento.id_evento,
-                        fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
-                    )
-                except Exception as e:
-                    print(f"⚠️ Error Mail: {e}")
-    
-                # 2. WhatsApp (Consulta directa a la tabla contacto)
-                try:
-                    query_tel = text("SELECT telefono FROM contacto WHERE id_usuario = :id_u")
-                    res_tel = db.execute(query_tel, {"id_u": reser.id_usuario}).fetchone()
-                    tel_real = res_tel[0] if res_tel else None
-
-                    if tel_real:
-                        enviar_whatsapp_modificacion_evento(
-                            telefono=tel_real,
-                            nombre_evento=evento.nombre_evento
-                        )
-                except Exception as e:
-                    print(f"❌ Error WhatsApp: {e}")
+            db.flush()
+
+            inscriptos = db.query(ReservaEvento).filter(
+                ReservaEvento.id_evento == evento.id_evento,
+                ReservaEvento.id_estado_reserva.in_([1, 2])
+            ).all()
+
+            # 1. Mail: uno solo en la bandeja de salida para todos los inscriptos
+            correo = armar_correo_modificacion_evento(
+                email_destino=MARCADOR_EMAIL,
+                nombre_evento=evento.nombre_evento,
+                id_evento=evento.id_evento,
+                fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
+            )
+            outbox_crud.encolar_correo(db, correo, [r.usuario.email for r in inscriptos if r.usuario])
+
+        # 2. WhatsApp: los teléfonos de todos en una consulta y envío en paralelo (no bloquea la respuesta)
+        try:
+            telefonos = _telefonos_de(db, [r.id_usuario for r in inscriptos if r.usuario and r.usuario.email])
+            enviar_whatsapp_masivo(telefonos, texto_modificacion_evento(evento.nombre_evento))
+        except Exception as e:
+            print(f"❌ Error WhatsApp: {e}")
 
         # 3. Devolvemos la respuesta detallada (la que venía de Main)
         return {
@@ -293,8 +297,6 @@ class EditarEventoService:
         Admin aprueba solicitud de edición.
         Aplica cambios, notifica a inscriptos y al organizador.
         """
-        from sqlalchemy import text
-        
         solicitud = solicitud_edicion_crud.obtener_solicitud_pendiente(db=db, id_evento=id_evento)
         
         if not solicitud:
@@ -340,35 +342,37 @@ class EditarEventoService:
             ReservaEvento.id_evento == evento.id_evento,
             ReservaEvento.id_estado_reserva.in_([1, 2]) 
         ).all()
-        
-        for reser in inscriptos:
-            if reser.usuario:
-                # --- ✅ NOTIFICACIÓN NAVBAR ---
-                NotificacionCRUD.create_notificacion(
-                    db=db,
-                    id_usuario=reser.usuario.id_usuario,
-                    id_estado_solicitud=None,
-                    mensaje=f"📝 El evento '{evento.nombre_evento}' en el que estás inscripto ha sido actualizado."
-                )
 
-                # --- ✅ MAIL INSCRIPTO ---
-                if reser.usuario.email:
-                    background_tasks.add_task(
-                        enviar_correo_modificacion_evento,
-                        email_destino=reser.usuario.email,
-                        nombre_evento=evento.nombre_evento,
-                        id_evento=evento.id_evento,
-                        fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
-                    )
+        # --- ✅ MAIL INSCRIPTOS (uno solo en la bandeja de salida) ---
+        correo = armar_correo_modificacion_evento(
+            email_destino=MARCADOR_EMAIL,
+            nombre_evento=evento.nombre_evento,
+            id_evento=evento.id_evento,
+            fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
+        )
+        outbox_crud.encolar_correo(db, correo, [r.usuario.email for r in inscriptos if r.usuario])
 
-                # --- ✅ WHATSAPP INSCRIPTO ---
-                # Usamos la relación que definimos en el modelo
-                if reser.usuario.contacto and reser.usuario.contacto.telefono:
-                    background_tasks.add_task(
-                        enviar_whatsapp_modificacion_evento,
-                        telefono=str(reser.usuario.contacto.telefono),
-                        nombre_evento=evento.nombre_evento
-                    )
+        # --- ✅ NOTIFICACIÓN NAVBAR (un solo INSERT; se confirma junto con el correo) ---
+        NotificacionCRUD.create_notificaciones_masivas(
+            db,
+            [r.usuario.id_usuario for r in inscriptos if r.usuario],
+            f"📝 El evento '{evento.nombre_evento}' en el que estás inscripto ha sido actualizado."
+        )
+        if inscriptos:
+            db.commit()
+
+        # --- ✅ WHATSAPP INSCRIPTOS ---
+        # Usamos la relación que definimos en el modelo; una sola tarea reparte los envíos en el pool
+        telefonos = [
+            str(r.usuario.contacto.telefono) for r in inscriptos
+            if r.usuario and r.usuario.contacto and r.usuario.contacto.telefono
+        ]
+        if telefonos:
+            background_tasks.add_task(
+                enviar_whatsapp_masivo,
+                telefonos,
+                texto_modificacion_evento(evento.nombre_evento)
+            )
 
         # 2. ✅ NUEVO: NOTIFICAR AL ORGANIZADOR (Dueño de la solicitud)
         if organizador:
@@ -392,9 +396,7 @@ class EditarEventoService:
             
             # WhatsApp Organizador
             try:
-                query_tel = text("SELECT telefono FROM contacto WHERE id_usuario = :id_u")
-                res_tel = db.execute(query_tel, {"id_u": organizador.id_usuario}).fetchone()
-                tel_org = res_tel[0] if res_tel else None
+                tel_org = next(iter(_telefonos_de(db, [organizador.id_usuario])), None)
                 
                 if tel_org:
                     background_tasks.add_task(
@@ -420,8 +422,6 @@ class EditarEventoService:
         Admin rechaza solicitud. Evento permanece sin cambios.
         Notifica al organizador por Email y WhatsApp.
         """
-        from sqlalchemy import text # Para la query del teléfono
-
         solicitud = solicitud_edicion_crud.obtener_solicitud_pendiente(
             db=db, 
             id_evento=id_evento
@@ -478,10 +478,8 @@ class EditarEventoService:
 
             # --- B. Notificación por WhatsApp ---
             try:
-                # Buscamos el tel en la tabla 'contacto' como en tu ejemplo
-                query_tel = text("SELECT telefono FROM contacto WHERE id_usuario = :id_u")
-                res_tel = db.execute(query_tel, {"id_u": usuario_organizador.id_usuario}).fetchone()
-                tel_real = res_tel[0] if res_tel else None
+                # Buscamos el tel en la tabla 'contacto'
+                tel_real = next(iter(_telefonos_de(db, [usuario_organizador.id_usuario])), None)
 
                 if tel_real:
                     background_tasks.add_task(
@@ -749,43 +747,31 @@ class EditarEventoService:
         # 👇 Notificar a inscriptos (Pendientes 1 y Confirmados 2)
         try:
             from app.models.registro_models import ReservaEvento
-            from sqlalchemy import text # Importante para la query manual
             
             inscriptos = db.query(ReservaEvento).filter(
                 ReservaEvento.id_evento == evento.id_evento,
                 ReservaEvento.id_estado_reserva.in_([1, 2])
             ).all()
 
-            for reser in inscriptos:
-                # 1. Bloque de Mail (Este ya te andaba bien)
-                if reser.usuario and reser.usuario.email:
-                    try:
-                        enviar_correo_modificacion_evento(
-                            email_destino=reser.usuario.email,
-                            nombre_evento=evento.nombre_evento,
-                            id_evento=evento.id_evento,
-                            fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
-                        )
-                    except Exception as e:
-                        print(f"⚠️ Error mail: {e}")
+            # 1. Mail: uno solo en la bandeja de salida para todos los inscriptos
+            correo = armar_correo_modificacion_evento(
+                email_destino=MARCADOR_EMAIL,
+                nombre_evento=evento.nombre_evento,
+                id_evento=evento.id_evento,
+                fecha_url=evento.fecha_evento.strftime('%Y-%m-%d')
+            )
+            if outbox_crud.encolar_correo(db, correo, [r.usuario.email for r in inscriptos if r.usuario]):
+                db.commit()
 
-                # 2. ✅ WhatsApp corregido para tu BD (buscando en tabla 'contacto')
-                try:
-                    # Buscamos el tel en la tabla donde sí está
-                    query_tel = text("SELECT telefono FROM contacto WHERE id_usuario = :id_u")
-                    res_tel = db.execute(query_tel, {"id_u": reser.id_usuario}).fetchone()
-                    tel_real = res_tel[0] if res_tel else None
-
-                    if tel_real:
-                        print(f"📱 Intentando WhatsApp para: {tel_real}")
-                        enviar_whatsapp_modificacion_evento(
-                            telefono=tel_real,
-                            nombre_evento=evento.nombre_evento
-                        )
-                    else:
-                        print(f"🚫 El usuario {reser.id_usuario} no tiene teléfono en la tabla contacto.")
-                except Exception as e:
-                    print(f"❌ Error al buscar o enviar WhatsApp: {e}")
+            # 2. ✅ WhatsApp: teléfonos de la tabla 'contacto' en una sola consulta, envío en paralelo
+            try:
+                ids_inscriptos = [r.id_usuario for r in inscriptos]
+                telefonos = _telefonos_de(db, ids_inscriptos)
+                if len(telefonos) < len(set(ids_inscriptos)):
+                    print(f"🚫 {len(set(ids_inscriptos)) - len(telefonos)} inscriptos sin teléfono en la tabla contacto.")
+                enviar_whatsapp_masivo(telefonos, texto_modificacion_evento(evento.nombre_evento))
+            except Exception as e:
+                print(f"❌ Error al buscar o enviar WhatsApp: {e}")
 
             print(f"✅ Proceso de notificaciones finalizado.")
 
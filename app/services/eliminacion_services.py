@@ -2,14 +2,15 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from datetime import date
 
-from app.db.crud import eliminacion_crud
+from app.db.crud import eliminacion_crud, ocupacion_crud, outbox_crud
 from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.db.unidad_trabajo import unidad_de_trabajo
 from app.models.auth_models import Usuario
 from app.models.registro_models import Evento, ReservaEvento
 from app.models.eliminacion_models import EliminacionEvento  
 from sqlalchemy.orm import Session, joinedload  
-from app.email import enviar_correo_cancelacion_evento
-from app.whatsapp import enviar_whatsapp_cancelacion_evento
+from app.email import MARCADOR_EMAIL, armar_correo_cancelacion_evento
+from app.whatsapp import enviar_whatsapp_masivo, texto_cancelacion_evento
 from fastapi import BackgroundTasks
 from app.email import enviar_correo_baja_aprobada, enviar_correo_baja_rechazada
 from app.whatsapp import enviar_whatsapp_baja_aprobada, enviar_whatsapp_baja_rechazada
@@ -217,29 +218,29 @@ class EliminacionService:
         # Buscamos al dueño (organizador) para avisarle
         organizador = db.query(Usuario).filter(Usuario.id_usuario == evento.id_usuario).first()
 
-        # Notificar a los corredores (tu función existente)
-        EliminacionService._notificar_inscritos(
-            db=db, evento=evento,
-            motivo="Solicitud de baja aprobada por el administrador",
-            id_eliminacion=eliminacion.id_eliminacion,
-            background_tasks=background_tasks
-        )
-
-        eliminacion.motivo_eliminacion += " | [✅ APROBADO POR ADMIN]"
-        eliminacion.estado_solicitud = 'aprobada'
-        eliminacion_crud.cancelar_evento(db, id_evento)
-        
-        # --- NOTIFICACIÓN INTERNA (NAVBAR) ---
-        if organizador:
-            NotificacionCRUD.create_notificacion(
-                db=db,
-                id_usuario=organizador.id_usuario,
-                id_estado_solicitud=None,
-                mensaje=f"✅ Tu solicitud de baja para el evento '{evento.nombre_evento}' ha sido aprobada."
+        # Reservas canceladas + notificaciones de todos los inscriptos + correo en la
+        # bandeja de salida + evento cancelado: una sola transacción con un solo commit
+        with unidad_de_trabajo(db):
+            # Notificar a los corredores (tu función existente)
+            EliminacionService._notificar_inscritos(
+                db=db, evento=evento,
+                motivo="Solicitud de baja aprobada por el administrador",
+                id_eliminacion=eliminacion.id_eliminacion,
+                background_tasks=background_tasks
             )
-        
-        
-        db.commit()
+
+            eliminacion.motivo_eliminacion += " | [✅ APROBADO POR ADMIN]"
+            eliminacion.estado_solicitud = 'aprobada'
+            eliminacion_crud.cancelar_evento(db, id_evento)
+            
+            # --- NOTIFICACIÓN INTERNA (NAVBAR) ---
+            if organizador:
+                NotificacionCRUD.create_notificacion(
+                    db=db,
+                    id_usuario=organizador.id_usuario,
+                    id_estado_solicitud=None,
+                    mensaje=f"✅ Tu solicitud de baja para el evento '{evento.nombre_evento}' ha sido aprobada."
+                )
 
         # ✅ NUEVO: Notificar al ORGANIZADOR que su baja fue aceptada
         if organizador and organizador.id_usuario != id_admin:
@@ -411,6 +412,7 @@ class EliminacionService:
         print(f"[NOTIFICACIONES] Procesando {len(reservas)} participantes...")
         print(f"{'='*70}")
         
+        telefonos = []
         for reserva in reservas:
             participante = reserva.usuario 
             if not participante:
@@ -419,42 +421,40 @@ class EliminacionService:
             # A. CAMBIAR ESTADO A CANCELADA (3)
             reserva.id_estado_reserva = 3
             
-            # B. NOTIFICACIÓN INTERNA (NAVBAR)
-            try:
-                NotificacionCRUD.create_notificacion(
-                    db=db,
-                    id_usuario=participante.id_usuario,
-                    id_estado_solicitud=None,
-                    mensaje=f"📢 IMPORTANTE: El evento '{evento.nombre_evento}' ha sido cancelado. Motivo: {motivo}."
-                )
-            except Exception as e:
-                print(f"  ⚠️ Error notificación interna usuario {participante.id_usuario}: {e}")
-
-            # C. ENVÍO DE EMAIL (Vía Background Task)
-            if participante.email:
-                background_tasks.add_task(
-                    enviar_correo_cancelacion_evento,
-                    email_destino=participante.email,
-                    nombre_evento=evento.nombre_evento,
-                    motivo=motivo
-                )
-                print(f"  ✉️  Email encolado para: {participante.email}")
-
-            # D. ENVÍO DE WHATSAPP (Vía Background Task usando la relación)
+            # D. TELÉFONO PARA WHATSAPP (usando la relación; se envían todos juntos abajo)
             if participante.contacto and participante.contacto.telefono:
-                tel_real = participante.contacto.telefono
-                background_tasks.add_task(
-                    enviar_whatsapp_cancelacion_evento,
-                    telefono=str(tel_real),
-                    nombre_evento=evento.nombre_evento,
-                    motivo=motivo
-                )
-                print(f"  📱 WhatsApp encolado para: {tel_real}")
+                telefonos.append(str(participante.contacto.telefono))
             else:
                 print(f"  ⚠️ Usuario {participante.id_usuario} sin teléfono en tabla contacto.")
 
+        # B. NOTIFICACIÓN INTERNA (NAVBAR): un solo INSERT multi-fila para todos
+        NotificacionCRUD.create_notificaciones_masivas(
+            db,
+            [r.usuario.id_usuario for r in reservas if r.usuario],
+            f"📢 IMPORTANTE: El evento '{evento.nombre_evento}' ha sido cancelado. Motivo: {motivo}."
+        )
+
+        # C. EMAIL: uno solo en la bandeja de salida para todos (se confirma con el commit de abajo)
+        correo = armar_correo_cancelacion_evento(
+            email_destino=MARCADOR_EMAIL,
+            nombre_evento=evento.nombre_evento,
+            motivo=motivo
+        )
+        if outbox_crud.encolar_correo(db, correo, [r.usuario.email for r in reservas if r.usuario]):
+            print(f"  ✉️  Email encolado para {len(reservas)} participantes")
+
+        # D. WHATSAPP: una sola background task que reparte los envíos en el pool del despachador
+        if telefonos:
+            background_tasks.add_task(
+                enviar_whatsapp_masivo,
+                telefonos,
+                texto_cancelacion_evento(evento.nombre_evento, motivo)
+            )
+            print(f"  📱 WhatsApp encolado para {len(telefonos)} participantes")
+
         # Guardamos cambios de estado y marcamos como notificado
         db.flush() 
+        ocupacion_crud.recalcular_ocupacion(db, evento.id_evento)
         try:
             eliminacion_crud.marcar_notificacion_enviada(db, id_eliminacion)
             print(f"[✅ OK] Proceso de notificación completado.")
@@ -12,6 +12,7 @@ from sqlalchemy import text # Para la consulta del teléfono
 from app.email import enviar_correo_aprobacion_publicacion
 from app.whatsapp import enviar_whatsapp_aprobacion_publicacion
 from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.db.unidad_trabajo import unidad_de_trabajo
 
 
 class EventoSolicitudService:
@@ -254,24 +255,21 @@ class EventoSolicitudService:
         )
 
         try:
-            db.add(nuevo_evento)
-            db.add(solicitud)
-            db.commit()
-            db.refresh(nuevo_evento)
-            db.refresh(solicitud)
-            
-            
+            # Evento + solicitud + notificación al organizador: un solo commit
+            with unidad_de_trabajo(db):
+                db.add(nuevo_evento)
+                db.add(solicitud)
+
+                # ✅ NOTIFICAR AL ORGANIZADOR
+                if organizador:
+                    NotificacionCRUD.create_notificacion(
+                        db=db,
+                        id_usuario=organizador.id_usuario,
+                        id_estado_solicitud=None,
+                        mensaje=f"🚀 ¡Tu evento '{solicitud.nombre_evento}' ha sido aprobado y ya está publicado!"
+                    )
 
-            # ✅ NOTIFICAR AL ORGANIZADOR
             if organizador:
-                
-                NotificacionCRUD.create_notificacion(
-                    db=db,
-                    id_usuario=organizador.id_usuario,
-                    id_estado_solicitud=None,
-                    mensaje=f"🚀 ¡Tu evento '{solicitud.nombre_evento}' ha sido aprobado y ya está publicado!"
-                )
-                
                 # 1. Enviar Email
                 if organizador.email:
                     background_tasks.add_task(
@@ -8,6 +8,7 @@ from app.models.inscripcion_models import ReservaEvento as Inscripcion
 from app.email import enviar_correo_reserva, enviar_correo_cancelacion_reserva, enviar_correo_pago_confirmado
 from app.whatsapp import enviar_whatsapp_reserva, enviar_whatsapp_cancelacion_evento, enviar_whatsapp_pago_confirmado
 from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.db.unidad_trabajo import unidad_de_trabajo
 from sqlalchemy import desc
 
 class InscripcionService:
@@ -141,20 +142,22 @@ class InscripcionService:
             id_estado_inicial = 1
             mensaje = "Reserva exitosa. Tienes 72hs para realizar el pago de tu evento."
 
-        nueva = inscripcion_crud.create_reserva(
-            db=db,
-            id_evento=id_evento,
-            id_usuario=usuario_actual.id_usuario,
-            id_estado=id_estado_inicial
-        )
-        
-        # ✅ NUEVO: Notificación interna Navbar
-        NotificacionCRUD.create_notificacion(
-            db=db,
-            id_usuario=usuario_actual.id_usuario,
-            id_estado_solicitud=None,
-            mensaje=f"🚲 {mensaje} para el evento '{evento.nombre_evento}'."
-        )
+        # Reserva + contadores + notificaciones en un solo commit
+        with unidad_de_trabajo(db):
+            nueva = inscripcion_crud.create_reserva(
+                db=db,
+                id_evento=id_evento,
+                id_usuario=usuario_actual.id_usuario,
+                id_estado=id_estado_inicial
+            )
+            
+            # ✅ NUEVO: Notificación interna Navbar
+            NotificacionCRUD.create_notificacion(
+                db=db,
+                id_usuario=usuario_actual.id_usuario,
+                id_estado_solicitud=None,
+                mensaje=f"🚲 {mensaje} para el evento '{evento.nombre_evento}'."
+            )
 
         # MANDAMOS EL MAIL EN SEGUNDO PLANO
         background_tasks.add_task(
@@ -273,7 +276,7 @@ class InscripcionService:
             return reserva
         
         # 2. Cambiamos el estado a Confirmado (ID 2)
-        reserva.id_estado_reserva = 2 
+        inscripcion_crud.cambiar_estado_reserva(db, reserva, 2)
         
         # ✅ Notificación interna Navbar
         nombre_evento = reserva.evento.nombre_evento if reserva.evento else "el evento"
@@ -337,7 +340,7 @@ class InscripcionService:
 
         # 3. 🔥 CAMBIO CLAVE: NO BORRAMOS, ACTUALIZAMOS EL ESTADO
         # Según tus ifs de arriba, el ID 3 es "Cancelada"
-        inscripcion.id_estado_reserva = 3 
+        inscripcion_crud.cambiar_estado_reserva(db, inscripcion, 3)
         
         # ✅ NUEVO: Notificación interna Navbar
         NotificacionCRUD.create_notificacion(
@@ -0,0 +1,107 @@
+# app/services/mapa_services.py
+"""
+Mapa de eventos por teselas: GET /eventos/mapa?bbox=&zoom=
+
+En lugar de mandar las coordenadas de todos los eventos para agruparlos en el
+cliente, el servidor devuelve para el bbox visible los clusters de ese zoom
+(unas decenas) y los eventos sueltos.
+
+- El índice de clusters (app/core/clustering.py) y cada tesela (zoom, x, y) se
+  cachean bajo una "vigencia": la versión de la tabla evento, el día y un
+  tramo de TTL_SEGUNDOS. Publicar, cancelar, finalizar o mover un evento sube
+  la versión (app/db/versionado.py) y el próximo pedido rearma todo sin tener
+  que buscar las teselas.
+- Las versiones son por proceso: un cambio hecho en OTRO worker no las sube
+  acá. El tramo de tiempo acota ese atraso a TTL_SEGUNDOS, y el día saca del
+  índice los eventos que ya pasaron (get_puntos_mapa filtra por fecha).
+"""
+import threading
+import time
+from datetime import date
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.cache import CacheLRU, versiones
+from app.core.clustering import IndiceClusters, teselas_para_bbox
+from app.db.crud import registro_crud
+
+TABLAS_MAPA = ("evento",)
+MAX_TESELAS = 100       # una pantalla grande a cualquier zoom son ~40-60 teselas
+TTL_SEGUNDOS = 60       # máximo atraso de un worker ante cambios hechos en otro proceso
+
+_cache_teselas = CacheLRU(max_items=2048, ttl_segundos=TTL_SEGUNDOS)
+
+_lock_indice = threading.Lock()
+_indice: Tuple[Optional[tuple], Optional[IndiceClusters]] = (None, None)
+
+
+def _vigencia() -> tuple:
+    """Clave de validez del índice y de las teselas: versión de evento, día y tramo de TTL."""
+    # La versión se lee ANTES de consultar (ver app/core/cache.py)
+    return versiones.get(*TABLAS_MAPA), date.today(), int(time.time() // TTL_SEGUNDOS)
+
+
+def _indice_clusters(db: Session, vigencia: tuple) -> IndiceClusters:
+    global _indice
+    with _lock_indice:
+        vigencia_actual, indice = _indice
+        if indice is not None and vigencia_actual == vigencia:
+            return indice
+
+        puntos = [
+            (float(fila.lat), float(fila.lng), {
+                "id_evento": fila.id_evento,
+                "nombre_evento": fila.nombre_evento,
+                "fecha_evento": fila.fecha_evento.isoformat() if fila.fecha_evento else None,
+                "id_tipo": fila.id_tipo,
+            })
+            for fila in registro_crud.get_puntos_mapa(db)
+        ]
+        indice = IndiceClusters(puntos)
+        _indice = (vigencia, indice)
+        print(f"🗺️ [MAPA] Índice de clusters armado con {len(indice)} eventos")
+        return indice
+
+
+def parsear_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """'oeste,sur,este,norte' (lo que da map.getBounds().toBBoxString() en Leaflet)."""
+    try:
+        oeste, sur, este, norte = (float(valor) for valor in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox debe ser 'oeste,sur,este,norte'")
+    if not (-90 <= sur <= norte <= 90):
+        raise HTTPException(status_code=400, detail="bbox: latitudes fuera de rango o invertidas")
+    if este - oeste >= 360:
+        return -180.0, sur, 180.0, norte
+    # Leaflet devuelve longitudes fuera de [-180, 180] al dar la vuelta al mundo
+    oeste = (oeste + 180.0) % 360.0 - 180.0
+    este = (este + 180.0) % 360.0 - 180.0
+    return oeste, sur, este, norte
+
+
+def obtener_mapa(db: Session, bbox: str, zoom: int) -> dict:
+    oeste, sur, este, norte = parsear_bbox(bbox)
+    teselas = teselas_para_bbox(oeste, sur, este, norte, zoom)
+    if len(teselas) > MAX_TESELAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El bbox abarca {len(teselas)} teselas en zoom {zoom} (máximo {MAX_TESELAS}): pedir un zoom menor"
+        )
+
+    vigencia = _vigencia()
+    elementos = []
+    for x, y in teselas:
+        elementos.extend(_cache_teselas.obtener_o_calcular(
+            (zoom, x, y, vigencia),
+            lambda: _indice_clusters(db, vigencia).tesela(zoom, x, y)
+        ))
+
+    return {
+        "zoom": zoom,
+        "teselas": len(teselas),
+        "clusters": sum(1 for e in elementos if e["tipo"] == "cluster"),
+        "eventos": sum(1 for e in elementos if e["tipo"] == "evento"),
+        "elementos": elementos,
+    }
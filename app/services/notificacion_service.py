@@ -1,5 +1,6 @@
+import hashlib
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.db.crud.notificacion_crud import NotificacionCRUD
 from app.schemas.notificacion_schema import NotificacionResponse
 
@@ -9,6 +10,32 @@ class NotificacionService:
         notificaciones = NotificacionCRUD.get_notificaciones_by_usuario(db, id_usuario)
         return [NotificacionResponse.model_validate(n) for n in notificaciones]
 
+    @staticmethod
+    def listar_pagina(db: Session, id_usuario: int, limite: int,
+                      cursor: Optional[str] = None) -> Tuple[List[NotificacionResponse], Optional[str]]:
+        """Una página del feed (más nuevas primero) y el cursor de la siguiente (None si no hay más)."""
+        filas, siguiente = NotificacionCRUD.get_pagina_notificaciones(db, id_usuario, limite, cursor)
+        return [NotificacionResponse.model_validate(n) for n in filas], siguiente
+
+    @staticmethod
+    def contar_no_leidas(db: Session, id_usuario: int) -> int:
+        return NotificacionCRUD.contar_no_leidas(db, id_usuario)
+
+    @staticmethod
+    def marcar_todas_leidas(db: Session, id_usuario: int) -> int:
+        return NotificacionCRUD.marcar_todas_leidas(db, id_usuario)
+
+    @staticmethod
+    def etag(db: Session, id_usuario: int, *variante) -> str:
+        """
+        ETag débil del feed del usuario: sale de (total, no leídas, id máximo), así
+        un navbar sin novedades recibe 304 sin que se lea ninguna notificación.
+        'variante' distingue respuestas distintas del mismo estado (página, límite).
+        """
+        firma = NotificacionCRUD.get_firma_notificaciones(db, id_usuario)
+        clave = "|".join(str(parte) for parte in (id_usuario, *firma, *variante))
+        return f'W/"{hashlib.sha1(clave.encode()).hexdigest()[:20]}"'
+
     @staticmethod
     def marcar_notificacion_leida(db: Session, id_notificacion: int) -> Optional[NotificacionResponse]:
         notificacion = NotificacionCRUD.update_notificacion_leida(db, id_notificacion, leida=True)
@@ -0,0 +1,119 @@
+# app/services/outbox_services.py
+"""
+Worker de la bandeja de salida de correos (outbox).
+
+Un thread por proceso que toma los correos pendientes de correo_saliente y los
+manda con app.email.enviar_lote (hasta 1000 destinatarios por llamada, un solo
+cliente SendGrid). Se despierta apenas se confirma una transacción que encoló
+correos y, por las dudas, revisa la tabla cada OUTBOX_INTERVALO_SEGUNDOS.
+
+Se inicia/detiene desde app/main.py. OUTBOX_WORKER=0 lo desactiva (por ejemplo
+si se corre un proceso dedicado).
+"""
+import os
+import threading
+
+from sqlalchemy import event
+
+from app.db.crud import outbox_crud
+from app.db.database import SessionLocal
+from app.email import MAX_DESTINATARIOS_POR_LLAMADA, enviar_lote
+
+INTERVALO_SEGUNDOS = float(os.getenv("OUTBOX_INTERVALO_SEGUNDOS", "5"))
+CORREOS_POR_VUELTA = 20
+SEGUNDOS_LEASE = 300
+
+
+class OutboxWorker:
+
+    def __init__(self, session_factory=SessionLocal, enviar=enviar_lote):
+        self._session_factory = session_factory
+        self._enviar = enviar
+        self._despertar = threading.Event()
+        self._detener = threading.Event()
+        self._thread = None
+
+    # ── CICLO DE VIDA ───────────────────────────────────────────────────────
+
+    def iniciar(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._detener.clear()
+        self._thread = threading.Thread(target=self._loop, name="outbox-correos", daemon=True)
+        self._thread.start()
+        print("📬 Worker de correos iniciado")
+
+    def detener(self, timeout: float = 10) -> None:
+        self._detener.set()
+        self._despertar.set()
+        if self._thread:
+            self._thread.join(timeout)
+        print("📪 Worker de correos detenido")
+
+    def despertar(self) -> None:
+        self._despertar.set()
+
+    def _loop(self) -> None:
+        while not self._detener.is_set():
+            try:
+                procesados = self.procesar_pendientes()
+            except Exception as e:
+                print(f"❌ Error en el worker de correos: {e}")
+                procesados = 0
+
+            # Si la vuelta vino llena puede haber más: seguimos sin esperar
+            if procesados < CORREOS_POR_VUELTA:
+                self._despertar.wait(INTERVALO_SEGUNDOS)
+                self._despertar.clear()
+
+    # ── PROCESAMIENTO ───────────────────────────────────────────────────────
+
+    def procesar_pendientes(self) -> int:
+        """Una vuelta: reclama correos y los envía de a lotes. Devuelve cuántos tomó."""
+        db = self._session_factory()
+        try:
+            correos = outbox_crud.reclamar_pendientes(db, CORREOS_POR_VUELTA, SEGUNDOS_LEASE)
+            for correo in correos:
+                self._enviar_correo(db, correo)
+            return len(correos)
+        finally:
+            db.close()
+
+    def _enviar_correo(self, db, correo) -> None:
+        destinatarios = correo.destinatarios or []
+        while correo.enviados < len(destinatarios) and not self._detener.is_set():
+            lote = destinatarios[correo.enviados:correo.enviados + MAX_DESTINATARIOS_POR_LLAMADA]
+            try:
+                self._enviar(correo.asunto, correo.html, lote)
+            except Exception as e:
+                print(f"⚠️ Falló el envío del correo {correo.id_correo}: {e}")
+                outbox_crud.registrar_error(db, correo, e)
+                return
+            outbox_crud.registrar_lote_enviado(db, correo, len(lote), SEGUNDOS_LEASE)
+
+
+# Instancia única del proceso
+worker_correos = OutboxWorker()
+
+
+def _al_confirmar(session) -> None:
+    if session.info.pop(outbox_crud.CLAVE_HAY_CORREOS, False):
+        worker_correos.despertar()
+
+
+def _al_revertir(session) -> None:
+    session.info.pop(outbox_crud.CLAVE_HAY_CORREOS, None)
+
+
+def iniciar_worker() -> None:
+    if os.getenv("OUTBOX_WORKER", "1") == "0":
+        print("📭 Worker de correos desactivado (OUTBOX_WORKER=0)")
+        return
+    if not event.contains(SessionLocal, "after_commit", _al_confirmar):
+        event.listen(SessionLocal, "after_commit", _al_confirmar)
+        event.listen(SessionLocal, "after_rollback", _al_revertir)
+    worker_correos.iniciar()
+
+
+def detener_worker() -> None:
+    worker_correos.detener()
@@ -3,7 +3,8 @@ from fastapi import HTTPException, status
 from app.db.crud import perfil_crud
 from app.models.auth_models import Usuario
 from app.schemas.perfil_schema import PerfilUpdate, CambioPassword, PerfilResponse
-from app.core.security import verify_password, get_password_hash
+from app.core import hashing
+from app.services.auth_services import AuthService
 
 class PerfilService:
 
@@ -27,7 +28,9 @@ class PerfilService:
                     detail="El email ya está registrado por otro usuario."
                 )
 
+        email_anterior = db.query(Usuario.email).filter(Usuario.id_usuario == id_usuario).scalar()
         usuario_actualizado, contacto_actualizado = perfil_crud.update_profile(db, id_usuario, datos)
+        AuthService.invalidar_identidad(email_anterior, usuario_actualizado.email)
         return self._formatear_respuesta(usuario_actualizado, contacto_actualizado)
 
     def cambiar_password(self, db: Session, id_usuario: int, datos: CambioPassword):
@@ -36,22 +39,26 @@ class PerfilService:
         if not usuario:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-        if not verify_password(datos.password_actual, usuario.contrasenia):
+        correcta, _ = hashing.verificar_sync(datos.password_actual, usuario.contrasenia)
+        if not correcta:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail="La contraseña actual es incorrecta."
             )
         
-        usuario.contrasenia = get_password_hash(datos.password_nueva)
+        usuario.contrasenia = hashing.hashear_sync(datos.password_nueva)
         db.add(usuario)
         db.commit()
+        AuthService.invalidar_identidad(usuario.email)
         
         return {"message": "Contraseña actualizada correctamente"}
 
     def eliminar_cuenta(self, db: Session, id_usuario: int):
+        email = db.query(Usuario.email).filter(Usuario.id_usuario == id_usuario).scalar()
         exito = perfil_crud.delete_user_account(db, id_usuario)
         if not exito:
             raise HTTPException(status_code=400, detail="No se pudo eliminar la cuenta")
+        AuthService.invalidar_identidad(email)
         return {"message": "Cuenta eliminada exitosamente"}
 
     # ------------------------------------------------------------------
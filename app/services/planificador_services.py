@@ -0,0 +1,340 @@
+# app/services/planificador_services.py
+"""
+Planificador de tareas dentro del backend (reemplaza a cron-job.org).
+
+Antes la revisión por baja ocupación dependía de que un servicio externo
+llamara a /eventos/cron/revisar-eventos: si el request tardaba más que el
+límite HTTP de Render se cortaba a mitad de camino, y si el servicio externo
+fallaba nadie se enteraba. Ahora las tareas corren en el propio proceso:
+
+- Un loop de asyncio revisa cada SEGUNDOS_TICK qué tarea toca y la corre en un
+  thread (las tareas usan la sesión sync de SQLAlchemy) sin bloquear el servidor.
+- Líder único: con varios workers de uvicorn (o réplicas) solo planifica el que
+  tiene el advisory lock de Postgres (pg_try_advisory_lock sobre una conexión
+  dedicada). Si ese proceso muere, la conexión se cierra, el lock se libera y
+  otro proceso toma el lugar en el próximo reintento.
+- Cada tarea además toma su lease en tarea_lease: una corrida manual (admin o
+  cron HTTP viejo) no se superpone con la programada.
+- Cada corrida queda en ejecucion_tarea (inicio, fin, duración, resultado o error).
+
+Horarios: variable TAREA_<NOMBRE> con "HH:MM" (una vez por día, hora de
+PLANIFICADOR_ZONA) o un número de segundos (cada N segundos). Ej:
+TAREA_BAJA_OCUPACION=03:00, TAREA_EXPIRAR_RESERVAS=60. Si el proceso estuvo
+dormido a la hora de una tarea diaria, la corre apenas vuelve.
+
+Se inicia/detiene desde app/main.py. PLANIFICADOR=0 lo desactiva.
+"""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.crud import ocupacion_crud, tarea_crud
+from app.db.database import SessionLocal, engine
+from app.services import transiciones_services
+from app.services.registro_services import EventoService
+
+ACTIVO = os.getenv("PLANIFICADOR", "1") != "0"
+ZONA = ZoneInfo(os.getenv("PLANIFICADOR_ZONA", "America/Argentina/Cordoba"))
+CLAVE_LOCK_LIDER = 20240601          # pg_advisory_lock: cualquier número fijo y único en la base
+SEGUNDOS_TICK = 5
+SEGUNDOS_REINTENTO_LIDER = 30
+DIAS_HISTORIAL = 30
+
+DISPARO_PROGRAMADA = "PROGRAMADA"
+DISPARO_MANUAL = "MANUAL"
+DISPARO_CRON = "CRON"
+
+
+# ============================================================================
+# TAREAS
+# ============================================================================
+class TareaProgramada:
+
+    def __init__(self, nombre: str, funcion: Callable[[Session], dict], descripcion: str,
+                 por_defecto: str, segundos_lease: int = 900):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.descripcion = descripcion
+        self.segundos_lease = segundos_lease
+        valor = os.getenv(f"TAREA_{nombre.upper()}", por_defecto).strip()
+        if ":" in valor:
+            horas, minutos = valor.split(":")
+            self.hora, self.minuto, self.cada_segundos = int(horas), int(minutos), None
+        else:
+            self.hora = self.minuto = None
+            self.cada_segundos = int(valor)
+
+    def programacion(self) -> str:
+        if self.cada_segundos:
+            return f"cada {self.cada_segundos} s"
+        return f"todos los días {self.hora:02d}:{self.minuto:02d} ({ZONA.key})"
+
+    def proxima(self, ultima: Optional[datetime], ahora: datetime) -> datetime:
+        """Próxima corrida (con zona) según la última (None = nunca corrió)."""
+        if self.cada_segundos:
+            return ahora if ultima is None else ultima + timedelta(seconds=self.cada_segundos)
+
+        turno = ahora.replace(hour=self.hora, minute=self.minuto, second=0, microsecond=0)
+        if ultima is not None and ultima < turno <= ahora:
+            return ahora                      # se perdió el turno de hoy: recuperarlo ya
+        return turno if turno > ahora else turno + timedelta(days=1)
+
+    def atrasada(self, ultimo_exito: Optional[datetime], ahora: datetime) -> bool:
+        """Sin un éxito en lo que deberían haber sido ~3 corridas (o un día y pico para las diarias)."""
+        if ultimo_exito is None:
+            return bool(self.cada_segundos)   # una diaria recién desplegada todavía no tuvo su turno
+        margen = timedelta(seconds=3 * self.cada_segundos + self.segundos_lease) if self.cada_segundos \
+            else timedelta(days=1, seconds=self.segundos_lease)
+        return ahora - ultimo_exito > margen
+
+
+def _purgar_historial(db: Session) -> dict:
+    return {"corridas_borradas": tarea_crud.purgar_historial(db, DIAS_HISTORIAL)}
+
+
+TAREAS: Dict[str, TareaProgramada] = {t.nombre: t for t in (
+    TareaProgramada("expirar_reservas", transiciones_services.expirar_reservas,
+                    "Reservas pendientes de pago con el plazo vencido -> Expirada", "60"),
+    TareaProgramada("finalizar_eventos", transiciones_services.finalizar_eventos,
+                    "Eventos publicados con fecha pasada -> Finalizado", "300"),
+    TareaProgramada("baja_ocupacion", EventoService.cancelar_eventos_por_baja_ocupacion,
+                    "Advierte y cancela eventos que no llegan al 40% de cupo", "03:00", segundos_lease=3600),
+    TareaProgramada("reconciliar_ocupacion", ocupacion_crud.reconciliar_ocupaciones,
+                    "Recalcula ocupacion_evento contando reserva_evento", "04:00", segundos_lease=3600),
+    TareaProgramada("purgar_historial", _purgar_historial,
+                    f"Borra el historial de corridas de más de {DIAS_HISTORIAL} días", "05:00"),
+)}
+
+
+# ============================================================================
+# EJECUCIÓN
+# ============================================================================
+_corriendo: set = set()
+_lock_corriendo = threading.Lock()
+
+
+def _a_zona(fecha: Optional[datetime]) -> Optional[datetime]:
+    # En la base se guarda la hora local del servidor (naive), como en el resto de las tablas
+    return fecha.astimezone(ZONA) if fecha else None
+
+
+def ejecutar_tarea(nombre: str, disparo: str = DISPARO_MANUAL) -> dict:
+    """
+    Corre una tarea ya (en el thread actual) registrando la corrida en el historial.
+    Si ya está corriendo (en este proceso o, por el lease, en otro) se omite.
+    Los errores quedan en el historial y se vuelven a lanzar.
+    """
+    tarea = TAREAS[nombre]
+    with _lock_corriendo:
+        if nombre in _corriendo:
+            return {"omitida": True, "motivo": "La tarea ya está corriendo en este proceso"}
+        _corriendo.add(nombre)
+
+    duenio = tarea_crud.identidad_proceso()
+    db = SessionLocal()
+    try:
+        if not tarea_crud.tomar_lease(db, nombre, duenio, tarea.segundos_lease):
+            return {"omitida": True, "motivo": "La tarea está corriendo en otro proceso"}
+        id_ejecucion = tarea_crud.crear_ejecucion(db, nombre, disparo, duenio).id_ejecucion
+
+        inicio = time.perf_counter()
+        try:
+            resultado = jsonable_encoder(tarea.funcion(db))
+        except Exception as e:
+            db.rollback()
+            duracion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+            tarea_crud.finalizar_ejecucion(db, id_ejecucion, duracion_ms, error=str(e))
+            tarea_crud.liberar_lease(db, nombre, duenio, error=str(e))
+            raise
+
+        duracion_ms = round((time.perf_counter() - inicio) * 1000, 1)
+        tarea_crud.finalizar_ejecucion(db, id_ejecucion, duracion_ms, resultado=resultado)
+        tarea_crud.liberar_lease(db, nombre, duenio, resultado=resultado)
+        return {"id_ejecucion": id_ejecucion, "duracion_ms": duracion_ms, "resultado": resultado}
+    finally:
+        db.close()
+        with _lock_corriendo:
+            _corriendo.discard(nombre)
+
+
+# ============================================================================
+# LÍDER (advisory lock de Postgres)
+# ============================================================================
+class LiderPostgres:
+    """Mantiene pg_try_advisory_lock en una conexión propia mientras el proceso viva."""
+
+    def __init__(self, motor=engine, clave: int = CLAVE_LOCK_LIDER):
+        self._motor = motor
+        self._clave = clave
+        self._conexion = None
+
+    def intentar(self) -> bool:
+        """True si este proceso es (o acaba de volverse) el líder. Bloqueante: llamar desde un thread."""
+        if self._motor.dialect.name != "postgresql":
+            return True   # SQLite / desarrollo: un solo proceso
+        if self._conexion is not None:
+            try:
+                self._conexion.execute(text("SELECT 1"))
+                return True
+            except Exception as e:
+                print(f"⚠️ [PLANIFICADOR] Se perdió la conexión del lock de líder: {e}")
+                self._descartar()
+        try:
+            conexion = self._motor.connect().execution_options(isolation_level="AUTOCOMMIT")
+            if conexion.execute(text("SELECT pg_try_advisory_lock(:clave)"), {"clave": self._clave}).scalar():
+                self._conexion = conexion
+                print("👑 [PLANIFICADOR] Este proceso es el líder")
+                return True
+            conexion.close()
+        except Exception as e:
+            print(f"⚠️ [PLANIFICADOR] No se pudo intentar el lock de líder: {e}")
+        return False
+
+    def soltar(self) -> None:
+        if self._conexion is None:
+            return
+        try:
+            self._conexion.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": self._clave})
+            self._conexion.close()
+        except Exception:
+            self._descartar()
+        self._conexion = None
+
+    def _descartar(self) -> None:
+        # invalidate: que la conexión no vuelva al pool (podría seguir teniendo el lock)
+        try:
+            self._conexion.invalidate()
+        except Exception:
+            pass
+        self._conexion = None
+
+
+# ============================================================================
+# LOOP
+# ============================================================================
+class Planificador:
+
+    def __init__(self, tareas: Dict[str, TareaProgramada] = TAREAS, lider: Optional[LiderPostgres] = None):
+        self.tareas = tareas
+        self.lider = lider or LiderPostgres()
+        self.es_lider = False
+        self.proximas: Dict[str, datetime] = {}
+        self._en_vuelo: set = set()
+        self._loop_tarea: Optional[asyncio.Task] = None
+
+    async def iniciar(self) -> None:
+        if self._loop_tarea and not self._loop_tarea.done():
+            return
+        self._loop_tarea = asyncio.create_task(self._loop())
+        print("🗓️ Planificador de tareas iniciado")
+
+    async def detener(self) -> None:
+        if self._loop_tarea:
+            self._loop_tarea.cancel()
+            try:
+                await self._loop_tarea
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.lider.soltar)
+        self.es_lider = False
+        print("🗓️ Planificador de tareas detenido")
+
+    async def _loop(self) -> None:
+        while True:
+            espera = SEGUNDOS_TICK
+            try:
+                es_lider = await asyncio.to_thread(self.lider.intentar)
+                if es_lider != self.es_lider:
+                    self.es_lider = es_lider
+                    self.proximas.clear()
+                if not es_lider:
+                    espera = SEGUNDOS_REINTENTO_LIDER
+                else:
+                    if not self.proximas:
+                        await asyncio.to_thread(self._calcular_proximas)
+                    self._lanzar_vencidas()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ [PLANIFICADOR] Error en el loop: {e}")
+            await asyncio.sleep(espera)
+
+    def _calcular_proximas(self) -> None:
+        """Al volverse líder: la próxima corrida de cada tarea sale de la última registrada."""
+        db = SessionLocal()
+        try:
+            ultimas = {lease.nombre: _a_zona(lease.ultima_ejecucion) for lease in tarea_crud.get_leases(db)}
+        finally:
+            db.close()
+        ahora = datetime.now(ZONA)
+        self.proximas = {nombre: tarea.proxima(ultimas.get(nombre), ahora) for nombre, tarea in self.tareas.items()}
+
+    def _lanzar_vencidas(self) -> None:
+        ahora = datetime.now(ZONA)
+        for nombre, proxima in list(self.proximas.items()):
+            if proxima <= ahora and nombre not in self._en_vuelo:
+                self._en_vuelo.add(nombre)
+                asyncio.create_task(self._correr(nombre))
+
+    async def _correr(self, nombre: str) -> None:
+        try:
+            await asyncio.to_thread(ejecutar_tarea, nombre, DISPARO_PROGRAMADA)
+        except Exception as e:
+            print(f"❌ [PLANIFICADOR] La tarea '{nombre}' falló: {e}")
+        finally:
+            self._en_vuelo.discard(nombre)
+            ahora = datetime.now(ZONA)
+            self.proximas[nombre] = self.tareas[nombre].proxima(ahora, ahora)
+
+
+planificador = Planificador()
+
+
+async def iniciar_planificador() -> None:
+    if not ACTIVO:
+        print("🗓️ Planificador desactivado (PLANIFICADOR=0)")
+        return
+    await planificador.iniciar()
+
+
+async def detener_planificador() -> None:
+    await planificador.detener()
+
+# ============================================================================
+# ESTADO (GET /salud, /admin/tareas)
+# ============================================================================
+def estado(db: Session, con_metricas: bool = False) -> dict:
+    ahora = datetime.now(ZONA)
+    leases = {lease.nombre: lease for lease in tarea_crud.get_leases(db)}
+    tareas: List[dict] = []
+    for nombre, tarea in TAREAS.items():
+        lease = leases.get(nombre)
+        ultimo_exito = _a_zona(lease.ultimo_exito) if lease else None
+        vence = _a_zona(lease.vence) if lease else None
+        fila = {
+            "nombre": nombre,
+            "descripcion": tarea.descripcion,
+            "programacion": tarea.programacion(),
+            "proxima_ejecucion": planificador.proximas.get(nombre),   # solo la conoce el líder
+            "en_curso": vence is not None and vence > ahora,
+            "ultima_ejecucion": _a_zona(lease.ultima_ejecucion) if lease else None,
+            "ultima_finalizacion": _a_zona(lease.ultima_finalizacion) if lease else None,
+            "ultimo_exito": ultimo_exito,
+            "ultimo_estado": lease.ultimo_estado if lease else None,
+            "ultimo_resultado": lease.ultimo_resultado if lease else None,
+            "ultimo_error": lease.ultimo_error if lease else None,
+            # Con el planificador apagado las dispara un cron externo: no sabemos cada cuánto
+            "atrasada": ACTIVO and tarea.atrasada(ultimo_exito, ahora),
+        }
+        if con_metricas:
+            fila["metricas"] = tarea_crud.get_metricas(db, nombre)
+        tareas.append(fila)
+    return {"activo": ACTIVO, "lider": planificador.es_lider, "tareas": tareas}
@@ -1,15 +1,18 @@
 import os
 import shutil
+import time
+from contextlib import contextmanager
 from uuid import uuid4
 from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from fastapi import HTTPException, status, UploadFile
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.registro_models import Evento
 from app.models.auth_models import Usuario
 from app.models.eliminacion_models import EliminacionEvento
-from app.db.crud import registro_crud
+from app.db.crud import registro_crud, ocupacion_crud
+from app.core.geometria import decodificar_polyline
 from app.models.suscripcion_models import SuscripcionNovedades
 
 from app.db.crud.registro_crud import (
@@ -22,17 +25,33 @@ from app.schemas.registro_schema import EventoCreate, EventoResponse
 from app.db.crud.notificacion_crud import NotificacionCRUD
 from app.models.inscripcion_models import ReservaEvento      
 from app.models.suscripcion_models import SuscripcionNovedades
+from app.db.crud import outbox_crud
 from app.email import (
-    enviar_correo_advertencia_organizador,
-    enviar_correo_nuevo_evento, 
-    enviar_correo_cancelacion_evento,  
-    enviar_correo_modificacion_evento   
+    MARCADOR_EMAIL,
+    armar_correo_advertencia_organizador,
+    armar_correo_nuevo_evento,
+    armar_correo_cancelacion_evento,
+    armar_correo_modificacion_evento
 )
 
 
 UPLOAD_DIR = "static/uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Revisión por baja ocupación (cron diario)
+PORCENTAJE_MINIMO_OCUPACION = 40
+DIAS_CANCELACION_BAJA_OCUPACION = 5
+DIAS_PRIMER_AVISO_BAJA_OCUPACION = 10
+
+
+@contextmanager
+def _medir(tiempos: dict, fase: str):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[fase] = tiempos.get(fase, 0.0) + (time.perf_counter() - inicio) * 1000
+
 class EventoService:
     """
     Servicio para gestionar operaciones de eventos (CRUD).
@@ -90,24 +109,24 @@ class EventoService:
         # ==========================================================
         if estado_calculado == 3: # Solo si el evento está PUBLICADO
             # Buscamos a los usuarios que tengan suscripción activa (id_estado 1) y general (evento NULL)
-            suscriptores = db.query(Usuario).join(SuscripcionNovedades).filter(
+            suscriptores = db.query(Usuario.email).join(SuscripcionNovedades).filter(
                 SuscripcionNovedades.id_estado_suscripcion == 1,
                 SuscripcionNovedades.id_evento == None
             ).all()
 
-            for s in suscriptores:
-                # 1. Preparamos la fecha en formato AAAA-MM-DD para la URL
-                fecha_url = nuevo_evento.fecha_evento.strftime('%Y-%m-%d')
-                
-                # 2. Usamos la función de email.py con los parámetros correctos
-                enviar_correo_nuevo_evento(
-                    email_destino=s.email,
-                    nombre_evento=nuevo_evento.nombre_evento,
-                    # Este es el texto que el usuario VE en el mail (podés dejarlo así)
-                    fecha_evento=nuevo_evento.fecha_evento.strftime('%d/%m/%Y %H:%M'),
-                    id_evento=nuevo_evento.id_evento,
-                    fecha_url=fecha_url  
-                )
+            # Un solo correo en la bandeja de salida para todos: el worker lo manda
+            # de a 1000 destinatarios y el request vuelve enseguida.
+            # MARCADOR_EMAIL se reemplaza por el email de cada uno (link de baja).
+            correo = armar_correo_nuevo_evento(
+                email_destino=MARCADOR_EMAIL,
+                nombre_evento=nuevo_evento.nombre_evento,
+                # Este es el texto que el usuario VE en el mail (podés dejarlo así)
+                fecha_evento=nuevo_evento.fecha_evento.strftime('%d/%m/%Y %H:%M'),
+                id_evento=nuevo_evento.id_evento,
+                fecha_url=nuevo_evento.fecha_evento.strftime('%Y-%m-%d')
+            )
+            if outbox_crud.encolar_correo(db, correo, [s.email for s in suscriptores]):
+                db.commit()
         # ==========================================================
 
         return nuevo_evento
@@ -131,22 +150,22 @@ class EventoService:
         2. Verificación de solicitudes de eliminación pendientes.
         """
         # 1. Obtener eventos base
-        eventos = registro_crud.get_eventos_por_usuario(
+        eventos, _ = registro_crud.get_eventos_por_usuario(
             db=db, 
             id_usuario=id_usuario, 
             skip=skip, 
             limit=limit
         )
         
+        # 🚀 Contadores de ocupación de todos los eventos en una sola consulta
+        ocupaciones = ocupacion_crud.get_ocupaciones(db, [e.id_evento for e in eventos])
+
         eventos_procesados = []
         for evento in eventos:
             # --- LÓGICA 1: CALCULAR CUPOS ---
-            ocupados = db.query(ReservaEvento).filter(
-                ReservaEvento.id_evento == evento.id_evento
-            ).count()
-            
-            total = evento.cupo_maximo if evento.cupo_maximo else 0
-            cupos_disponibles = total - ocupados
+            cupos_disponibles = ocupacion_crud.calcular_cupos_disponibles(
+                evento.cupo_maximo, ocupaciones.get(evento.id_evento)
+            )
             # --- LÓGICA 2: SOLICITUDES PENDIENTES ---
             solicitud = db.query(EliminacionEvento).filter(
                 EliminacionEvento.id_evento == evento.id_evento,
@@ -173,16 +192,15 @@ class EventoService:
     @staticmethod
     def listar_todos_los_eventos(db: Session, skip: int = 0, limit: int = 100) -> List[EventoResponse]:
         # Traemos los eventos del CRUD tal cual estaban
-        eventos = registro_crud.get_eventos(db=db, skip=skip, limit=limit)
+        eventos, _ = registro_crud.get_eventos(db=db, skip=skip, limit=limit)
         
         # --- NUEVO: AQUÍ HACEMOS LA MAGIA DE LOS CUPOS ---
+        # 🚀 Leemos los contadores mantenidos (una consulta para toda la página)
+        ocupaciones = ocupacion_crud.get_ocupaciones(db, [e.id_evento for e in eventos])
         for evento in eventos:
-            # Contamos cuántos inscriptos hay en la tabla ReservaEvento
-            ocupados = db.query(ReservaEvento).filter(ReservaEvento.id_evento == evento.id_evento).count()
-            
-            # Hacemos la resta
-            total = evento.cupo_maximo if evento.cupo_maximo else 0
-            evento.cupos_disponibles = total - ocupados
+            evento.cupos_disponibles = ocupacion_crud.calcular_cupos_disponibles(
+                evento.cupo_maximo, ocupaciones.get(evento.id_evento)
+            )
         # ------------------------------------------------
         
         return eventos
@@ -197,13 +215,41 @@ class EventoService:
             )
         
         # --- NUEVO: CALCULAR CUPOS PARA UN SOLO EVENTO ---
-        ocupados = db.query(ReservaEvento).filter(ReservaEvento.id_evento == evento.id_evento).count()
-        total = evento.cupo_maximo if evento.cupo_maximo else 0
-        evento.cupos_disponibles = total - ocupados
+        evento.cupos_disponibles = ocupacion_crud.calcular_cupos_disponibles(
+            evento.cupo_maximo, ocupacion_crud.get_ocupacion(db, evento.id_evento)
+        )
         # -------------------------------------------------
         
         return evento
     # ========================================================================
+    # RUTA DEL EVENTO (simplificada según el zoom del mapa)
+    # ========================================================================
+    @staticmethod
+    def obtener_ruta(db: Session, evento_id: int, zoom: Optional[int], formato: str) -> Tuple[dict, str]:
+        """(respuesta, huella). La huella sirve de ETag: solo cambia si cambia la ruta."""
+        ruta = registro_crud.get_ruta_evento(db, evento_id)
+        if ruta is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"El evento {evento_id} no tiene ruta cargada"
+            )
+
+        polyline, puntos, nivel = ruta.para_zoom(zoom)
+        respuesta = {
+            "id_evento": evento_id,
+            "zoom": nivel,
+            "puntos": puntos,
+            "puntos_originales": ruta.puntos,
+            "formato": formato,
+            "metricas": ruta.metricas,
+        }
+        if formato == "coordenadas":
+            respuesta["coordenadas"] = [list(p) for p in decodificar_polyline(polyline)]
+        else:
+            respuesta["polyline"] = polyline
+        return respuesta, f'"{ruta.huella[:20]}-{nivel}-{formato}"'
+
+    # ========================================================================
     # ACTUALIZAR EVENTO (CON AVISO POR MAIL)
     # ========================================================================
     @staticmethod
@@ -226,15 +272,14 @@ class EventoService:
             .all()
         )
 
-        for i in inscriptos:
-            fecha_url = evento_actualizado.fecha_evento.strftime('%Y-%m-%d')
-            if i.email:
-                enviar_correo_modificacion_evento(
-                    email_destino=i.email,
-                    nombre_evento=evento_actualizado.nombre_evento,
-                    id_evento=evento_actualizado.id_evento,
-                    fecha_url=fecha_url
-                )
+        correo = armar_correo_modificacion_evento(
+            email_destino=MARCADOR_EMAIL,
+            nombre_evento=evento_actualizado.nombre_evento,
+            id_evento=evento_actualizado.id_evento,
+            fecha_url=evento_actualizado.fecha_evento.strftime('%Y-%m-%d')
+        )
+        if outbox_crud.encolar_correo(db, correo, [i.email for i in inscriptos]):
+            db.commit()
             
         return evento_actualizado
     
@@ -261,20 +306,24 @@ class EventoService:
         if not interesados:
             print(f"--- [INFO] El evento '{evento.nombre_evento}' no tenía reservas activas. ---")
         else:
-            # 2. Enviamos el mail a cada uno
-            for participante in interesados:
-                if participante.email:
-                    enviar_correo_cancelacion_evento(
-                        email_destino=participante.email,
-                        nombre_evento=evento.nombre_evento,
-                        motivo=motivo
-                    )
+            # 2. Encolamos el mail para todos (lo envía el worker de correos) + aviso en el navbar
+            correo = armar_correo_cancelacion_evento(
+                email_destino=MARCADOR_EMAIL,
+                nombre_evento=evento.nombre_evento,
+                motivo=motivo
+            )
+            outbox_crud.encolar_correo(db, correo, [p.email for p in interesados])
+            NotificacionCRUD.create_notificaciones_masivas(
+                db,
+                [p.id_usuario for p in interesados],
+                f"📢 IMPORTANTE: El evento '{evento.nombre_evento}' ha sido cancelado. Motivo: {motivo}."
+            )
         
-        # 3. Marcamos como notificado en la tabla EliminacionEvento
+        # 3. Marcamos como notificado en la tabla EliminacionEvento (mismo commit que el correo encolado)
         eliminacion = db.query(EliminacionEvento).filter(EliminacionEvento.id_eliminacion == id_eliminacion).first()
         if eliminacion:
             eliminacion.notificacion_enviada = True
-            db.commit()
+        db.commit()
     # ==========================================
     # HU 4.2: SOLICITAR ELIMINACIÓN (EXTERNO)
     # ==========================================
@@ -451,106 +500,165 @@ class EventoService:
     # Advertencias (10 a 6 días) y Cancelación (5 días)
     # ==========================================
     @staticmethod
-    def cancelar_eventos_por_baja_ocupacion(db: Session):
+    def cancelar_eventos_por_baja_ocupacion(db: Session, simular: bool = False):
+        """
+        🚀 Por conjuntos, con la misma cantidad de consultas sean 3 o 3000 eventos:
+          1. candidatos:    UNA consulta con la ocupación (GROUP BY de confirmadas) y
+                            el email del organizador de todos los eventos en riesgo.
+          2. cancelacion:   UN UPDATE masivo de los que están a 5 días.
+          3. destinatarios: UNA consulta con los usuarios con reserva de los cancelados.
+          4. encolado:      correos a la bandeja de salida y notificaciones multi-fila.
+          5. commit:        todo junto (los correos salen recién después, por el worker).
+        simular=True devuelve el plan (a quién se advertiría / qué se cancelaría) sin escribir nada.
+        En ambos casos 'tiempos_ms' trae la duración de cada fase.
+        """
+        tiempos = {}
         hoy = datetime.now().date()
-        
-        # Definimos el rango de días (desde cancelación en 5 días, hasta primer aviso en 10 días)
-        fecha_cancelacion = hoy + timedelta(days=5)
-        fecha_primer_aviso = hoy + timedelta(days=10)
 
-        # Buscamos eventos activos que estén en ese rango de fechas
-        eventos_a_revisar = (
-            db.query(Evento)
-            .filter(Evento.id_estado == ID_ESTADO_PUBLICADO)
-            .filter(func.date(Evento.fecha_evento) >= fecha_cancelacion)
-            .filter(func.date(Evento.fecha_evento) <= fecha_primer_aviso)
-            .filter(Evento.cupo_maximo > 0)
-            .all()
-        )
-
-        eventos_cancelados = []
-        eventos_advertidos = []
-
-        for evento in eventos_a_revisar:
-            # Calculamos exactamente cuántos días faltan para el evento
-            # (Usamos .date() por si fecha_evento es DateTime)
-            fecha_ev = evento.fecha_evento.date() if isinstance(evento.fecha_evento, datetime) else evento.fecha_evento
-            dias_para_el_evento = (fecha_ev - hoy).days
+        # Definimos el rango de días (desde cancelación en 5 días, hasta primer aviso en 10 días)
+        fecha_cancelacion = hoy + timedelta(days=DIAS_CANCELACION_BAJA_OCUPACION)
+        fecha_primer_aviso = hoy + timedelta(days=DIAS_PRIMER_AVISO_BAJA_OCUPACION)
 
-            # 3. Contar inscripciones confirmadas
+        # =========================================================
+        # FASE 1: CANDIDATOS (ocupación de todos en una consulta)
+        # =========================================================
+        with _medir(tiempos, "candidatos"):
+            en_rango = (
+                db.query(Evento.id_evento)
+                .filter(Evento.id_estado == ID_ESTADO_PUBLICADO)
+                .filter(Evento.fecha_evento >= fecha_cancelacion)
+                .filter(Evento.fecha_evento <= fecha_primer_aviso)
+                .filter(Evento.cupo_maximo > 0)
+            )
             confirmadas = (
-                db.query(func.count(ReservaEvento.id_reserva))
-                .filter(ReservaEvento.id_evento == evento.id_evento)
+                db.query(ReservaEvento.id_evento, func.count(ReservaEvento.id_reserva).label("cantidad"))
                 .filter(ReservaEvento.id_estado_reserva == 2)
-                .scalar()
-            ) or 0
-
-            porcentaje_ocupacion = (confirmadas / evento.cupo_maximo) * 100
-
-            # Si el evento YA CUBRIÓ el 40%, no hacemos nada (está a salvo)
-            if porcentaje_ocupacion >= 40.0:
-                continue
+                .filter(ReservaEvento.id_evento.in_(en_rango.subquery().select()))
+                .group_by(ReservaEvento.id_evento)
+                .subquery()
+            )
+            cantidad_confirmadas = func.coalesce(confirmadas.c.cantidad, 0)
+            query = (
+                db.query(Evento.id_evento, Evento.nombre_evento, Evento.fecha_evento, Evento.cupo_maximo,
+                         Usuario.id_usuario, Usuario.email, cantidad_confirmadas)
+                .outerjoin(confirmadas, confirmadas.c.id_evento == Evento.id_evento)
+                .outerjoin(Usuario, Usuario.id_usuario == Evento.id_usuario)
+                .filter(Evento.id_evento.in_(en_rango.subquery().select()))
+                # Los que YA CUBRIERON el 40% están a salvo: ni los traemos
+                .filter(cantidad_confirmadas * 100 < Evento.cupo_maximo * PORCENTAJE_MINIMO_OCUPACION)
+                .order_by(Evento.fecha_evento, Evento.id_evento)
+            )
+            if not simular:
+                # Que nadie los edite/cancele entre el plan y el UPDATE
+                query = query.with_for_update(of=Evento)
+            candidatos = query.all()
 
-            # Buscamos al organizador
-            organizador = db.query(Usuario).filter(Usuario.id_usuario == evento.id_usuario).first()
+        advertir, cancelar = [], []
+        for id_evento, nombre, fecha_evento, cupo_maximo, id_organizador, email_organizador, cantidad in candidatos:
+            dias_para_el_evento = (fecha_evento - hoy).days
+            plan = {
+                "id": id_evento,
+                "nombre": nombre,
+                "id_organizador": id_organizador,
+                "email_organizador": email_organizador,
+                "porcentaje": (cantidad / cupo_maximo) * 100,
+                "dias_para_el_evento": dias_para_el_evento,
+            }
+            if dias_para_el_evento == DIAS_CANCELACION_BAJA_OCUPACION:
+                cancelar.append(plan)
+            elif email_organizador:
+                # Si el evento es en 10 días, se cancela en 5. Si es en 6, se cancela en 1 (mañana).
+                plan["dias_para_cancelacion"] = dias_para_el_evento - DIAS_CANCELACION_BAJA_OCUPACION
+                advertir.append(plan)
 
-            # =========================================================
-            # FASE 1: ADVERTENCIA (Faltan entre 6 y 10 días para el evento)
-            # =========================================================
-            if 6 <= dias_para_el_evento <= 10:
-                if organizador and organizador.email:
-                    # Si el evento es en 10 días, se cancela en 5. 
-                    # Si el evento es en 6 días, se cancela en 1 (mañana).
-                    dias_para_cancelacion = dias_para_el_evento - 5
-                    
-                    # Llamamos a una nueva función de correo (te la dejo más abajo)
-                    enviar_correo_advertencia_organizador(
-                        email_destino=organizador.email,
-                        nombre_evento=evento.nombre_evento,
-                        porcentaje=porcentaje_ocupacion,
-                        dias_restantes=dias_para_cancelacion
-                    )
-                    eventos_advertidos.append(evento.nombre_evento)
+        # =========================================================
+        # FASE 2: CANCELACIÓN (un solo UPDATE)
+        # =========================================================
+        ids_cancelar = [plan["id"] for plan in cancelar]
+        if ids_cancelar and not simular:
+            with _medir(tiempos, "cancelacion"):
+                db.query(Evento).filter(
+                    Evento.id_evento.in_(ids_cancelar),
+                    Evento.id_estado == ID_ESTADO_PUBLICADO
+                ).update({"id_estado": ID_ESTADO_CANCELADO}, synchronize_session=False)
 
-            # =========================================================
-            # FASE 2: CANCELACIÓN (Faltan exactamente 5 días)
-            # =========================================================
-            elif dias_para_el_evento == 5:
-                evento.id_estado = ID_ESTADO_CANCELADO 
-                
-                usuarios_reserva = (
-                    db.query(Usuario)
-                    .join(ReservaEvento, ReservaEvento.id_usuario == Usuario.id_usuario)
-                    .filter(ReservaEvento.id_evento == evento.id_evento)
+        # =========================================================
+        # FASE 3: DESTINATARIOS (una sola consulta para todos los cancelados)
+        # =========================================================
+        if ids_cancelar:
+            with _medir(tiempos, "destinatarios"):
+                por_evento = {id_evento: {} for id_evento in ids_cancelar}
+                filas = (
+                    db.query(ReservaEvento.id_evento, Usuario.id_usuario, Usuario.email)
+                    .join(Usuario, ReservaEvento.id_usuario == Usuario.id_usuario)
+                    .filter(ReservaEvento.id_evento.in_(ids_cancelar))
                     .all()
                 )
-                
-                emails_a_notificar = set([u.email for u in usuarios_reserva if u.email])
-                if organizador and organizador.email:
-                    emails_a_notificar.add(organizador.email)
+                for id_evento, id_usuario, email in filas:
+                    por_evento[id_evento][id_usuario] = email
+                for plan in cancelar:
+                    destinatarios = por_evento[plan["id"]]
+                    if plan["id_organizador"] is not None:
+                        destinatarios[plan["id_organizador"]] = plan["email_organizador"]
+                    plan["ids_a_notificar"] = list(destinatarios)
+                    plan["emails_a_notificar"] = sorted({e for e in destinatarios.values() if e})
 
-                texto_motivo = f"Lamentablemente, el evento no alcanzó el cupo mínimo del 40% requerido para su realización (Ocupación final: {porcentaje_ocupacion:.1f}%). Su dinero será devuelto a la cuenta desde la cual se realizó el pago. Sentimos las molestias ocasionadas."
-                
-                for email in emails_a_notificar:
-                    enviar_correo_cancelacion_evento(
-                        email_destino=email,
-                        nombre_evento=evento.nombre_evento,
+        # =========================================================
+        # FASE 4: ENCOLADO (bandeja de salida + notificaciones multi-fila)
+        # =========================================================
+        if not simular:
+            with _medir(tiempos, "encolado"):
+                for plan in advertir:
+                    correo = armar_correo_advertencia_organizador(
+                        email_destino=plan["email_organizador"],
+                        nombre_evento=plan["nombre"],
+                        porcentaje=plan["porcentaje"],
+                        dias_restantes=plan["dias_para_cancelacion"]
+                    )
+                    outbox_crud.encolar_correo(db, correo, [plan["email_organizador"]])
+
+                for plan in cancelar:
+                    texto_motivo = f"Lamentablemente, el evento no alcanzó el cupo mínimo del 40% requerido para su realización (Ocupación final: {plan['porcentaje']:.1f}%). Su dinero será devuelto a la cuenta desde la cual se realizó el pago. Sentimos las molestias ocasionadas."
+                    correo = armar_correo_cancelacion_evento(
+                        email_destino=MARCADOR_EMAIL,
+                        nombre_evento=plan["nombre"],
                         motivo=texto_motivo
                     )
+                    outbox_crud.encolar_correo(db, correo, plan["emails_a_notificar"])
 
-                eventos_cancelados.append({
-                    "id": evento.id_evento,
-                    "nombre": evento.nombre_evento,
-                    "ocupacion": f"{porcentaje_ocupacion:.1f}%"
-                })
+                    # Aviso en el navbar para inscriptos y organizador (un INSERT multi-fila)
+                    NotificacionCRUD.create_notificaciones_masivas(
+                        db,
+                        plan["ids_a_notificar"],
+                        f"📢 IMPORTANTE: El evento '{plan['nombre']}' fue cancelado por no alcanzar el cupo mínimo del 40%."
+                    )
 
-        # Solo hacemos commit si hubo cancelaciones (las advertencias no modifican la DB)
-        if eventos_cancelados:
-            db.commit()
+            # Cancelaciones, correos y notificaciones se confirman juntos
+            with _medir(tiempos, "commit"):
+                db.commit()
 
-        return {
-            "mensaje": f"Se evaluaron {len(eventos_a_revisar)} eventos en riesgo.", 
-            "advertidos": len(eventos_advertidos),
-            "cancelados": len(eventos_cancelados),
-            "detalle_cancelados": eventos_cancelados
-        }
\ No newline at end of file
+        resultado = {
+            "mensaje": f"Se evaluaron {len(candidatos)} eventos en riesgo.",
+            "advertidos": len(advertir),
+            "cancelados": len(cancelar),
+            "detalle_cancelados": [
+                {"id": plan["id"], "nombre": plan["nombre"], "ocupacion": f"{plan['porcentaje']:.1f}%"}
+                for plan in cancelar
+            ],
+            "tiempos_ms": {fase: round(ms, 1) for fase, ms in tiempos.items()},
+        }
+        if simular:
+            resultado["simulacion"] = True
+            resultado["plan"] = {
+                "advertir": [
+                    {"id": p["id"], "nombre": p["nombre"], "ocupacion": f"{p['porcentaje']:.1f}%",
+                     "dias_para_cancelacion": p["dias_para_cancelacion"], "email_organizador": p["email_organizador"]}
+                    for p in advertir
+                ],
+                "cancelar": [
+                    {"id": p["id"], "nombre": p["nombre"], "ocupacion": f"{p['porcentaje']:.1f}%",
+                     "notificaciones": len(p["ids_a_notificar"]), "correos": len(p["emails_a_notificar"])}
+                    for p in cancelar
+                ],
+            }
+        return resultado
@@ -0,0 +1,450 @@
+# app/services/reportes_export.py
+"""
+Exportación de reportes en streaming.
+
+- ESQUEMAS_EXPORTACION: por cada tipo exportable, roles, claves del reporte y
+  columnas tipadas (entero, decimal, fecha, ...).
+- generar_csv: arma el CSV de a bloques a partir de un iterable de filas (dicts),
+  sin juntar el archivo completo en memoria.
+- generar_parquet / generar_arrow / generar_xlsx: mismos datos con tipos reales
+  (Decimal, fechas) para planillas y notebooks. pyarrow y openpyxl se importan
+  recién cuando se piden esos formatos.
+- comprimir_gzip: comprime los bloques a medida que salen.
+- FUENTES_STREAMING: tablas grandes que se leen directo de la base con un cursor
+  del lado del servidor (yield_per), sin armar la lista de dicts del reporte.
+
+IMPORTANTE: los generadores abren su PROPIA sesión. Con FastAPI >= 0.106 la sesión
+de get_db se cierra antes de que StreamingResponse empiece a mandar el cuerpo.
+"""
+import csv
+import zlib
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from io import RawIOBase, StringIO
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Iterator
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from app.db.database import SessionLocal
+from app.models.auth_models import Usuario
+from app.models.inscripcion_models import ReservaEvento
+from app.models.ocupacion_models import OcupacionEvento
+from app.models.registro_models import Evento, TipoEvento
+from app.services.reportes_services import MAPA_ROLES
+
+TAMANIO_LOTE = 1000       # Filas por viaje al cursor de la base
+FILAS_POR_BLOQUE = 500    # Filas por chunk enviado al cliente
+FILAS_POR_GRUPO = 10000   # Filas por row group (parquet) / record batch (arrow)
+SIN_DATOS = "Sin datos disponibles para este reporte"
+
+# ═════════════════════════════════════════════════════════════════════════════
+# ESQUEMAS
+# ═════════════════════════════════════════════════════════════════════════════
+
+# Tipos de columna
+ENTERO = "entero"
+REAL = "real"
+DECIMAL = "decimal"      # Montos: 2 decimales exactos
+TEXTO = "texto"
+FECHA = "fecha"
+BOOLEANO = "booleano"
+
+# tipo -> (roles permitidos, claves del reporte donde buscar (la primera que exista), columnas)
+ESQUEMAS_EXPORTACION = {
+    # Bloque Admin
+    "total_eventos":          ([1, 2],       ("total_eventos",),        [("total_eventos", ENTERO)]),
+    "eventos_por_estado":     ([1, 2, 3],    ("eventos_por_estado",),   [("estado", ENTERO), ("cantidad", ENTERO)]),
+    "eventos_por_usuario":    ([1, 2],       ("eventos_por_usuario",),  [("usuario", ENTERO), ("cantidad", ENTERO)]),
+    "eventos_por_mes":        ([1, 2],       ("eventos_por_mes",),      [("anio", ENTERO), ("mes", ENTERO), ("cantidad", ENTERO)]),
+    "usuarios_total":         ([1],          ("usuarios_total",),       [("usuarios_total", ENTERO)]),
+    "usuarios_por_rol":       ([1],          ("usuarios_por_rol",),     [("rol", ENTERO), ("cantidad", ENTERO)]),
+    "eventos_por_tipo":       ([1, 2, 3],    ("eventos_por_tipo", "rendimiento_por_tipo"), [("tipo", TEXTO), ("cantidad", ENTERO)]),
+    "eventos_por_dificultad": ([1, 2],       ("eventos_por_dificultad",), [("dificultad", TEXTO), ("cantidad", ENTERO)]),
+    "eventos_por_ubicacion":  ([1, 2],       ("eventos_por_ubicacion",), [("ubicacion", TEXTO), ("cantidad", ENTERO)]),
+    "top_10_recaudacion":     ([1],          ("top_10_recaudacion",), [
+        ("nombre", TEXTO), ("fecha_evento", FECHA), ("tipo", TEXTO), ("pertenencia", TEXTO),
+        ("organizador", TEXTO), ("inscripciones_confirmadas", ENTERO), ("monto_recaudado", DECIMAL),
+    ]),
+    "usuarios_nuevos":        ([1],          ("usuarios_nuevos",), [
+        ("nombre", TEXTO), ("email", TEXTO), ("rol", TEXTO), ("fecha_creacion", FECHA),
+        ("cantidad_inscripciones", ENTERO), ("cantidad_eventos_creados", ENTERO),
+    ]),
+    # Admin ve las tendencias con pertenencia; la Org Externa las globales
+    "tendencias_ubicacion_completa": ([1, 3], ("tendencias_ubicacion_completa", "tendencias_ubicacion"), [("provincia", TEXTO), ("total_eventos", ENTERO)]),
+
+    # Bloque Supervisor
+    "analisis_organizadores": ([1, 2],       ("analisis_organizadores",), [
+        ("id_usuario", ENTERO), ("organizador", TEXTO), ("email", TEXTO), ("rol", TEXTO),
+        ("total_eventos", ENTERO), ("activos", ENTERO), ("finalizados", ENTERO), ("recaudacion_total", DECIMAL),
+    ]),
+    "top_ocupacion":          ([1, 2],       ("top_ocupacion",), [
+        ("id_evento", ENTERO), ("nombre_evento", TEXTO), ("fecha_evento", FECHA), ("cupo_maximo", ENTERO),
+        ("inscriptos_pagos", ENTERO), ("reservados_no_pagos", ENTERO), ("total_ocupado", ENTERO),
+        ("tasa_ocupacion", REAL), ("es_pago", BOOLEANO),
+    ]),
+    "dashboard_eventos":      ([1, 2],       ("dashboard_eventos",), [
+        ("id_evento", ENTERO), ("nombre_evento", TEXTO), ("fecha_evento", FECHA),
+        ("responsable", TEXTO), ("estado", TEXTO), ("pertenencia", TEXTO),
+    ]),
+    "solicitudes_externas":   ([1, 2],       ("solicitudes_externas",), [("estado", TEXTO), ("cantidad", ENTERO)]),
+
+    # Bloque Organizacion Externa / Detallado (accesible por roles 1, 2 y 3)
+    "lista_eventos_detallada": ([1, 2, 3],   ("lista_eventos_detallada",), [
+        ("id", ENTERO), ("nombre", TEXTO), ("fecha", FECHA), ("tipo", TEXTO), ("reservas", ENTERO), ("estado", ENTERO),
+    ]),
+    "detalle_recaudacion":    ([1, 2, 3],    ("detalle_recaudacion",), [
+        ("id_evento", ENTERO), ("nombre_evento", TEXTO), ("monto", DECIMAL),
+        ("inscriptos_confirmados", ENTERO), ("cupo_maximo", ENTERO),
+    ]),
+    "tendencias_ubicacion":   ([1, 2, 3],    ("tendencias_ubicacion",), [("provincia", TEXTO), ("total_eventos", ENTERO)]),
+    "mis_eventos_total":      ([3, 4],       ("mis_eventos_total",),    [("mis_eventos_total", ENTERO)]),
+    "mis_eventos_por_estado": ([1, 2, 3, 4], ("mis_eventos_por_estado",), [("estado", ENTERO), ("cantidad", ENTERO)]),
+
+    # Bloque Cliente
+    "mis_inscripciones":      ([4],          ("mis_inscripciones",),    [("evento_nombre", TEXTO), ("estado", TEXTO)]),
+}
+
+
+def extraer_filas(datos: dict, claves: tuple, columnas: list) -> list:
+    """Busca la primera clave presente en el reporte. Los totales sueltos se exportan como una fila."""
+    valor = next((datos[c] for c in claves if c in datos), None)
+    if isinstance(valor, list):
+        return valor
+    if len(columnas) == 1:
+        return [{columnas[0][0]: valor or 0}]
+    return []
+
+
+def _convertir(valor, tipo: str):
+    """Pasa el valor del reporte (ya formateado para el front) a su tipo real. None si no aplica."""
+    if valor is None or valor == "":
+        return None
+    try:
+        if tipo == ENTERO:
+            return int(valor)
+        if tipo == REAL:
+            return float(valor)
+        if tipo == DECIMAL:
+            return Decimal(str(valor)).quantize(Decimal("0.01"))
+        if tipo == BOOLEANO:
+            return bool(valor)
+        if tipo == FECHA:
+            if isinstance(valor, datetime):
+                return valor.date()
+            if isinstance(valor, date):
+                return valor
+            for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+                try:
+                    return datetime.strptime(valor[:10], formato).date()
+                except ValueError:
+                    continue
+            return None  # "Sin fecha"
+    except (TypeError, ValueError, InvalidOperation):
+        return None
+    return str(valor)
+
+
+def _lotes(filas: Iterable[dict], tamanio: int) -> Iterator[list]:
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamanio))
+        if not lote:
+            return
+        yield lote
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# CSV / GZIP
+# ═════════════════════════════════════════════════════════════════════════════
+
+def generar_csv(filas: Iterable[dict], columnas: list, filas_por_bloque: int = FILAS_POR_BLOQUE) -> Iterator[str]:
+    """Devuelve el CSV en bloques de texto. El encabezado sale recién con la primera fila."""
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[nombre for nombre, _ in columnas], extrasaction='ignore')
+    pendientes = 0
+    hubo_filas = False
+
+    for fila in filas:
+        if not hubo_filas:
+            writer.writeheader()
+            hubo_filas = True
+        writer.writerow(fila)
+        pendientes += 1
+
+        if pendientes >= filas_por_bloque:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pendientes = 0
+
+    if not hubo_filas:
+        yield SIN_DATOS
+    elif pendientes:
+        yield buffer.getvalue()
+
+
+def comprimir_gzip(bloques: Iterable[str]) -> Iterator[bytes]:
+    """Comprime en formato gzip a medida que llegan los bloques."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16 + MAX_WBITS -> encabezado gzip
+    for bloque in bloques:
+        datos = compresor.compress(bloque.encode("utf-8"))
+        if datos:
+            yield datos
+    yield compresor.flush()
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FORMATOS TIPADOS (PARQUET / ARROW / XLSX)
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Exportación parquet/arrow no disponible: falta instalar pyarrow")
+    return pyarrow
+
+
+def _importar_openpyxl():
+    try:
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Exportación xlsx no disponible: falta instalar openpyxl")
+    return openpyxl, WriteOnlyCell
+
+
+class _Sumidero(RawIOBase):
+    """Archivo de solo escritura que junta lo escrito hasta que se lo vacía (para mandarlo al cliente)."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self) -> int:
+        return self._posicion
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _esquema_arrow(pa, columnas: list):
+    tipos = {
+        ENTERO: pa.int64(), REAL: pa.float64(), DECIMAL: pa.decimal128(14, 2),
+        TEXTO: pa.string(), FECHA: pa.date32(), BOOLEANO: pa.bool_(),
+    }
+    return pa.schema([(nombre, tipos[tipo]) for nombre, tipo in columnas])
+
+
+def _lote_arrow(pa, esquema, columnas: list, lote: list):
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([_convertir(fila.get(nombre), tipo) for fila in lote], type=esquema.field(nombre).type)
+            for nombre, tipo in columnas
+        ],
+        schema=esquema
+    )
+
+
+def generar_parquet(filas: Iterable[dict], columnas: list) -> Iterator[bytes]:
+    """Parquet con un row group por lote; cada lote se manda apenas se escribe."""
+    pa = _importar_pyarrow()
+    esquema = _esquema_arrow(pa, columnas)
+
+    def _bloques():
+        sumidero = _Sumidero()
+        writer = pa.parquet.ParquetWriter(sumidero, esquema, compression="snappy")
+        try:
+            for lote in _lotes(filas, FILAS_POR_GRUPO):
+                writer.write_batch(_lote_arrow(pa, esquema, columnas, lote))
+                yield sumidero.vaciar()
+        finally:
+            writer.close()
+        yield sumidero.vaciar()  # Footer con los metadatos
+
+    return _bloques()
+
+
+def generar_arrow(filas: Iterable[dict], columnas: list) -> Iterator[bytes]:
+    """Formato Arrow IPC stream (se lee con pyarrow.ipc.open_stream)."""
+    pa = _importar_pyarrow()
+    esquema = _esquema_arrow(pa, columnas)
+
+    def _bloques():
+        sumidero = _Sumidero()
+        writer = pa.ipc.new_stream(sumidero, esquema)
+        try:
+            for lote in _lotes(filas, FILAS_POR_GRUPO):
+                writer.write_batch(_lote_arrow(pa, esquema, columnas, lote))
+                yield sumidero.vaciar()
+        finally:
+            writer.close()
+        yield sumidero.vaciar()
+
+    return _bloques()
+
+
+def generar_xlsx(filas: Iterable[dict], columnas: list, tamanio_bloque: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    XLSX en modo write_only: openpyxl vuelca las filas a un temporal a medida que llegan.
+    El zip recién se puede enviar al final (el formato lo exige), pero la memoria queda acotada.
+    """
+    openpyxl, WriteOnlyCell = _importar_openpyxl()
+    formatos = {DECIMAL: "#,##0.00", FECHA: "DD/MM/YYYY"}
+
+    def _bloques():
+        libro = openpyxl.Workbook(write_only=True)
+        hoja = libro.create_sheet("Reporte")
+        hoja.append([nombre for nombre, _ in columnas])
+
+        for fila in filas:
+            celdas = []
+            for nombre, tipo in columnas:
+                celda = WriteOnlyCell(hoja, value=_convertir(fila.get(nombre), tipo))
+                if tipo in formatos:
+                    celda.number_format = formatos[tipo]
+                celdas.append(celda)
+            hoja.append(celdas)
+
+        with SpooledTemporaryFile(max_size=8 * 1024 * 1024) as archivo:
+            libro.save(archivo)
+            archivo.seek(0)
+            while True:
+                bloque = archivo.read(tamanio_bloque)
+                if not bloque:
+                    break
+                yield bloque
+
+    return _bloques()
+
+
+# formato -> (generador, media type, extensión)
+FORMATOS_EXPORTACION = {
+    "csv": (generar_csv, "text/csv", "csv"),
+    "parquet": (generar_parquet, "application/vnd.apache.parquet", "parquet"),
+    "arrow": (generar_arrow, "application/vnd.apache.arrow.stream", "arrow"),
+    "xlsx": (generar_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+# ═════════════════════════════════════════════════════════════════════════════
+# FUENTES EN STREAMING (cursor del lado del servidor)
+# Devuelven dicts con las mismas claves que el reporte en memoria
+# (ReporteSnapshot), así el CSV sale igual venga de la caché o de la base.
+# ═════════════════════════════════════════════════════════════════════════════
+
+def _query_eventos(db, id_usuario: int, id_rol: int):
+    query = (
+        db.query(
+            Evento.id_evento, Evento.nombre_evento, Evento.fecha_evento, Evento.id_estado,
+            Evento.costo_participacion, Evento.cupo_maximo,
+            TipoEvento.nombre.label("tipo_nombre"),
+            func.coalesce(OcupacionEvento.pendientes, 0).label("pendientes"),
+            func.coalesce(OcupacionEvento.confirmadas, 0).label("confirmadas"),
+            func.coalesce(OcupacionEvento.canceladas, 0).label("canceladas"),
+            func.coalesce(OcupacionEvento.expiradas, 0).label("expiradas"),
+        )
+        .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
+        .outerjoin(OcupacionEvento, OcupacionEvento.id_evento == Evento.id_evento)
+    )
+    # Rol > 2 ve solo sus eventos; Admin y Supervisor ven todos
+    if id_rol > 2:
+        query = query.filter(Evento.id_usuario == id_usuario)
+    return query.order_by(Evento.fecha_evento.desc(), Evento.id_evento.desc()).yield_per(TAMANIO_LOTE)
+
+
+def filas_eventos_detallados(id_usuario: int, id_rol: int) -> Iterator[dict]:
+    db = SessionLocal()
+    try:
+        for e in _query_eventos(db, id_usuario, id_rol):
+            yield {
+                "id": e.id_evento,
+                "nombre": e.nombre_evento,
+                "fecha": e.fecha_evento.strftime('%d/%m/%Y') if e.fecha_evento else "Sin fecha",
+                "tipo": e.tipo_nombre,
+                "reservas": e.pendientes + e.confirmadas + e.canceladas + e.expiradas,
+                "estado": e.id_estado,
+            }
+    finally:
+        db.close()
+
+
+def filas_detalle_recaudacion(id_usuario: int, id_rol: int) -> Iterator[dict]:
+    db = SessionLocal()
+    try:
+        for e in _query_eventos(db, id_usuario, id_rol):
+            yield {
+                "id_evento": e.id_evento,
+                "nombre_evento": e.nombre_evento,
+                "monto": round(float(e.costo_participacion or 0) * e.confirmadas, 2),
+                "inscriptos_confirmados": e.confirmadas,
+                "cupo_maximo": e.cupo_maximo,
+            }
+    finally:
+        db.close()
+
+
+def filas_usuarios_nuevos(id_usuario: int, id_rol: int) -> Iterator[dict]:
+    """Usuarios registrados en el año actual (mismo criterio que el reporte sin filtros)."""
+    db = SessionLocal()
+    try:
+        inscripciones = (
+            db.query(ReservaEvento.id_usuario, func.count(ReservaEvento.id_reserva).label("cantidad"))
+            .filter(ReservaEvento.id_estado_reserva == 2)
+            .group_by(ReservaEvento.id_usuario)
+            .subquery()
+        )
+        eventos = (
+            db.query(Evento.id_usuario, func.count(Evento.id_evento).label("cantidad"))
+            .group_by(Evento.id_usuario)
+            .subquery()
+        )
+        query = (
+            db.query(
+                Usuario.id_usuario, Usuario.nombre_y_apellido, Usuario.email, Usuario.id_rol, Usuario.fecha_creacion,
+                func.coalesce(inscripciones.c.cantidad, 0).label("cantidad_inscripciones"),
+                func.coalesce(eventos.c.cantidad, 0).label("cantidad_eventos_creados"),
+            )
+            .outerjoin(inscripciones, inscripciones.c.id_usuario == Usuario.id_usuario)
+            .outerjoin(eventos, eventos.c.id_usuario == Usuario.id_usuario)
+            .filter(Usuario.id_rol.in_([1, 2, 3, 4]))
+            .filter(Usuario.fecha_creacion >= f"{datetime.now().year}-01-01 00:00:00")
+            .order_by(Usuario.id_usuario)
+            .yield_per(TAMANIO_LOTE)
+        )
+        for u in query:
+            yield {
+                "id": u.id_usuario,
+                "nombre": u.nombre_y_apellido,
+                "email": u.email or 'Sin Email',
+                "rol": MAPA_ROLES.get(u.id_rol, "Desconocido"),
+                "fecha_creacion": u.fecha_creacion.strftime('%d/%m/%Y') if u.fecha_creacion else "Sin fecha",
+                "cantidad_inscripciones": u.cantidad_inscripciones,
+                "cantidad_eventos_creados": u.cantidad_eventos_creados,
+            }
+    finally:
+        db.close()
+
+
+# tipo de exportación -> generador de filas (id_usuario, id_rol)
+FUENTES_STREAMING = {
+    "lista_eventos_detallada": filas_eventos_detallados,
+    "detalle_recaudacion": filas_detalle_recaudacion,
+    "usuarios_nuevos": filas_usuarios_nuevos,
+}
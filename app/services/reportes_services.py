@@ -1,663 +1,645 @@
+import calendar
+import time
 from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Optional
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case, text
+from sqlalchemy import and_, func, or_
+from app.core.cache import CacheLRU, versiones
+from app.core.ubicacion import normalizar_ubicacion
 from app.models.eliminacion_models import EliminacionEvento
 from app.models.auth_models import Usuario, Rol
 from app.models.evento_solicitud_models import EstadoSolicitud, SolicitudPublicacion
 from app.models.registro_models import Evento, TipoEvento, NivelDificultad
 from app.models.inscripcion_models import EstadoReserva, ReservaEvento
-from datetime import datetime
-import calendar
-
-class ReporteService:
-
-    @staticmethod
-    def _get_mis_estadisticas(db: Session, id_usuario: int, id_rol: int):
-        query_total = db.query(func.count(Evento.id_evento))
-        query_estados = db.query(Evento.id_estado, func.count(Evento.id_evento)).group_by(Evento.id_estado)
-
-        # Si NO es admin(1) ni supervisor(2), filtramos solo por su usuario
-        if id_rol > 2:
-            query_total = query_total.filter(Evento.id_usuario == id_usuario)
-            query_estados = query_estados.filter(Evento.id_usuario == id_usuario)
-
-        total = query_total.scalar()
-        res_estados = query_estados.all()
-        por_estado = [{"estado": e, "cantidad": c} for e, c in res_estados]
-
-        return {
-            "mis_eventos_total": total,
-            "mis_eventos_por_estado": por_estado
-        }
-
-    @staticmethod
-    def _extraer_provincia(ubicacion_completa: str) -> str:
-        if not ubicacion_completa:
-            return "Sin Provincia"
-        partes = [p.strip() for p in ubicacion_completa.split(',')]
-        for parte in partes:
-            if "Provincia de" in parte:
-                return parte.replace("Provincia de", "").strip().title()
-            if "Province of" in parte:
-                return parte.replace("Province of", "").strip().title()
-        if len(partes) >= 3:
-            candidata = partes[-3].strip()
-            if not candidata.isdigit() and candidata.lower() != "argentina":
-                return candidata.title()
-        if len(partes) >= 2:
-            return partes[-2].strip().title()
-        return "Sin Provincia"
+from app.models.ocupacion_models import OcupacionEvento
+
+# ═════════════════════════════════════════════════════════════════════════════
+# SNAPSHOT DE REPORTES
+# Carga UNA vez los eventos (con tipo, dificultad, organizador y contadores de
+# reservas de ocupacion_evento) y arma todas las secciones en memoria.
+# Antes cada sección (admin, supervisor, organización) volvía a escanear
+# evento / reserva_evento / usuario con joins parecidos (~25 consultas por carga).
+#
+# Columnas: descripción y motivo de eliminación se traen aparte, solo para los
+# eventos del listado detallado (no para los globales que usan las tendencias).
+# Filas: el listado detallado de admin/supervisor es de TODOS los eventos (igual
+# que la exportación en streaming, reportes_export._query_eventos); solo las
+# secciones sueltas con rango (reportes_admin / reportes_supervisor) acotan.
+# ═════════════════════════════════════════════════════════════════════════════
+
+ESTADOS_ACTIVOS_O_FINALIZADOS = (3, 4)
+MAPA_ROLES = {1: "Administrador", 2: "Supervisor", 3: "Organización Externa", 4: "Cliente"}
+
+# Tablas de las que dependen los reportes: un commit sobre cualquiera invalida la caché.
+# El TTL acota lo que puede quedar viejo en OTROS workers (las versiones son por proceso).
+TABLAS_REPORTES = (
+    "evento", "reserva_evento", "ocupacion_evento", "usuario",
+    "eliminacion_evento", "solicitud_publicacion",
+)
+_cache_reportes = CacheLRU(max_items=128, ttl_segundos=60)
+
+
+def _rango_fechas(anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
+    """
+    Convierte los filtros del front en (desde, hasta) inclusive.
+    Si vienen varios se aplican todos juntos (AND), igual que los filtros SQL de antes.
+    Sin ningún filtro -> año actual (el "escudo anti-colapso").
+    """
+    desde, hasta = [], []
+    try:
+        if fecha_inicio:
+            desde.append(date.fromisoformat(fecha_inicio))
+        if fecha_fin:
+            hasta.append(date.fromisoformat(fecha_fin))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato de fecha inválido. Usar YYYY-MM-DD.")
+
+    if anio and mes:
+        _, ultimo_dia = calendar.monthrange(anio, mes)
+        desde.append(date(anio, mes, 1))
+        hasta.append(date(anio, mes, ultimo_dia))
+    elif anio:
+        desde.append(date(anio, 1, 1))
+        hasta.append(date(anio, 12, 31))
+
+    if not desde and not hasta:
+        anio_actual = datetime.now().year
+        desde.append(date(anio_actual, 1, 1))
+        hasta.append(date(anio_actual, 12, 31))
+
+    return (max(desde) if desde else None, min(hasta) if hasta else None)
+
+
+def _filtro_rango(rango):
+    """Condición SQL sobre fecha_evento (índice idx_evento_fecha) equivalente a _en_rango."""
+    desde, hasta = rango
+    condiciones = []
+    if desde:
+        condiciones.append(Evento.fecha_evento >= desde)
+    if hasta:
+        condiciones.append(Evento.fecha_evento <= hasta)
+    return and_(*condiciones)
+
+
+def _en_rango(fecha, rango) -> bool:
+    desde, hasta = rango
+    if fecha is None:
+        return False
+    if desde and fecha < desde:
+        return False
+    if hasta and fecha > hasta:
+        return False
+    return True
+
+
+def _armar_tendencias(eventos, detalle_evento) -> list:
+    """Agrupa eventos por provincia -> localidad. detalle_evento(e) arma cada item de la lista."""
+    tendencias_dict: dict = {}
+    for e in eventos:
+        # Columnas precalculadas; solo se parsea si el evento todavía no pasó por el backfill
+        prov, loc = (e.provincia, e.localidad) if e.localidad is not None else normalizar_ubicacion(e.ubicacion)
+
+        if prov not in tendencias_dict:
+            tendencias_dict[prov] = {"provincia": prov, "total_eventos": 0, "localidades": {}}
+        if loc not in tendencias_dict[prov]["localidades"]:
+            tendencias_dict[prov]["localidades"][loc] = {"localidad": loc, "cantidad": 0, "eventos": []}
+
+        tendencias_dict[prov]["localidades"][loc]["eventos"].append(detalle_evento(e))
+        tendencias_dict[prov]["localidades"][loc]["cantidad"] += 1
+        tendencias_dict[prov]["total_eventos"] += 1
+
+    tendencias = []
+    for prov_data in tendencias_dict.values():
+        prov_data["localidades"] = list(prov_data["localidades"].values())
+        tendencias.append(prov_data)
+    tendencias.sort(key=lambda x: x["total_eventos"], reverse=True)
+    return tendencias
+
+
+class ReporteSnapshot:
+    """
+    Marco compartido para armar los reportes de UNA request.
+
+    - eventos: filas con los datos del evento + tipo + dificultad + organizador
+      + contadores de reservas (pendientes/confirmadas/canceladas/expiradas).
+    - tiempos: milisegundos por etapa (carga y cada sección), para el header Server-Timing.
+
+    rangos: (desde, hasta) de las secciones que se van a armar (ver _rango_fechas);
+    si se pasan, solo se cargan los eventos con fecha dentro de alguno. Sin rangos,
+    todos (la sección de organización los necesita).
+    id_usuario_propio: si se pasa (organización externa), sus eventos más los
+    publicados/finalizados globales que usan las tendencias.
+    """
+
+    def __init__(self, db: Session, id_usuario_propio: int = None, rangos: tuple = ()):
+        self.db = db
+        self.id_usuario_propio = id_usuario_propio
+        self.rangos = tuple(rangos)
+        self.tiempos: dict = {}
+        self._eventos = None
+        self._eventos_por_id = None
+
+    @contextmanager
+    def medir(self, etapa: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.tiempos[etapa] = self.tiempos.get(etapa, 0.0) + (time.perf_counter() - inicio) * 1000
+
+    def server_timing(self) -> str:
+        """Valor para el header Server-Timing: 'etapa;dur=12.3, otra;dur=4.5'."""
+        return ", ".join(f"{etapa};dur={ms:.1f}" for etapa, ms in self.tiempos.items())
+
+    # ── CARGAS BASE (una sola vez por snapshot) ─────────────────────────────
+
+    @property
+    def eventos(self) -> list:
+        if self._eventos is None:
+            with self.medir("carga_eventos"):
+                query = (
+                    self.db.query(
+                        Evento.id_evento, Evento.nombre_evento, Evento.fecha_evento, Evento.fecha_creacion,
+                        Evento.id_estado, Evento.costo_participacion, Evento.cupo_maximo, Evento.distancia_km,
+                        Evento.ubicacion, Evento.provincia, Evento.localidad, Evento.id_usuario,
+                        TipoEvento.nombre.label("tipo_nombre"),
+                        NivelDificultad.nombre.label("dificultad_nombre"),
+                        Usuario.nombre_y_apellido.label("organizador"),
+                        Usuario.email.label("email_organizador"),
+                        Usuario.id_rol.label("id_rol_creador"),
+                        Rol.nombre_rol,
+                        func.coalesce(OcupacionEvento.pendientes, 0).label("pendientes"),
+                        func.coalesce(OcupacionEvento.confirmadas, 0).label("confirmadas"),
+                        func.coalesce(OcupacionEvento.canceladas, 0).label("canceladas"),
+                        func.coalesce(OcupacionEvento.expiradas, 0).label("expiradas"),
+                    )
+                    .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
+                    .outerjoin(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)
+                    .join(Usuario, Evento.id_usuario == Usuario.id_usuario)
+                    .join(Rol, Usuario.id_rol == Rol.id_rol)
+                    .outerjoin(OcupacionEvento, OcupacionEvento.id_evento == Evento.id_evento)
+                )
+                en_rango = or_(*(_filtro_rango(r) for r in self.rangos)) if self.rangos else None
+                if self.id_usuario_propio is not None:
+                    globales = Evento.id_estado.in_(ESTADOS_ACTIVOS_O_FINALIZADOS)
+                    query = query.filter(or_(
+                        Evento.id_usuario == self.id_usuario_propio,
+                        and_(globales, en_rango) if en_rango is not None else globales
+                    ))
+                elif en_rango is not None:
+                    query = query.filter(en_rango)
+                self._eventos = query.order_by(Evento.fecha_evento.desc(), Evento.id_evento.desc()).all()
+        return self._eventos
+
+    @property
+    def eventos_por_id(self) -> dict:
+        if self._eventos_por_id is None:
+            self._eventos_por_id = {e.id_evento: e for e in self.eventos}
+        return self._eventos_por_id
+
+    def descripciones(self, ids_eventos: Optional[list]) -> dict:
+        """Descripción de los eventos pedidos (solo la usa el listado detallado). None = todos."""
+        if ids_eventos is not None and not ids_eventos:
+            return {}
+        with self.medir("carga_descripciones"):
+            query = self.db.query(Evento.id_evento, Evento.descripcion).filter(Evento.descripcion.isnot(None))
+            if ids_eventos is not None:
+                query = query.filter(Evento.id_evento.in_(ids_eventos))
+            return {id_evento: descripcion for id_evento, descripcion in query.all()}
+
+    def motivos_eliminacion(self, ids_eventos: Optional[list]) -> dict:
+        """Último motivo de eliminación de cada uno de los eventos pedidos. None = todos."""
+        if ids_eventos is not None and not ids_eventos:
+            return {}
+        with self.medir("carga_eliminaciones"):
+            query = self.db.query(EliminacionEvento.id_evento, EliminacionEvento.motivo_eliminacion)
+            if ids_eventos is not None:
+                query = query.filter(EliminacionEvento.id_evento.in_(ids_eventos))
+            filas = query.order_by(EliminacionEvento.id_eliminacion).all()
+        return {id_evento: motivo for id_evento, motivo in filas}
 
     @staticmethod
-    def _extraer_localidad(ubicacion_completa: str) -> str:
-        if not ubicacion_completa:
-            return "Sin Localidad"
-        partes = [p.strip() for p in ubicacion_completa.split(',')]
-        for parte in partes:
-            if "Municipio de" in parte:
-                return parte.replace("Municipio de", "").strip().title()
-        for parte in partes:
-            if "Departamento" in parte:
-                return parte.strip().title()
-        if len(partes) >= 3:
-            return partes[-3].strip().title()
-        return partes[0].strip().title()
+    def _total_reservas(e) -> int:
+        return e.pendientes + e.confirmadas + e.canceladas + e.expiradas
 
-    @staticmethod
-    def reportes_admin(db: Session, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
-        filtros = []
-        
-        # 1. AHORA SÍ RECIBIMOS LAS FECHAS DEL FRONTEND
-        if fecha_inicio:
-            filtros.append(Evento.fecha_evento >= f"{fecha_inicio} 00:00:00")
-        if fecha_fin:
-            filtros.append(Evento.fecha_evento <= f"{fecha_fin} 23:59:59")
-
-        # 2. FILTROS POR AÑO/MES (Por si se usan en otra vista)
-        if anio and mes:
-            _, ultimo_dia = calendar.monthrange(anio, mes)
-            filtros.append(Evento.fecha_evento >= f"{anio}-{mes:02d}-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio}-{mes:02d}-{ultimo_dia} 23:59:59")
-        elif anio:
-            filtros.append(Evento.fecha_evento >= f"{anio}-01-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio}-12-31 23:59:59")
-
-        # 3. EL ESCUDO ANTI-COLAPSO (Si el front manda la petición vacía)
-        if not filtros:
-            anio_actual = datetime.now().year
-            filtros.append(Evento.fecha_evento >= f"{anio_actual}-01-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio_actual}-12-31 23:59:59")
-
-        # -- CONTEOS BÁSICOS ORIGINALES --
-        total_eventos = db.query(func.count(Evento.id_evento)).filter(*filtros).scalar()
-        resultados_estado = db.query(Evento.id_estado, func.count(Evento.id_evento)).filter(*filtros).group_by(Evento.id_estado).all()
-        eventos_por_estado = [{"estado": e, "cantidad": c} for e, c in resultados_estado]
-
-        resultados_usuario = db.query(Evento.id_usuario, func.count(Evento.id_evento)).filter(*filtros).group_by(Evento.id_usuario).all()
-        eventos_por_usuario = [{"usuario": u, "cantidad": c} for u, c in resultados_usuario]
-
-        resultados_mes = db.query(
-            func.extract("year", Evento.fecha_evento).label("anio"),
-            func.extract("month", Evento.fecha_evento).label("mes"),
-            func.count(Evento.id_evento)
-        ).filter(*filtros).group_by("anio", "mes").all()
-        eventos_por_mes = [{"anio": int(a), "mes": int(m), "cantidad": c} for a, m, c in resultados_mes]
-
-        resultados_tipo = (
-            db.query(TipoEvento.nombre, func.count(Evento.id_evento))
-            .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
-            .filter(*filtros).group_by(TipoEvento.nombre).all()
-        )
-        eventos_por_tipo = [{"tipo": n, "cantidad": c} for n, c in resultados_tipo]
+    # ── SECCIÓN ADMIN ───────────────────────────────────────────────────────
 
-        resultados_dificultad = (
-            db.query(NivelDificultad.nombre, func.count(Evento.id_evento))
-            .join(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)
-            .filter(*filtros).group_by(NivelDificultad.nombre).all()
-        )
-        eventos_por_dificultad = [{"dificultad": n, "cantidad": c} for n, c in resultados_dificultad]
+    def seccion_admin(self, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None) -> dict:
+        rango = _rango_fechas(anio, mes, fecha_inicio, fecha_fin)
+        eventos = [e for e in self.eventos if _en_rango(e.fecha_evento, rango)]
 
-        usuarios_total = db.query(func.count(Usuario.id_usuario)).scalar()
-        resultados_roles = db.query(Usuario.id_rol, func.count(Usuario.id_usuario)).group_by(Usuario.id_rol).all()
-        usuarios_por_rol = [{"rol": r, "cantidad": c} for r, c in resultados_roles]
+        with self.medir("admin_conteos"):
+            por_estado = Counter(e.id_estado for e in eventos)
+            por_usuario = Counter(e.id_usuario for e in eventos)
+            por_mes = Counter((e.fecha_evento.year, e.fecha_evento.month) for e in eventos)
+            por_tipo = Counter(e.tipo_nombre for e in eventos)
+            por_dificultad = Counter(e.dificultad_nombre for e in eventos if e.dificultad_nombre)
 
-        ubicaciones_crudas = db.query(Evento.ubicacion).filter(*filtros).all()
-        lista_lugares = [ReporteService._extraer_localidad(u[0]) for u in ubicaciones_crudas if u[0]]
-        conteo = Counter(lista_lugares)
-        eventos_por_ubicacion = [{"ubicacion": lugar, "cantidad": cantidad} for lugar, cantidad in conteo.most_common(10)]
+            resultados_roles = self.db.query(Usuario.id_rol, func.count(Usuario.id_usuario)).group_by(Usuario.id_rol).all()
+            usuarios_por_rol = [{"rol": r, "cantidad": c} for r, c in resultados_roles]
 
-        # ═════════════════════════════════════════════════════════════════════
-        # -- NUEVA LÓGICA AGREGADA PARA LOS REQUERIMIENTOS 1 AL 5 DEL ADMIN --
-        # ═════════════════════════════════════════════════════════════════════
+        with self.medir("admin_ubicacion"):
+            conteo_lugares = self._eventos_por_localidad(rango, eventos)
 
         # 1 y 2. Lista Detallada (Propios y Externos) y Recaudación
-        
-        # A. Traemos TODAS las métricas de reservas en una sola consulta ultra rápida
-        reservas_stats = (
-            db.query(
-                ReservaEvento.id_evento,
-                func.sum(case((ReservaEvento.id_estado_reserva == 2, 1), else_=0)).label("confirmadas"),
-                func.count(ReservaEvento.id_reserva).label("total_reservas")
+        with self.medir("admin_recaudacion"):
+            lista_eventos_detallada = []
+            total_recaudado = 0.0
+            total_reservas_recibidas = 0
+
+            for e in eventos:
+                confirmadas = e.confirmadas
+                total_reservas = self._total_reservas(e)
+
+                costo = float(e.costo_participacion or 0)
+                monto_evento = costo * confirmadas
+                total_recaudado += monto_evento
+                total_reservas_recibidas += total_reservas
+
+                lista_eventos_detallada.append({
+                    "id": e.id_evento,
+                    "nombre": e.nombre_evento,
+                    "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
+                    "estado": e.id_estado,
+                    "tipo": e.tipo_nombre,
+                    "dificultad": e.dificultad_nombre or "Sin Dificultad",
+                    "pertenencia": "Propio" if e.id_rol_creador in [1, 2] else "Externo",
+                    "organizador": e.organizador,
+                    "reservas_totales": total_reservas,
+                    "inscripciones_confirmadas": confirmadas,
+                    "cupo_maximo": e.cupo_maximo,
+                    "costo_participacion": costo,
+                    "monto_recaudado": round(monto_evento, 2),
+                    "ubicacion": e.ubicacion,
+                    "distancia_km": float(e.distancia_km or 0),
+                })
+
+            # 4. Top 10 Recaudación
+            recaudacion_por_evento = sorted(
+                [ev for ev in lista_eventos_detallada if ev["estado"] in ESTADOS_ACTIVOS_O_FINALIZADOS],
+                key=lambda x: x["monto_recaudado"],
+                reverse=True
             )
-            .join(Evento, ReservaEvento.id_evento == Evento.id_evento) # <-- Agregamos esto
-            .filter(*filtros) # <-- AGREGAMOS LOS FILTROS ACÁ
-            .group_by(ReservaEvento.id_evento)
-            .all()
-        )
-        
-        # Armamos un diccionario para buscar rápido
-        reservas_map = {
-            row.id_evento: {
-                "confirmadas": int(row.confirmadas or 0),
-                "total": int(row.total_reservas or 0)
-            } for row in reservas_stats
-        }
 
-        # B. Eventos limpios, SIN outerjoin a reservas y SIN group_by (esto vuela en la BD)
-        eventos_query = (
-            db.query(
-                Evento,
-                TipoEvento.nombre.label("tipo_nombre"),
-                NivelDificultad.nombre.label("dificultad_nombre"),
-                Usuario.id_rol,
-                Usuario.nombre_y_apellido.label("organizador")
+        # 3. Tendencias por Ubicación (Con pertenencia)
+        with self.medir("admin_tendencias"):
+            detalle_por_id = {ev["id"]: ev for ev in lista_eventos_detallada}
+            tendencias_ubicacion = _armar_tendencias(
+                [e for e in eventos if e.id_estado in ESTADOS_ACTIVOS_O_FINALIZADOS],
+                lambda e: detalle_por_id[e.id_evento]
             )
-            .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
-            .outerjoin(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad)
-            .join(Usuario, Evento.id_usuario == Usuario.id_usuario)
-            .filter(*filtros)
-            # Como ya no unimos reservas, el group_by ya no es necesario
-            .order_by(Evento.fecha_evento.desc())
-            .all()
-        )
 
-        lista_eventos_detallada = []
-        total_recaudado = 0.0
-        total_reservas_recibidas = 0
-
-        # C. Armamos la lista y buscamos las reservas en el diccionario de Python
-        for e, tipo_nombre, dificultad_nombre, id_rol, organizador in eventos_query:
-            
-            # Buscamos las estadísticas de este evento en el mapa (instantáneo)
-            stats = reservas_map.get(e.id_evento, {"confirmadas": 0, "total": 0})
-            confirmadas = stats["confirmadas"]
-            total_reservas = stats["total"]
-            
-            costo = float(e.costo_participacion or 0)
-            monto_evento = costo * confirmadas
-            total_recaudado += monto_evento
-            total_reservas_recibidas += total_reservas
-            
-            pertenencia = "Propio" if id_rol in [1, 2] else "Externo"
-
-            lista_eventos_detallada.append({
-                "id": e.id_evento,
-                "nombre": e.nombre_evento,
-                "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
-                "estado": e.id_estado,
-                "tipo": tipo_nombre,
-                "dificultad": dificultad_nombre or "Sin Dificultad",
-                "pertenencia": pertenencia,
-                "organizador": organizador,
-                "reservas_totales": total_reservas,
-                "inscripciones_confirmadas": confirmadas,
-                "cupo_maximo": e.cupo_maximo,
-                "costo_participacion": costo,
-                "monto_recaudado": round(monto_evento, 2),
-                "ubicacion": e.ubicacion,
-                "distancia_km": float(e.distancia_km or 0),
-            })
+        with self.medir("admin_usuarios_nuevos"):
+            usuarios_nuevos = self._usuarios_nuevos(anio, mes, fecha_inicio, fecha_fin)
 
-        # 3. Tendencias por Ubicación (Con pertenencia)
-        tendencias_dict = {}
-        for ev in lista_eventos_detallada:
-            if ev["estado"] not in [3, 4]: 
-                continue
-            prov = ReporteService._extraer_provincia(ev["ubicacion"]).strip().title()
-            loc = ReporteService._extraer_localidad(ev["ubicacion"]).strip().title()
-
-            if prov not in tendencias_dict:
-                tendencias_dict[prov] = {"provincia": prov, "total_eventos": 0, "localidades": {}}
-            if loc not in tendencias_dict[prov]["localidades"]:
-                tendencias_dict[prov]["localidades"][loc] = {"localidad": loc, "cantidad": 0, "eventos": []}
-
-            tendencias_dict[prov]["localidades"][loc]["eventos"].append(ev)
-            tendencias_dict[prov]["localidades"][loc]["cantidad"] += 1
-            tendencias_dict[prov]["total_eventos"] += 1
-
-        tendencias_ubicacion = []
-        for prov_data in tendencias_dict.values():
-            prov_data["localidades"] = list(prov_data["localidades"].values())
-            tendencias_ubicacion.append(prov_data)
-        tendencias_ubicacion.sort(key=lambda x: x["total_eventos"], reverse=True)
-
-        # 4. Top 10 Recaudación
-        recaudacion_por_evento = sorted(
-            [e for e in lista_eventos_detallada if e["estado"] in [3, 4]], 
-            key=lambda x: x["monto_recaudado"], 
-            reverse=True
-        )
+        return {
+            "total_eventos": len(eventos),
+            "eventos_por_tipo": [{"tipo": n, "cantidad": c} for n, c in por_tipo.items()],
+            "eventos_por_dificultad": [{"dificultad": n, "cantidad": c} for n, c in por_dificultad.items()],
+            "eventos_por_estado": [{"estado": e, "cantidad": c} for e, c in sorted(por_estado.items())],
+            "eventos_por_usuario": [{"usuario": u, "cantidad": c} for u, c in sorted(por_usuario.items())],
+            "eventos_por_mes": [{"anio": a, "mes": m, "cantidad": c} for (a, m), c in sorted(por_mes.items())],
+            "usuarios_total": sum(r["cantidad"] for r in usuarios_por_rol),
+            "usuarios_por_rol": usuarios_por_rol,
+            "eventos_por_ubicacion": [{"ubicacion": lugar, "cantidad": c} for lugar, c in conteo_lugares.most_common(10)],
 
-       # ═════════════════════════════════════════════════════════════════════
-        # 5. Usuarios Nuevos (VERDADERAMENTE OPTIMIZADO)
-        # ═════════════════════════════════════════════════════════════════════
-        
+            # -- DATOS NUEVOS PARA LOS REQUERIMIENTOS FRONTEND --
+            "lista_eventos_detallada": lista_eventos_detallada,
+            "recaudacion_total": round(total_recaudado, 2),
+            "total_reservas_recibidas": total_reservas_recibidas,
+            "tendencias_ubicacion_completa": tendencias_ubicacion,
+            "top_10_recaudacion": recaudacion_por_evento, # Mantenemos el nombre de la clave para no romper el front, pero con la lista completa
+            "usuarios_nuevos": usuarios_nuevos
+        }
+
+    def _eventos_por_localidad(self, rango, eventos) -> Counter:
+        """GROUP BY sobre la columna localidad (índice idx_evento_provincia_localidad)."""
+        desde, hasta = rango
+        query = self.db.query(Evento.localidad, func.count(Evento.id_evento)).filter(Evento.ubicacion != "")
+        if desde:
+            query = query.filter(Evento.fecha_evento >= desde)
+        if hasta:
+            query = query.filter(Evento.fecha_evento <= hasta)
+        filas = query.group_by(Evento.localidad).order_by(func.count(Evento.id_evento).desc(), Evento.localidad).all()
+
+        conteo = Counter({localidad: cantidad for localidad, cantidad in filas if localidad is not None})
+        # Eventos sin backfill (localidad NULL): se parsean solo esos
+        if any(localidad is None for localidad, _ in filas):
+            conteo.update(normalizar_ubicacion(e.ubicacion)[1] for e in eventos if e.localidad is None and e.ubicacion)
+        return conteo
+
+    def _usuarios_nuevos(self, anio, mes, fecha_inicio, fecha_fin) -> list:
         # A. Traemos SOLO los usuarios registrados en el rango de fechas
-        query_usuarios = db.query(Usuario).filter(Usuario.id_rol.in_([1, 2, 3, 4]))
-        
-        # Usamos fecha_registro o fecha_creacion según como se llame en tu modelo
-        col_fecha_user = getattr(Usuario, 'fecha_registro', getattr(Usuario, 'fecha_creacion', None))
-        
-        if col_fecha_user:
-            if fecha_inicio:
-                query_usuarios = query_usuarios.filter(col_fecha_user >= f"{fecha_inicio} 00:00:00")
-            if fecha_fin:
-                query_usuarios = query_usuarios.filter(col_fecha_user <= f"{fecha_fin} 23:59:59")
-            # El escudo: si no hay fechas, traemos los de este año
-            elif not fecha_inicio and not fecha_fin and not anio and not mes:
-                query_usuarios = query_usuarios.filter(col_fecha_user >= f"{datetime.now().year}-01-01 00:00:00")
+        query_usuarios = self.db.query(
+            Usuario.id_usuario, Usuario.nombre_y_apellido, Usuario.email, Usuario.id_rol, Usuario.fecha_creacion
+        ).filter(Usuario.id_rol.in_([1, 2, 3, 4]))
 
-        usuarios_nuevos_query = query_usuarios.all()
+        if fecha_inicio:
+            query_usuarios = query_usuarios.filter(Usuario.fecha_creacion >= f"{fecha_inicio} 00:00:00")
+        if fecha_fin:
+            query_usuarios = query_usuarios.filter(Usuario.fecha_creacion <= f"{fecha_fin} 23:59:59")
+        # El escudo: si no hay fechas, traemos los de este año
+        elif not fecha_inicio and not fecha_fin and not anio and not mes:
+            query_usuarios = query_usuarios.filter(Usuario.fecha_creacion >= f"{datetime.now().year}-01-01 00:00:00")
 
-        # B. Sacamos los IDs de esos poquitos usuarios
-        ids_usuarios = [u.id_usuario for u in usuarios_nuevos_query]
+        usuarios = query_usuarios.all()
+        ids_usuarios = [u.id_usuario for u in usuarios]
 
-        dict_reservas = {}
-        dict_eventos = {}
+        dict_reservas: dict = {}
+        dict_eventos: dict = {}
 
-        # C. SOLO buscamos reservas y eventos si encontramos usuarios nuevos
+        # B. Solo las reservas confirmadas y los eventos creados de esos usuarios
         if ids_usuarios:
-            reservas_crudas = (
-                db.query(ReservaEvento.id_usuario, Evento.nombre_evento, Evento.fecha_evento)
+            reservas = (
+                self.db.query(ReservaEvento.id_usuario, Evento.nombre_evento, Evento.fecha_evento)
                 .join(Evento, ReservaEvento.id_evento == Evento.id_evento)
                 .filter(ReservaEvento.id_estado_reserva == 2)
-                .filter(ReservaEvento.id_usuario.in_(ids_usuarios)) # <-- ¡LA MAGIA ESTÁ ACÁ!
+                .filter(ReservaEvento.id_usuario.in_(ids_usuarios))
                 .all()
             )
-            
-            for r in reservas_crudas:
+            for r in reservas:
                 dict_reservas.setdefault(r.id_usuario, []).append({
-                    "evento": r.nombre_evento, 
+                    "evento": r.nombre_evento,
                     "fecha": r.fecha_evento.strftime('%d/%m/%Y') if r.fecha_evento else ""
                 })
 
-            eventos_creados_crudos = (
-                db.query(Evento.id_usuario, Evento.nombre_evento, Evento.fecha_evento)
-                .filter(Evento.id_usuario.in_(ids_usuarios)) # <-- ¡Y ACÁ!
+            # Todos sus eventos, no solo los del rango: consulta aparte (el snapshot trae el rango)
+            creados = (
+                self.db.query(Evento.id_usuario, Evento.nombre_evento, Evento.fecha_evento)
+                .filter(Evento.id_usuario.in_(ids_usuarios))
+                .order_by(Evento.fecha_evento.desc(), Evento.id_evento.desc())
                 .all()
             )
-            
-            for e in eventos_creados_crudos:
+            for e in creados:
                 dict_eventos.setdefault(e.id_usuario, []).append({
-                    "evento": e.nombre_evento, 
+                    "evento": e.nombre_evento,
                     "fecha": e.fecha_evento.strftime('%d/%m/%Y') if e.fecha_evento else ""
                 })
 
-        # D. Armamos la lista final rapidísimo
         usuarios_nuevos = []
-        mapa_roles = { 1: "Administrador", 2: "Supervisor", 3: "Organización Externa", 4: "Cliente" }
-
-        for u in usuarios_nuevos_query:
-            fecha_creacion = getattr(u, 'fecha_creacion', None) or getattr(u, 'fecha_registro', None)
-            
+        for u in usuarios:
             insc_list = dict_reservas.get(u.id_usuario, [])
             ev_list = dict_eventos.get(u.id_usuario, [])
-
             usuarios_nuevos.append({
                 "id": u.id_usuario,
                 "nombre": u.nombre_y_apellido,
-                "email": getattr(u, 'email', 'Sin Email'),
-                "rol": mapa_roles.get(u.id_rol, "Desconocido"), 
-                "fecha_creacion": fecha_creacion.strftime('%d/%m/%Y') if fecha_creacion else "Sin fecha",
+                "email": u.email or 'Sin Email',
+                "rol": MAPA_ROLES.get(u.id_rol, "Desconocido"),
+                "fecha_creacion": u.fecha_creacion.strftime('%d/%m/%Y') if u.fecha_creacion else "Sin fecha",
                 "inscripciones": insc_list,
                 "cantidad_inscripciones": len(insc_list),
                 "eventos_creados": ev_list,
                 "cantidad_eventos_creados": len(ev_list)
             })
+        return usuarios_nuevos
+
+    # ── SECCIÓN SUPERVISOR ──────────────────────────────────────────────────
+
+    def seccion_supervisor(self, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None) -> dict:
+        rango = _rango_fechas(anio, mes, fecha_inicio, fecha_fin)
+
+        with self.medir("supervisor_ocupacion"):
+            org_dict = {}
+            top_ocupacion = []
+            dashboard_eventos = []
+
+            for e in self.eventos:
+                if e.id_estado not in (3, 4, 5) or not _en_rango(e.fecha_evento, rango):
+                    continue
+                uid = e.id_usuario
+
+                # --- A. Organizadores ---
+                if uid not in org_dict:
+                    org_dict[uid] = {
+                        "id_usuario": uid, "organizador": e.organizador,
+                        "email": e.email_organizador, "rol": e.nombre_rol,
+                        "total_eventos": 0, "activos": 0, "finalizados": 0, "recaudacion_total": 0.0
+                    }
+                org_dict[uid]["total_eventos"] += 1
+                if e.id_estado == 3: org_dict[uid]["activos"] += 1
+                elif e.id_estado == 4: org_dict[uid]["finalizados"] += 1
+                org_dict[uid]["recaudacion_total"] += (e.confirmadas * float(e.costo_participacion or 0))
+
+                # --- B. Dashboard Sistema ---
+                estado_str = "Activo" if e.id_estado == 3 else ("Finalizado" if e.id_estado == 4 else "Cancelado")
+                pertenencia = "Propio" if e.id_rol_creador in [1, 2] else "Externo"
+                dashboard_eventos.append({
+                    "id_evento": e.id_evento,
+                    "nombre_evento": e.nombre_evento,
+                    "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
+                    "responsable": e.organizador,
+                    "estado": estado_str,
+                    "pertenencia": pertenencia
+                })
+
+                # --- C. Ocupación ---
+                if e.cupo_maximo > 0 and e.id_estado in ESTADOS_ACTIVOS_O_FINALIZADOS:
+                    total_ocupado = e.confirmadas + e.pendientes
+                    cupo = int(e.cupo_maximo)
+                    tasa = (total_ocupado / cupo * 100) if cupo > 0 else 0
+                    top_ocupacion.append({
+                        "id_evento": e.id_evento,
+                        "nombre_evento": e.nombre_evento,
+                        "fecha_evento": e.fecha_evento.isoformat() if e.fecha_evento else None,
+                        "cupo_maximo": cupo,
+                        "inscriptos_pagos": e.confirmadas,
+                        "reservados_no_pagos": e.pendientes,
+                        "total_ocupado": total_ocupado,
+                        "tasa_ocupacion": round(tasa, 2),
+                        "es_pago": float(e.costo_participacion or 0) > 0,
+                        "pertenencia": pertenencia
+                    })
+
+            analisis_organizadores = list(org_dict.values())
+            analisis_organizadores.sort(key=lambda x: x["recaudacion_total"], reverse=True)
+            top_ocupacion.sort(key=lambda x: x["tasa_ocupacion"], reverse=True)
+
+        # ── Solicitudes Externas (no depende de los eventos) ──
+        with self.medir("supervisor_solicitudes"):
+            resultados_solicitudes = (
+                self.db.query(EstadoSolicitud.nombre, func.count(SolicitudPublicacion.id_solicitud))
+                .join(SolicitudPublicacion, EstadoSolicitud.id_estado_solicitud == SolicitudPublicacion.id_estado_solicitud)
+                .group_by(EstadoSolicitud.nombre).all()
+            )
 
         return {
-            "total_eventos": total_eventos,
-            "eventos_por_tipo": eventos_por_tipo,
-            "eventos_por_dificultad": eventos_por_dificultad,
-            "eventos_por_estado": eventos_por_estado,
-            "eventos_por_usuario": eventos_por_usuario,
-            "eventos_por_mes": eventos_por_mes,
-            "usuarios_total": usuarios_total,
-            "usuarios_por_rol": usuarios_por_rol,
-            "eventos_por_ubicacion": eventos_por_ubicacion,
-            
-            # -- DATOS NUEVOS PARA LOS REQUERIMIENTOS FRONTEND --
-            "lista_eventos_detallada": lista_eventos_detallada,
-            "recaudacion_total": round(total_recaudado, 2),
-            "total_reservas_recibidas": total_reservas_recibidas,
-            "tendencias_ubicacion_completa": tendencias_ubicacion,
-            "top_10_recaudacion": recaudacion_por_evento, # Mantenemos el nombre de la clave para no romper el front, pero con la lista completa
-            "usuarios_nuevos": usuarios_nuevos
+            "analisis_organizadores": analisis_organizadores,
+            "top_ocupacion": top_ocupacion,
+            "dashboard_eventos": dashboard_eventos,
+            "solicitudes_externas": [{"estado": n, "cantidad": c} for n, c in resultados_solicitudes]
         }
 
-    @staticmethod
-    def reportes_supervisor(db: Session, id_usuario: int, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
-        filtros = []
-        
-        # ── 1. FILTROS VIEJOS (OPTIMIZADOS SIN FUNC.EXTRACT) ──
-        if anio and mes:
-            _, ultimo_dia = calendar.monthrange(anio, mes)
-            filtros.append(Evento.fecha_evento >= f"{anio}-{mes:02d}-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio}-{mes:02d}-{ultimo_dia} 23:59:59")
-        elif anio:
-            filtros.append(Evento.fecha_evento >= f"{anio}-01-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio}-12-31 23:59:59")
-            
-        # ── 2. FILTROS DE FECHA EXACTA (Front-end actual) ──
-        if fecha_inicio:
-            filtros.append(Evento.fecha_evento >= f"{fecha_inicio} 00:00:00")
-        if fecha_fin:
-            filtros.append(Evento.fecha_evento <= f"{fecha_fin} 23:59:59")
-
-        # ── 3. EL ESCUDO ANTI-COLAPSO ──
-        # Si el front no mandó ninguna fecha (petición reportes/ vacía), 
-        # forzamos el año actual para que la DB no escanee millones de registros.
-        if not filtros:
-            anio_actual = datetime.now().year
-            filtros.append(Evento.fecha_evento >= f"{anio_actual}-01-01 00:00:00")
-            filtros.append(Evento.fecha_evento <= f"{anio_actual}-12-31 23:59:59")
-
-        # ── 1. UNIFICAMOS LAS CONSULTAS ──
-        # Traemos TODOS los datos necesarios de una sola vez
-        eventos_base = (
-            db.query(
-                Evento.id_evento, Evento.nombre_evento, Evento.fecha_evento,
-                Evento.cupo_maximo, Evento.costo_participacion, Evento.id_estado,
-                Usuario.id_usuario, Usuario.nombre_y_apellido, Usuario.email, Usuario.id_rol,
-                Rol.nombre_rol
-            )
-            .join(Usuario, Evento.id_usuario == Usuario.id_usuario)
-            .join(Rol, Usuario.id_rol == Rol.id_rol)
-            .filter(Evento.id_estado.in_([3, 4, 5]))
-            .filter(*filtros)
-            .all()
-        )
-
-        # Sacamos los IDs de los eventos que encontramos
-        eventos_ids = [e.id_evento for e in eventos_base]
-
-        # ── 2. MAPA DE RESERVAS (Súper optimizado) ──
-        # Solo buscamos las reservas de los eventos que trajimos arriba
-        reservas_dict = {}
-        if eventos_ids:
-            reservas_agrupadas = (
-                db.query(
-                    ReservaEvento.id_evento,
-                    func.sum(case((ReservaEvento.id_estado_reserva == 2, 1), else_=0)).label("confirmadas"),
-                    func.sum(case((ReservaEvento.id_estado_reserva == 1, 1), else_=0)).label("pendientes")
-                )
-                .filter(ReservaEvento.id_evento.in_(eventos_ids)) # <--- Magia pura: solo los IDs filtrados
-                .group_by(ReservaEvento.id_evento)
-                .all()
-            )
-            reservas_dict = {
-                r.id_evento: {"confirmadas": int(r.confirmadas or 0), "pendientes": int(r.pendientes or 0)} 
-                for r in reservas_agrupadas
-            }
-
-        # ── 3. ARMAMOS LOS 3 REPORTES EN MEMORIA ──
-        org_dict = {}
-        top_ocupacion = []
-        dashboard_eventos = []
-
-        for row in eventos_base:
-            uid = row.id_usuario
-            stats = reservas_dict.get(row.id_evento, {"confirmadas": 0, "pendientes": 0})
-            
-            # --- A. Organizadores ---
-            if uid not in org_dict:
-                org_dict[uid] = {
-                    "id_usuario": uid, "organizador": row.nombre_y_apellido,
-                    "email": row.email, "rol": row.nombre_rol,
-                    "total_eventos": 0, "activos": 0, "finalizados": 0, "recaudacion_total": 0.0
-                }
-            
-            org_dict[uid]["total_eventos"] += 1
-            if row.id_estado == 3: org_dict[uid]["activos"] += 1
-            elif row.id_estado == 4: org_dict[uid]["finalizados"] += 1
-            
-            org_dict[uid]["recaudacion_total"] += (stats["confirmadas"] * float(row.costo_participacion or 0))
-
-            # --- B. Dashboard Sistema ---
-            estado_str = "Activo" if row.id_estado == 3 else ("Finalizado" if row.id_estado == 4 else "Cancelado")
-            pertenencia = "Propio" if row.id_rol in [1, 2] else "Externo"
-            
-            dashboard_eventos.append({
-                "id_evento": row.id_evento,
-                "nombre_evento": row.nombre_evento,
-                "fecha_evento": row.fecha_evento.strftime('%Y-%m-%d') if row.fecha_evento else "Sin fecha",
-                "responsable": row.nombre_y_apellido,
-                "estado": estado_str,
-                "pertenencia": pertenencia
-            })
+    # ── SECCIÓN ORGANIZACIÓN EXTERNA / DETALLADA ────────────────────────────
 
-            # --- C. Ocupación ---
-            if row.cupo_maximo > 0 and row.id_estado in [3, 4]:
-                inscriptos = stats["confirmadas"]
-                reservados = stats["pendientes"]
-                total_ocupado = inscriptos + reservados
-                cupo = int(row.cupo_maximo)
-                tasa = (total_ocupado / cupo * 100) if cupo > 0 else 0
-
-                top_ocupacion.append({
-                    "id_evento": row.id_evento,
-                    "nombre_evento": row.nombre_evento,
-                    "fecha_evento": row.fecha_evento.isoformat() if row.fecha_evento else None,
-                    "cupo_maximo": cupo,
-                    "inscriptos_pagos": inscriptos,
-                    "reservados_no_pagos": reservados,
-                    "total_ocupado": total_ocupado,
-                    "tasa_ocupacion": round(tasa, 2),
-                    "es_pago": float(row.costo_participacion or 0) > 0,
-                    "pertenencia": pertenencia 
+    def seccion_organizacion(self, id_usuario: int, id_rol: int) -> dict:
+        # Rol > 2 (ej: Organizador 3) ve solo lo suyo; Admin (1) y Supervisor (2) ven TODO
+        if id_rol > 2:
+            eventos = [e for e in self.eventos if e.id_usuario == id_usuario]
+        else:
+            eventos = self.eventos
+
+        with self.medir("organizacion_detalle"):
+            # Admin/supervisor sin rangos listan todos: sin IN gigante, se trae todo
+            todos = id_rol <= 2 and not self.rangos and self.id_usuario_propio is None
+            ids_eventos = None if todos else [e.id_evento for e in eventos]
+            motivos = self.motivos_eliminacion(ids_eventos)
+            descripciones = self.descripciones(ids_eventos)
+            por_estado = Counter(e.id_estado for e in eventos)
+            reservas_por_tipo = Counter()
+
+            lista_eventos = []
+            detalle_recaudacion = []
+            total_recaudado = 0.0
+
+            for e in eventos:
+                total_reservas = self._total_reservas(e)
+                reservas_por_tipo[e.tipo_nombre] += total_reservas
+                costo = float(e.costo_participacion or 0)
+                monto_evento = costo * e.confirmadas
+                total_recaudado += monto_evento
+
+                lista_eventos.append({
+                    "id": e.id_evento,
+                    "nombre": e.nombre_evento,
+                    "fecha": e.fecha_evento.strftime('%d/%m/%Y') if e.fecha_evento else "Sin fecha",
+                    "fecha_solicitud": e.fecha_creacion.strftime('%d/%m/%Y') if e.fecha_creacion else "Sin fecha",
+                    "fecha_creacion": e.fecha_creacion.strftime('%d/%m/%Y') if e.fecha_creacion else "Sin fecha",
+                    "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
+                    "estado": e.id_estado,
+                    "estado_evento": e.id_estado,
+                    "tipo": e.tipo_nombre,
+                    "reservas": total_reservas,
+                    "cupo_maximo": e.cupo_maximo,
+                    "costo_participacion": costo,
+                    "distancia_km": float(e.distancia_km or 0),
+                    "descripcion": descripciones.get(e.id_evento) or "",
+                    "ubicacion_completa": e.ubicacion or "",
+                    "motivo": motivos.get(e.id_evento),
+                    "dificultad": e.dificultad_nombre or "Sin Dificultad",
+                    "pertenencia": "Propio" if e.id_rol_creador in [1, 2] else "Externo",
                 })
 
-        # Ordenamos los resultados
-        analisis_organizadores = list(org_dict.values())
-        analisis_organizadores.sort(key=lambda x: x["recaudacion_total"], reverse=True)
-        top_ocupacion.sort(key=lambda x: x["tasa_ocupacion"], reverse=True)
+                # ── Detalle de recaudación: TODOS los eventos (incluye gratuitos) ─────
+                detalle_recaudacion.append({
+                    "id_evento": e.id_evento,
+                    "nombre_evento": e.nombre_evento,
+                    "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
+                    "monto": round(monto_evento, 2),
+                    "monto_unitario": costo,
+                    "inscriptos_count": total_reservas,
+                    "inscriptos_confirmados": e.confirmadas,
+                    "cupo_maximo": e.cupo_maximo,
+                    "estado_evento": e.id_estado,
+                    "tipo": e.tipo_nombre,
+                    "descripcion": descripciones.get(e.id_evento) or "",
+                    "ubicacion_completa": e.ubicacion or "",
+                    "distancia_km": float(e.distancia_km or 0),
+                })
 
-        # ── 4. Solicitudes Externas (Este no lo tocamos) ──
-        resultados_solicitudes = (
-            db.query(EstadoSolicitud.nombre, func.count(SolicitudPublicacion.id_solicitud))
-            .join(SolicitudPublicacion, EstadoSolicitud.id_estado_solicitud == SolicitudPublicacion.id_estado_solicitud)
-            .group_by(EstadoSolicitud.nombre).all()
-        )
-        solicitudes_externas = [{"estado": n, "cantidad": c} for n, c in resultados_solicitudes]
+        # ── Tendencias globales por ubicación (siempre globales, no dependen del rol) ──
+        with self.medir("organizacion_tendencias"):
+            tendencias_ubicacion = _armar_tendencias(
+                [e for e in self.eventos if e.id_estado in ESTADOS_ACTIVOS_O_FINALIZADOS],
+                lambda e: {
+                    "nombre": e.nombre_evento,
+                    "tipo": e.tipo_nombre,
+                    "distancia_km": float(e.distancia_km or 0),
+                    "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
+                    "estado": e.id_estado,
+                }
+            )[:10]
 
         return {
-            "analisis_organizadores": analisis_organizadores,
-            "top_ocupacion": top_ocupacion,
-            "dashboard_eventos": dashboard_eventos,
-            "solicitudes_externas": solicitudes_externas
+            "mis_eventos_total": len(eventos),
+            "mis_eventos_por_estado": [{"estado": e, "cantidad": c} for e, c in sorted(por_estado.items())],
+            "lista_eventos_detallada": lista_eventos,
+            "rendimiento_por_tipo": [{"tipo": n, "cantidad": c} for n, c in reservas_por_tipo.items() if c > 0],
+            "total_reservas_recibidas": sum(ev["reservas"] for ev in lista_eventos),
+            "recaudacion_total": round(total_recaudado, 2),
+            "detalle_recaudacion": detalle_recaudacion,
+            "tendencias_ubicacion": tendencias_ubicacion,
         }
 
+
+class ReporteService:
+
     @staticmethod
-    def reportes_organizacion_externa(db: Session, id_usuario: int, id_rol: int):
-        # 1. Pasamos el rol a las estadísticas base
-        stats_base = ReporteService._get_mis_estadisticas(db, id_usuario, id_rol)
-
-        # ── BASES DE CONSULTA (Sin filtrar por usuario todavía) ──
-        base_eventos_query = (
-            db.query(
-                Evento.id_evento,
-                Evento.nombre_evento,
-                Evento.fecha_evento,
-                Evento.fecha_creacion,
-                Evento.id_estado,
-                Evento.costo_participacion,
-                Evento.cupo_maximo,
-                Evento.distancia_km,
-                Evento.descripcion,
-                Evento.ubicacion,
-                TipoEvento.nombre.label("tipo_nombre"),
-                func.count(ReservaEvento.id_reserva).label("total_reservas"),
-                EliminacionEvento.motivo_eliminacion.label("motivo_eliminacion"),
-                NivelDificultad.nombre.label("dificultad_nombre"), # <--- AGREGADO
-                Usuario.id_rol.label("id_rol_creador")             # <--- AGREGADO
-            )
-            .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
-            .outerjoin(NivelDificultad, Evento.id_dificultad == NivelDificultad.id_dificultad) # <--- AGREGADO
-            .join(Usuario, Evento.id_usuario == Usuario.id_usuario)                            # <--- AGREGADO
-            .outerjoin(ReservaEvento, Evento.id_evento == ReservaEvento.id_evento)
-            .outerjoin(EliminacionEvento, Evento.id_evento == EliminacionEvento.id_evento)
-            .group_by(Evento.id_evento, TipoEvento.nombre, EliminacionEvento.motivo_eliminacion, NivelDificultad.nombre, Usuario.id_rol) # <--- AGREGADO AL GROUP BY
-        )
+    def reportes_admin(db: Session, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None, snapshot: ReporteSnapshot = None):
+        snapshot = snapshot or ReporteSnapshot(db, rangos=[_rango_fechas(anio, mes, fecha_inicio, fecha_fin)])
+        return snapshot.seccion_admin(anio=anio, mes=mes, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
 
-        # ARREGLO 1: Armamos la base sin filtro de Popularidad por tipo
-        base_resultados_tipo = (
-            db.query(TipoEvento.nombre, func.count(ReservaEvento.id_reserva))
-            .join(Evento, Evento.id_tipo == TipoEvento.id_tipo)
-            .outerjoin(ReservaEvento, Evento.id_evento == ReservaEvento.id_evento)
-            .group_by(TipoEvento.nombre)
-        )
+    @staticmethod
+    def reportes_supervisor(db: Session, id_usuario: int, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None, snapshot: ReporteSnapshot = None):
+        snapshot = snapshot or ReporteSnapshot(db, rangos=[_rango_fechas(anio, mes, fecha_inicio, fecha_fin)])
+        return snapshot.seccion_supervisor(anio=anio, mes=mes, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
 
-        # ARREGLO 2: Armamos la base sin filtro de Reservas confirmadas
-        base_confirmadas_subq = (
-            db.query(
-                ReservaEvento.id_evento,
-                func.sum(
-                    case((ReservaEvento.id_estado_reserva == 2, 1), else_=0)
-                ).label("confirmadas"),
-                func.count(ReservaEvento.id_reserva).label("total")
-            )
-            .join(Evento, ReservaEvento.id_evento == Evento.id_evento)
-            .group_by(ReservaEvento.id_evento)
-        )
+    @staticmethod
+    def reportes_organizacion_externa(db: Session, id_usuario: int, id_rol: int, snapshot: ReporteSnapshot = None):
+        snapshot = snapshot or ReporteSnapshot(db, id_usuario_propio=id_usuario if id_rol > 2 else None)
+        return snapshot.seccion_organizacion(id_usuario, id_rol)
 
-        # ── APLICAMOS EL FILTRO CONDICIONAL IGUAL QUE EN EL FRONT ──
-        # Si el rol es mayor a 2 (ej: Organizador 3), filtramos para que vea solo lo suyo.
-        # Si es 1 (Admin) o 2 (Supervisor), se saltan este if y ven TODO.
-        if id_rol > 2:
-            base_eventos_query = base_eventos_query.filter(Evento.id_usuario == id_usuario)
-            base_resultados_tipo = base_resultados_tipo.filter(Evento.id_usuario == id_usuario)
-            base_confirmadas_subq = base_confirmadas_subq.filter(Evento.id_usuario == id_usuario)
-
-        # Ejecutamos las consultas (ahora si son globales para admin/super)
-        eventos_query = base_eventos_query.order_by(Evento.fecha_evento.desc()).all()
-        resultados_tipo = base_resultados_tipo.all()
-        confirmadas_subq = base_confirmadas_subq.all()
-
-        # ── ARMADO DE LISTAS ──
-        lista_eventos = [
-            {
-                "id": e.id_evento,
-                "nombre": e.nombre_evento,
-                "fecha": e.fecha_evento.strftime('%d/%m/%Y') if e.fecha_evento else "Sin fecha",
-                "fecha_solicitud": e.fecha_creacion.strftime('%d/%m/%Y') if e.fecha_creacion else "Sin fecha",
-                "fecha_creacion": e.fecha_creacion.strftime('%d/%m/%Y') if e.fecha_creacion else "Sin fecha",
-                "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
-                "estado": e.id_estado,
-                "estado_evento": e.id_estado,
-                "tipo": e.tipo_nombre,
-                "reservas": e.total_reservas,
-                "cupo_maximo": e.cupo_maximo,
-                "costo_participacion": float(e.costo_participacion or 0),
-                "distancia_km": float(e.distancia_km or 0),
-                "descripcion": e.descripcion or "",
-                "ubicacion_completa": e.ubicacion or "",
-                "motivo": e.motivo_eliminacion,
-                # ✅ ¡AHORA SÍ, LA MAGIA!
-                "dificultad": e.dificultad_nombre or "Sin Dificultad",
-                "pertenencia": "Propio" if e.id_rol_creador in [1, 2] else "Externo",
-            }
-            for e in eventos_query
-        ]
-
-        # Mapeamos los resultados_tipo (que ahora respetan el rol)
-        rendimiento_tipo = [{"tipo": n, "cantidad": c} for n, c in resultados_tipo if c > 0]
-
-        # Mapeamos las confirmadas (que ahora respetan el rol)
-        confirmadas_map: dict = {row.id_evento: {"confirmadas": int(row.confirmadas or 0), "total": int(row.total or 0)} for row in confirmadas_subq}
-
-        # ── Detalle de recaudación: TODOS los eventos (incluye gratuitos) ─────
-        detalle_recaudacion = []
-        total_recaudado = 0.0
-
-        for e in eventos_query:
-            costo = float(e.costo_participacion or 0)
-            stats = confirmadas_map.get(e.id_evento, {"confirmadas": 0, "total": int(e.total_reservas or 0)})
-            inscriptos_confirmados = stats["confirmadas"]
-            inscriptos_count = stats["total"]
-            monto_evento = costo * inscriptos_confirmados
-            total_recaudado += monto_evento
-
-            detalle_recaudacion.append({
-                "id_evento": e.id_evento,
-                "nombre_evento": e.nombre_evento,
-                "fecha_evento": e.fecha_evento.strftime('%Y-%m-%d') if e.fecha_evento else "Sin fecha",
-                "monto": round(monto_evento, 2),
-                "monto_unitario": costo,
-                "inscriptos_count": inscriptos_count,
-                "inscriptos_confirmados": inscriptos_confirmados,
-                "cupo_maximo": e.cupo_maximo,
-                "estado_evento": e.id_estado,
-                "tipo": e.tipo_nombre,
-                "descripcion": e.descripcion or "",
-                "ubicacion_completa": e.ubicacion or "",
-                "distancia_km": float(e.distancia_km or 0),
-            })
+    @staticmethod
+    def reportes_por_rol(db: Session, id_usuario: int, id_rol: int, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
+        """
+        Arma el reporte completo del rol sobre UN snapshot compartido.
+        Devuelve (datos, snapshot) para que el endpoint pueda exponer los tiempos.
+        """
+        if id_rol == 4:
+            snapshot = ReporteSnapshot(db)
+            with snapshot.medir("cliente"):
+                return ReporteService.reportes_cliente(db, id_usuario), snapshot
 
-        # ── Tendencias globales por ubicación (Queda igual, ya era global) ──
-        eventos_globales = (
-            db.query(
-                Evento.nombre_evento,
-                Evento.ubicacion,
-                Evento.fecha_evento,
-                Evento.id_estado,
-                Evento.distancia_km,
-                TipoEvento.nombre.label("tipo_nombre"),
-            )
-            .join(TipoEvento, Evento.id_tipo == TipoEvento.id_tipo)
-            .filter(Evento.id_estado.in_([3, 4]))
-            .all()
-        )
+        if id_rol not in (1, 2, 3):
+            raise HTTPException(status_code=403, detail="Rol no autorizado")
 
-        tendencias_dict: dict = {}
-        for evento in eventos_globales:
-            provincia = ReporteService._extraer_provincia(evento.ubicacion).strip().title()
-            localidad = ReporteService._extraer_localidad(evento.ubicacion).strip().title()
+        # Sin rangos: el listado detallado de la sección de organización es de todos los eventos
+        snapshot = ReporteSnapshot(db, id_usuario_propio=id_usuario if id_rol == 3 else None)
 
-            if provincia not in tendencias_dict:
-                tendencias_dict[provincia] = {"provincia": provincia, "total_eventos": 0, "localidades": {}}
+        if id_rol == 3:
+            return snapshot.seccion_organizacion(id_usuario, id_rol), snapshot
 
-            if localidad not in tendencias_dict[provincia]["localidades"]:
-                tendencias_dict[provincia]["localidades"][localidad] = {
-                    "localidad": localidad, "cantidad": 0, "eventos": []
-                }
+        data_super = snapshot.seccion_supervisor(anio=anio, mes=mes, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
+        data_detallada = snapshot.seccion_organizacion(id_usuario, id_rol)
 
-            tendencias_dict[provincia]["localidades"][localidad]["eventos"].append({
-                "nombre": evento.nombre_evento,
-                "tipo": evento.tipo_nombre,
-                "distancia_km": float(evento.distancia_km or 0),
-                "fecha_evento": evento.fecha_evento.strftime('%Y-%m-%d') if evento.fecha_evento else "Sin fecha",
-                "estado": evento.id_estado,
-            })
-            tendencias_dict[provincia]["localidades"][localidad]["cantidad"] += 1
-            tendencias_dict[provincia]["total_eventos"] += 1
+        if id_rol == 1:
+            # El admin recibe solo año/mes en su sección (igual que antes)
+            data_admin = snapshot.seccion_admin(anio=anio, mes=mes)
+            return {**data_super, **data_admin, **data_detallada}, snapshot
 
-        tendencias_ubicacion = []
-        for prov_data in tendencias_dict.values():
-            prov_data["localidades"] = list(prov_data["localidades"].values())
-            tendencias_ubicacion.append(prov_data)
-        tendencias_ubicacion.sort(key=lambda x: x["total_eventos"], reverse=True)
-        tendencias_ubicacion = tendencias_ubicacion[:10]
+        return {**data_super, **data_detallada}, snapshot
 
-        return {
-            "mis_eventos_total": stats_base["mis_eventos_total"],
-            "mis_eventos_por_estado": stats_base["mis_eventos_por_estado"],
-            "lista_eventos_detallada": lista_eventos,
-            "rendimiento_por_tipo": rendimiento_tipo,
-            "total_reservas_recibidas": sum(e["reservas"] for e in lista_eventos),
-            "recaudacion_total": round(total_recaudado, 2),
-            "detalle_recaudacion": detalle_recaudacion,
-            "tendencias_ubicacion": tendencias_ubicacion,
-        }
+    @staticmethod
+    def obtener_reporte(db: Session, id_usuario: int, id_rol: int, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
+        """
+        reportes_por_rol con caché por (rol, usuario, filtros) + versión de las tablas.
+        El dashboard y las exportaciones CSV comparten el mismo resultado.
+        Devuelve (datos, server_timing). Los datos cacheados NO se deben modificar.
+        """
+        # La versión se lee ANTES de consultar (ver app/core/cache.py)
+        clave = ReporteService._clave_reporte(id_usuario, id_rol, anio, mes, fecha_inicio, fecha_fin)
+
+        inicio = time.perf_counter()
+        datos = _cache_reportes.get(clave)
+        if datos is not None:
+            return datos, f"cache;desc=hit;dur={(time.perf_counter() - inicio) * 1000:.1f}"
+
+        datos, snapshot = ReporteService.reportes_por_rol(
+            db, id_usuario, id_rol, anio=anio, mes=mes, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin
+        )
+        _cache_reportes.set(clave, datos)
+        return datos, "cache;desc=miss, " + snapshot.server_timing()
+
+    @staticmethod
+    def reporte_en_cache(id_usuario: int, id_rol: int, anio: int = None, mes: int = None, fecha_inicio: str = None, fecha_fin: str = None):
+        """El reporte si ya está calculado y vigente; None si habría que calcularlo."""
+        return _cache_reportes.get(ReporteService._clave_reporte(id_usuario, id_rol, anio, mes, fecha_inicio, fecha_fin))
+
+    @staticmethod
+    def _clave_reporte(id_usuario, id_rol, anio, mes, fecha_inicio, fecha_fin) -> tuple:
+        return (id_rol, id_usuario, anio, mes, fecha_inicio, fecha_fin, versiones.get(*TABLAS_REPORTES))
 
     @staticmethod
     def reportes_cliente(db: Session, id_usuario: int):
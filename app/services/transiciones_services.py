@@ -0,0 +1,34 @@
+# app/services/transiciones_services.py
+"""
+Transiciones de estado por tiempo.
+
+Antes los listados (GET /eventos, /eventos/buscar) pasaban a FINALIZADO los
+eventos vencidos en cada request: un UPDATE + commit en el camino de lectura,
+con locks sobre evento en cada visita. Ahora las transiciones corren como
+tareas del planificador (app/services/planificador_services.py) y las lecturas
+no escriben:
+
+  - finalizar_eventos: eventos publicados con fecha pasada      -> Finalizado (4)
+  - expirar_reservas:  reservas pendientes con el plazo vencido -> Expirada (4), liberando cupo
+
+Cada una es una sola transacción. El lease y el historial los pone el planificador.
+"""
+from sqlalchemy.orm import Session
+
+from app.db.crud import inscripcion_crud, registro_crud
+
+
+def finalizar_eventos(db: Session) -> dict:
+    finalizados = registro_crud.finalizar_eventos_vencidos(db)
+    db.commit()
+    if finalizados:
+        print(f"✅ [TRANSICIONES] {finalizados} eventos pasados a FINALIZADO")
+    return {"eventos_finalizados": finalizados}
+
+
+def expirar_reservas(db: Session) -> dict:
+    resultado = inscripcion_crud.expirar_reservas_vencidas(db)
+    db.commit()
+    if resultado["reservas_expiradas"]:
+        print(f"✅ [TRANSICIONES] {resultado['reservas_expiradas']} reservas pasadas a EXPIRADA")
+    return resultado
@@ -0,0 +1,153 @@
+# app/tests/tests.py
+"""
+Tests de los contadores de ocupación (ocupacion_evento), de la
+normalización de ubicaciones y del cubrimiento de geohash para radios.
+
+Corren contra SQLite en memoria, sin Postgres:
+    python -m unittest app.tests.tests
+"""
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import Computed, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Registra todos los modelos (las relaciones se resuelven por nombre)
+from app.models import (  # noqa: F401
+    auth_models, editar_models, eliminacion_models, evento_solicitud_models, inscripcion_models,
+    notificacion_models, ocupacion_models, outbox_models, registro_models, ruta_models,
+    solicitud_edicion_models, suscripcion_models, tarea_models,
+)
+from app.core import geohash
+from app.core.geometria import distancias_km
+from app.core.ubicacion import normalizar_ubicacion
+from app.models.base import Base
+from app.models.registro_models import Evento
+from app.models.inscripcion_models import ReservaEvento
+from app.models.ocupacion_models import OcupacionEvento
+from app.db.crud import inscripcion_crud
+
+
+@compiles(Computed, "sqlite")
+def _computed_sqlite(elemento, compilador, **kw):
+    # fecha_expiracion usa "interval", que SQLite no tiene: acá no se usa
+    return ""
+
+
+PENDIENTE, CONFIRMADA, CANCELADA = 1, 2, 3
+ID_EVENTO = 1
+
+
+class OcupacionSinFilaTest(unittest.TestCase):
+    """
+    Eventos sin fila en ocupacion_evento: registrar_cambio_estado la arma
+    contando las reservas, así que el estado nuevo ya tiene que estar puesto.
+    """
+
+    def setUp(self):
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine, autoflush=False)()
+        self.addCleanup(self.db.close)
+
+    def _reserva(self, estado: int) -> ReservaEvento:
+        # Sin pasar por create_reserva: el evento queda sin fila de ocupación
+        reserva = ReservaEvento(id_evento=ID_EVENTO, id_usuario=1, id_estado_reserva=estado)
+        self.db.add(reserva)
+        self.db.commit()
+        self.assertIsNone(self.db.get(OcupacionEvento, ID_EVENTO))
+        return reserva
+
+    def _ocupacion(self) -> OcupacionEvento:
+        self.db.expire_all()
+        return self.db.get(OcupacionEvento, ID_EVENTO)
+
+    def test_confirmar_pago_sin_fila_cuenta_la_reserva_confirmada(self):
+        reserva = self._reserva(PENDIENTE)
+
+        inscripcion_crud.confirmar_reserva_pago(self.db, reserva)
+
+        ocupacion = self._ocupacion()
+        self.assertEqual((ocupacion.pendientes, ocupacion.confirmadas), (0, 1))
+
+    def test_cambiar_estado_sin_fila_cuenta_el_estado_nuevo(self):
+        reserva = self._reserva(PENDIENTE)
+
+        inscripcion_crud.cambiar_estado_reserva(self.db, reserva, CANCELADA)
+        self.db.commit()
+
+        ocupacion = self._ocupacion()
+        self.assertEqual((ocupacion.pendientes, ocupacion.canceladas), (0, 1))
+
+    def test_confirmar_pago_con_fila_mueve_el_contador(self):
+        reserva = self._reserva(PENDIENTE)
+        self.db.add(OcupacionEvento(id_evento=ID_EVENTO, pendientes=1, confirmadas=0, canceladas=0, expiradas=0))
+        self.db.commit()
+
+        inscripcion_crud.confirmar_reserva_pago(self.db, reserva)
+
+        ocupacion = self._ocupacion()
+        self.assertEqual((ocupacion.pendientes, ocupacion.confirmadas), (0, 1))
+
+
+class UbicacionLargaTest(unittest.TestCase):
+    """
+    ubicacion admite 300 caracteres; provincia y localidad derivadas tienen que
+    entrar en sus columnas (en Postgres, si no, el INSERT falla con "value too long").
+    """
+
+    LARGO_UBICACION = Evento.__table__.c.ubicacion.type.length
+
+    def _assert_entra(self, ubicacion: str):
+        self.assertLessEqual(len(ubicacion), self.LARGO_UBICACION)
+        evento = Evento(ubicacion=ubicacion)
+        self.assertLessEqual(len(evento.provincia), Evento.__table__.c.provincia.type.length)
+        self.assertLessEqual(len(evento.localidad), Evento.__table__.c.localidad.type.length)
+        self.assertEqual((evento.provincia, evento.localidad), normalizar_ubicacion(ubicacion))
+
+    def test_un_solo_segmento_de_300(self):
+        self._assert_entra("a" * self.LARGO_UBICACION)
+
+    def test_segmentos_largos(self):
+        self._assert_entra("A" * 296 + ", X")
+        self._assert_entra("Calle 1, Municipio de " + "B" * 200 + ", Provincia de " + "C" * 60)
+        self._assert_entra("Av. " + "B" * 296)
+
+    def test_title_que_alarga_el_texto(self):
+        # "ß".title() == "Ss": el recorte tiene que ser después del title()
+        self._assert_entra("ß" * self.LARGO_UBICACION)
+
+
+
+class CeldasParaRadioTest(unittest.TestCase):
+    """
+    Todo punto a radio_km o menos tiene que caer en alguna celda de
+    celdas_para_radio: si no, get_eventos_cercanos no lo ve nunca.
+    """
+
+    def _assert_cubierto(self, lat: float, lng: float, radio_km: float, punto_lat: float, punto_lng: float):
+        self.assertLessEqual(distancias_km(lat, lng, [punto_lat], [punto_lng])[0], radio_km)
+        codigo = geohash.codificar(punto_lat, punto_lng)
+        celdas = geohash.celdas_para_radio(lat, lng, radio_km)
+        self.assertTrue(any(codigo.startswith(celda) for celda in celdas), f"{codigo} fuera de {celdas}")
+
+    def test_latitud_alta_usa_el_borde_mas_cercano_al_polo(self):
+        self._assert_cubierto(-83.91, -13.24, 500, -84.91, -59.01)
+        self._assert_cubierto(74.79, -87.91, 2226, 88.45, 21.35)
+
+    def test_circulo_que_toca_el_polo_cubre_todas_las_longitudes(self):
+        self._assert_cubierto(89.7, 118.0, 41, 89.99, -118.6)
+        self._assert_cubierto(-89.96, -169.18, 0.41, -89.9576, -165.64)
+
+    def test_borde_norte_del_radio(self):
+        # Justo en el borde: KM_POR_GRADO_LAT tiene que salir del mismo radio que la haversine
+        radio_km = 100
+        self._assert_cubierto(-34.6, -58.4, radio_km, -34.6 + radio_km / geohash.KM_POR_GRADO_LAT * 0.9999, -58.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,12 @@
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 
 load_dotenv()
@@ -16,28 +23,167 @@ PIE_SEGURIDAD = (
     "Nuestras confirmaciones son solo informativas."
 )
 
+# --- DESPACHO: transporte compartido, pool, límite de tasa y reintentos ---
+# WHATSAPP_TRANSPORTE=stub no llama a Twilio: registra los mensajes en memoria
+# (tests locales y pruebas de carga; WHATSAPP_STUB_LATENCIA_MS simula la red).
+TRANSPORTE = os.getenv("WHATSAPP_TRANSPORTE", "twilio")
+CONCURRENCIA = int(os.getenv("WHATSAPP_CONCURRENCIA", "8"))
+MENSAJES_POR_SEGUNDO = float(os.getenv("WHATSAPP_MENSAJES_POR_SEGUNDO", "20"))  # Por cuenta de Twilio
+MAX_INTENTOS = 3
+ESPERA_BASE_SEGUNDOS = 0.5
+# Errores de Twilio que vale la pena reintentar (el resto, ej: número inválido, no)
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class TransporteTwilio:
+    """Un solo Client con una sesión HTTP con pool de conexiones (antes: un Client por mensaje)."""
+
+    def __init__(self):
+        http_client = TwilioHttpClient(pool_connections=True, timeout=15)
+        http_client.session.mount("https://", HTTPAdapter(pool_maxsize=CONCURRENCIA))
+        self.client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN, http_client=http_client)
+
+    def enviar(self, telefono_destino: str, mensaje: str) -> str:
+        message = self.client.messages.create(
+            from_=TWILIO_NUMBER,
+            body=mensaje,
+            to=f"whatsapp:{telefono_destino}"
+        )
+        return message.sid
+
+
+class TransporteStub:
+    """No envía nada: guarda (telefono, mensaje). Puede simular latencia y fallas."""
+
+    def __init__(self, latencia_segundos: float = None, fallar_cada: int = 0):
+        if latencia_segundos is None:
+            latencia_segundos = float(os.getenv("WHATSAPP_STUB_LATENCIA_MS", "0")) / 1000
+        self.latencia_segundos = latencia_segundos
+        self.fallar_cada = fallar_cada
+        self.enviados = []
+        self._llamadas = 0
+        self._lock = threading.Lock()
+
+    def enviar(self, telefono_destino: str, mensaje: str) -> str:
+        with self._lock:
+            self._llamadas += 1
+            llamada = self._llamadas
+        if self.latencia_segundos:
+            time.sleep(self.latencia_segundos)
+        if self.fallar_cada and llamada % self.fallar_cada == 0:
+            raise TwilioRestException(503, "stub", "Falla simulada")
+        with self._lock:
+            self.enviados.append((telefono_destino, mensaje))
+        return f"STUB{llamada:06d}"
+
+
+class LimitadorTasa:
+    """Token bucket: como mucho `por_segundo` mensajes por segundo (con ráfagas de hasta `rafaga`)."""
+
+    def __init__(self, por_segundo: float, rafaga: int = None):
+        self.por_segundo = por_segundo
+        self.capacidad = float(rafaga or max(1, int(por_segundo)))
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def esperar_turno(self) -> None:
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.por_segundo)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.por_segundo
+            time.sleep(espera)
+
+
+class DespachadorWhatsApp:
+    """
+    Envía mensajes con un pool de threads acotado, respetando el límite de tasa
+    de la cuenta y reintentando con backoff exponencial los errores transitorios.
+    """
+
+    def __init__(self, transporte=None, concurrencia: int = CONCURRENCIA, por_segundo: float = MENSAJES_POR_SEGUNDO):
+        self._transporte = transporte
+        self._concurrencia = concurrencia
+        self._limitador = LimitadorTasa(por_segundo)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def transporte(self):
+        # Se crea al primer uso (importar el módulo no abre conexiones)
+        if self._transporte is None:
+            with self._lock:
+                if self._transporte is None:
+                    self._transporte = TransporteStub() if TRANSPORTE == "stub" else TransporteTwilio()
+        return self._transporte
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._concurrencia, thread_name_prefix="whatsapp")
+        return self._pool
+
+    def enviar(self, telefono_destino: str, mensaje: str) -> bool:
+        """Envío individual (bloqueante) con límite de tasa y reintentos."""
+        if not telefono_destino.startswith('+'):
+            telefono_destino = f"+{telefono_destino}"
+
+        for intento in range(1, MAX_INTENTOS + 1):
+            self._limitador.esperar_turno()
+            try:
+                sid = self.transporte.enviar(telefono_destino, mensaje)
+                print(f"✅ WhatsApp Enviado! SID: {sid}")
+                return True
+            except TwilioRestException as e:
+                if e.status not in ESTADOS_REINTENTABLES or intento == MAX_INTENTOS:
+                    print(f"❌ Error enviando WhatsApp a {telefono_destino}: {e}")
+                    return False
+            except Exception as e:
+                # Errores de red: también se reintentan
+                if intento == MAX_INTENTOS:
+                    print(f"❌ Error enviando WhatsApp a {telefono_destino}: {e}")
+                    return False
+            time.sleep(ESPERA_BASE_SEGUNDOS * (2 ** (intento - 1)) * (1 + random.random() / 2))
+        return False
+
+    def enviar_masivo(self, telefonos, mensaje: str, esperar: bool = False):
+        """
+        Mismo mensaje a varios teléfonos en paralelo (repetidos y vacíos se descartan).
+        esperar=False: vuelve enseguida (los envíos siguen en el pool).
+        esperar=True: bloquea y devuelve {"enviados": n, "fallidos": m}.
+        """
+        destinos = list(dict.fromkeys(str(t) for t in telefonos if t))
+        pool = self._get_pool()
+        futuros = [pool.submit(self.enviar, telefono, mensaje) for telefono in destinos]
+        print(f"📱 {len(futuros)} WhatsApp encolados")
+        if not esperar:
+            return futuros
+
+        resultados = [f.result() for f in futuros]
+        return {"enviados": sum(resultados), "fallidos": len(resultados) - sum(resultados)}
+
+
+# Instancia única del proceso
+despachador = DespachadorWhatsApp()
+
+
 def _ejecutar_envio_whatsapp(telefono_destino: str, mensaje: str):
     """Función interna para disparar el mensaje vía Twilio"""
     print(f"DEBUG - Intentando envío WhatsApp a: {telefono_destino}...")
     
     # Agregamos el pie de seguridad a todos los mensajes
-    mensaje_final = mensaje + PIE_SEGURIDAD
-    
-    if not telefono_destino.startswith('+'):
-        telefono_destino = f"+{telefono_destino}"
-    
-    try:
-        client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
-        message = client.messages.create(
-            from_=TWILIO_NUMBER,
-            body=mensaje_final,
-            to=f"whatsapp:{telefono_destino}"
-        )
-        print(f"✅ WhatsApp Enviado! SID: {message.sid}")
-        return True
-    except Exception as e:
-        print(f"❌ Error enviando WhatsApp: {e}")
-        return False
+    return despachador.enviar(telefono_destino, mensaje + PIE_SEGURIDAD)
+
+
+def enviar_whatsapp_masivo(telefonos, mensaje: str, esperar: bool = False):
+    """Mismo aviso a muchos inscriptos (cancelaciones, modificaciones) sin bloquear el request."""
+    return despachador.enviar_masivo(telefonos, mensaje + PIE_SEGURIDAD, esperar=esperar)
 
 # --- FUNCIONES DE AVISO ---
 
@@ -67,21 +213,25 @@ def enviar_whatsapp_reserva(telefono: str, nombre_usuario: str, evento: str, fec
         
     return _ejecutar_envio_whatsapp(telefono, texto)
 
-def enviar_whatsapp_modificacion_evento(telefono: str, nombre_evento: str):
-    texto = (
+def texto_modificacion_evento(nombre_evento: str) -> str:
+    return (
         f"📝 *Cambio en tu evento: {nombre_evento}*\n\n"
         f"Hola ciclista, te avisamos que hubo cambios en los detalles. "
         f"Por favor, revisá la plataforma para ver la nueva info."
     )
-    return _ejecutar_envio_whatsapp(telefono, texto)
 
-def enviar_whatsapp_cancelacion_evento(telefono: str, nombre_evento: str, motivo: str):
-    texto = (
+def enviar_whatsapp_modificacion_evento(telefono: str, nombre_evento: str):
+    return _ejecutar_envio_whatsapp(telefono, texto_modificacion_evento(nombre_evento))
+
+def texto_cancelacion_evento(nombre_evento: str, motivo: str) -> str:
+    return (
         f"❌ *EVENTO CANCELADO: {nombre_evento}*\n\n"
         f"Lamentamos informarte que el evento se canceló.\n"
         f"Motivo: {motivo}"
     )
-    return _ejecutar_envio_whatsapp(telefono, texto)
+
+def enviar_whatsapp_cancelacion_evento(telefono: str, nombre_evento: str, motivo: str):
+    return _ejecutar_envio_whatsapp(telefono, texto_cancelacion_evento(nombre_evento, motivo))
 
 def enviar_whatsapp_rechazo_edicion(telefono: str, nombre_evento: str):
     texto = (
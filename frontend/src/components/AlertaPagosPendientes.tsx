@@ -2,6 +2,7 @@
 // Banner flotante de pagos pendientes con cuenta regresiva individual
 
 import { useState, useEffect } from 'react';
+import { suscribirPush } from '../services/push-service';
 
 interface PagoPendiente {
   id_reserva: number;
@@ -119,12 +120,18 @@ export default function AlertaPagosPendientes() {
     const token = localStorage.getItem('token') || sessionStorage.getItem('token');
     if (!token) return;
 
-    fetch(`${import.meta.env.VITE_API_URL}/inscripciones/mis-pagos-pendientes`, {
-      headers: { Authorization: `Bearer ${token}` }
-    })
-      .then(r => r.ok ? r.json() : [])
-      .then(data => { if (Array.isArray(data) && data.length > 0) setPendientes(data); })
-      .catch(() => {});
+    const cargar = () => {
+      fetch(`${import.meta.env.VITE_API_URL}/inscripciones/mis-pagos-pendientes`, {
+        headers: { Authorization: `Bearer ${token}` }
+      })
+        .then(r => r.ok ? r.json() : [])
+        .then(data => { if (Array.isArray(data)) setPendientes(data); })
+        .catch(() => {});
+    };
+
+    cargar();
+    // Se vuelve a pedir cuando el backend avisa que cambió alguna reserva del usuario
+    return suscribirPush('pagos', cargar);
   }, []);
 
   if (pendientes.length === 0 || !visible) return null;
@@ -2,10 +2,12 @@ import { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import '../styles/notificaciones-badge.css';
 import { 
-  getMisNotificaciones, 
+  getNotificacionesRecientes, 
+  getCantidadNoLeidas,
   marcarNotificacionLeida
 } from '../services/notificacion-service';
 import type { Notificacion } from '../services/notificacion-service';
+import { suscribirPush } from '../services/push-service';
 
 // Parsea "dd-mm-yyyy HH:MM" → Date
 const parsearFechaBackend = (fechaStr: string): Date => {
@@ -17,6 +19,7 @@ const parsearFechaBackend = (fechaStr: string): Date => {
 
 export const NotificacionesBadge = () => {
   const [notificaciones, setNotificaciones] = useState<Notificacion[]>([]);
+  const [noLeidas, setNoLeidas] = useState(0);
   const [showDropdown, setShowDropdown] = useState(false);
   const [loading, setLoading] = useState(false);
   const navigate = useNavigate();
@@ -25,13 +28,14 @@ export const NotificacionesBadge = () => {
 
   const cargarNotificaciones = async () => {
     try {
-      const data = await getMisNotificaciones();
-      
-      const ultimas = data
-        .sort((a, b) => parsearFechaBackend(b.fecha_creacion).getTime() - parsearFechaBackend(a.fecha_creacion).getTime())
-        .slice(0, 5);
+      // El backend ya las devuelve ordenadas (más nuevas primero)
+      const [ultimas, cantidad] = await Promise.all([
+        getNotificacionesRecientes(5),
+        getCantidadNoLeidas()
+      ]);
         
       setNotificaciones(ultimas);
+      setNoLeidas(cantidad);
     } catch (error) {
       console.error('Error polling notificaciones:', error);
     } finally {
@@ -41,7 +45,9 @@ export const NotificacionesBadge = () => {
 
   useEffect(() => {
     cargarNotificaciones();
-    const interval = setInterval(cargarNotificaciones, 30000);
+    // Avisos en vivo; el polling queda solo de respaldo (ej: otro worker del backend)
+    const desuscribir = suscribirPush('notificaciones', cargarNotificaciones);
+    const interval = setInterval(cargarNotificaciones, 300000);
     
     const handleClickOutside = (event: MouseEvent) => {
       if (badgeRef.current && !badgeRef.current.contains(event.target as Node)) {
@@ -51,6 +57,7 @@ export const NotificacionesBadge = () => {
     document.addEventListener('mousedown', handleClickOutside);
 
     return () => {
+      desuscribir();
       clearInterval(interval);
       document.removeEventListener('mousedown', handleClickOutside);
     };
@@ -66,8 +73,6 @@ export const NotificacionesBadge = () => {
     }
   };
 
-  const noLeidas = notificaciones.filter(n => !n.leida).length;
-
   const formatearFechaCorta = (fechaStr: string) => {
     const date = parsearFechaBackend(fechaStr);
     const ahora = new Date();
@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from "react";
-import { getEventos } from "../services/eventos";
+import { getEventos, getRutaEvento } from "../services/eventos";
 import L from "leaflet";
 import "leaflet/dist/leaflet.css";
 import "../styles/mapa.css";
@@ -17,7 +17,6 @@ interface Evento {
   lng: number;
   id_tipo?: number;
   id_dificultad?: number;
-  ruta_coordenadas?: [number, number][] | string;
 }
 
 export default function EventsMapPage() {
@@ -97,60 +96,67 @@ export default function EventsMapPage() {
       routeLayerRef.current = null;
     }
 
-    // B. Verificamos si el evento actual tiene ruta_coordenadas
-    if (selectedEvent && selectedEvent.ruta_coordenadas) {
-      
-      let coordenadas: [number, number][] = [];
-      
-      // 🛡️ Red de seguridad: si viene como string (ej. "[[-38,-63],...]") lo transformamos a array.
-      // Si ya viene como array, lo usamos directo.
-      try {
-        coordenadas = typeof selectedEvent.ruta_coordenadas === 'string'
-          ? JSON.parse(selectedEvent.ruta_coordenadas)
-          : selectedEvent.ruta_coordenadas;
-      } catch (error) {
-        console.error("Error al leer las coordenadas de la ruta:", error);
-        return; // Cortamos acá si la data está corrupta
-      }
-
-      // Si después de leerlo tenemos coordenadas válidas, dibujamos
-      if (coordenadas.length > 0) {
-        // A. Limpiamos las flechas viejas si existían
-        if (routeDecoratorRef.current) {
-          routeDecoratorRef.current.remove();
+    // B. La ruta ya no viene en el listado: la pedimos aparte, simplificada.
+    // Pedimos el nivel más detallado porque después hacemos fitBounds sobre la ruta.
+    if (!selectedEvent) return;
+    let cancelado = false;
+
+    getRutaEvento(selectedEvent.id_evento, 14)
+      .then((coordenadas) => {
+        if (cancelado || !mapRef.current) return;
+        dibujarRuta(coordenadas);
+      })
+      .catch((error) => {
+        // 404 = el evento no tiene ruta cargada
+        if (error?.response?.status !== 404) {
+          console.error("Error al cargar la ruta del evento:", error);
         }
+      });
 
-        // B. Dibujamos la ruta sólida normal
-        const polyline = L.polyline(coordenadas, {
-          color: "#0cb7f2",
-          weight: 6,
-          opacity: 1.8,
-        });
+    return () => {
+      cancelado = true;
+    };
+  }, [selectedEvent]);
 
-        polyline.addTo(mapRef.current);
-        routeLayerRef.current = polyline;
-
-        // C. LE CLAVAMOS LAS FLECHAS ENCIMA 🔥
-        const decorator = (L as any).polylineDecorator(polyline, {
-          patterns: [
-            {
-              offset: '6%',     // Empieza al 5% del trayecto
-              repeat: '110px',   // Dibuja una flecha cada 80 píxeles
-              symbol: (L as any).Symbol.arrowHead({
-                pixelSize: 15,
-                polygon: false,
-                pathOptions: { stroke: true, color: '#002244', weight: 3 } // Flechas azul oscuro para que resalten sobre el celeste
-              })
-            }
-          ]
-        }).addTo(mapRef.current);
-
-        routeDecoratorRef.current = decorator;
-
-        mapRef.current.fitBounds(polyline.getBounds(), { padding: [50, 50] });
+  const dibujarRuta = (coordenadas: [number, number][]) => {
+    if (!mapRef.current) return;
+    // Si vinieron coordenadas, dibujamos
+    if (coordenadas.length > 0) {
+      // A. Limpiamos las flechas viejas si existían
+      if (routeDecoratorRef.current) {
+        routeDecoratorRef.current.remove();
       }
+
+      // B. Dibujamos la ruta sólida normal
+      const polyline = L.polyline(coordenadas, {
+        color: "#0cb7f2",
+        weight: 6,
+        opacity: 1.8,
+      });
+
+      polyline.addTo(mapRef.current);
+      routeLayerRef.current = polyline;
+
+      // C. LE CLAVAMOS LAS FLECHAS ENCIMA 🔥
+      const decorator = (L as any).polylineDecorator(polyline, {
+        patterns: [
+          {
+            offset: '6%',     // Empieza al 5% del trayecto
+            repeat: '110px',   // Dibuja una flecha cada 80 píxeles
+            symbol: (L as any).Symbol.arrowHead({
+              pixelSize: 15,
+              polygon: false,
+              pathOptions: { stroke: true, color: '#002244', weight: 3 } // Flechas azul oscuro para que resalten sobre el celeste
+            })
+          }
+        ]
+      }).addTo(mapRef.current);
+
+      routeDecoratorRef.current = decorator;
+
+      mapRef.current.fitBounds(polyline.getBounds(), { padding: [50, 50] });
     }
-  }, [selectedEvent]);
+  };
 
   const initMap = () => {
     if (mapRef.current) return; // 👈 evita recrear el mapa
@@ -101,6 +101,39 @@ export const adminEliminarEvento = async (idEvento: number, motivo: string) => {
     return response.data;
 };
 
+// --- RUTA DEL EVENTO (simplificada para el zoom pedido) ---
+// El backend la manda como "encoded polyline" (formato de Google, precisión 1e-5):
+// una ruta de miles de puntos pesa unos pocos KB en vez de cientos.
+export function decodificarPolyline(texto: string, precision = 5): [number, number][] {
+  const factor = Math.pow(10, precision);
+  const puntos: [number, number][] = [];
+  let indice = 0, lat = 0, lng = 0;
+
+  const leerNumero = () => {
+    let resultado = 0, desplazamiento = 0, byte;
+    do {
+      byte = texto.charCodeAt(indice++) - 63;
+      resultado |= (byte & 0x1f) << desplazamiento;
+      desplazamiento += 5;
+    } while (byte >= 0x20);
+    return resultado & 1 ? ~(resultado >> 1) : resultado >> 1;
+  };
+
+  while (indice < texto.length) {
+    lat += leerNumero();
+    lng += leerNumero();
+    puntos.push([lat / factor, lng / factor]);
+  }
+  return puntos;
+}
+
+export async function getRutaEvento(idEvento: number, zoom?: number): Promise<[number, number][]> {
+  const res = await api.get(`/eventos/${idEvento}/ruta`, {
+    params: zoom !== undefined ? { zoom } : {},
+  });
+  return res.data.polyline ? decodificarPolyline(res.data.polyline) : (res.data.coordenadas ?? []);
+}
+
 export async function getEventosCalendario(month: number, year: number) {
   const res = await api.get("/eventos/calendario/", {
     params: {
@@ -30,4 +30,37 @@ export async function marcarNotificacionLeida(idNotificacion: number): Promise<N
       headers: { Authorization: `Bearer ${token}` },
   });
   return res.data;
-}
\ No newline at end of file
+}
+
+// Últimas N notificaciones (página del feed). El navegador revalida con ETag:
+// si no hubo novedades el backend responde 304 y se reusa la respuesta anterior.
+export async function getNotificacionesRecientes(limite: number): Promise<Notificacion[]> {
+  const token = localStorage.getItem("token") || sessionStorage.getItem("token");
+  if (!token) throw new Error("No hay token de autenticación");
+
+  const res = await api.get("/notificaciones/", {
+    params: { limite },
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  return res.data;
+}
+
+export async function getCantidadNoLeidas(): Promise<number> {
+  const token = localStorage.getItem("token") || sessionStorage.getItem("token");
+  if (!token) throw new Error("No hay token de autenticación");
+
+  const res = await api.get("/notificaciones/unread-count", {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  return res.data.no_leidas;
+}
+
+export async function marcarTodasLeidas(): Promise<number> {
+  const token = localStorage.getItem("token") || sessionStorage.getItem("token");
+  if (!token) throw new Error("No hay token de autenticación");
+
+  const res = await api.put("/notificaciones/leer-todas", {}, {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  return res.data.actualizadas;
+}
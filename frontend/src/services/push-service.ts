@@ -0,0 +1,75 @@
+import { api } from "./api";
+
+// ============================================================================
+// CANAL EN VIVO (SSE) — una sola conexión por pestaña compartida por todos los
+// componentes. El backend solo avisa ("notificaciones", "pagos", "resync") y
+// cada componente vuelve a pedir sus datos.
+// EventSource no manda headers: se pide un token de stream (dura ~1 minuto y
+// solo sirve para abrir el canal) y va en la URL. El token de login, nunca.
+// ============================================================================
+
+type Manejador = (datos: any) => void;
+
+const baseURL = import.meta.env.VITE_API_URL;
+const manejadores = new Map<string, Set<Manejador>>();
+let fuente: EventSource | null = null;
+let conectando = false;
+const REINTENTO_MS = 5000;
+
+function hayInteresados() {
+  return Array.from(manejadores.values()).some(s => s.size > 0);
+}
+
+function emitir(tipo: string, datos: any) {
+  manejadores.get(tipo)?.forEach(fn => fn(datos));
+}
+
+async function conectar() {
+  const token = localStorage.getItem("token") || sessionStorage.getItem("token");
+  if (!token || fuente || conectando || typeof EventSource === "undefined") return;
+
+  conectando = true;
+  let tokenStream: string;
+  try {
+    const { data } = await api.post("/notificaciones/stream/token");
+    tokenStream = data.token;
+  } catch {
+    return; // sin canal en vivo: los componentes siguen con su polling
+  } finally {
+    conectando = false;
+  }
+  if (fuente || !hayInteresados()) return;
+
+  fuente = new EventSource(`${baseURL}/notificaciones/stream?token=${encodeURIComponent(tokenStream)}`);
+  ["notificaciones", "pagos"].forEach(tipo => {
+    fuente!.addEventListener(tipo, (e) => emitir(tipo, JSON.parse((e as MessageEvent).data || "{}")));
+  });
+  // Se perdieron avisos (cola llena o reconexión): que todos refresquen
+  const refrescarTodo = () => ["notificaciones", "pagos"].forEach(tipo => emitir(tipo, {}));
+  fuente.addEventListener("resync", refrescarTodo);
+  fuente.addEventListener("conectado", refrescarTodo);
+  // El navegador reconecta solo con la misma URL; cuando el token de stream ya
+  // venció responde 401 y EventSource se cierra: pedimos otro y volvemos a abrir
+  fuente.onerror = () => {
+    if (fuente?.readyState !== EventSource.CLOSED) return;
+    fuente = null;
+    setTimeout(() => { if (hayInteresados()) conectar(); }, REINTENTO_MS);
+  };
+}
+
+function desconectar() {
+  fuente?.close();
+  fuente = null;
+}
+
+// Devuelve la función para desuscribirse (usar en el cleanup del useEffect)
+export function suscribirPush(tipo: "notificaciones" | "pagos", fn: Manejador): () => void {
+  if (!manejadores.has(tipo)) manejadores.set(tipo, new Set());
+  manejadores.get(tipo)!.add(fn);
+  conectar();
+
+  return () => {
+    manejadores.get(tipo)?.delete(fn);
+    if (!hayInteresados()) desconectar();
+  };
+}
@@ -0,0 +1,59 @@
+# scripts/backfill_geohash.py
+"""
+Completa evento.geohash a partir de evento.lat / evento.lng.
+
+Los eventos nuevos o editados ya se guardan con el geohash (ver
+Evento._indexar_posicion en app/models/registro_models.py); este script es para
+los que existían antes. Sin geohash un evento no aparece en GET /eventos/cercanos.
+
+Uso (desde la raíz del repo, con DATABASE_URL configurada):
+    python -m scripts.backfill_geohash            # solo los que están en NULL
+    python -m scripts.backfill_geohash --todos    # recalcula todos
+"""
+import argparse
+
+from app.core import geohash
+from app.db.database import SessionLocal
+from app.models.registro_models import Evento
+
+TAMANIO_LOTE = 1000
+
+
+def backfill(todos: bool = False) -> int:
+    db = SessionLocal()
+    actualizados = 0
+    try:
+        ultimo_id = 0
+        while True:
+            # Paginado por id: no mantiene un cursor abierto mientras se hacen los UPDATE
+            query = db.query(Evento.id_evento, Evento.lat, Evento.lng).filter(
+                Evento.id_evento > ultimo_id, Evento.lat.isnot(None), Evento.lng.isnot(None)
+            )
+            if not todos:
+                query = query.filter(Evento.geohash.is_(None))
+            lote = query.order_by(Evento.id_evento).limit(TAMANIO_LOTE).all()
+            if not lote:
+                break
+
+            cambios = [
+                {"id_evento": id_evento, "geohash": geohash.codificar(float(lat), float(lng))}
+                for id_evento, lat, lng in lote
+            ]
+            db.bulk_update_mappings(Evento, cambios)
+            db.commit()
+
+            actualizados += len(cambios)
+            ultimo_id = lote[-1].id_evento
+            print(f"✅ {actualizados} eventos actualizados (hasta id {ultimo_id})")
+    finally:
+        db.close()
+    return actualizados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Completa el geohash de los eventos")
+    parser.add_argument("--todos", action="store_true", help="Recalcular también los que ya tienen valor")
+    args = parser.parse_args()
+
+    total = backfill(todos=args.todos)
+    print(f"🏁 Listo: {total} eventos procesados")
@@ -0,0 +1,75 @@
+# scripts/backfill_rutas.py
+"""
+Arma ruta_evento (polyline compacta + niveles simplificados + métricas) para los
+eventos que tienen ruta_coordenadas, y pisa evento.distancia_km con la distancia
+medida sobre la ruta.
+
+Los eventos nuevos o editados ya la generan solos (ver Evento._compactar_ruta en
+app/models/registro_models.py); este script es para los que existían antes o
+para recalcular todo si cambian los niveles (RUTA_NIVELES_ZOOM) o las métricas.
+Mientras tanto GET /eventos/{id}/ruta la arma en memoria en cada request.
+
+Uso (desde la raíz del repo, con DATABASE_URL configurada):
+    python -m scripts.backfill_rutas            # solo los que no tienen ruta_evento
+    python -m scripts.backfill_rutas --todos    # recalcula todas
+"""
+import argparse
+import time
+
+from app.db.database import SessionLocal
+from app.models.registro_models import Evento
+from app.models.ruta_models import RutaEvento, distancia_decimal
+
+TAMANIO_LOTE = 200   # las rutas largas pesan: lotes más chicos que en backfill_ubicacion
+
+
+def backfill(todos: bool = False) -> int:
+    db = SessionLocal()
+    procesados = 0
+    inicio = time.perf_counter()
+    try:
+        ultimo_id = 0
+        while True:
+            # Paginado por id: no mantiene un cursor abierto mientras se escriben las rutas
+            query = (
+                db.query(Evento.id_evento, Evento.ruta_coordenadas)
+                .filter(Evento.id_evento > ultimo_id, Evento.ruta_coordenadas.isnot(None))
+            )
+            if not todos:
+                query = query.outerjoin(RutaEvento, RutaEvento.id_evento == Evento.id_evento) \
+                             .filter(RutaEvento.id_evento.is_(None))
+            lote = query.order_by(Evento.id_evento).limit(TAMANIO_LOTE).all()
+            if not lote:
+                break
+
+            for id_evento, coordenadas in lote:
+                nueva = RutaEvento.desde_coordenadas(coordenadas)
+                anterior = db.get(RutaEvento, id_evento)
+                if anterior is not None:
+                    db.delete(anterior)
+                    db.flush()
+                if nueva is not None:
+                    nueva.id_evento = id_evento
+                    db.add(nueva)
+                    db.query(Evento).filter(Evento.id_evento == id_evento).update(
+                        {"distancia_km": distancia_decimal(nueva.distancia_km)}, synchronize_session=False
+                    )
+            db.commit()
+            db.expunge_all()
+
+            procesados += len(lote)
+            ultimo_id = lote[-1].id_evento
+            print(f"✅ {procesados} rutas procesadas (hasta id {ultimo_id})")
+    finally:
+        db.close()
+    print(f"⏱️ {time.perf_counter() - inicio:.1f} s")
+    return procesados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera ruta_evento a partir de evento.ruta_coordenadas")
+    parser.add_argument("--todos", action="store_true", help="Recalcular también las que ya existen")
+    args = parser.parse_args()
+
+    total = backfill(todos=args.todos)
+    print(f"🏁 Listo: {total} eventos procesados")
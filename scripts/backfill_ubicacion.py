@@ -0,0 +1,58 @@
+# scripts/backfill_ubicacion.py
+"""
+Completa evento.provincia / evento.localidad a partir de evento.ubicacion.
+
+Los eventos nuevos o editados ya se guardan con estas columnas (ver Evento en
+app/models/registro_models.py); este script es para los que existían antes
+o para recalcular todo si cambian las reglas de app/core/ubicacion.py.
+
+Uso (desde la raíz del repo, con DATABASE_URL configurada):
+    python -m scripts.backfill_ubicacion            # solo los que están en NULL
+    python -m scripts.backfill_ubicacion --todos    # recalcula todos
+"""
+import argparse
+
+from app.core.ubicacion import normalizar_ubicacion
+from app.db.database import SessionLocal
+from app.models.registro_models import Evento
+
+TAMANIO_LOTE = 1000
+
+
+def backfill(todos: bool = False) -> int:
+    db = SessionLocal()
+    actualizados = 0
+    try:
+        ultimo_id = 0
+        while True:
+            # Paginado por id: no mantiene un cursor abierto mientras se hacen los UPDATE
+            query = db.query(Evento.id_evento, Evento.ubicacion).filter(Evento.id_evento > ultimo_id)
+            if not todos:
+                query = query.filter(Evento.localidad.is_(None))
+            lote = query.order_by(Evento.id_evento).limit(TAMANIO_LOTE).all()
+            if not lote:
+                break
+
+            cambios = []
+            for id_evento, ubicacion in lote:
+                provincia, localidad = normalizar_ubicacion(ubicacion)
+                cambios.append({"id_evento": id_evento, "provincia": provincia, "localidad": localidad})
+
+            db.bulk_update_mappings(Evento, cambios)
+            db.commit()
+
+            actualizados += len(cambios)
+            ultimo_id = lote[-1].id_evento
+            print(f"✅ {actualizados} eventos actualizados (hasta id {ultimo_id})")
+    finally:
+        db.close()
+    return actualizados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Completa provincia/localidad de los eventos")
+    parser.add_argument("--todos", action="store_true", help="Recalcular también los que ya tienen valor")
+    args = parser.parse_args()
+
+    total = backfill(todos=args.todos)
+    print(f"🏁 Listo: {total} eventos procesados")
@@ -0,0 +1,127 @@
+# scripts/bench_login.py
+"""
+Benchmark de una ráfaga de logins (POST /api/v1/auth/login).
+
+Lanza N logins con C clientes concurrentes contra la app (en el mismo proceso,
+sin levantar uvicorn) y, mientras tanto, pide un endpoint liviano
+(GET /api/v1/eventos/catalogos/filtros) para ver si el resto de la API se
+traba. Compara:
+  --procesos 0   bcrypt en threads, como antes del pool
+  --procesos N   bcrypt en el pool de procesos de app/core/hashing.py
+
+Crea un usuario temporal (bench-login@bench.local) y lo borra al final.
+Usa la base de DATABASE_URL.
+
+Uso (desde la raíz del repo):
+    python -m scripts.bench_login
+    python -m scripts.bench_login --logins 200 --concurrencia 50 --procesos 0 2 4
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.core import hashing
+from app.core.security import BCRYPT_ROUNDS, pwd_context
+from app.db.database import SessionLocal
+from app.main import app
+from app.models.auth_models import Usuario
+from app.models.notificacion_models import Notificacion
+
+EMAIL = "bench-login@example.com"
+CONTRASENIA = "bench-Contrasenia-123"
+ID_ROL_CLIENTE = 4
+
+
+def _crear_usuario() -> None:
+    db = SessionLocal()
+    try:
+        _borrar_usuario(db)
+        db.add(Usuario(nombre_y_apellido="Bench Login", email=EMAIL,
+                       contrasenia=pwd_context.hash(CONTRASENIA), id_rol=ID_ROL_CLIENTE))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _borrar_usuario(db) -> None:
+    ids = db.query(Usuario.id_usuario).filter(Usuario.email == EMAIL).scalar_subquery()
+    db.query(Notificacion).filter(Notificacion.id_usuario.in_(ids)).delete(synchronize_session=False)
+    db.query(Usuario).filter(Usuario.email == EMAIL).delete(synchronize_session=False)
+    db.commit()
+
+
+def _percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))] if ordenados else 0.0
+
+
+async def _rafaga(logins: int, concurrencia: int) -> dict:
+    transporte = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+        semaforo = asyncio.Semaphore(concurrencia)
+        latencias_login, latencias_otro, codigos = [], [], {}
+        terminado = asyncio.Event()
+
+        async def login():
+            async with semaforo:
+                inicio = time.perf_counter()
+                r = await cliente.post("/api/v1/auth/login", data={"username": EMAIL, "password": CONTRASENIA})
+                latencias_login.append((time.perf_counter() - inicio) * 1000)
+                codigos[r.status_code] = codigos.get(r.status_code, 0) + 1
+
+        async def otro_endpoint():
+            while not terminado.is_set():
+                inicio = time.perf_counter()
+                await cliente.get("/api/v1/eventos/catalogos/filtros")
+                latencias_otro.append((time.perf_counter() - inicio) * 1000)
+                await asyncio.sleep(0.05)
+
+        sondeo = asyncio.create_task(otro_endpoint())
+        inicio = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        segundos = time.perf_counter() - inicio
+        terminado.set()
+        await sondeo
+
+    return {
+        "segundos": segundos,
+        "codigos": codigos,
+        "login_p50": _percentil(latencias_login, 0.5),
+        "login_p95": _percentil(latencias_login, 0.95),
+        "otro_p50": _percentil(latencias_otro, 0.5),
+        "otro_p95": _percentil(latencias_otro, 0.95),
+    }
+
+
+def medir(logins: int, concurrencia: int, procesos: list) -> None:
+    _crear_usuario()
+    try:
+        print(f"\n📊 Ráfaga de {logins} logins con {concurrencia} clientes (bcrypt, {BCRYPT_ROUNDS} rondas)")
+        for cantidad in procesos:
+            hashing.detener()
+            hashing.PROCESOS = cantidad
+            hashing.MAX_PENDIENTES = max(hashing.MAX_PENDIENTES, concurrencia)
+            r = asyncio.run(_rafaga(logins, concurrencia))
+            modo = "threads (antes)" if cantidad == 0 else f"pool {cantidad} procesos"
+            print(f"   {modo:>18} | {logins / r['segundos']:6.1f} logins/s | login p50 {r['login_p50']:7.0f} ms "
+                  f"p95 {r['login_p95']:7.0f} ms | otro endpoint p50 {r['otro_p50']:6.0f} ms "
+                  f"p95 {r['otro_p95']:6.0f} ms | {r['codigos']}")
+    finally:
+        hashing.detener()
+        db = SessionLocal()
+        try:
+            _borrar_usuario(db)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de throughput de login (bcrypt)")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--procesos", type=int, nargs="+", default=[0, 2])
+    args = parser.parse_args()
+
+    medir(args.logins, args.concurrencia, args.procesos)
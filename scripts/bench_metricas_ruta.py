@@ -0,0 +1,88 @@
+# scripts/bench_metricas_ruta.py
+"""
+Benchmark del procesamiento de rutas al guardar un evento (no toca la base).
+
+Para rutas sintéticas de 1.000 / 10.000 / 100.000 puntos mide cada fase de
+RutaEvento.desde_coordenadas:
+  - normalizar:  JSON del frontend [{lat, lng}, ...] -> lista de (lat, lng)
+  - array:       lista -> array NumPy (una vez por ruta)
+  - metricas:    distancia haversine, bbox, centroide y densidad (NumPy)
+  - simplificar: Douglas-Peucker para cada zoom de RUTA_NIVELES_ZOOM (NumPy)
+  - polyline:    codificación de la ruta completa
+y compara la distancia contra un loop de Python puro (referencia y control).
+
+Uso (desde la raíz del repo):
+    python -m scripts.bench_metricas_ruta
+    python -m scripts.bench_metricas_ruta --puntos 1000 100000 --repeticiones 5
+"""
+import argparse
+import math
+import random
+import time
+
+from app.core.geometria import (
+    RADIO_TIERRA_KM, codificar_polyline, como_array, douglas_peucker, metricas_ruta, normalizar_ruta, tolerancia_para_zoom
+)
+from app.models.ruta_models import NIVELES_ZOOM, RutaEvento
+
+
+def _ruta_sintetica(cantidad: int) -> list:
+    """Caminata aleatoria desde Córdoba capital, ~10 m entre puntos, como la manda el frontend."""
+    random.seed(cantidad)
+    lat, lng, rumbo = -31.4201, -64.1888, 0.0
+    ruta = []
+    for _ in range(cantidad):
+        rumbo += random.uniform(-0.3, 0.3)
+        lat += 0.00009 * math.cos(rumbo)
+        lng += 0.00009 * math.sin(rumbo) / math.cos(math.radians(lat))
+        ruta.append({"lat": lat, "lng": lng})
+    return ruta
+
+
+def _distancia_python(puntos: list) -> float:
+    total = 0.0
+    for (lat1, lng1), (lat2, lng2) in zip(puntos, puntos[1:]):
+        p1, p2 = math.radians(lat1), math.radians(lat2)
+        a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+        total += 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(a))
+    return total
+
+
+def _ms(funcion, repeticiones: int) -> tuple:
+    """(mejor tiempo en ms, resultado de la última corrida)"""
+    mejor, resultado = float("inf"), None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, (time.perf_counter() - inicio) * 1000)
+    return mejor, resultado
+
+
+def medir(cantidades: list, repeticiones: int) -> None:
+    print(f"\n📊 Procesamiento de rutas (niveles de zoom {NIVELES_ZOOM}, mejor de {repeticiones})")
+    print(f"   {'puntos':>8} | {'normalizar':>10} | {'array':>7} | {'metricas':>9} | {'python':>9} | "
+          f"{'simplificar':>11} | {'polyline':>9} | {'total':>9} | distancia")
+    for cantidad in cantidades:
+        ruta = _ruta_sintetica(cantidad)
+        t_normalizar, puntos = _ms(lambda: normalizar_ruta(ruta), repeticiones)
+        t_array, coordenadas = _ms(lambda: como_array(puntos), repeticiones)
+        t_metricas, metricas = _ms(lambda: metricas_ruta(coordenadas), repeticiones)
+        t_python, distancia = _ms(lambda: _distancia_python(puntos), repeticiones)
+        t_simplificar, _ = _ms(
+            lambda: [douglas_peucker(coordenadas, tolerancia_para_zoom(zoom)) for zoom in NIVELES_ZOOM], repeticiones
+        )
+        t_polyline, _ = _ms(lambda: codificar_polyline(coordenadas), repeticiones)
+        t_total, _ = _ms(lambda: RutaEvento.desde_coordenadas(ruta), repeticiones)
+
+        assert abs(metricas["distancia_km"] - distancia) < 1e-3, "la distancia vectorizada no coincide"
+        print(f"   {cantidad:>8,} | {t_normalizar:8.1f}ms | {t_array:5.1f}ms | {t_metricas:7.2f}ms | {t_python:7.1f}ms | "
+              f"{t_simplificar:9.1f}ms | {t_polyline:7.1f}ms | {t_total:7.1f}ms | {metricas['distancia_km']:.2f} km")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de métricas y simplificación de rutas")
+    parser.add_argument("--puntos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    medir(args.puntos, args.repeticiones)
@@ -0,0 +1,100 @@
+# scripts/bench_notificaciones.py
+"""
+Benchmark del fan-out de notificaciones del navbar (cancelaciones, ediciones, cron).
+
+Compara, para 10 / 1.000 / 10.000 destinatarios:
+  1. Como antes: NotificacionCRUD.create_notificacion por usuario (commit + refresh c/u).
+  2. NotificacionCRUD.create_notificaciones_masivas (INSERT multi-fila, un commit).
+
+Crea usuarios temporales (email bench-notif-*@bench.local) y al final borra
+usuarios y notificaciones que generó. Usa la base de DATABASE_URL.
+
+Uso (desde la raíz del repo):
+    python -m scripts.bench_notificaciones
+    python -m scripts.bench_notificaciones --destinatarios 10 1000 10000 --sin-antes 10000
+"""
+import argparse
+import time
+
+from sqlalchemy import delete, insert, select
+
+from app.db.crud.notificacion_crud import NotificacionCRUD
+from app.db.database import SessionLocal
+from app.models.auth_models import Usuario
+from app.models.notificacion_models import Notificacion
+
+PREFIJO_EMAIL = "bench-notif-"
+DOMINIO_EMAIL = "@bench.local"
+ID_ROL_CLIENTE = 4
+
+
+def _crear_usuarios(db, cantidad: int) -> list:
+    db.execute(insert(Usuario).values([
+        {
+            "nombre_y_apellido": f"Bench {i}",
+            "email": f"{PREFIJO_EMAIL}{i}{DOMINIO_EMAIL}",
+            "contrasenia": "x",
+            "id_rol": ID_ROL_CLIENTE
+        }
+        for i in range(cantidad)
+    ]))
+    db.commit()
+    return list(db.scalars(select(Usuario.id_usuario).where(Usuario.email.like(f"{PREFIJO_EMAIL}%"))))
+
+
+def _limpiar(db) -> None:
+    ids = select(Usuario.id_usuario).where(Usuario.email.like(f"{PREFIJO_EMAIL}%"))
+    db.execute(delete(Notificacion).where(Notificacion.id_usuario.in_(ids)))
+    db.execute(delete(Usuario).where(Usuario.email.like(f"{PREFIJO_EMAIL}%")))
+    db.commit()
+
+
+def _como_antes(db, ids: list, mensaje: str) -> None:
+    for id_usuario in ids:
+        NotificacionCRUD.create_notificacion(db=db, id_usuario=id_usuario, id_estado_solicitud=None, mensaje=mensaje)
+
+
+def _masivo(db, ids: list, mensaje: str) -> None:
+    NotificacionCRUD.create_notificaciones_masivas(db, ids, mensaje)
+    db.commit()
+
+
+def medir(destinatarios: list, sin_antes: int) -> None:
+    db = SessionLocal()
+    try:
+        _limpiar(db)
+        ids_todos = _crear_usuarios(db, max(destinatarios))
+
+        print(f"\n📊 Fan-out de notificaciones ({db.bind.dialect.name})")
+        for cantidad in destinatarios:
+            ids = ids_todos[:cantidad]
+            mensaje = f"📢 Bench {cantidad} destinatarios"
+            fila = f"   {cantidad:>7} destinatarios |"
+
+            if cantidad < sin_antes:
+                inicio = time.perf_counter()
+                _como_antes(db, ids, mensaje)
+                segundos = time.perf_counter() - inicio
+                fila += f" antes {segundos:8.3f} s ({cantidad / segundos:>9,.0f}/s) |"
+            else:
+                fila += f" antes {'(omitido)':>24} |"
+
+            inicio = time.perf_counter()
+            _masivo(db, ids, mensaje)
+            segundos = time.perf_counter() - inicio
+            fila += f" masivo {segundos:8.3f} s ({cantidad / segundos:>9,.0f}/s)"
+            print(fila)
+    finally:
+        db.rollback()
+        _limpiar(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del fan-out de notificaciones in-app")
+    parser.add_argument("--destinatarios", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--sin-antes", type=int, default=1_000_000,
+                        help="No medir la versión fila por fila desde esta cantidad (tarda mucho)")
+    args = parser.parse_args()
+
+    medir(args.destinatarios, args.sin_antes)
@@ -0,0 +1,77 @@
+# scripts/bench_plantillas_email.py
+"""
+Micro-benchmark del render de correos para envíos masivos.
+
+Compara, por destinatario:
+  1. Como antes: armar el HTML, envolverlo en un EmailMessage y volver a
+     extraerlo con iter_parts() para mandarlo a SendGrid.
+  2. string.Template.substitute sobre el texto sin compilar (parsea cada vez).
+  3. PLANTILLAS.renderizar (plantilla compilada al importar app.plantillas_email).
+
+Uso (desde la raíz del repo):
+    python -m scripts.bench_plantillas_email
+    python -m scripts.bench_plantillas_email --destinatarios 50000 --plantilla nuevo_evento
+"""
+import argparse
+import time
+from email.message import EmailMessage
+from string import Template
+
+from app.plantillas_email import PLANTILLAS
+
+
+def _valores(plantilla: str, i: int) -> dict:
+    # Un valor distinto por destinatario para cada variable de la plantilla
+    return {campo: f"{campo}-{i}" for campo in PLANTILLAS.campos(plantilla)}
+
+
+def _como_antes(asunto: str, html: str, email: str) -> tuple:
+    msg = EmailMessage()
+    msg['Subject'] = asunto
+    msg['To'] = email
+    msg.add_alternative(html, subtype='html')
+    html_body = ""
+    for part in msg.iter_parts():
+        if part.get_content_type() == 'text/html':
+            html_body = part.get_payload(decode=True).decode()
+    return msg['Subject'], html_body
+
+
+def medir(destinatarios: int, plantilla: str) -> None:
+    valores = [_valores(plantilla, i) for i in range(destinatarios)]
+    _, cuerpo_c = PLANTILLAS._plantillas[plantilla]
+    # Mismo texto de la plantilla pero sin compilar (las constantes ya reemplazadas)
+    texto_cuerpo = Template(cuerpo_c.literales[0] + "".join(
+        f"${{{campo}}}{literal}" for campo, literal in zip(cuerpo_c.campos, cuerpo_c.literales[1:])
+    ))
+
+    resultados = {}
+
+    inicio = time.perf_counter()
+    for v in valores:
+        asunto, html = PLANTILLAS.renderizar(plantilla, **v)
+        _como_antes(asunto, html, v.get("email_destino", "x@x.com"))
+    resultados["EmailMessage (antes)"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for v in valores:
+        texto_cuerpo.substitute(v)
+    resultados["Template sin compilar"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for v in valores:
+        PLANTILLAS.renderizar(plantilla, **v)
+    resultados["Plantilla compilada"] = time.perf_counter() - inicio
+
+    print(f"\n📊 Plantilla '{plantilla}' | {destinatarios} destinatarios | {len(cuerpo_c.campos)} variables")
+    for nombre, segundos in resultados.items():
+        print(f"   {nombre:<24} {segundos:7.3f} s  ({destinatarios / segundos:>10,.0f} correos/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de render de plantillas de correo")
+    parser.add_argument("--destinatarios", type=int, default=10000)
+    parser.add_argument("--plantilla", default="cancelacion_evento", choices=PLANTILLAS.nombres)
+    args = parser.parse_args()
+
+    medir(args.destinatarios, args.plantilla)
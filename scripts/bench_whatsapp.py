@@ -0,0 +1,50 @@
+# scripts/bench_whatsapp.py
+"""
+Prueba de carga del despachador de WhatsApp contra el transporte stub (no llama a Twilio).
+
+Compara el envío secuencial de antes (un mensaje tras otro) con el pool del
+despachador, simulando la latencia de la API de Twilio.
+
+Uso (desde la raíz del repo):
+    python -m scripts.bench_whatsapp
+    python -m scripts.bench_whatsapp --mensajes 500 --latencia-ms 300 --concurrencia 16 --por-segundo 50
+"""
+import argparse
+import time
+
+from app.whatsapp import DespachadorWhatsApp, TransporteStub
+
+
+def medir(mensajes: int, latencia_ms: float, concurrencia: int, por_segundo: float) -> None:
+    telefonos = [f"549351{i:07d}" for i in range(mensajes)]
+
+    # 1. Secuencial: equivalente al loop anterior (un envío bloqueante por inscripto)
+    stub = TransporteStub(latencia_segundos=latencia_ms / 1000)
+    secuencial = DespachadorWhatsApp(transporte=stub, concurrencia=1, por_segundo=1_000_000)
+    inicio = time.perf_counter()
+    for telefono in telefonos:
+        secuencial.enviar(telefono, "bench")
+    t_secuencial = time.perf_counter() - inicio
+
+    # 2. Pool del despachador con límite de tasa
+    stub = TransporteStub(latencia_segundos=latencia_ms / 1000)
+    despachador = DespachadorWhatsApp(transporte=stub, concurrencia=concurrencia, por_segundo=por_segundo)
+    inicio = time.perf_counter()
+    resultado = despachador.enviar_masivo(telefonos, "bench", esperar=True)
+    t_pool = time.perf_counter() - inicio
+
+    print(f"\n📊 {mensajes} mensajes | latencia {latencia_ms} ms | concurrencia {concurrencia} | {por_segundo} msg/s")
+    print(f"   Secuencial: {t_secuencial:.2f} s")
+    print(f"   Pool:       {t_pool:.2f} s  ({resultado['enviados']} enviados, {resultado['fallidos']} fallidos)")
+    print(f"   Mejora:     x{t_secuencial / t_pool:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del despachador de WhatsApp (transporte stub)")
+    parser.add_argument("--mensajes", type=int, default=200)
+    parser.add_argument("--latencia-ms", type=float, default=250)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--por-segundo", type=float, default=100)
+    args = parser.parse_args()
+
+    medir(args.mensajes, args.latencia_ms, args.concurrencia, args.por_segundo)
@@ -0,0 +1,169 @@
+# scripts/carga_push.py
+"""
+Prueba de carga del canal en vivo de notificaciones (SSE).
+
+Dos modos:
+
+1. broker (por defecto): simula N clientes conectados dentro del proceso y un
+   publicador en otro thread (como los endpoints sync / listeners de sesión)
+   que hace fan-outs masivos. Mide latencia de entrega y eventos/s.
+
+       python -m scripts.carga_push --clientes 5000 --usuarios 5000 --rondas 20
+
+2. servidor: abre N conexiones SSE reales contra un backend levantado
+   (cliente HTTP mínimo con asyncio, sin dependencias) con el token de un
+   usuario, y dispara avisos con PUT /notificaciones/leer-todas. Mide cuánto
+   tarda el aviso en llegar a todas las conexiones.
+
+       python -m scripts.carga_push --url http://localhost:8000/api/v1 --token <JWT> --clientes 2000
+
+   Subir el límite de archivos abiertos si hace falta (ulimit -n 65535).
+"""
+import argparse
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.core.broker import BrokerEventos
+
+
+def _resumen(titulo: str, latencias: list, segundos: float, esperados: int) -> None:
+    print(f"\n📊 {titulo}")
+    print(f"   entregados   {len(latencias):>10,} / {esperados:,}")
+    print(f"   duración     {segundos:>10.3f} s  ({len(latencias) / segundos:>12,.0f} eventos/s)")
+    if latencias:
+        ms = sorted(x * 1000 for x in latencias)
+        p = lambda q: ms[min(len(ms) - 1, int(len(ms) * q))]
+        print(f"   latencia ms  p50 {p(0.50):8.2f} | p95 {p(0.95):8.2f} | p99 {p(0.99):8.2f} | máx {ms[-1]:8.2f}")
+
+
+# ============================================================================
+# MODO BROKER (en proceso)
+# ============================================================================
+async def _cliente_simulado(broker: BrokerEventos, id_usuario: int, esperados: int, latencias: list) -> None:
+    suscripcion = broker.suscribir(id_usuario)
+    try:
+        for _ in range(esperados):
+            evento = await suscripcion.siguiente(timeout=30)
+            if evento is None:
+                return
+            latencias.append(time.time() - evento["ts"])
+    finally:
+        broker.desuscribir(suscripcion)
+
+
+async def carga_broker(clientes: int, usuarios: int, rondas: int) -> None:
+    broker = BrokerEventos(max_pendientes=rondas + 1)
+    latencias: list = []
+    tareas = [
+        asyncio.create_task(_cliente_simulado(broker, i % usuarios, rondas, latencias))
+        for i in range(clientes)
+    ]
+    await asyncio.sleep(0)  # que todas se suscriban
+
+    def publicador():
+        # Cada ronda = un commit que notifica a todos los usuarios (cancelación masiva)
+        for ronda in range(rondas):
+            broker.publicar_muchos((u, "notificaciones", {"ronda": ronda}) for u in range(usuarios))
+            time.sleep(0.01)
+
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=publicador)
+    hilo.start()
+    await asyncio.gather(*tareas)
+    hilo.join()
+    _resumen(f"Broker en proceso | {clientes} conexiones, {usuarios} usuarios, {rondas} rondas",
+             latencias, time.perf_counter() - inicio, clientes * rondas)
+    print(f"   {broker.estadisticas()}")
+
+
+# ============================================================================
+# MODO SERVIDOR (conexiones SSE reales)
+# ============================================================================
+async def _http(host: str, puerto: int, metodo: str, ruta: str, token: str):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    escritor.write(
+        f"{metodo} {ruta} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n"
+        f"Accept: text/event-stream\r\nContent-Length: 0\r\n\r\n".encode()
+    )
+    await escritor.drain()
+    return lector, escritor
+
+
+async def _cliente_sse(url, token: str, esperados: int, listo: asyncio.Event, conectados: list, recibidos: list, fin: asyncio.Event):
+    ruta = f"{url.path}/notificaciones/stream"
+    lector, escritor = await _http(url.hostname, url.port or 80, "GET", ruta, token)
+    try:
+        estado = await lector.readline()
+        if b" 200 " not in estado:
+            print(f"⚠️ {estado.decode().strip()}")
+            return
+        conectados.append(1)
+        if len(conectados) == esperados:
+            listo.set()
+        while not fin.is_set():
+            linea = await lector.readline()
+            if not linea:
+                return
+            if linea.startswith(b"event: notificaciones"):
+                recibidos.append(time.perf_counter())
+    finally:
+        escritor.close()
+
+
+async def carga_servidor(base: str, token: str, clientes: int, rondas: int) -> None:
+    url = urlsplit(base)
+    listo = asyncio.Event()
+    fin = asyncio.Event()
+    conectados: list = []
+    recibidos: list = []
+
+    inicio = time.perf_counter()
+    tareas = [
+        asyncio.create_task(_cliente_sse(url, token, clientes, listo, conectados, recibidos, fin))
+        for _ in range(clientes)
+    ]
+    try:
+        await asyncio.wait_for(listo.wait(), timeout=120)
+    except asyncio.TimeoutError:
+        pass
+    print(f"🔌 {len(conectados)} conexiones abiertas en {time.perf_counter() - inicio:.2f} s")
+
+    latencias = []
+    inicio = time.perf_counter()
+    for _ in range(rondas):
+        antes = len(recibidos)
+        disparo = time.perf_counter()
+        lector, escritor = await _http(url.hostname, url.port or 80, "PUT",
+                                       f"{url.path}/notificaciones/leer-todas", token)
+        await lector.readline()
+        escritor.close()
+        limite = time.perf_counter() + 10
+        while len(recibidos) - antes < len(conectados) and time.perf_counter() < limite:
+            await asyncio.sleep(0.005)
+        latencias.extend(t - disparo for t in recibidos[antes:])
+
+    fin.set()
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    _resumen(f"Servidor {base} | {len(conectados)} conexiones, {rondas} avisos",
+             latencias, time.perf_counter() - inicio, len(conectados) * rondas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga del canal SSE de notificaciones")
+    parser.add_argument("--clientes", type=int, default=5000)
+    parser.add_argument("--usuarios", type=int, default=5000, help="Solo modo broker")
+    parser.add_argument("--rondas", type=int, default=20)
+    parser.add_argument("--url", help="Base de la API (ej: http://localhost:8000/api/v1) para el modo servidor")
+    parser.add_argument("--token", help="JWT del usuario con el que se conectan los clientes")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.token:
+            parser.error("--token es obligatorio con --url")
+        asyncio.run(carga_servidor(args.url.rstrip("/"), args.token, args.clientes, args.rondas))
+    else:
+        asyncio.run(carga_broker(args.clientes, args.usuarios, args.rondas))
@@ -336,3 +336,223 @@ CREATE INDEX IF NOT EXISTS idx_reserva_evento
 -- El endpoint /inscripciones/mis-pagos-pendientes usa exactamente esta combinación
 CREATE INDEX IF NOT EXISTS idx_reserva_usuario_estado
     ON Reserva_Evento(id_usuario, id_estado_reserva);
+
+-- ── Tabla Ocupacion_Evento ──────────────────────────────────────────────────
+
+-- Contadores de reservas por estado para cada evento.
+-- Reemplaza el COUNT(*) por evento que hacían los listados y el calendario.
+-- Se mantiene desde el backend (inscripcion_crud / eliminacion_crud) y se
+-- reconcilia con GET /api/v1/eventos/cron/reconciliar-ocupacion.
+CREATE TABLE IF NOT EXISTS Ocupacion_Evento (
+    id_evento INT PRIMARY KEY,
+    pendientes INT NOT NULL DEFAULT 0,                       -- reservas en estado 1
+    confirmadas INT NOT NULL DEFAULT 0,                      -- reservas en estado 2
+    canceladas INT NOT NULL DEFAULT 0,                       -- reservas en estado 3
+    expiradas INT NOT NULL DEFAULT 0,                        -- reservas en estado 4
+    fecha_actualizacion TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT FK_Ocupacion_Evento FOREIGN KEY (id_evento) REFERENCES Evento(id_evento)
+);
+
+-- Carga inicial a partir de las reservas existentes (seguro de re-ejecutar)
+INSERT INTO Ocupacion_Evento (id_evento, pendientes, confirmadas, canceladas, expiradas)
+SELECT id_evento,
+       COUNT(*) FILTER (WHERE id_estado_reserva = 1),
+       COUNT(*) FILTER (WHERE id_estado_reserva = 2),
+       COUNT(*) FILTER (WHERE id_estado_reserva = 3),
+       COUNT(*) FILTER (WHERE id_estado_reserva = 4)
+FROM Reserva_Evento
+GROUP BY id_evento
+ON CONFLICT (id_evento) DO UPDATE SET
+    pendientes = EXCLUDED.pendientes,
+    confirmadas = EXCLUDED.confirmadas,
+    canceladas = EXCLUDED.canceladas,
+    expiradas = EXCLUDED.expiradas,
+    fecha_actualizacion = CURRENT_TIMESTAMP;
+
+-- ── Provincia / Localidad normalizadas en Evento ────────────────────────────
+
+-- Derivadas de Evento.ubicacion (app/core/ubicacion.py). El backend las completa
+-- al crear / editar / aprobar; los eventos existentes se cargan con:
+--     python -m scripts.backfill_ubicacion
+-- Los reportes agrupan por estas columnas en lugar de parsear el texto.
+ALTER TABLE Evento ADD COLUMN IF NOT EXISTS provincia VARCHAR(100);
+ALTER TABLE Evento ADD COLUMN IF NOT EXISTS localidad VARCHAR(150);
+
+CREATE INDEX IF NOT EXISTS idx_evento_provincia_localidad
+    ON Evento(provincia, localidad);
+
+-- ── Tabla Correo_Saliente (outbox de correos) ───────────────────────────────
+
+-- Los servicios encolan acá los mails en la misma transacción que el cambio que
+-- los origina; el worker de app/services/outbox_services.py los envía en segundo
+-- plano agrupando hasta 1000 destinatarios por llamada a SendGrid.
+CREATE TABLE IF NOT EXISTS Correo_Saliente (
+    id_correo SERIAL PRIMARY KEY,
+    asunto VARCHAR(255) NOT NULL,
+    html TEXT NOT NULL,
+    destinatarios JSON NOT NULL,                               -- [{"email", "sustituciones"}]
+    enviados INT NOT NULL DEFAULT 0,                           -- puntero para retomar tras un error
+    estado VARCHAR(20) NOT NULL DEFAULT 'PENDIENTE',           -- PENDIENTE | ENVIADO | ERROR
+    intentos INT NOT NULL DEFAULT 0,
+    ultimo_error TEXT,
+    bloqueado_hasta TIMESTAMP,                                 -- lease del worker / backoff
+    fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    fecha_envio TIMESTAMP
+);
+
+-- El worker solo busca pendientes: índice parcial chico
+CREATE INDEX IF NOT EXISTS idx_correo_saliente_pendiente
+    ON Correo_Saliente(bloqueado_hasta, id_correo)
+    WHERE estado = 'PENDIENTE';
+
+-- ── Índices del feed de notificaciones ──────────────────────────────────────
+
+-- Paginación por keyset (fecha_creacion, id_notificacion) del usuario; INCLUDE leida
+-- para que la firma del ETag (total, no leídas, id máximo) salga solo del índice.
+CREATE INDEX IF NOT EXISTS idx_notificacion_usuario_fecha
+    ON Notificacion(id_usuario, fecha_creacion DESC, id_notificacion DESC) INCLUDE (leida);
+
+-- Badge del navbar (/notificaciones/unread-count): solo las no leídas, índice chico
+CREATE INDEX IF NOT EXISTS idx_notificacion_no_leidas
+    ON Notificacion(id_usuario)
+    WHERE leida = FALSE;
+
+-- ── Búsqueda de texto de eventos (/eventos/buscar) ──────────────────────────
+
+-- Ver app/db/busqueda_eventos.py. Requiere las extensiones contrib unaccent y pg_trgm.
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- unaccent() es STABLE: este envoltorio IMMUTABLE permite usarlo en índices
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+-- Configuración en español que además ignora acentos ("Córdoba" = "cordoba")
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+        ALTER TEXT SEARCH CONFIGURATION es_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+    END IF;
+END $$;
+
+-- Nombre (A) > ubicación (B) > descripción (C); se recalcula solo al escribir la fila
+ALTER TABLE Evento ADD COLUMN IF NOT EXISTS busqueda_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(nombre_evento, '')), 'A') ||
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(ubicacion, '')), 'B') ||
+        setweight(to_tsvector('es_unaccent'::regconfig, coalesce(descripcion, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_evento_busqueda_tsv
+    ON Evento USING gin (busqueda_tsv);
+
+-- Trigramas para palabras a medias / errores de tipeo y para el filtro por ubicación
+CREATE INDEX IF NOT EXISTS idx_evento_nombre_trgm
+    ON Evento USING gin (f_unaccent(lower(nombre_evento)) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_evento_ubicacion_trgm
+    ON Evento USING gin (f_unaccent(lower(ubicacion)) gin_trgm_ops);
+
+-- ── Paginación por cursor de los listados de eventos ────────────────────────
+
+-- Keyset (fecha_evento, id_evento) de los publicados (/eventos/buscar y listados
+-- públicos) y de "mis eventos"; ver app/core/paginacion.py.
+CREATE INDEX IF NOT EXISTS idx_evento_publicado_fecha_id
+    ON Evento(fecha_evento, id_evento)
+    WHERE id_estado = 3;
+
+CREATE INDEX IF NOT EXISTS idx_evento_usuario_fecha_id
+    ON Evento(id_usuario, fecha_evento DESC, id_evento DESC);
+
+-- ── Motor de transiciones de estado ─────────────────────────────────────────
+
+-- Lease de las tareas de fondo (app/db/crud/tarea_crud.py): con varios procesos
+-- solo uno corre cada tarea a la vez. Guarda la última corrida para GET /salud.
+CREATE TABLE IF NOT EXISTS Tarea_Lease (
+    nombre VARCHAR(100) PRIMARY KEY,
+    duenio VARCHAR(100),                                       -- host:pid que la tiene tomada
+    vence TIMESTAMP,                                           -- NULL = libre
+    ultima_ejecucion TIMESTAMP,
+    ultima_finalizacion TIMESTAMP,
+    ultimo_exito TIMESTAMP,
+    ultimo_estado VARCHAR(20),                                 -- OK | ERROR
+    ultimo_resultado JSON,
+    ultimo_error TEXT
+);
+
+-- Expiración de reservas impagas: el motor solo mira las pendientes
+CREATE INDEX IF NOT EXISTS idx_reserva_pendiente_expiracion
+    ON Reserva_Evento(fecha_expiracion)
+    WHERE id_estado_reserva = 1;
+
+-- Finalización de eventos vencidos: idx_evento_publicado_fecha_id (id_estado = 3) ya cubre
+-- "id_estado = 3 AND fecha_evento < hoy".
+
+-- ── Planificador de tareas: historial de corridas ───────────────────────────
+
+-- Una fila por corrida (programada, manual o por cron HTTP) de cada tarea de
+-- app/services/planificador_services.py; se purga a los 30 días.
+CREATE TABLE IF NOT EXISTS Ejecucion_Tarea (
+    id_ejecucion SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    disparo VARCHAR(20) NOT NULL,                              -- PROGRAMADA | MANUAL | CRON
+    duenio VARCHAR(100),
+    inicio TIMESTAMP NOT NULL,
+    fin TIMESTAMP,
+    duracion_ms DOUBLE PRECISION,
+    estado VARCHAR(20) NOT NULL,                               -- EN_CURSO | OK | ERROR
+    resultado JSON,
+    error TEXT
+);
+
+-- Historial y métricas por tarea (últimas N corridas)
+CREATE INDEX IF NOT EXISTS idx_ejecucion_tarea_nombre
+    ON Ejecucion_Tarea(nombre, id_ejecucion DESC);
+
+-- Purga por antigüedad
+CREATE INDEX IF NOT EXISTS idx_ejecucion_tarea_inicio
+    ON Ejecucion_Tarea(inicio);
+
+-- ── Tabla Ruta_Evento (geometría compacta de las rutas) ─────────────────────
+
+-- Ruta completa en encoded polyline (precisión 1e-5) + una versión simplificada
+-- (Douglas-Peucker) por zoom de Leaflet. La arma el modelo al asignar
+-- evento.ruta_coordenadas; los existentes: python -m scripts.backfill_rutas
+CREATE TABLE IF NOT EXISTS Ruta_Evento (
+    id_evento INT PRIMARY KEY REFERENCES Evento(id_evento) ON DELETE CASCADE,
+    puntos INT NOT NULL,
+    polyline TEXT NOT NULL,
+    niveles JSON NOT NULL,                                     -- {"8": polyline, "11": ..., "14": ...}
+    puntos_por_nivel JSON NOT NULL,
+    huella VARCHAR(40) NOT NULL,                               -- sha1 de la polyline (ETag)
+    fecha_actualizacion TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ── Métricas de ruta calculadas en el servidor ──────────────────────────────
+
+-- Distancia haversine, bounding box, centroide y densidad de puntos; se calculan
+-- al guardar evento.ruta_coordenadas (los existentes: python -m scripts.backfill_rutas --todos).
+-- evento.distancia_km pasa a ser la distancia medida sobre la ruta cuando hay ruta.
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS distancia_km DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS lat_min DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS lat_max DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS lng_min DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS lng_max DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS centroide_lat DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS centroide_lng DOUBLE PRECISION;
+ALTER TABLE Ruta_Evento ADD COLUMN IF NOT EXISTS densidad_puntos_km DOUBLE PRECISION;
+
+-- ── Geohash en Evento (búsqueda de eventos cercanos) ────────────────────────
+
+-- Derivado de Evento.lat / Evento.lng (app/core/geohash.py, precisión 9). El
+-- backend lo completa al crear / editar / aprobar; los existentes:
+--     python -m scripts.backfill_geohash
+-- GET /eventos/cercanos busca por prefijos de celda (LIKE 'prefijo%'):
+-- varchar_pattern_ops permite usar el btree aunque la base no tenga collation C.
+ALTER TABLE Evento ADD COLUMN IF NOT EXISTS geohash VARCHAR(12);
+
+CREATE INDEX IF NOT EXISTS idx_evento_geohash
+    ON Evento(geohash varchar_pattern_ops);